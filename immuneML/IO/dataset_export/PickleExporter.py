@@ -35,6 +35,7 @@ class PickleExporter(DataExporter):
             exported_dataset.repertoires = exported_repertoires
             exported_dataset.metadata_file = PickleExporter._export_metadata(dataset, path, dataset_filename, repertoires_path)
         elif isinstance(dataset, SequenceDataset) or isinstance(dataset, ReceptorDataset):
+            exported_dataset.materialize(path)
             exported_dataset.set_filenames(PickleExporter._export_receptors(exported_dataset.get_filenames(), path))
 
         file_path = path / dataset_filename
@@ -11,6 +11,7 @@ from immuneML.IO.dataset_import.DatasetImportParams import DatasetImportParams
 from immuneML.data_model.dataset.Dataset import Dataset
 from immuneML.data_model.dataset.ElementDataset import ElementDataset
 from immuneML.data_model.dataset.RepertoireDataset import RepertoireDataset
+from immuneML.data_model.repertoire.RepertoireColumnStore import RepertoireColumnStore
 from immuneML.environment.Constants import Constants
 
 
@@ -127,11 +128,15 @@ class PickleImport(DataImport):
     def _discover_repertoire_path(pickle_params, dataset):
         dataset_dir = PickleImport._discover_dataset_dir(pickle_params)
 
-        if len(list(dataset_dir.glob("*.npy"))) == len(dataset.repertoires):
+        if PickleImport._count_repertoire_files(dataset_dir) == len(dataset.repertoires):
             path = dataset_dir
-        elif len(list(dataset_dir.glob("repertoires/*.npy"))) == len(dataset.repertoires):
+        elif PickleImport._count_repertoire_files(dataset_dir / "repertoires/") == len(dataset.repertoires):
             path = dataset_dir / "repertoires/"
         else:
             path = None
 
         return path
+
+    @staticmethod
+    def _count_repertoire_files(path: Path) -> int:
+        return len(list(path.glob("*.npy"))) + len(list(path.glob(f"*{RepertoireColumnStore.FORMAT_SUFFIX}")))
@@ -3,10 +3,12 @@ from multiprocessing.pool import Pool
 import numpy as np
 from editdistance import eval as edit_distance
 
+from immuneML.analysis.SequenceMatchingIndex import SequenceMatchingIndex
 from immuneML.data_model.dataset.RepertoireDataset import RepertoireDataset
 from immuneML.data_model.receptor.receptor_sequence.ReceptorSequence import ReceptorSequence
 from immuneML.data_model.repertoire.Repertoire import Repertoire
 from immuneML.encodings.reference_encoding.SequenceMatchingSummaryType import SequenceMatchingSummaryType
+from immuneML.environment.EnvironmentSettings import EnvironmentSettings
 
 
 class SequenceMatcher:
@@ -31,23 +33,61 @@ class SequenceMatcher:
     }
     """
 
-    CORES = 4
+    _worker_reference_index = None
 
-    def match(self, dataset: RepertoireDataset, reference_sequences: list, max_distance: int, summary_type: SequenceMatchingSummaryType) -> dict:
+    def match(self, dataset: RepertoireDataset, reference_sequences: list, max_distance: int, summary_type: SequenceMatchingSummaryType,
+              number_of_processes: int = 1) -> dict:
+        """
+        Matches all repertoires in the dataset to the reference sequences; the reference sequences are indexed once and, if
+        number_of_processes > 1, the repertoires are distributed across a pool of processes which each receive the index only once
+        """
 
-        matched = {"repertoires": []}
+        reference_index = self._make_reference_index(reference_sequences, max_distance)
+        arguments = [(repertoire, index, summary_type) for index, repertoire in enumerate(dataset.get_data())]
 
-        for index, repertoire in enumerate(dataset.get_data()):
-            matched["repertoires"].append(self.match_repertoire(repertoire, index,
-                                                                reference_sequences, max_distance, summary_type))
+        return {"repertoires": self._run_per_repertoire(SequenceMatcher._match_repertoire_in_worker, arguments, reference_index,
+                                                        number_of_processes)}
 
-        return matched
+    def count_dataset_matches(self, dataset: RepertoireDataset, reference_index: SequenceMatchingIndex, number_of_processes: int = 1) -> np.ndarray:
+        """
+        Returns a matrix where rows correspond to repertoires and columns to reference sequences in the index, and the values are the summed
+        counts of repertoire sequences matching the reference; repertoires are processed in parallel as in match()
+        """
 
-    def matches_gene(self, gene1, gene2):
-        if gene1 == gene2:
-            return True
+        arguments = [(repertoire,) for repertoire in dataset.get_data()]
+        counts = self._run_per_repertoire(SequenceMatcher._count_repertoire_matches_in_worker, arguments, reference_index, number_of_processes)
+
+        return np.array(counts, dtype=int).reshape(len(arguments), reference_index.get_reference_count())
+
+    def _run_per_repertoire(self, function, arguments: list, reference_index: SequenceMatchingIndex, number_of_processes: int) -> list:
+        if number_of_processes is not None and number_of_processes > 1 and len(arguments) > 1:
+            with Pool(min(number_of_processes, len(arguments)), initializer=SequenceMatcher._initialize_worker,
+                      initargs=(reference_index,)) as pool:
+                return pool.starmap(function, arguments)
         else:
-            return gene2.split("-", 1)[0] == gene1 or gene1.split("-", 1)[0] == gene2
+            SequenceMatcher._initialize_worker(reference_index)
+            try:
+                return [function(*argument) for argument in arguments]
+            finally:
+                SequenceMatcher._initialize_worker(None)
+
+    @staticmethod
+    def _initialize_worker(reference_index: SequenceMatchingIndex):
+        SequenceMatcher._worker_reference_index = reference_index
+
+    @staticmethod
+    def _match_repertoire_in_worker(repertoire: Repertoire, index: int, summary_type: SequenceMatchingSummaryType) -> dict:
+        return SequenceMatcher.match_repertoire_to_index(repertoire, index, SequenceMatcher._worker_reference_index, summary_type)
+
+    @staticmethod
+    def _count_repertoire_matches_in_worker(repertoire: Repertoire) -> np.ndarray:
+        return SequenceMatcher._worker_reference_index.count_repertoire_matches(repertoire)
+
+    def _make_reference_index(self, reference_sequences: list, max_distance: int) -> SequenceMatchingIndex:
+        return SequenceMatchingIndex.from_receptor_sequences(reference_sequences, [max_distance] * len(reference_sequences))
+
+    def matches_gene(self, gene1, gene2):
+        return SequenceMatchingIndex.matches_gene(gene1, gene2)
 
     def matches_sequence(self, original_sequence: ReceptorSequence, reference_sequence: ReceptorSequence, max_distance):
         """
@@ -63,22 +103,41 @@ class SequenceMatcher:
 
     def match_repertoire(self, repertoire: Repertoire, index: int, reference_sequences: list, max_distance: int,
                          summary_type: SequenceMatchingSummaryType) -> dict:
+        return SequenceMatcher.match_repertoire_to_index(repertoire, index, self._make_reference_index(reference_sequences, max_distance),
+                                                         summary_type)
+
+    @staticmethod
+    def match_repertoire_to_index(repertoire: Repertoire, index: int, reference_index: SequenceMatchingIndex,
+                                  summary_type: SequenceMatchingSummaryType) -> dict:
+        """Matches the repertoire to the indexed reference sequences, reading sequences, genes, chains and counts from repertoire columns"""
 
+        sequences = repertoire.get_attribute(EnvironmentSettings.get_sequence_type().value)
+        sequence_count = len(sequences)
+        v_genes, j_genes, chains = [column if column is not None else [None] * sequence_count
+                                    for column in [repertoire.get_v_genes(), repertoire.get_j_genes(), repertoire.get_chains()]]
+
+        matched_sequences = {}
         matched = {"sequences": [], "repertoire": repertoire.identifier, "repertoire_index": index}
-        arguments = [(seq, reference_sequences, max_distance) for seq in repertoire.sequences]
 
-        with Pool(SequenceMatcher.CORES) as pool:
-            matched["sequences"] = pool.starmap(self.match_sequence, arguments)
+        for sequence, v_gene, j_gene, chain in zip(sequences, v_genes, j_genes, chains):
+            key = (sequence, v_gene, j_gene, chain)
+            if key not in matched_sequences:
+                matched_sequences[key] = [reference_index.sequences[reference] for reference in reference_index.find_matches(*key)]
+            matched["sequences"].append({"matching_sequences": matched_sequences[key], "sequence": sequence, "v_gene": v_gene,
+                                         "j_gene": j_gene, "chain": chain})
+
+        is_matched = np.array([len(sequence["matching_sequences"]) > 0 for sequence in matched["sequences"]], dtype=bool)
 
         if summary_type == SequenceMatchingSummaryType.CLONAL_PERCENTAGE:
-            total_count = np.sum([sequence.metadata.count for sequence in repertoire.sequences])
-            matched["clonal_percentage"] = np.sum([sequence.metadata.count for index, sequence in enumerate(repertoire.sequences) if len(matched["sequences"][index]["matching_sequences"]) > 0]) / total_count
+            counts = repertoire.get_counts()
+            counts = np.array([count if count is not None else 1 for count in counts]) if counts is not None else np.ones(sequence_count, dtype=int)
+            matched["clonal_percentage"] = np.sum(counts[is_matched]) / np.sum(counts)
         else:
-            matched["count"] = len([r for r in matched["sequences"] if len(r["matching_sequences"]) > 0])
-            matched["percentage"] = matched["count"] / len(matched["sequences"])
+            matched["count"] = int(np.sum(is_matched))
+            matched["percentage"] = matched["count"] / sequence_count
         matched["metadata"] = repertoire.metadata
         matched["patient_id"] = repertoire.identifier
-        matched["chains"] = list(set([sequence.metadata.chain for sequence in repertoire.sequences]))
+        matched["chains"] = list(set(chains))
 
         return matched
 
@@ -0,0 +1,138 @@
+from collections import defaultdict
+
+import numpy as np
+from editdistance import eval as edit_distance
+
+from immuneML.data_model.receptor.receptor_sequence.Chain import Chain
+from immuneML.data_model.repertoire.Repertoire import Repertoire
+from immuneML.environment.EnvironmentSettings import EnvironmentSettings
+
+
+class SequenceMatchingIndex:
+    """
+    Index over a list of reference sequences which finds all references matching a given sequence in the same way as
+    SequenceMatcher.matches_sequence does (same chain, matching V and J genes and Levenshtein distance between sequences of at most the
+    maximum distance), without comparing the sequence to each reference.
+
+    References are partitioned by chain and by V and J gene family (the part of the gene name before the first '-'): two genes can only match
+    if they belong to the same family, so a sequence is compared only to references from its own partition. Within a partition, each
+    reference is stored under its sequence and under all variants of the sequence with up to max_distance characters deleted (deletion
+    neighbourhood). If two sequences are within Levenshtein distance d, there is a common variant obtained by deleting at most d characters
+    from each, so the candidate matches for a sequence are the references stored under any of its deletion variants; the candidates are
+    then checked for the exact distance and gene match. When the maximum distance is 0, only the sequences are stored and matching is a
+    single lookup.
+
+    Arguments:
+
+        sequences (list): reference sequences (amino acid or nucleotide, depending on the sequence type used for matching)
+
+        v_genes (list): V genes of the reference sequences
+
+        j_genes (list): J genes of the reference sequences
+
+        chains (list): chains of the reference sequences (Chain objects or chain names)
+
+        max_distances (list): maximum Levenshtein distance for each reference sequence to be considered a match
+
+    """
+
+    def __init__(self, sequences: list, v_genes: list, j_genes: list, chains: list, max_distances: list):
+        assert len(sequences) == len(v_genes) == len(j_genes) == len(chains) == len(max_distances), \
+            f"{SequenceMatchingIndex.__name__}: sequences, genes, chains and maximum distances have to be of the same length."
+
+        self.sequences = list(sequences)
+        self.v_genes = list(v_genes)
+        self.j_genes = list(j_genes)
+        self.max_distances = [int(max_distance) for max_distance in max_distances]
+        self._partitions = {}
+        self._partition_max_distances = defaultdict(int)
+
+        for index, (sequence, v_gene, j_gene, chain) in enumerate(zip(self.sequences, self.v_genes, self.j_genes, chains)):
+            if not isinstance(sequence, str):
+                continue
+            key = SequenceMatchingIndex._make_partition_key(v_gene, j_gene, chain)
+            partition = self._partitions.setdefault(key, defaultdict(list))
+            self._partition_max_distances[key] = max(self._partition_max_distances[key], self.max_distances[index])
+            for variant in SequenceMatchingIndex._make_deletion_variants(sequence, self.max_distances[index]):
+                partition[variant].append(index)
+
+    @classmethod
+    def from_receptor_sequences(cls, reference_sequences: list, max_distances: list):
+        return cls(sequences=[sequence.get_sequence() for sequence in reference_sequences],
+                   v_genes=[sequence.metadata.v_gene for sequence in reference_sequences],
+                   j_genes=[sequence.metadata.j_gene for sequence in reference_sequences],
+                   chains=[sequence.metadata.chain for sequence in reference_sequences], max_distances=max_distances)
+
+    @staticmethod
+    def _make_partition_key(v_gene: str, j_gene: str, chain) -> tuple:
+        return SequenceMatchingIndex._to_chain(chain), SequenceMatchingIndex._get_gene_family(v_gene), \
+               SequenceMatchingIndex._get_gene_family(j_gene)
+
+    @staticmethod
+    def matches_gene(gene1: str, gene2: str) -> bool:
+        if gene1 == gene2:
+            return True
+        else:
+            return gene2.split("-", 1)[0] == gene1 or gene1.split("-", 1)[0] == gene2
+
+    @staticmethod
+    def _get_gene_family(gene: str):
+        return gene.split("-", 1)[0] if isinstance(gene, str) else gene
+
+    @staticmethod
+    def _to_chain(chain):
+        return Chain.get_chain(chain) if chain and isinstance(chain, str) else chain if isinstance(chain, Chain) else None
+
+    @staticmethod
+    def _make_deletion_variants(sequence: str, max_deletions: int) -> set:
+        variants = {sequence}
+        current_variants = {sequence}
+        for _ in range(max_deletions):
+            current_variants = {variant[:position] + variant[position + 1:] for variant in current_variants for position in range(len(variant))}
+            variants.update(current_variants)
+        return variants
+
+    def get_reference_count(self) -> int:
+        return len(self.sequences)
+
+    def find_matches(self, sequence: str, v_gene: str, j_gene: str, chain) -> list:
+        """Returns sorted indices of reference sequences which match the given sequence"""
+        key = SequenceMatchingIndex._make_partition_key(v_gene, j_gene, chain)
+        if not isinstance(sequence, str) or key not in self._partitions:
+            return []
+
+        partition = self._partitions[key]
+        candidates = set()
+        for variant in SequenceMatchingIndex._make_deletion_variants(sequence, self._partition_max_distances[key]):
+            candidates.update(partition.get(variant, []))
+
+        return sorted(index for index in candidates
+                      if SequenceMatchingIndex.matches_gene(self.v_genes[index], v_gene) and SequenceMatchingIndex.matches_gene(self.j_genes[index], j_gene)
+                      and edit_distance(sequence, self.sequences[index]) <= self.max_distances[index])
+
+    def count_matches(self, sequences, v_genes, j_genes, chains, counts=None) -> np.ndarray:
+        """
+        Returns for each reference sequence the summed counts of the given sequences which match it; identical sequences (with the same
+        genes and chain) are looked up only once, and sequences without counts are counted once
+        """
+        counts_per_sequence = defaultdict(int)
+        for sequence, v_gene, j_gene, chain, count in zip(sequences, v_genes, j_genes, chains, counts if counts is not None else [1] * len(sequences)):
+            counts_per_sequence[(sequence, v_gene, j_gene, SequenceMatchingIndex._to_chain(chain))] += count if count is not None else 1
+
+        matches = np.zeros(len(self.sequences), dtype=int)
+        for (sequence, v_gene, j_gene, chain), count in counts_per_sequence.items():
+            matches[self.find_matches(sequence, v_gene, j_gene, chain)] += count
+
+        return matches
+
+    def count_repertoire_matches(self, repertoire: Repertoire) -> np.ndarray:
+        """Same as count_matches, but reads the sequences, genes, chains and counts directly from repertoire columns"""
+        sequences = repertoire.get_attribute(EnvironmentSettings.get_sequence_type().value)
+        if sequences is None:
+            return np.zeros(len(self.sequences), dtype=int)
+
+        sequence_count = len(sequences)
+        columns = [column if column is not None else [None] * sequence_count
+                   for column in [repertoire.get_v_genes(), repertoire.get_j_genes(), repertoire.get_attribute("chains")]]
+
+        return self.count_matches(sequences, *columns, counts=repertoire.get_counts())
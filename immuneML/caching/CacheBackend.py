@@ -0,0 +1,24 @@
+import abc
+from pathlib import Path
+
+from immuneML.caching.CacheObjectType import CacheObjectType
+
+
+class CacheBackend(metaclass=abc.ABCMeta):
+    """
+    Storage used by CacheHandler for memoized objects; a different backend can be set by calling CacheHandler.set_backend(backend).
+    Each object is identified by the cache path (which depends on the cache type) and the file name derived from the cache key.
+    """
+
+    @abc.abstractmethod
+    def load(self, cache_path: Path, filename: Path, object_type: CacheObjectType):
+        """Returns the cached object or None if the object is not in the cache"""
+        pass
+
+    @abc.abstractmethod
+    def store(self, cache_path: Path, filename: Path, caching_object, object_type: CacheObjectType):
+        pass
+
+    @abc.abstractmethod
+    def get_statistics(self) -> dict:
+        pass
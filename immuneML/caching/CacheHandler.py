@@ -1,18 +1,35 @@
 import hashlib
 import logging
-import os
-import pickle
 from pathlib import Path
 
-import dill
+import numpy as np
 
+from immuneML.caching.CacheBackend import CacheBackend
 from immuneML.caching.CacheObjectType import CacheObjectType
+from immuneML.caching.TieredCacheBackend import TieredCacheBackend
 from immuneML.environment.EnvironmentSettings import EnvironmentSettings
 from immuneML.util.PathBuilder import PathBuilder
 
 
 class CacheHandler:
 
+    backend: CacheBackend = None
+
+    @staticmethod
+    def set_backend(backend: CacheBackend):
+        CacheHandler.backend = backend
+
+    @staticmethod
+    def get_backend() -> CacheBackend:
+        """Returns the cache backend, creating the default TieredCacheBackend (configured from the environment) when it is first needed"""
+        if CacheHandler.backend is None:
+            CacheHandler.backend = TieredCacheBackend()
+        return CacheHandler.backend
+
+    @staticmethod
+    def get_statistics() -> dict:
+        return CacheHandler.get_backend().get_statistics()
+
     @staticmethod
     def get_file_path(cache_type=None):
         file_path = EnvironmentSettings.get_cache_path(cache_type) / "files"
@@ -27,11 +44,7 @@ class CacheHandler:
     @staticmethod
     def get_by_key(cache_key: str, object_type, cache_type=None):
         filename = CacheHandler._build_filename(cache_key, object_type, cache_type)
-        obj = None
-        if filename.is_file():
-            with filename.open("rb") as file:
-                obj = dill.load(file)
-        return obj
+        return CacheHandler.get_backend().load(EnvironmentSettings.get_cache_path(cache_type), filename, object_type)
 
     @staticmethod
     def _build_filename(cache_key: str, object_type: CacheObjectType, cache_type=None) -> Path:
@@ -44,25 +57,44 @@ class CacheHandler:
         PathBuilder.build(EnvironmentSettings.get_cache_path(cache_type))
         h = CacheHandler.generate_cache_key(params)
         filename = CacheHandler._build_filename(cache_key=h, object_type=object_type, cache_type=cache_type)
-        with filename.open("wb") as file:
-            dill.dump(caching_object, file, protocol=pickle.HIGHEST_PROTOCOL)
+        CacheHandler.get_backend().store(EnvironmentSettings.get_cache_path(cache_type), filename, caching_object, object_type)
 
     @staticmethod
     def add_by_key(cache_key: str, caching_object, object_type: CacheObjectType = CacheObjectType.OTHER, cache_type=None):
         PathBuilder.build(EnvironmentSettings.get_cache_path(cache_type))
         filename = CacheHandler._build_filename(cache_key=cache_key, object_type=object_type, cache_type=cache_type)
         try:
-            with filename.open("wb") as file:
-                dill.dump(caching_object, file, protocol=pickle.HIGHEST_PROTOCOL)
+            CacheHandler.get_backend().store(EnvironmentSettings.get_cache_path(cache_type), filename, caching_object, object_type)
         except AttributeError:
-            os.remove(filename)
             logging.warning(f"CacheHandler: could not cache object of class {type(caching_object).__name__} with key {cache_key}. "
                             f"Object: {caching_object}\n"
                             f"Next time this object is needed, it will be recomputed which will take more time but should not influence results.")
 
     @staticmethod
     def generate_cache_key(params: tuple):
-        return hashlib.sha256(str(params).encode('utf-8')).hexdigest()
+        return hashlib.sha256(CacheHandler._to_canonical_string(params, top_level=True).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _to_canonical_string(params, top_level: bool = False) -> str:
+        """
+        Converts caching params to a string which does not depend on the order of elements in dicts and sets and which includes the full
+        content of numpy arrays; for tuples and lists of other values, the result is the same as str(params)
+        """
+        if isinstance(params, tuple):
+            elements = [CacheHandler._to_canonical_string(element) for element in params]
+            return f"({elements[0]},)" if len(elements) == 1 else f"({', '.join(elements)})"
+        elif isinstance(params, list):
+            return f"[{', '.join(CacheHandler._to_canonical_string(element) for element in params)}]"
+        elif isinstance(params, dict):
+            items = sorted(f"{CacheHandler._to_canonical_string(key)}: {CacheHandler._to_canonical_string(value)}" for key, value in params.items())
+            return f"{{{', '.join(items)}}}"
+        elif isinstance(params, (set, frozenset)):
+            return f"{{{', '.join(sorted(CacheHandler._to_canonical_string(element) for element in params))}}}" if len(params) > 0 else "set()"
+        elif isinstance(params, np.ndarray):
+            content = params.tobytes() if params.dtype != object else str(params.tolist()).encode('utf-8')
+            return f"ndarray({params.dtype}, {params.shape}, {hashlib.sha256(content).hexdigest()})"
+        else:
+            return str(params) if top_level else repr(params)
 
     @staticmethod
     def memo(cache_key: str, fn, object_type: CacheObjectType = CacheObjectType.OTHER, cache_type=None):
@@ -79,4 +111,4 @@ class CacheHandler:
 
     @staticmethod
     def _hash(params: tuple) -> str:
-        return hashlib.sha256(str(params).encode('utf-8')).hexdigest()
+        return CacheHandler.generate_cache_key(params)
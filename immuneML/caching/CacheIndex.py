@@ -0,0 +1,70 @@
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+
+from immuneML.caching.CacheObjectType import CacheObjectType
+from immuneML.caching.EvictionPolicy import EvictionPolicy
+from immuneML.util.PathBuilder import PathBuilder
+
+
+class CacheIndex:
+    """
+    Index of cached files with their size and access statistics, stored in an SQLite database in the cache directory so that it can be
+    updated safely by parallel processes using the same cache.
+    """
+
+    FILE_NAME = "cache_index.sqlite"
+
+    def __init__(self, cache_path: Path):
+        self.path = cache_path / CacheIndex.FILE_NAME
+
+    def _connect(self):
+        PathBuilder.build(self.path.parent)
+        connection = sqlite3.connect(str(self.path), timeout=60)
+        connection.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, object_type TEXT, size INTEGER, created REAL, "
+                           "last_access REAL, access_count INTEGER)")
+        return connection
+
+    def record_write(self, key: str, object_type: CacheObjectType, size: int):
+        now = time.time()
+        with closing(self._connect()) as connection, connection:
+            connection.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, 0)", (key, object_type.name, size, now, now))
+
+    def record_access(self, key: str, object_type: CacheObjectType, size: int):
+        self.record_accesses({key: (object_type, size, time.time(), 1)})
+
+    def record_accesses(self, accesses: dict):
+        """
+        Records accesses to multiple cached files in one transaction
+
+        Arguments:
+
+            accesses (dict): cache keys mapped to tuples (object type, size, time of the last access, number of accesses)
+
+        """
+        with closing(self._connect()) as connection, connection:
+            connection.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET "
+                                   "last_access = MAX(last_access, excluded.last_access), access_count = access_count + excluded.access_count",
+                                   [(key, object_type.name, size, last_access, last_access, count)
+                                    for key, (object_type, size, last_access, count) in accesses.items()])
+
+    def remove(self, key: str):
+        with closing(self._connect()) as connection, connection:
+            connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def get_total_size(self, object_type: CacheObjectType) -> int:
+        with closing(self._connect()) as connection:
+            return connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries WHERE object_type = ?", (object_type.name,)).fetchone()[0]
+
+    def get_eviction_candidates(self, object_type: CacheObjectType, policy: EvictionPolicy) -> list:
+        """Returns (key, size) pairs of the given object type in the order in which they should be evicted"""
+        order = "last_access" if policy == EvictionPolicy.LRU else "access_count, last_access"
+        with closing(self._connect()) as connection:
+            return connection.execute(f"SELECT key, size FROM entries WHERE object_type = ? ORDER BY {order}", (object_type.name,)).fetchall()
+
+    def get_entries(self) -> list:
+        with closing(self._connect()) as connection:
+            cursor = connection.execute("SELECT * FROM entries")
+            columns = [description[0] for description in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
@@ -0,0 +1,42 @@
+from pathlib import Path
+
+import dill
+import numpy as np
+
+from immuneML.data_model.encoded_data.EncodedData import EncodedData
+from immuneML.data_model.encoded_data.EncodedDataSerializer import EncodedDataSerializer
+from immuneML.util.PathBuilder import PathBuilder
+
+
+class CachePickler(dill.Pickler):
+    """
+    Pickler for cached objects which stores EncodedData objects and large numpy arrays outside of the pickle file, in the data_path
+    directory, so that they can be memory-mapped when the cached object is loaded with CacheUnpickler. The pickle refers to the stored
+    objects by their path relative to the parent of data_path, so it also records which data directory it uses.
+    """
+
+    ENCODED_DATA = "encoded_data"
+    ARRAY = "array"
+
+    def __init__(self, file, data_path: Path, min_array_bytes: int = 1024 ** 2, **kwargs):
+        super().__init__(file, **kwargs)
+        self.data_path = data_path
+        self.min_array_bytes = min_array_bytes
+        self.stored_objects = {}
+
+    def persistent_id(self, obj):
+        if isinstance(obj, EncodedData):
+            return self._store(obj, CachePickler.ENCODED_DATA, lambda path: EncodedDataSerializer.write(obj, path))
+        elif type(obj) in [np.ndarray, np.memmap] and not obj.dtype.hasobject and obj.nbytes >= self.min_array_bytes:
+            return self._store(obj, CachePickler.ARRAY, lambda path: np.save(str(path), np.asarray(obj), allow_pickle=False))
+        else:
+            return None
+
+    def _store(self, obj, kind: str, write_fn):
+        if id(obj) not in self.stored_objects:
+            name = f"{kind}_{len(self.stored_objects)}" + (".npy" if kind == CachePickler.ARRAY else "")
+            PathBuilder.build(self.data_path)
+            write_fn(self.data_path / name)
+            self.stored_objects[id(obj)] = (kind, name, obj)
+        kind, name, _ = self.stored_objects[id(obj)]
+        return kind, f"{self.data_path.name}/{name}"
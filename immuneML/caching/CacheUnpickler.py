@@ -0,0 +1,28 @@
+import pickle
+from pathlib import Path
+
+import dill
+import numpy as np
+
+from immuneML.caching.CachePickler import CachePickler
+from immuneML.data_model.encoded_data.EncodedDataSerializer import EncodedDataSerializer
+
+
+class CacheUnpickler(dill.Unpickler):
+    """
+    Unpickler for objects stored with CachePickler: EncodedData objects and large arrays stored in the data directory recorded in the
+    pickle (relative to path, the directory of the pickle file) are memory-mapped instead of being read into memory.
+    """
+
+    def __init__(self, file, path: Path, **kwargs):
+        super().__init__(file, **kwargs)
+        self.path = path
+
+    def persistent_load(self, pid):
+        kind, name = pid
+        if kind == CachePickler.ENCODED_DATA:
+            return EncodedDataSerializer.read(self.path / name)
+        elif kind == CachePickler.ARRAY:
+            return np.load(str(self.path / name), mmap_mode="c", allow_pickle=False)
+        else:
+            raise pickle.UnpicklingError(f"{CacheUnpickler.__name__}: unknown persistent object type {kind}.")
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class EvictionPolicy(Enum):
+
+    LRU = "least_recently_used"
+    LFU = "least_frequently_used"
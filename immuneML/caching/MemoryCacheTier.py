@@ -0,0 +1,40 @@
+from collections import OrderedDict
+
+
+class MemoryCacheTier:
+    """
+    In-process least-recently-used store of serialized cache objects, limited by the total size in bytes. Objects are kept serialized so
+    that each hit returns a new copy and callers cannot modify the cached object.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._items = OrderedDict()
+
+    def get(self, key: str):
+        data = self._items.get(key)
+        if data is not None:
+            self._items.move_to_end(key)
+        return data
+
+    def put(self, key: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+
+        self.remove(key)
+        self._items[key] = data
+        self.current_bytes += len(data)
+
+        while self.current_bytes > self.max_bytes:
+            _, evicted = self._items.popitem(last=False)
+            self.current_bytes -= len(evicted)
+
+    def remove(self, key: str):
+        data = self._items.pop(key, None)
+        if data is not None:
+            self.current_bytes -= len(data)
+
+    def clear(self):
+        self._items.clear()
+        self.current_bytes = 0
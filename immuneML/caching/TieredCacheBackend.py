@@ -0,0 +1,265 @@
+import atexit
+import io
+import logging
+import os
+import pickle
+import pickletools
+import shutil
+import sqlite3
+import time
+import uuid
+import weakref
+from collections import defaultdict
+from pathlib import Path
+
+from immuneML.caching.CacheBackend import CacheBackend
+from immuneML.caching.CacheIndex import CacheIndex
+from immuneML.caching.CacheObjectType import CacheObjectType
+from immuneML.caching.CachePickler import CachePickler
+from immuneML.caching.CacheUnpickler import CacheUnpickler
+from immuneML.caching.EvictionPolicy import EvictionPolicy
+from immuneML.caching.MemoryCacheTier import MemoryCacheTier
+from immuneML.environment.Constants import Constants
+
+
+class TieredCacheBackend(CacheBackend):
+    """
+    Cache backend with an in-process memory tier in front of the disk tier.
+
+    Objects are written to disk atomically (to a temporary file which is then renamed), so that parallel processes never read partially
+    written objects. EncodedData objects and large numpy arrays which are part of the cached object are not pickled, but stored in a
+    separate directory next to the pickle file (see CachePickler) and memory-mapped when the object is loaded. Each write uses a new data
+    directory with a unique name which is recorded in the pickle, so renaming the pickle file is the only step which replaces a cached
+    object. Data directories which are no longer referenced by the pickle file are removed when the object is written again or evicted, once
+    they are older than STALE_DATA_SECONDS (so that directories of writes which are still in progress are kept); when an object is evicted,
+    the data directory its pickle file refers to is removed with it.
+
+    Each write and read is recorded in a CacheIndex in the cache directory, which keeps the size and access statistics of each cached
+    file. If a maximum number of bytes is set for an object type, the least recently used (LRU) or least frequently used (LFU) objects of
+    that type are removed from the disk once the limit is exceeded. Updating the index is best-effort (e.g., if the SQLite database
+    cannot be locked on a network file system, a warning is logged and caching continues) and reads are recorded in batches: they are
+    kept in memory and written to the index in one transaction after ACCESS_FLUSH_COUNT reads or ACCESS_FLUSH_SECONDS seconds, before
+    eviction and when the process exits normally.
+
+    Arguments:
+
+        memory_max_bytes (int): the maximum size of serialized objects kept in memory in each process; 0 disables the memory tier; if not
+        set, it is read from the environment variable cache_memory_max_bytes and defaults to 256MB
+
+        max_bytes_per_type (dict): maximum size of cached files on disk per CacheObjectType; object types which are not listed are not limited;
+        if not set, it is read from the environment variable cache_max_bytes_per_type with comma-separated object types and limits (e.g.,
+        "ENCODING:10000000000,OTHER:1000000000") and no object type is limited by default
+
+        eviction_policy (EvictionPolicy): which objects to remove first when the size limit for an object type is exceeded
+
+    """
+
+    COUNTERS = ("memory_hits", "disk_hits", "misses", "bytes_read", "bytes_written", "evictions")
+    STALE_DATA_SECONDS = 3600
+    DEFAULT_MEMORY_MAX_BYTES = 256 * 1024 ** 2
+    ACCESS_FLUSH_COUNT = 100
+    ACCESS_FLUSH_SECONDS = 30
+
+    _instances = weakref.WeakSet()
+    _exit_handler_registered = False
+
+    def __init__(self, memory_max_bytes: int = None, max_bytes_per_type: dict = None, eviction_policy: EvictionPolicy = EvictionPolicy.LRU):
+        self.memory_tier = MemoryCacheTier(memory_max_bytes if memory_max_bytes is not None else self._parse_memory_max_bytes())
+        self.max_bytes_per_type = max_bytes_per_type if max_bytes_per_type is not None else self._parse_max_bytes_per_type()
+        self.eviction_policy = eviction_policy
+        self.statistics = defaultdict(lambda: dict.fromkeys(TieredCacheBackend.COUNTERS, 0))
+        self._pending_accesses = defaultdict(dict)
+        self._pending_access_count = 0
+        self._last_flush = time.time()
+        TieredCacheBackend._register_for_exit(self)
+
+    @staticmethod
+    def _register_for_exit(backend):
+        """Keeps track of the backends whose pending reads are written to the cache index at exit, with only one exit handler for all"""
+        TieredCacheBackend._instances.add(backend)
+        if not TieredCacheBackend._exit_handler_registered:
+            atexit.register(TieredCacheBackend._flush_all_access_records)
+            TieredCacheBackend._exit_handler_registered = True
+
+    @staticmethod
+    def _flush_all_access_records():
+        for backend in list(TieredCacheBackend._instances):
+            backend.flush_access_records()
+
+    @staticmethod
+    def _parse_memory_max_bytes() -> int:
+        value = os.environ.get(Constants.CACHE_MEMORY_MAX_BYTES)
+        if value is None:
+            return TieredCacheBackend.DEFAULT_MEMORY_MAX_BYTES
+        if not value.strip().isdigit():
+            raise ValueError(f"{TieredCacheBackend.__name__}: environment variable {Constants.CACHE_MEMORY_MAX_BYTES} has to be a non-negative "
+                             f"integer, got {value} instead.")
+        return int(value)
+
+    @staticmethod
+    def _parse_max_bytes_per_type() -> dict:
+        value = os.environ.get(Constants.CACHE_MAX_BYTES_PER_TYPE, "")
+        max_bytes_per_type = {}
+        for item in [item.strip() for item in value.split(",") if item.strip() != ""]:
+            object_type, _, max_bytes = item.partition(":")
+            if object_type.strip().upper() not in CacheObjectType.__members__ or not max_bytes.strip().isdigit():
+                raise ValueError(f"{TieredCacheBackend.__name__}: environment variable {Constants.CACHE_MAX_BYTES_PER_TYPE} has to list object "
+                                 f"types ({', '.join(CacheObjectType.__members__)}) and their size limits in bytes as TYPE:BYTES separated by "
+                                 f"commas, got {value} instead.")
+            max_bytes_per_type[CacheObjectType[object_type.strip().upper()]] = int(max_bytes)
+        return max_bytes_per_type
+
+    def load(self, cache_path: Path, filename: Path, object_type: CacheObjectType):
+        statistics = self.statistics[object_type.name]
+
+        if not filename.is_file():
+            self.memory_tier.remove(str(filename))
+            statistics["misses"] += 1
+            return None
+
+        data = self.memory_tier.get(str(filename))
+        if data is not None:
+            statistics["memory_hits"] += 1
+        else:
+            try:
+                data = filename.read_bytes()
+            except FileNotFoundError:
+                statistics["misses"] += 1
+                return None
+            self.memory_tier.put(str(filename), data)
+            statistics["disk_hits"] += 1
+            statistics["bytes_read"] += len(data)
+
+        try:
+            obj = CacheUnpickler(io.BytesIO(data), filename.parent).load()
+        except FileNotFoundError:
+            self.memory_tier.remove(str(filename))
+            statistics["misses"] += 1
+            return None
+
+        self._record_access(cache_path, self._get_index_key(cache_path, filename), object_type, len(data))
+
+        return obj
+
+    def _record_access(self, cache_path: Path, key: str, object_type: CacheObjectType, size: int):
+        _, _, _, count = self._pending_accesses[cache_path].get(key, (None, None, None, 0))
+        self._pending_accesses[cache_path][key] = (object_type, size, time.time(), count + 1)
+        self._pending_access_count += 1
+
+        if self._pending_access_count >= self.ACCESS_FLUSH_COUNT or time.time() - self._last_flush >= self.ACCESS_FLUSH_SECONDS:
+            self.flush_access_records()
+
+    def flush_access_records(self):
+        """Writes the reads of cached objects which were not yet recorded to the cache index"""
+        pending_accesses, self._pending_accesses = self._pending_accesses, defaultdict(dict)
+        self._pending_access_count = 0
+        self._last_flush = time.time()
+
+        for cache_path, accesses in pending_accesses.items():
+            self._update_index(lambda: CacheIndex(cache_path).record_accesses(accesses))
+
+    def _update_index(self, update_fn) -> bool:
+        try:
+            update_fn()
+            return True
+        except sqlite3.Error as error:
+            logging.warning(f"{TieredCacheBackend.__name__}: the cache index could not be updated, access statistics and size limits of cached "
+                            f"objects might not be up to date. Error: {error}")
+            return False
+
+    def store(self, cache_path: Path, filename: Path, caching_object, object_type: CacheObjectType):
+        version = f"{os.getpid()}.{uuid.uuid4().hex}"
+        tmp_filename = filename.parent / f".{filename.name}.{version}.tmp"
+        data_path = self._get_data_path(filename, version)
+        try:
+            with tmp_filename.open("wb") as file:
+                CachePickler(file, data_path, protocol=pickle.HIGHEST_PROTOCOL).dump(caching_object)
+            size = tmp_filename.stat().st_size + self._get_directory_size(data_path)
+            os.replace(tmp_filename, filename)
+        except BaseException:
+            if tmp_filename.is_file():
+                os.remove(tmp_filename)
+            if data_path.is_dir():
+                shutil.rmtree(data_path)
+            raise
+
+        self._remove_stale_data_paths(filename)
+        self.memory_tier.remove(str(filename))
+        self.statistics[object_type.name]["bytes_written"] += size
+
+        index = CacheIndex(cache_path)
+        index_updated = self._update_index(lambda: index.record_write(self._get_index_key(cache_path, filename), object_type, size))
+
+        if object_type in self.max_bytes_per_type and index_updated:
+            self.flush_access_records()
+            self._update_index(lambda: self._evict(cache_path, index, object_type, keep_key=self._get_index_key(cache_path, filename)))
+
+    def _evict(self, cache_path: Path, index: CacheIndex, object_type: CacheObjectType, keep_key: str):
+        max_bytes = self.max_bytes_per_type[object_type]
+        total_bytes = index.get_total_size(object_type)
+
+        if total_bytes > max_bytes:
+            for key, size in index.get_eviction_candidates(object_type, self.eviction_policy):
+                if total_bytes <= max_bytes:
+                    break
+                if key != keep_key:
+                    self._remove_cached_object(cache_path / key)
+                    index.remove(key)
+                    total_bytes -= size
+                    self.statistics[object_type.name]["evictions"] += 1
+
+            logging.info(f"{TieredCacheBackend.__name__}: removed cached objects of type {object_type.name} to keep their size under "
+                         f"{max_bytes} bytes.")
+
+    def _remove_cached_object(self, filename: Path):
+        """Removes the pickle file together with the data directory it refers to, and any stale data directories of the same object"""
+        referenced_data_path = self._get_referenced_data_path(filename)
+        if filename.is_file():
+            os.remove(filename)
+        if referenced_data_path is not None:
+            shutil.rmtree(filename.parent / referenced_data_path, ignore_errors=True)
+        self._remove_stale_data_paths(filename)
+        self.memory_tier.remove(str(filename))
+
+    def _get_data_path(self, filename: Path, version: str) -> Path:
+        return filename.parent / f"{filename.stem}_data.{version}"
+
+    def _get_referenced_data_path(self, filename: Path):
+        """Returns the name of the data directory the pickle file refers to (see CachePickler) or None if there is no such directory"""
+        prefix = f"{filename.stem}_data."
+        try:
+            data = filename.read_bytes()
+        except FileNotFoundError:
+            return None
+        for _, argument, _ in pickletools.genops(data):
+            if isinstance(argument, str) and argument.startswith(prefix) and "/" in argument:
+                return argument.split("/", 1)[0]
+        return None
+
+    def _remove_stale_data_paths(self, filename: Path):
+        """Removes data directories of the cached object which are not referenced by its pickle file and are older than STALE_DATA_SECONDS"""
+        data_paths = [path for path in filename.parent.glob(f"{filename.stem}_data*") if path.is_dir()]
+        if len(data_paths) > 0:
+            referenced_data_path = self._get_referenced_data_path(filename)
+            for data_path in data_paths:
+                if data_path.name != referenced_data_path and self._is_stale(data_path):
+                    shutil.rmtree(data_path, ignore_errors=True)
+
+    def _is_stale(self, data_path: Path) -> bool:
+        try:
+            return time.time() - data_path.stat().st_mtime > self.STALE_DATA_SECONDS
+        except FileNotFoundError:
+            return False
+
+    def _get_directory_size(self, path: Path) -> int:
+        return sum(file.stat().st_size for file in path.rglob("*") if file.is_file()) if path.is_dir() else 0
+
+    def _get_index_key(self, cache_path: Path, filename: Path) -> str:
+        return filename.relative_to(cache_path).as_posix()
+
+    def get_statistics(self) -> dict:
+        """Returns the hit, miss, byte and eviction counters per object type for the current process"""
+        return {object_type: dict(counters) for object_type, counters in self.statistics.items()}
+
+    def reset_statistics(self):
+        self.statistics.clear()
@@ -1,27 +1,47 @@
+from pathlib import Path
 from uuid import uuid4
 
+import numpy as np
+
 from immuneML.data_model.dataset.Dataset import Dataset
 from immuneML.data_model.encoded_data.EncodedData import EncodedData
 from immuneML.data_model.receptor.ElementGenerator import ElementGenerator
+from immuneML.util.PathBuilder import PathBuilder
 
 
 class ElementDataset(Dataset):
     """
     This is the base class for ReceptorDataset and SequenceDataset which implements all the functionality for both classes. The only difference between
     these two classes is whether paired or single chain data is stored.
+
+    A dataset can also be a view of another dataset: if example_indices are set, the dataset consists only of the examples with these indices
+    in the batch files (see make_subset); the batch files with only the examples of the view are created only when they are explicitly requested
+    (see materialize).
     """
 
     def __init__(self, labels: dict = None, encoded_data: EncodedData = None, filenames: list = None, identifier: str = None,
-                 file_size: int = 50000, name: str = None):
+                 file_size: int = 50000, name: str = None, example_indices=None):
         super().__init__()
         self.labels = labels
         self.encoded_data = encoded_data
         self.identifier = identifier if identifier is not None else uuid4().hex
         self._filenames = sorted(filenames) if filenames is not None else []
-        self.element_generator = ElementGenerator(self._filenames, file_size)
+        self.example_indices = np.asarray(example_indices, dtype=int) if example_indices is not None else None
+        self.element_generator = ElementGenerator(self._filenames, file_size, self.example_indices)
         self.file_size = file_size
         self.element_ids = None
         self.name = name
+        self._view_path = None
+        self._view_type = None
+
+    def __setstate__(self, state):
+        state.setdefault("example_indices", None)
+        state.setdefault("_view_path", None)
+        state.setdefault("_view_type", None)
+        self.__dict__.update(state)
+
+    def is_view(self) -> bool:
+        return self.example_indices is not None
 
     def get_data(self, batch_size: int = 10000):
         self._filenames.sort()
@@ -34,13 +54,61 @@ class ElementDataset(Dataset):
         return self.element_generator.build_batch_generator()
 
     def get_filenames(self):
+        """Returns the batch files the examples of the dataset are read from; for a dataset view, these are the batch files of the original dataset"""
         return self._filenames
 
     def set_filenames(self, filenames):
+        """Sets the batch files which store all examples of the dataset (for a dataset view, the dataset will no longer be a view)"""
         self._filenames = filenames
+        self.example_indices = None
+        self.element_generator.element_indices = None
+        self.element_generator.file_list = self._filenames
+
+    def materialize(self, path: Path = None):
+        """
+        For a dataset view, writes the batch files with only the examples of the view (under path if given, otherwise under the path given
+        to make_subset) and sets them as the batch files of the dataset, so that it is no longer a view; does nothing for other datasets
+        """
+        if not self.is_view():
+            return
+
+        self._filenames.sort()
+        self.element_generator.file_list = self._filenames
+        path = PathBuilder.build(path if path is not None else self._view_path if self._view_path is not None else self._filenames[0].parent)
+        batch_filenames = ElementGenerator(self._filenames, self.file_size).make_subset(self.example_indices.tolist(), path,
+                                                                                        self._view_type or Dataset.SUBSAMPLED,
+                                                                                        self.identifier)
+        self.set_filenames(batch_filenames)
+
+    def _copy_view_settings(self, dataset):
+        dataset._view_path = self._view_path
+        dataset._view_type = self._view_type
+        return dataset
+
+    def get_batch_datasets(self) -> list:
+        """Returns one dataset per batch file with the examples of this dataset which are stored in that file"""
+        self._filenames.sort()
+        self.element_generator.file_list = self._filenames
+        if self.is_view():
+            return [self.__class__(labels=self.labels, filenames=[self._filenames[file_index]], file_size=self.file_size,
+                                   identifier=f"{self.identifier}_batch_{index}", example_indices=positions)
+                    for index, (file_index, positions) in enumerate(self.element_generator.split_indices_by_file(self.example_indices))]
+        else:
+            return [self.__class__(labels=self.labels, filenames=[filename], file_size=self.file_size,
+                                   identifier=f"{self.identifier}_batch_{index}") for index, filename in enumerate(self._filenames)]
 
     def get_example_count(self):
-        return len(self.get_example_ids())
+        if self.element_ids is not None and len(self.element_ids) > 0:
+            return len(self.element_ids)
+        self._filenames.sort()
+        self.element_generator.file_list = self._filenames
+        return self.element_generator.get_element_count()
+
+    def get_examples(self, example_indices) -> list:
+        """Loads only the examples (receptors or receptor sequences) with the given indices, in the order of example_indices"""
+        self._filenames.sort()
+        self.element_generator.file_list = self._filenames
+        return self.element_generator.get_elements(example_indices)
 
     def get_example_ids(self):
         if self.element_ids is None or (isinstance(self.element_ids, list) and len(self.element_ids) == 0):
@@ -52,6 +120,8 @@ class ElementDataset(Dataset):
     def make_subset(self, example_indices, path, dataset_type: str):
         """
         Creates a new dataset object with only those examples (receptors or receptor sequences) available which were given by index in example_indices argument.
+        The new dataset is a view of this dataset: it only stores the indices of its examples and reads them from the batch files of this dataset,
+        so no examples are copied; the batch files of the new dataset are created under path only if materialize is called (e.g., when the dataset is exported).
 
         Args:
             example_indices (list): a list of indices of examples (receptors or receptor sequences) to use in the new dataset
@@ -63,9 +133,20 @@ class ElementDataset(Dataset):
             a new dataset object (ReceptorDataset or SequenceDataset, as the original dataset) which includes only the examples specified under example_indices
 
         """
-        new_dataset = self.__class__(labels=self.labels, file_size=self.file_size)
-        batch_filenames = self.element_generator.make_subset(example_indices, path, dataset_type, new_dataset.identifier)
-        new_dataset.set_filenames(batch_filenames)
+        if example_indices is None or len(example_indices) == 0:
+            raise RuntimeError(f"{ElementDataset.__name__}: no examples were specified to create the dataset subset. "
+                               f"Dataset type was {dataset_type}, dataset identifier: {self.identifier}.")
+
+        example_indices = np.sort(np.asarray(example_indices, dtype=int))
+        example_count = self.get_example_count()
+        assert example_indices[0] >= 0 and example_indices[-1] < example_count, \
+            f"{ElementDataset.__name__}: example indices for the subset have to be between 0 and {example_count - 1}."
+
+        self._filenames.sort()
+        new_dataset = self.__class__(labels=self.labels, filenames=list(self._filenames), file_size=self.file_size,
+                                     example_indices=self.example_indices[example_indices] if self.is_view() else example_indices)
+        new_dataset._view_path = Path(path)
+        new_dataset._view_type = dataset_type
         return new_dataset
 
     def get_label_names(self):
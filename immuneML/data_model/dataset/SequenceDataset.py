@@ -1,13 +1,13 @@
 import copy
 import logging
 import math
-import pickle
 from pathlib import Path
 from typing import List
 
 import pandas as pd
 
 from immuneML.data_model.dataset.ElementDataset import ElementDataset
+from immuneML.data_model.receptor.ElementBatchFile import ElementBatchFile
 from immuneML.data_model.receptor.receptor_sequence.ReceptorSequence import ReceptorSequence
 
 
@@ -23,8 +23,7 @@ class SequenceDataset(ElementDataset):
                       for index in range(1, file_count+1)]
 
         for index in range(file_count):
-            with file_names[index].open("wb") as file:
-                pickle.dump(sequences[index*file_size:(index+1)*file_size], file)
+            ElementBatchFile.write(file_names[index], sequences[index*file_size:(index+1)*file_size])
 
         return SequenceDataset(filenames=file_names, file_size=file_size, name=name)
 
@@ -45,4 +44,5 @@ class SequenceDataset(ElementDataset):
         return pd.DataFrame(result) if return_df else result
 
     def clone(self):
-        return SequenceDataset(self.labels, copy.deepcopy(self.encoded_data), copy.deepcopy(self._filenames), file_size=self.file_size)
+        return self._copy_view_settings(SequenceDataset(self.labels, copy.deepcopy(self.encoded_data), copy.deepcopy(self._filenames),
+                                                        file_size=self.file_size, example_indices=copy.deepcopy(self.example_indices)))
@@ -0,0 +1,76 @@
+from typing import Callable
+
+import numpy as np
+from scipy import sparse
+
+from immuneML.data_model.dataset.ElementDataset import ElementDataset
+from immuneML.data_model.encoded_data.EncodedData import EncodedData
+from immuneML.encodings.DatasetEncoder import DatasetEncoder
+from immuneML.encodings.EncoderParams import EncoderParams
+
+
+class EncodedBatchGenerator:
+    """
+    Creates functions which return mini-batches of encoded data (EncodedData objects) to train ML methods incrementally, so that only
+    one batch has to be kept in memory at a time. The functions can be called multiple times (e.g., once per training epoch) and each
+    call returns a new generator of batches: in the same order if called without arguments, or shuffled if a random state
+    (np.random.RandomState) is given.
+    """
+
+    @staticmethod
+    def from_encoded_data(encoded_data: EncodedData, batch_size: int) -> Callable:
+        """
+        Splits already encoded data into batches of batch_size examples; if the examples are memory-mapped (e.g., loaded from cache),
+        only the current batch is read into memory. When shuffled, the examples are assigned to batches in a random order. The positions
+        of the examples of a batch in the encoded data are stored in the info of the batch (key example_indices).
+        """
+        assert batch_size > 0, f"{EncodedBatchGenerator.__name__}: batch_size has to be a positive integer, got {batch_size} instead."
+
+        examples = encoded_data.examples.tocsr() if sparse.issparse(encoded_data.examples) else encoded_data.examples
+
+        def get_batches(random_state: np.random.RandomState = None):
+            order = random_state.permutation(examples.shape[0]) if random_state is not None else np.arange(examples.shape[0])
+            for start in range(0, examples.shape[0], batch_size):
+                yield EncodedBatchGenerator._make_batch(encoded_data, examples, np.sort(order[start:start + batch_size]))
+
+        return get_batches
+
+    @staticmethod
+    def _make_batch(encoded_data: EncodedData, examples, indices: np.ndarray) -> EncodedData:
+        labels = {label: np.asarray(values)[indices] for label, values in encoded_data.labels.items()} \
+            if encoded_data.labels is not None else None
+        example_ids = list(np.asarray(encoded_data.example_ids)[indices]) if encoded_data.example_ids is not None else None
+
+        return EncodedData(examples=np.asarray(examples[indices]) if isinstance(examples, np.ndarray) else examples[indices],
+                           labels=labels, example_ids=example_ids, feature_names=encoded_data.feature_names,
+                           feature_annotations=encoded_data.feature_annotations, encoding=encoded_data.encoding,
+                           info={"example_indices": indices})
+
+    @staticmethod
+    def from_element_dataset(dataset: ElementDataset, encoder: DatasetEncoder, params: EncoderParams, batch_size: int = None) -> Callable:
+        """
+        Encodes a receptor or sequence dataset one batch file (as returned by ElementDataset.get_batch_datasets) at a time with an encoder
+        which was already fitted on training data; params.learn_model has to be False so that all batches get the same features. If
+        batch_size is set, each encoded batch file is split further into batches of batch_size examples. When shuffled, the batch files
+        are encoded in a random order and their examples are assigned to batches in a random order, so only one encoded batch file is kept
+        in memory at a time. The positions of the examples of a batch in the dataset are stored in the info of the batch (key example_indices).
+        """
+        assert not params.learn_model, f"{EncodedBatchGenerator.__name__}: the encoder has to be fitted before the dataset is encoded in " \
+                                       f"batches, set learn_model in encoder params to False."
+
+        def get_batches(random_state: np.random.RandomState = None):
+            batch_datasets = dataset.get_batch_datasets()
+            offsets = np.cumsum([0] + [batch_dataset.get_example_count() for batch_dataset in batch_datasets])
+            order = random_state.permutation(len(batch_datasets)) if random_state is not None else range(len(batch_datasets))
+            for index in order:
+                encoded_data = encoder.encode(batch_datasets[index], params).encoded_data
+                if batch_size is None:
+                    encoded_data.info = {**(encoded_data.info if encoded_data.info is not None else {}),
+                                         "example_indices": offsets[index] + np.arange(encoded_data.examples.shape[0])}
+                    yield encoded_data
+                else:
+                    for batch in EncodedBatchGenerator.from_encoded_data(encoded_data, batch_size)(random_state):
+                        batch.info["example_indices"] = offsets[index] + batch.info["example_indices"]
+                        yield batch
+
+        return get_batches
@@ -8,7 +8,8 @@ class EncodedData:
     Arguments:
       examples: a matrix of example_count x feature_count elements (can be a numpy array or a sparse matrix); there are some exceptions to this, for
         instance, :py:obj:`source.encodings.onehot.OneHotEncoder.OneHotEncoder` where the numpy array has more than two dimensions, but most of the
-        encodings follow the matrix format.
+        encodings follow the matrix format; it is None if the examples are encoded in batches during training (see
+        :py:obj:`~immuneML.hyperparameter_optimization.core.HPUtil.HPUtil.encode_dataset_in_batches`)
       feature_names: a list of feature names with feature_count elements
       feature_annotations: a data frame consisting of annotations for each unique feature
       example_ids: a list of example (repertoire/sequence/receptor) IDs; it must be the same length as the example_count in the examples matrix
@@ -19,8 +20,8 @@ class EncodedData:
     def __init__(self, examples, labels: dict = None, example_ids: list = None, feature_names: list = None,
                  feature_annotations: pd.DataFrame = None, encoding: str = None, info: dict = None):
 
-        assert feature_names is None or examples.shape[1] == len(feature_names)
-        if feature_names is not None:
+        assert feature_names is None or examples is None or examples.shape[1] == len(feature_names)
+        if feature_names is not None and examples is not None:
             assert feature_annotations is None or feature_annotations.shape[0] == len(feature_names) == examples.shape[1]
         if example_ids is not None and labels is not None:
             for label in labels.values():
@@ -0,0 +1,130 @@
+import json
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from immuneML.util.PathBuilder import PathBuilder
+
+
+class EncodedDataSerializer:
+    """
+    Stores an EncodedData object (or any object with attributes stored in its __dict__) as a directory with one or more files per
+    attribute, so that large arrays are never pickled and can be memory-mapped when the object is loaded:
+
+        - numpy arrays (without Python objects) are stored as .npy files,
+        - scipy sparse matrices are stored as .npy files with data, indices and index pointers,
+        - data frames (e.g., feature annotations) are stored as Parquet files if pyarrow is installed, and pickled otherwise,
+        - values which can be exactly represented in JSON (e.g., labels with lists of strings, numbers or booleans) are stored in JSON,
+        - all other values are pickled.
+
+    The manifest.json file in the directory lists how each of the attributes was stored.
+    """
+
+    MANIFEST_FILE_NAME = "manifest.json"
+
+    @staticmethod
+    def write(obj, path: Path):
+        PathBuilder.build(path)
+        manifest = {"class": {"module": type(obj).__module__, "name": type(obj).__qualname__}, "attributes": {}}
+
+        for name, value in vars(obj).items():
+            manifest["attributes"][name] = EncodedDataSerializer._write_value(value, path, name)
+
+        with (path / EncodedDataSerializer.MANIFEST_FILE_NAME).open("w") as file:
+            json.dump(manifest, file, indent=2)
+
+    @staticmethod
+    def read(path: Path, mmap: bool = True):
+        with (path / EncodedDataSerializer.MANIFEST_FILE_NAME).open("r") as file:
+            manifest = json.load(file)
+
+        module = __import__(manifest["class"]["module"], fromlist=[manifest["class"]["name"]])
+        obj_class = getattr(module, manifest["class"]["name"])
+        obj = obj_class.__new__(obj_class)
+
+        for name, storage in manifest["attributes"].items():
+            setattr(obj, name, EncodedDataSerializer._read_value(storage, path, name, mmap))
+
+        return obj
+
+    @staticmethod
+    def _write_value(value, path: Path, name: str) -> dict:
+        if isinstance(value, np.ndarray) and not value.dtype.hasobject:
+            np.save(str(path / f"{name}.npy"), np.asarray(value), allow_pickle=False)
+            return {"kind": "ndarray"}
+        elif sparse.issparse(value) and value.format in ["csr", "csc", "coo"]:
+            return EncodedDataSerializer._write_sparse(value, path, name)
+        elif isinstance(value, pd.DataFrame) and EncodedDataSerializer._can_use_parquet(value):
+            value.to_parquet(path / f"{name}.parquet")
+            return {"kind": "parquet"}
+        elif EncodedDataSerializer._is_json_serializable(value):
+            return {"kind": "json", "value": value}
+        else:
+            with (path / f"{name}.pickle").open("wb") as file:
+                pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+            return {"kind": "pickle"}
+
+    @staticmethod
+    def _write_sparse(value, path: Path, name: str) -> dict:
+        if value.format == "coo":
+            components = {"data": value.data, "row": value.row, "col": value.col}
+        else:
+            components = {"data": value.data, "indices": value.indices, "indptr": value.indptr}
+
+        for component_name, component in components.items():
+            np.save(str(path / f"{name}_{component_name}.npy"), component, allow_pickle=False)
+
+        return {"kind": "sparse", "format": value.format, "shape": list(value.shape), "components": list(components.keys())}
+
+    @staticmethod
+    def _read_value(storage: dict, path: Path, name: str, mmap: bool):
+        kind = storage["kind"]
+        if kind == "ndarray":
+            return EncodedDataSerializer._load_array(path / f"{name}.npy", mmap)
+        elif kind == "sparse":
+            components = [EncodedDataSerializer._load_array(path / f"{name}_{component}.npy", mmap) for component in storage["components"]]
+            shape = tuple(storage["shape"])
+            if storage["format"] == "coo":
+                return sparse.coo_matrix((components[0], (components[1], components[2])), shape=shape)
+            else:
+                matrix_class = sparse.csr_matrix if storage["format"] == "csr" else sparse.csc_matrix
+                return matrix_class((components[0], components[1], components[2]), shape=shape)
+        elif kind == "parquet":
+            return pd.read_parquet(path / f"{name}.parquet")
+        elif kind == "json":
+            return storage["value"]
+        else:
+            with (path / f"{name}.pickle").open("rb") as file:
+                return pickle.load(file)
+
+    @staticmethod
+    def _load_array(path: Path, mmap: bool):
+        array = np.load(str(path), mmap_mode="c" if mmap else None, allow_pickle=False)
+        return array if array.size > 0 else np.array(array)
+
+    @staticmethod
+    def _can_use_parquet(df: pd.DataFrame) -> bool:
+        try:
+            import pyarrow
+        except ImportError:
+            return False
+        return all(isinstance(column, str) for column in df.columns)
+
+    @staticmethod
+    def _is_json_serializable(value) -> bool:
+        try:
+            return json.loads(json.dumps(value)) == value and EncodedDataSerializer._has_json_types(value)
+        except (TypeError, ValueError):
+            return False
+
+    @staticmethod
+    def _has_json_types(value) -> bool:
+        if isinstance(value, list):
+            return all(EncodedDataSerializer._has_json_types(element) for element in value)
+        elif isinstance(value, dict):
+            return all(isinstance(key, str) and EncodedDataSerializer._has_json_types(element) for key, element in value.items())
+        else:
+            return value is None or type(value) in [str, int, float, bool]
@@ -0,0 +1,87 @@
+import pickle
+from pathlib import Path
+
+import numpy as np
+
+
+class ElementBatchFile:
+    """
+    Indexed on-disk format for batches of elements (receptors or receptor sequences) of ElementDatasets: the elements are pickled in small
+    blocks and the file starts with a manifest with the number of elements and the byte offset of each block, so that the elements can be
+    counted without loading the batch and any element can be loaded by unpickling only the block which contains it.
+
+    File layout:
+        - magic bytes identifying the format,
+        - number of elements, number of elements per block and number of blocks (n) as little-endian uint64,
+        - n + 1 offsets of the blocks as little-endian uint64 (relative to the start of the first block, the last one marking the end),
+        - pickled blocks (lists of elements).
+
+    Batch files in the previous format (a pickled list of elements) can still be read, but only as a whole.
+    """
+
+    MAGIC = b"IMLBAT01"
+    BLOCK_SIZE = 256
+    _UINT_DTYPE = np.dtype("<u8")
+
+    @staticmethod
+    def write(path: Path, elements: list, block_size: int = BLOCK_SIZE):
+        blocks = [pickle.dumps(list(elements[start:start + block_size]), pickle.HIGHEST_PROTOCOL)
+                  for start in range(0, len(elements), block_size)]
+        offsets = np.zeros(len(blocks) + 1, dtype=ElementBatchFile._UINT_DTYPE)
+        np.cumsum([len(block) for block in blocks], out=offsets[1:])
+
+        with Path(path).open("wb") as file:
+            file.write(ElementBatchFile.MAGIC)
+            file.write(np.array([len(elements), block_size, len(blocks)], dtype=ElementBatchFile._UINT_DTYPE).tobytes())
+            file.write(offsets.tobytes())
+            for block in blocks:
+                file.write(block)
+
+    @staticmethod
+    def is_indexed(path: Path) -> bool:
+        with Path(path).open("rb") as file:
+            return file.read(len(ElementBatchFile.MAGIC)) == ElementBatchFile.MAGIC
+
+    @staticmethod
+    def get_element_count(path: Path) -> int:
+        with Path(path).open("rb") as file:
+            if file.read(len(ElementBatchFile.MAGIC)) == ElementBatchFile.MAGIC:
+                return ElementBatchFile._read_header(file)[0]
+            else:
+                file.seek(0)
+                return len(pickle.load(file))
+
+    @staticmethod
+    def read(path: Path) -> list:
+        with Path(path).open("rb") as file:
+            if file.read(len(ElementBatchFile.MAGIC)) == ElementBatchFile.MAGIC:
+                _, _, offsets = ElementBatchFile._read_header(file)
+                data = memoryview(file.read())
+                return [element for start, end in zip(offsets[:-1], offsets[1:]) for element in pickle.loads(data[start:end])]
+            else:
+                file.seek(0)
+                return pickle.load(file)
+
+    @staticmethod
+    def read_elements(path: Path, indices) -> list:
+        """Loads only the elements at the given positions in the batch (in the order of indices), unpickling each needed block once"""
+        with Path(path).open("rb") as file:
+            if file.read(len(ElementBatchFile.MAGIC)) == ElementBatchFile.MAGIC:
+                _, block_size, offsets = ElementBatchFile._read_header(file)
+                data_start = file.tell()
+                blocks = {}
+                for block_index in sorted({int(index) // block_size for index in indices}):
+                    file.seek(data_start + int(offsets[block_index]))
+                    blocks[block_index] = pickle.loads(file.read(int(offsets[block_index + 1] - offsets[block_index])))
+                return [blocks[int(index) // block_size][int(index) % block_size] for index in indices]
+            else:
+                file.seek(0)
+                elements = pickle.load(file)
+                return [elements[index] for index in indices]
+
+    @staticmethod
+    def _read_header(file):
+        element_count, block_size, block_count = np.frombuffer(file.read(3 * ElementBatchFile._UINT_DTYPE.itemsize),
+                                                               dtype=ElementBatchFile._UINT_DTYPE).tolist()
+        offsets = np.frombuffer(file.read((block_count + 1) * ElementBatchFile._UINT_DTYPE.itemsize), dtype=ElementBatchFile._UINT_DTYPE)
+        return element_count, block_size, offsets
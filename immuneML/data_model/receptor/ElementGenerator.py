@@ -1,33 +1,49 @@
 import math
-import pickle
 from pathlib import Path
 
+import numpy as np
+
+from immuneML.data_model.receptor.ElementBatchFile import ElementBatchFile
+
+
 class ElementGenerator:
 
-    def __init__(self, file_list: list, file_size: int = 1000):
+    def __init__(self, file_list: list, file_size: int = 1000, element_indices=None):
         self.file_list = file_list
-        self.file_lengths = [-1 for i in range(len(file_list))]
         self.file_size = file_size
+        self.element_indices = element_indices
 
-    def _load_batch(self, current_file: int):
+    @property
+    def file_list(self):
+        return self._file_list
+
+    @file_list.setter
+    def file_list(self, file_list: list):
+        if getattr(self, "_file_list", None) is not file_list or len(self.file_lengths) != len(file_list):
+            self.file_lengths = [-1 for i in range(len(file_list))]
+        self._file_list = file_list
 
-        with self.file_list[current_file].open("rb") as file:
-            elements = pickle.load(file)
+    def __setstate__(self, state):
+        # generators pickled before file_list became a property store it directly
+        if "file_list" in state:
+            state["_file_list"] = state.pop("file_list")
+        state.setdefault("element_indices", None)
+        self.__dict__.update(state)
 
+    def _load_batch(self, current_file: int):
+        elements = ElementBatchFile.read(self.file_list[current_file])
+        self.file_lengths[current_file] = len(elements)
         return elements
 
     def _get_element_count(self, file_index: int):
-
-        # TODO: make this abstract and move implementation to specific generator: count elements in file for new format
-
         if self.file_lengths[file_index] == -1:
-            with self.file_list[file_index].open("rb") as file:
-                count = len(pickle.load(file))
-            self.file_lengths[file_index] = count
+            self.file_lengths[file_index] = ElementBatchFile.get_element_count(self.file_list[file_index])
 
         return self.file_lengths[file_index]
 
     def get_element_count(self):
+        if self.element_indices is not None:
+            return len(self.element_indices)
         for index in range(len(self.file_list)):
             if self.file_lengths[index] == -1:
                 self._get_element_count(index)
@@ -41,43 +57,76 @@ class ElementGenerator:
         :return: element generator
         """
 
-        for current_file_index in range(len(self.file_list)):
-            batch = self._load_batch(current_file_index)
-            yield batch
+        if self.element_indices is not None:
+            yield from self._get_elements_by_file(self.element_indices)
+        else:
+            for current_file_index in range(len(self.file_list)):
+                batch = self._load_batch(current_file_index)
+                yield batch
 
     def build_element_generator(self):
         """
         creates a generator which will return one element at the time
         :return: element generator
         """
-        for current_file_index in range(len(self.file_list)):
-            batch = self._load_batch(current_file_index)
+        for batch in self.build_batch_generator():
             for element in batch:
                 yield element
 
+    def get_elements(self, example_indices) -> list:
+        """
+        loads only the elements with the given indices (in the order of indices); from indexed batch files only the blocks of elements which
+        include the requested elements are unpickled
+        :return: list of elements
+        """
+        if self.element_indices is not None:
+            example_indices = np.asarray(self.element_indices)[np.asarray(example_indices, dtype=int)]
+        return [element for elements in self._get_elements_by_file(example_indices) for element in elements]
+
+    def split_indices_by_file(self, example_indices) -> list:
+        """
+        splits dataset-level indices of elements (e.g., element_indices of a dataset view) by the batch file they are stored in
+        :return: list of (file index, positions of the elements in the file) pairs
+        """
+        file_indices, positions = self._locate_elements(example_indices)
+        boundaries = np.flatnonzero(np.diff(file_indices)) + 1
+        return [(int(file_index_group[0]), position_group) for file_index_group, position_group in
+                zip(np.split(file_indices, boundaries), np.split(positions, boundaries)) if len(file_index_group) > 0]
+
+    def _locate_elements(self, example_indices):
+        """maps dataset-level indices of elements to (file index, position in the file) pairs based on the element counts per file"""
+        example_indices = np.asarray(example_indices, dtype=int)
+        file_starts = np.cumsum([0] + [self._get_element_count(index) for index in range(len(self.file_list))])
+        assert example_indices.size == 0 or (example_indices.min() >= 0 and example_indices.max() < file_starts[-1]), \
+            f"{ElementGenerator.__name__}: element indices have to be between 0 and {file_starts[-1] - 1}."
+        file_indices = np.searchsorted(file_starts, example_indices, side="right") - 1
+        return file_indices, example_indices - file_starts[file_indices]
+
+    def _get_elements_by_file(self, example_indices):
+        """yields lists of elements with the given indices, reading each batch file once for consecutive indices from the same file"""
+        for file_index, positions in self.split_indices_by_file(example_indices):
+            yield ElementBatchFile.read_elements(self.file_list[file_index], positions.tolist())
+
     def make_subset(self, example_indices: list, path: Path, dataset_type: str, dataset_identifier: str):
         if example_indices is None or len(example_indices) == 0:
             raise RuntimeError(f"{ElementGenerator.__name__}: no examples were specified to create the dataset subset. "
                                f"Dataset type was {dataset_type}, dataset identifier: {dataset_identifier}.")
-        batch_size = self.file_size
-        elements = []
-        file_count = 1
-
-        example_indices.sort()
 
+        example_indices = np.sort(example_indices)
+        if self.element_indices is not None:
+            example_indices = np.asarray(self.element_indices)[example_indices]
         batch_filenames = self._prepare_batch_filenames(len(example_indices), path, dataset_type, dataset_identifier)
 
-        for index, batch in enumerate(self.build_batch_generator()):
-            extracted_elements = self._extract_elements_from_batch(index, batch_size, batch, example_indices)
+        elements, file_count = [], 0
+        for extracted_elements in self._get_elements_by_file(example_indices):
             elements.extend(extracted_elements)
-
-            if len(elements) >= self.file_size or len(elements) == len(example_indices):
-                self._store_elements_to_file(batch_filenames[file_count-1], elements[:self.file_size])
-                file_count += 1
+            while len(elements) >= self.file_size:
+                self._store_elements_to_file(batch_filenames[file_count], elements[:self.file_size])
                 elements = elements[self.file_size:]
+                file_count += 1
 
         if len(elements) > 0:
-            self._store_elements_to_file(batch_filenames[file_count - 1], elements)
+            self._store_elements_to_file(batch_filenames[file_count], elements)
 
         return batch_filenames
 
@@ -89,11 +138,4 @@ class ElementGenerator:
         return filenames
 
     def _store_elements_to_file(self, path, elements):
-        with path.open("wb") as file:
-            pickle.dump(elements, file)
-
-    def _extract_elements_from_batch(self, index, batch_size, batch, example_indices):
-        upper_limit, lower_limit = (index + 1) * batch_size, index * batch_size
-        batch_indices = [ind for ind in example_indices if lower_limit <= ind < upper_limit]
-        elements = [batch[i - lower_limit] for i in batch_indices]
-        return elements
+        ElementBatchFile.write(path, elements)
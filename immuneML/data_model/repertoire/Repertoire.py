@@ -20,6 +20,7 @@ from immuneML.data_model.receptor.receptor_sequence.ReceptorSequence import Rece
 from immuneML.data_model.receptor.receptor_sequence.ReceptorSequenceList import ReceptorSequenceList
 from immuneML.data_model.receptor.receptor_sequence.SequenceAnnotation import SequenceAnnotation
 from immuneML.data_model.receptor.receptor_sequence.SequenceMetadata import SequenceMetadata
+from immuneML.data_model.repertoire.RepertoireColumnStore import RepertoireColumnStore
 from immuneML.environment.EnvironmentSettings import EnvironmentSettings
 from immuneML.simulation.implants.ImplantAnnotation import ImplantAnnotation
 from immuneML.util.NumpyHelper import NumpyHelper
@@ -30,6 +31,10 @@ class Repertoire(DatasetItem):
     """
     Repertoire object consisting of sequence objects, each sequence attribute is stored as a list across all sequences and can be
     loaded separately. Internally, this class relies on numpy to store/import_dataset the data.
+
+    Repertoires are stored in a columnar format (see RepertoireColumnStore) where each attribute can be memory-mapped separately.
+    Repertoires stored in the previous format (a structured numpy array with object fields in a `.npy` file) can still be read and
+    can be converted to the columnar format using `convert_to_columnar`.
     """
 
     FIELDS = tuple(
@@ -77,7 +82,7 @@ class Repertoire(DatasetItem):
 
         filename_base = filename_base if filename_base is not None else identifier
 
-        data_filename = path / f"{filename_base}.npy"
+        data_filename = path / f"{filename_base}{RepertoireColumnStore.FORMAT_SUFFIX}"
 
         field_list, values, dtype = Repertoire.process_custom_lists(custom_lists)
 
@@ -87,18 +92,13 @@ class Repertoire(DatasetItem):
 
             field_list.extend(field_list_signals)
             values.extend(values_signals)
-            dtype.extend(dtype_signals)
 
         for field in Repertoire.FIELDS:
             if eval(field) is not None and not all(el is None for el in eval(field)):
                 field_list.append(field)
                 values.append(eval(field))
-                dtype.append((field, np.object))
-
-        dtype = np.dtype(dtype)
 
-        repertoire_matrix = np.array(list(map(tuple, zip(*values))), order='F', dtype=dtype)
-        np.save(str(data_filename), repertoire_matrix)
+        RepertoireColumnStore.write(data_filename, dict(zip(field_list, values)))
 
         metadata_filename = path / f"{filename_base}_metadata.pickle"
         metadata = {} if metadata is None else metadata
@@ -114,13 +114,15 @@ class Repertoire(DatasetItem):
         if indices_to_keep is not None and len(indices_to_keep) > 0:
             PathBuilder.build(result_path)
 
-            data = repertoire.load_data()
-            data = data[indices_to_keep]
             identifier = uuid4().hex
             filename_base = filename_base if filename_base is not None else identifier
 
-            data_filename = result_path / f"{filename_base}.npy"
-            np.save(str(data_filename), data)
+            data_filename = result_path / f"{filename_base}{RepertoireColumnStore.FORMAT_SUFFIX}"
+            if repertoire.is_columnar():
+                RepertoireColumnStore.write_subset(repertoire.data_filename, data_filename, indices_to_keep)
+            else:
+                data = repertoire.load_data()[indices_to_keep]
+                RepertoireColumnStore.write(data_filename, {field: data[field].tolist() for field in data.dtype.names})
 
             metadata_filename = result_path / f"{filename_base}_metadata.pickle"
             shutil.copyfile(repertoire.metadata_filename, metadata_filename)
@@ -130,6 +132,28 @@ class Repertoire(DatasetItem):
         else:
             return None
 
+    @classmethod
+    def convert_to_columnar(cls, repertoire, result_path: Path, filename_base: str = None):
+        """
+        Creates a copy of a repertoire stored in the previous (structured `.npy`) format in the columnar format; the identifier and metadata
+        of the repertoire are preserved. Repertoires that are already columnar are returned unchanged.
+        """
+        if repertoire.is_columnar():
+            return repertoire
+
+        PathBuilder.build(result_path)
+        filename_base = filename_base if filename_base is not None else repertoire.data_filename.stem
+        data = repertoire.load_data()
+
+        data_filename = result_path / f"{filename_base}{RepertoireColumnStore.FORMAT_SUFFIX}"
+        RepertoireColumnStore.write(data_filename, {field: data[field].tolist() for field in data.dtype.names})
+
+        metadata_filename = result_path / f"{filename_base}_metadata.pickle"
+        if repertoire.metadata_filename != metadata_filename:
+            shutil.copyfile(repertoire.metadata_filename, metadata_filename)
+
+        return Repertoire(data_filename, metadata_filename, repertoire.identifier)
+
     @classmethod
     def build_from_sequence_objects(cls, sequence_objects: list, path: Path, metadata: dict, filename_base: str = None):
 
@@ -174,7 +198,7 @@ class Repertoire(DatasetItem):
         data_filename = Path(data_filename)
         metadata_filename = Path(metadata_filename) if metadata_filename is not None else None
 
-        assert data_filename.suffix == ".npy", \
+        assert data_filename.suffix in [".npy", RepertoireColumnStore.FORMAT_SUFFIX], \
             f"Repertoire: the file representing the repertoire has to be in numpy binary format. Got {data_filename.suffix} instead."
 
         self.data_filename = data_filename
@@ -188,6 +212,15 @@ class Repertoire(DatasetItem):
         self.identifier = identifier
         self.data = None
         self.element_count = None
+        self._member_names = None
+
+    def is_columnar(self) -> bool:
+        return self.data_filename.suffix == RepertoireColumnStore.FORMAT_SUFFIX
+
+    def _get_member_names(self) -> list:
+        if self._member_names is None:
+            self._member_names = RepertoireColumnStore.get_member_names(self.data_filename)
+        return self._member_names
 
     def get_sequence_aas(self):
         return self.get_attribute("sequence_aas")
@@ -203,7 +236,9 @@ class Repertoire(DatasetItem):
 
     def get_counts(self):
         counts = self.get_attribute("counts")
-        if counts is not None:
+        if counts is not None and counts.dtype != object:
+            counts = np.asarray(counts, dtype=int)
+        elif counts is not None:
             counts = np.array([int(count) if count is not None else None for count in counts])
         return counts
 
@@ -215,13 +250,23 @@ class Repertoire(DatasetItem):
 
     def load_data(self):
         if self.data is None or (isinstance(self.data, weakref.ref) and self.data() is None):
-            data = np.load(self.data_filename, allow_pickle=True)
+            data = self._load_columnar_data() if self.is_columnar() else np.load(self.data_filename, allow_pickle=True)
             self.data = weakref.ref(data) if EnvironmentSettings.low_memory else data
         data = self.data() if EnvironmentSettings.low_memory else self.data
         self.element_count = data.shape[0]
         return data
 
+    def _load_columnar_data(self):
+        columns = {field: self.get_attribute(field) for field in self.fields}
+        data = np.empty(self.get_element_count(), dtype=np.dtype([(field, object) for field in self.fields]))
+        for field, column in columns.items():
+            data[field] = column.tolist()
+        return data
+
     def get_attribute(self, attribute):
+        if self.is_columnar():
+            return RepertoireColumnStore.read_column(self.data_filename, attribute, self._get_member_names())
+
         data = self.load_data()
         if attribute in data.dtype.names:
             tmp = data[attribute]
@@ -230,11 +275,11 @@ class Repertoire(DatasetItem):
             return None
 
     def get_attributes(self, attributes: list):
-        data = self.load_data()
+        data_fields = self._get_member_names() if self.is_columnar() else self.load_data().dtype.names
         result = {}
         for attribute in attributes:
-            if attribute in data.dtype.names:
-                result[attribute] = data[attribute]
+            if attribute in data_fields:
+                result[attribute] = self.get_attribute(attribute)
             else:
                 logging.warning(f"{Repertoire.__name__}: attribute {attribute} is not present in the repertoire {self.identifier}, skipping...")
         return result
@@ -245,15 +290,21 @@ class Repertoire(DatasetItem):
     def __getstate__(self):
         state = self.__dict__.copy()
         del state['data']
+        state['_member_names'] = None
         return state
 
     def __setstate__(self, state):
         self.__dict__.update(state)
         self.data = None
+        self._member_names = None
 
     def get_element_count(self):
         if self.element_count is None:
-            self.load_data()
+            if self.is_columnar():
+                row_members = [name for name in self._get_member_names() if RepertoireColumnStore.is_row_member(name)]
+                self.element_count = RepertoireColumnStore.get_column_length(self.data_filename, row_members[0]) if len(row_members) > 0 else 0
+            else:
+                self.load_data()
         return self.element_count
 
     def _make_sequence_object(self, row, load_implants: bool = False):
@@ -0,0 +1,202 @@
+import struct
+import zipfile
+from numbers import Integral, Real
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+class RepertoireColumnStore:
+    """
+    Columnar on-disk storage for repertoire data: each repertoire field is stored as a separate member of an uncompressed `.npz` archive,
+    so that a single column can be memory-mapped directly from the archive without reading (or unpickling) the rest of the repertoire.
+
+    Column encodings:
+        - gene, chain, region type and frame type fields are stored as int32 category codes with a small list of categories (code -1 is None),
+        - other fields where all values are strings, integers, floats or booleans are stored as fixed-width numpy arrays,
+        - if such fields contain None values, an additional boolean null mask is stored,
+        - remaining fields with hashable values are stored as categories, and unhashable values are stored as pickled object arrays.
+
+    All members are row-aligned except for categories, which allows subsetting a repertoire by subsetting each member.
+    """
+
+    FORMAT_SUFFIX = ".npz"
+    CATEGORIES_SUFFIX = "__categories"
+    MASK_SUFFIX = "__mask"
+    CATEGORICAL_FIELDS = ("v_genes", "j_genes", "v_subgroups", "j_subgroups", "v_alleles", "j_alleles", "chains", "region_types", "frame_types")
+    _LOCAL_HEADER_SIZE = 30
+
+    @staticmethod
+    def write(path: Path, columns: dict):
+        members = {}
+        for field, values in columns.items():
+            members.update(RepertoireColumnStore.encode_column(field, values))
+        np.savez(str(path), **members)
+
+    @staticmethod
+    def encode_column(field: str, values) -> dict:
+        if isinstance(values, np.ndarray) and values.ndim == 1:
+            encoded = RepertoireColumnStore._encode_array(field, values)
+            if encoded is not None:
+                return encoded
+
+        values = list(values)
+        if field in RepertoireColumnStore.CATEGORICAL_FIELDS:
+            encoded = RepertoireColumnStore._encode_categorical(field, values)
+            if encoded is not None:
+                return encoded
+
+        mask = np.array([value is None for value in values], dtype=bool)
+        present = [value for value in values if value is not None]
+        dtype = RepertoireColumnStore._infer_dtype(present)
+
+        if dtype is not None:
+            filler = "" if dtype == str else dtype(0)
+            encoded = {field: np.array([filler if value is None else value for value in values], dtype=dtype)}
+            if mask.any():
+                encoded[f"{field}{RepertoireColumnStore.MASK_SUFFIX}"] = mask
+            return encoded
+
+        encoded = RepertoireColumnStore._encode_categorical(field, values)
+        if encoded is None:
+            column = np.empty(len(values), dtype=object)
+            column[:] = values
+            encoded = {field: column}
+        return encoded
+
+    @staticmethod
+    def _encode_array(field: str, values: np.ndarray):
+        """
+        Encodes a column given as a one-dimensional array of strings, integers, floats or booleans (where None values are allowed) with
+        vectorized operations, with the same result as when the values are given as a list; for other arrays, returns None
+        """
+        mask = np.equal(values, None) if values.dtype == object else np.zeros(values.shape[0], dtype=bool)
+        value_type = pd.api.types.infer_dtype(values, skipna=True)
+        dtypes = {"string": str, "integer": np.int64, "floating": np.float64, "boolean": bool}
+
+        if value_type not in dtypes or (value_type != "floating" and not np.array_equal(mask, pd.isnull(values))):
+            return None
+        elif field in RepertoireColumnStore.CATEGORICAL_FIELDS:
+            if value_type != "string":
+                return None
+            codes, categories = pd.factorize(values)
+            return {field: codes.astype(np.int32), f"{field}{RepertoireColumnStore.CATEGORIES_SUFFIX}": np.asarray(categories, dtype=object)}
+        else:
+            dtype = dtypes[value_type]
+            filled = values.copy()
+            if mask.any():
+                filled[mask] = "" if dtype == str else dtype(0)
+            encoded = {field: np.array(filled.tolist() if dtype == str else filled, dtype=dtype)}
+            if mask.any():
+                encoded[f"{field}{RepertoireColumnStore.MASK_SUFFIX}"] = mask
+            return encoded
+
+    @staticmethod
+    def _infer_dtype(values: list):
+        if len(values) == 0:
+            return None
+        elif all(isinstance(value, (bool, np.bool_)) for value in values):
+            return bool
+        elif all(isinstance(value, Integral) and not isinstance(value, (bool, np.bool_)) for value in values):
+            return np.int64
+        elif all(isinstance(value, Real) and not isinstance(value, (bool, np.bool_, Integral)) for value in values):
+            return np.float64
+        elif all(isinstance(value, str) for value in values):
+            return str
+        else:
+            return None
+
+    @staticmethod
+    def _encode_categorical(field: str, values: list):
+        category_codes = {}
+        try:
+            codes = np.array([-1 if value is None else category_codes.setdefault(value, len(category_codes)) for value in values],
+                             dtype=np.int32)
+        except TypeError:
+            return None
+
+        categories = np.empty(len(category_codes), dtype=object)
+        categories[:] = list(category_codes.keys())
+        return {field: codes, f"{field}{RepertoireColumnStore.CATEGORIES_SUFFIX}": categories}
+
+    @staticmethod
+    def get_member_names(path: Path) -> list:
+        with zipfile.ZipFile(path) as archive:
+            return [name[:-len(".npy")] for name in archive.namelist()]
+
+    @staticmethod
+    def is_row_member(name: str) -> bool:
+        return not name.endswith(RepertoireColumnStore.CATEGORIES_SUFFIX)
+
+    @staticmethod
+    def load_member(path: Path, name: str, mmap: bool = True):
+        """
+        Loads one member of the archive; if the member is stored without compression and does not contain Python objects, it is memory-mapped
+        directly from the archive so that no data is copied until it is accessed.
+        """
+        with zipfile.ZipFile(path) as archive:
+            info = archive.getinfo(f"{name}.npy")
+            with archive.open(info) as member:
+                version = np.lib.format.read_magic(member)
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(member) if version == (1, 0) \
+                    else np.lib.format.read_array_header_2_0(member)
+                header_length = member.tell()
+
+            if mmap and not dtype.hasobject and info.compress_type == zipfile.ZIP_STORED and int(np.prod(shape)) > 0:
+                offset = RepertoireColumnStore._get_data_offset(path, info) + header_length
+                return np.memmap(path, dtype=dtype, mode="c", offset=offset, shape=shape, order="F" if fortran_order else "C")
+            else:
+                with archive.open(info) as member:
+                    return np.lib.format.read_array(member, allow_pickle=True)
+
+    @staticmethod
+    def _get_data_offset(path: Path, info: zipfile.ZipInfo) -> int:
+        with open(path, "rb") as file:
+            file.seek(info.header_offset)
+            local_header = file.read(RepertoireColumnStore._LOCAL_HEADER_SIZE)
+        filename_length, extra_length = struct.unpack("<HH", local_header[26:30])
+        return info.header_offset + RepertoireColumnStore._LOCAL_HEADER_SIZE + filename_length + extra_length
+
+    @staticmethod
+    def get_column_length(path: Path, name: str) -> int:
+        with zipfile.ZipFile(path) as archive:
+            with archive.open(f"{name}.npy") as member:
+                version = np.lib.format.read_magic(member)
+                shape, _, _ = np.lib.format.read_array_header_1_0(member) if version == (1, 0) \
+                    else np.lib.format.read_array_header_2_0(member)
+        return shape[0]
+
+    @staticmethod
+    def read_column(path: Path, field: str, member_names: list):
+        """
+        Returns decoded values of one repertoire field: plain columns without None values are returned as memory-mapped arrays,
+        while categorical columns and columns with missing values are decoded to object arrays.
+        """
+        if field not in member_names:
+            return None
+
+        column = RepertoireColumnStore.load_member(path, field)
+
+        if f"{field}{RepertoireColumnStore.CATEGORIES_SUFFIX}" in member_names:
+            categories = RepertoireColumnStore.load_member(path, f"{field}{RepertoireColumnStore.CATEGORIES_SUFFIX}", mmap=False)
+            decoded = np.empty(len(categories) + 1, dtype=object)
+            decoded[:-1] = categories
+            column = decoded[np.asarray(column)]
+        elif f"{field}{RepertoireColumnStore.MASK_SUFFIX}" in member_names:
+            mask = RepertoireColumnStore.load_member(path, f"{field}{RepertoireColumnStore.MASK_SUFFIX}")
+            if mask.any():
+                column = np.array(column, dtype=object)
+                column[mask] = None
+
+        return column
+
+    @staticmethod
+    def write_subset(path: Path, new_path: Path, indices):
+        members = {}
+        for name in RepertoireColumnStore.get_member_names(path):
+            if RepertoireColumnStore.is_row_member(name):
+                members[name] = np.asarray(RepertoireColumnStore.load_member(path, name))[indices]
+            else:
+                members[name] = RepertoireColumnStore.load_member(path, name, mmap=False)
+        np.savez(str(new_path), **members)
@@ -1,6 +1,8 @@
+import h5py
 import numpy as np
 import pandas as pd
 import yaml
+from scipy import sparse
 
 from immuneML.data_model.encoded_data.EncodedData import EncodedData
 
@@ -15,7 +17,7 @@ def load_encoded_data(labels_path: str, encoding_details_path: str, design_matri
 
         labels_path (str): path to labels file as exported by the DesignMatrixExporter
         encoding_details_path (str): path to the details file, where example_ids, feature_names and the encoding name will be imported from
-        design_matrix_path (str): path to csv or npy file where the design matrix is stored
+        design_matrix_path (str): path to csv (optionally gzipped), npy, npz or hdf5 file where the design matrix is stored
 
     Returns:
 
@@ -23,8 +25,7 @@ def load_encoded_data(labels_path: str, encoding_details_path: str, design_matri
 
     """
     # read the data from these files
-    # TODO: support H5py
-    examples = pd.read_csv(design_matrix_path).values if design_matrix_path.endswith(".csv") else np.load(design_matrix_path, allow_pickle=True)
+    examples = load_design_matrix(design_matrix_path)
     labels = pd.read_csv(labels_path).to_dict('list')
 
     with open(encoding_details_path, "r") as file:
@@ -37,3 +38,28 @@ def load_encoded_data(labels_path: str, encoding_details_path: str, design_matri
                                encoding=encoding_details['encoding'])
 
     return encoded_data
+
+
+def load_design_matrix(design_matrix_path: str):
+    """
+    Loads the design matrix as exported by the DesignMatrixExporter; sparse matrices stored in npz or hdf5 format are returned as
+    scipy sparse matrices
+    """
+    design_matrix_path = str(design_matrix_path)
+    if design_matrix_path.endswith(".csv") or design_matrix_path.endswith(".csv.gz"):
+        return pd.read_csv(design_matrix_path).values
+    elif design_matrix_path.endswith(".npz"):
+        with np.load(design_matrix_path, allow_pickle=True) as archive:
+            if "design_matrix" in archive:
+                return archive["design_matrix"]
+        return sparse.load_npz(design_matrix_path)
+    elif design_matrix_path.endswith(".hdf5"):
+        with h5py.File(design_matrix_path, "r") as hf_object:
+            design_matrix = hf_object["design_matrix"]
+            if isinstance(design_matrix, h5py.Group):
+                return sparse.csr_matrix((design_matrix["data"][()], design_matrix["indices"][()], design_matrix["indptr"][()]),
+                                         shape=tuple(design_matrix.attrs["shape"]))
+            else:
+                return design_matrix[()]
+    else:
+        return np.load(design_matrix_path, allow_pickle=True)
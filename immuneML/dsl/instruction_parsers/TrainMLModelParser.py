@@ -28,13 +28,17 @@ class TrainMLModelParser:
     def parse(self, key: str, instruction: dict, symbol_table: SymbolTable, path: Path = None) -> TrainMLModelInstruction:
 
         valid_keys = ["assessment", "selection", "dataset", "strategy", "labels", "metrics", "settings", "number_of_processes", "type", "reports",
-                      "optimization_metric", 'refit_optimal_model', 'store_encoded_data']
+                      "optimization_metric", 'refit_optimal_model', 'store_encoded_data',
+                      'number_of_processes_per_job']
         ParameterValidator.assert_type_and_value(instruction['settings'], list, TrainMLModelParser.__name__, 'settings')
         ParameterValidator.assert_keys(list(instruction.keys()), valid_keys, TrainMLModelParser.__name__, "TrainMLModel")
         ParameterValidator.assert_type_and_value(instruction['refit_optimal_model'], bool, TrainMLModelParser.__name__, 'refit_optimal_model')
         ParameterValidator.assert_type_and_value(instruction['metrics'], list, TrainMLModelParser.__name__, 'metrics')
         ParameterValidator.assert_type_and_value(instruction['optimization_metric'], str, TrainMLModelParser.__name__, 'optimization_metric')
         ParameterValidator.assert_type_and_value(instruction['number_of_processes'], int, TrainMLModelParser.__name__, 'number_of_processes')
+        if instruction['number_of_processes_per_job'] is not None:
+            ParameterValidator.assert_type_and_value(instruction['number_of_processes_per_job'], int, TrainMLModelParser.__name__,
+                                                     'number_of_processes_per_job', min_inclusive=1, max_inclusive=instruction['number_of_processes'])
         ParameterValidator.assert_type_and_value(instruction['strategy'], str, TrainMLModelParser.__name__, 'strategy')
         ParameterValidator.assert_type_and_value(instruction['store_encoded_data'], bool, TrainMLModelParser.__name__, 'store_encoded_data')
         if instruction["reports"] is not None:
@@ -59,7 +63,8 @@ class TrainMLModelParser:
                                                  optimization_metric=optimization_metric, refit_optimal_model=instruction['refit_optimal_model'],
                                                  label_configuration=label_config, path=path, context=context,
                                                  store_encoded_data=instruction['store_encoded_data'],
-                                                 number_of_processes=instruction["number_of_processes"], reports=reports, name=key)
+                                                 number_of_processes=instruction["number_of_processes"], reports=reports, name=key,
+                                                 number_of_processes_per_job=instruction['number_of_processes_per_job'])
 
         return hp_instruction
 
@@ -1,12 +1,17 @@
 
 from pathlib import Path
 
+import h5py
+import numpy as np
 import pandas as pd
 
+from immuneML.caching.CacheHandler import CacheHandler
 from immuneML.data_model.dataset.RepertoireDataset import RepertoireDataset
 from immuneML.data_model.encoded_data.EncodedData import EncodedData
 from immuneML.encodings.DatasetEncoder import DatasetEncoder
 from immuneML.encodings.EncoderParams import EncoderParams
+from immuneML.environment.EnvironmentSettings import EnvironmentSettings
+from immuneML.environment.SequenceType import SequenceType
 from immuneML.util.PathBuilder import PathBuilder
 
 
@@ -15,8 +20,15 @@ class DeepRCEncoder(DatasetEncoder):
     DeepRCEncoder should be used in combination with the DeepRC ML method (:ref:`DeepRC`).
     This encoder writes the data in a RepertoireDataset to .tsv files.
     For each repertoire, one .tsv file is created containing the amino acid sequences and the counts.
-    Additionally, one metadata .tsv file is created, which describes the subset of repertoires that is encoded by
-    a given instance of the DeepRCEncoder.
+    Additionally, one metadata .tsv file is created, which describes all repertoires of the dataset.
+
+    The files are written only once per dataset (the full dataset from the context if it is set) and are shared between all
+    subsets of the dataset (e.g., the training and test sets of different splits): the encoded data of a subset refers to its
+    repertoires by their indices in the metadata file (example_indices), so the DeepRC ML method can also convert the files to its
+    HDF5 format (see export_hdf5_file) only once per dataset. Since they are shared, the files are not stored in the result path
+    of the encoding, but in the 'deeprc' subdirectory of the cache directory (CacheHandler.get_file_path()), in a folder named by
+    the cache key of the dataset and the labels. The location of the metadata file is stored in the encoded data
+    (info["metadata_filepath"]).
 
     YAML specification:
 
@@ -54,18 +66,21 @@ class DeepRCEncoder(DatasetEncoder):
         else:
             raise ValueError("DeepRCEncoder is not defined for dataset types which are not RepertoireDataset.")
 
-    def export_repertoire_tsv_files(self, output_folder: Path):
-        repertoires = self.context["dataset"].repertoires
+    def export_repertoire_tsv_files(self, dataset: RepertoireDataset, output_folder: Path) -> int:
+        max_sequence_length = 0
 
-        for repertoire in repertoires:
+        for repertoire in dataset.repertoires:
             filepath = output_folder / f"{repertoire.identifier}.{DeepRCEncoder.EXTENSION}"
+            sequences = repertoire.get_sequence_aas()
 
             if not filepath.is_file():
-                df = pd.DataFrame({DeepRCEncoder.SEQUENCE_COLUMN: repertoire.get_sequence_aas(), DeepRCEncoder.COUNTS_COLUMN: repertoire.get_counts()})
+                df = pd.DataFrame({DeepRCEncoder.SEQUENCE_COLUMN: sequences, DeepRCEncoder.COUNTS_COLUMN: repertoire.get_counts()})
                 df.to_csv(path_or_buf=filepath, sep=DeepRCEncoder.SEP, index=False)
 
-                max_sequence_length = max(df[DeepRCEncoder.SEQUENCE_COLUMN].str.len())
-                self.max_sequence_length = max(self.max_sequence_length, max_sequence_length)
+            if sequences is not None and len(sequences) > 0:
+                max_sequence_length = max(max_sequence_length, max(len(sequence) for sequence in sequences))
+
+        return max_sequence_length
 
     def export_metadata_file(self, dataset, labels, output_folder):
         metadata_filepath = output_folder / f"{dataset.identifier}_metadata.{DeepRCEncoder.EXTENSION}"
@@ -76,20 +91,113 @@ class DeepRCEncoder(DatasetEncoder):
 
         return metadata_filepath
 
+    @staticmethod
+    def export_hdf5_file(metadata_filepath: Path, label_name: str, hdf5_filepath: Path):
+        """
+        Writes the repertoires described by the metadata file to a HDF5 file in the layout read by DeepRC (as written by
+        deeprc.deeprc_binary.dataset_converters.DatasetToHDF5), without the need for DeepRC to be installed:
+
+        - the group 'sampledata' contains the sequences of all repertoires one after another as 'seq_lens', 'counts_per_sequence' and
+          'amino_acid_sequences' (the indices of the amino acids in the alphabet, padded with -1 to the length of the longest
+          sequence), and the start and end index of the sequences of each repertoire as 'sample_sequences_start_end',
+
+        - the group 'metadata' contains the repertoire file names ('sample_keys'), their number ('n_samples'), the values of the
+          label ('target_features'), the label name ('target_features_names') and the alphabet ('aas').
+
+        The datasets are built from the columns of one repertoire file at a time and appended to the file, so only one repertoire
+        is kept in memory.
+
+        Arguments:
+
+            metadata_filepath (Path): the metadata file written by the encoder
+
+            label_name (str): the label to store as the target of the repertoires
+
+            hdf5_filepath (Path): where to write the HDF5 file
+
+        """
+        metadata = pd.read_csv(metadata_filepath, sep=DeepRCEncoder.SEP, usecols=[DeepRCEncoder.ID_COLUMN, label_name],
+                               dtype=str, keep_default_na=False)
+        alphabet = "".join(EnvironmentSettings.get_sequence_alphabet(SequenceType.AMINO_ACID))
+        aa_indices = np.full(256, -1, dtype=np.int8)
+        aa_indices[np.frombuffer(alphabet.encode("ascii"), dtype=np.uint8)] = np.arange(len(alphabet), dtype=np.int8)
+
+        sample_keys = [f"{identifier}.{DeepRCEncoder.EXTENSION}" for identifier in metadata[DeepRCEncoder.ID_COLUMN]]
+        sample_sequences_start_end = np.zeros((len(sample_keys), 2), dtype=np.uint64)
+
+        with h5py.File(str(hdf5_filepath), "w") as hf:
+            seq_lens = hf.create_dataset("sampledata/seq_lens", shape=(0,), maxshape=(None,), dtype=np.uint16, chunks=True)
+            counts_per_sequence = hf.create_dataset("sampledata/counts_per_sequence", shape=(0,), maxshape=(None,), dtype=np.int64,
+                                                    chunks=True)
+            amino_acid_sequences = hf.create_dataset("sampledata/amino_acid_sequences", shape=(0, 0), maxshape=(None, None),
+                                                     dtype=np.int8, chunks=True, fillvalue=-1)
+
+            for index, sample_key in enumerate(sample_keys):
+                repertoire = pd.read_csv(metadata_filepath.parent / sample_key, sep=DeepRCEncoder.SEP,
+                                         usecols=[DeepRCEncoder.SEQUENCE_COLUMN, DeepRCEncoder.COUNTS_COLUMN],
+                                         dtype={DeepRCEncoder.SEQUENCE_COLUMN: str}, keep_default_na=False,
+                                         na_values={DeepRCEncoder.COUNTS_COLUMN: [""]})
+                sequences = repertoire[DeepRCEncoder.SEQUENCE_COLUMN].values.astype(bytes)
+                lengths = np.char.str_len(sequences)
+                max_length = sequences.dtype.itemsize
+                encoded = aa_indices[np.frombuffer(sequences.tobytes(), dtype=np.uint8).reshape(sequences.shape[0], max_length)]
+
+                assert all(np.sum(encoded >= 0, axis=1) == lengths), \
+                    f"{DeepRCEncoder.__name__}: repertoire {sample_key} contains sequences with characters not in the alphabet {alphabet}."
+
+                start, end = seq_lens.shape[0], seq_lens.shape[0] + sequences.shape[0]
+                sample_sequences_start_end[index] = [start, end]
+
+                seq_lens.resize((end,))
+                seq_lens[start:end] = lengths
+                counts_per_sequence.resize((end,))
+                counts_per_sequence[start:end] = repertoire[DeepRCEncoder.COUNTS_COLUMN].fillna(1).values.astype(np.int64)
+                amino_acid_sequences.resize((end, max(amino_acid_sequences.shape[1], max_length)))
+                amino_acid_sequences[start:end, :max_length] = encoded
+
+            hf.create_dataset("sampledata/sample_sequences_start_end", data=sample_sequences_start_end)
+            hf.create_dataset("metadata/sample_keys", data=np.array(sample_keys, dtype=object), dtype=h5py.special_dtype(vlen=str))
+            hf.create_dataset("metadata/n_samples", data=len(sample_keys))
+            hf.create_dataset("metadata/target_features", data=metadata[[label_name]].values.astype(object),
+                              dtype=h5py.special_dtype(vlen=str))
+            hf.create_dataset("metadata/target_features_names", data=np.array([label_name], dtype=object),
+                              dtype=h5py.special_dtype(vlen=str))
+            hf.create_dataset("metadata/aas", data=alphabet)
+
+    def _export_dataset(self, dataset: RepertoireDataset, labels: list) -> dict:
+        output_folder = CacheHandler.get_file_path() / "deeprc" / CacheHandler.generate_cache_key(self._prepare_caching_params(dataset, labels))
+        PathBuilder.build(output_folder)
+
+        max_sequence_length = self.export_repertoire_tsv_files(dataset, output_folder)
+        metadata_filepath = self.export_metadata_file(dataset, labels, output_folder)
+
+        return {"metadata_filepath": metadata_filepath, "max_sequence_length": max_sequence_length}
+
+    def _prepare_caching_params(self, dataset: RepertoireDataset, labels: list):
+        return (("dataset_identifier", dataset.identifier),
+                ("repertoire_ids", tuple(dataset.get_repertoire_ids())),
+                ("labels", tuple(labels)),
+                ("encoding", DeepRCEncoder.__name__))
+
     def encode(self, dataset, params: EncoderParams) -> RepertoireDataset:
-        result_path = params.result_path / "encoding"
-        PathBuilder.build(result_path)
+        full_dataset = dataset if self.context is None or "dataset" not in self.context else self.context["dataset"]
+        labels = params.label_config.get_labels_by_name()
 
-        self.export_repertoire_tsv_files(result_path)
+        export = CacheHandler.memo_by_params(self._prepare_caching_params(full_dataset, labels),
+                                             lambda: self._export_dataset(full_dataset, labels))
+        self.max_sequence_length = export["max_sequence_length"]
 
-        labels = params.label_config.get_labels_by_name()
-        metadata_filepath = self.export_metadata_file(dataset, labels, result_path)
+        full_repertoire_ids = pd.Index(full_dataset.get_repertoire_ids())
+        example_indices = full_repertoire_ids.get_indexer(dataset.get_repertoire_ids())
+        assert all(example_indices >= 0), f"{DeepRCEncoder.__name__}: the repertoires of dataset {dataset.name} could not be found in " \
+                                          f"the dataset {full_dataset.name} set as the context of the encoder."
 
         encoded_dataset = dataset.clone()
         encoded_dataset.encoded_data = EncodedData(examples=None, labels=dataset.get_metadata(labels) if params.encode_labels else None,
                                                    example_ids=dataset.repertoire_ids,
                                                    encoding=DeepRCEncoder.__name__,
-                                                   info={"metadata_filepath": metadata_filepath,
+                                                   info={"metadata_filepath": export["metadata_filepath"],
+                                                         "example_indices": example_indices,
                                                          "max_sequence_length": self.max_sequence_length})
 
         return encoded_dataset
@@ -34,6 +34,12 @@ class DistanceEncoder(DatasetEncoder):
         Only the fields defined under attributes_to_match will be considered, all other fields are ignored.
         Valid values include any repertoire attribute (sequence, amino acid sequence, V gene etc).
 
+        sequence_batch_size (int): The number of sequences in a batch when comparing sequences across repertoires. This does not affect
+        the results of the encoding, only the speed.
+
+        pool_size (int): The number of processes used to compute the distance matrix; the matrix is computed in tiles of repertoire pairs
+        which are processed in parallel. This does not affect the results of the encoding, only the speed.
+
     YAML specification:
 
     .. indent with spaces
@@ -43,6 +49,7 @@ class DistanceEncoder(DatasetEncoder):
             Distance:
                 distance_metric: JACCARD
                 sequence_batch_size: 1000
+                pool_size: 4
                 attributes_to_match:
                     - sequence_aas
                     - v_genes
@@ -52,12 +59,15 @@ class DistanceEncoder(DatasetEncoder):
 
     """
 
-    def __init__(self, distance_metric: DistanceMetricType, attributes_to_match: list, sequence_batch_size: int, context: dict = None,
-                 name: str = None):
+    def __init__(self, distance_metric: DistanceMetricType, attributes_to_match: list, sequence_batch_size: int, pool_size: int = 4,
+                 context: dict = None, name: str = None):
         self.distance_metric = distance_metric
         self.distance_fn = ReflectionHandler.import_function(self.distance_metric.value, DistanceMetrics)
+        self.set_size_distance_fn = ReflectionHandler.import_function(f"{self.distance_metric.value}_from_set_sizes", DistanceMetrics) \
+            if hasattr(DistanceMetrics, f"{self.distance_metric.value}_from_set_sizes") else None
         self.attributes_to_match = attributes_to_match
         self.sequence_batch_size = sequence_batch_size
+        self.pool_size = pool_size
         self.context = context
         self.name = name
         self.comparison = None
@@ -67,14 +77,17 @@ class DistanceEncoder(DatasetEncoder):
         return self
 
     @staticmethod
-    def _prepare_parameters(distance_metric: str, attributes_to_match: list, sequence_batch_size: int, context: dict = None):
+    def _prepare_parameters(distance_metric: str, attributes_to_match: list, sequence_batch_size: int, pool_size: int = 4,
+                            context: dict = None):
         valid_metrics = [metric.name for metric in DistanceMetricType]
         ParameterValidator.assert_in_valid_list(distance_metric, valid_metrics, "DistanceEncoder", "distance_metric")
+        ParameterValidator.assert_type_and_value(pool_size, int, "DistanceEncoder", "pool_size", min_inclusive=1)
 
         return {
             "distance_metric": DistanceMetricType[distance_metric.upper()],
             "attributes_to_match": attributes_to_match,
             "sequence_batch_size": sequence_batch_size,
+            "pool_size": pool_size,
             "context": context
         }
 
@@ -88,11 +101,11 @@ class DistanceEncoder(DatasetEncoder):
 
     def build_distance_matrix(self, dataset: RepertoireDataset, params: EncoderParams, train_repertoire_ids: list):
         self.comparison = PairwiseRepertoireComparison(self.attributes_to_match, self.attributes_to_match, params.result_path,
-                                                  sequence_batch_size=self.sequence_batch_size)
+                                                       sequence_batch_size=self.sequence_batch_size, pool_size=self.pool_size)
 
         current_dataset = dataset if self.context is None or "dataset" not in self.context else self.context["dataset"]
 
-        distance_matrix = self.comparison.compare(current_dataset, self.distance_fn, self.distance_metric.value)
+        distance_matrix = self.comparison.compare(current_dataset, self.distance_fn, self.distance_metric.value, self.set_size_distance_fn)
 
         repertoire_ids = dataset.get_repertoire_ids()
 
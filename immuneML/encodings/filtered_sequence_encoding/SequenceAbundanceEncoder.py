@@ -37,6 +37,9 @@ class SequenceAbundanceEncoder(DatasetEncoder):
 
         p_value_threshold (float): The p value threshold to be used by the statistical test.
 
+        min_count (int): The minimum number of repertoires a clonotype has to be present in to be tested for association with the label;
+        clonotypes present in fewer repertoires are never considered label-associated. The default value is 2.
+
         sequence_batch_size (int): The number of sequences in a batch when comparing sequences across repertoires, typically 100s of thousands.
         This does not affect the results of the encoding, only the speed.
 
@@ -58,6 +61,7 @@ class SequenceAbundanceEncoder(DatasetEncoder):
                     - chains
                     - region_types
                 p_value_threshold: 0.05
+                min_count: 2
                 sequence_batch_size: 100000
                 repertoire_batch_size: 32
 
@@ -66,8 +70,10 @@ class SequenceAbundanceEncoder(DatasetEncoder):
     RELEVANT_SEQUENCE_ABUNDANCE = "relevant_sequence_abundance"
     TOTAL_SEQUENCE_ABUNDANCE = "total_sequence_abundance"
 
-    def __init__(self, comparison_attributes, p_value_threshold: float, sequence_batch_size: int, repertoire_batch_size: int, name: str = None):
+    def __init__(self, comparison_attributes, p_value_threshold: float, sequence_batch_size: int, repertoire_batch_size: int,
+                 min_count: int = 2, name: str = None):
         self.comparison_attributes = comparison_attributes
+        self.min_count = min_count
         self.sequence_batch_size = sequence_batch_size
         self.name = name
         self.relevant_sequence_indices = None
@@ -109,7 +115,8 @@ class SequenceAbundanceEncoder(DatasetEncoder):
                                                                                               comparison_data=comparison_data,
                                                                                               label=label, p_value_threshold=self.p_value_threshold,
                                                                                               comparison_attributes=self.comparison_attributes,
-                                                                                              sequence_indices_path=self.relevant_indices_path)
+                                                                                              sequence_indices_path=self.relevant_indices_path,
+                                                                                              min_count=self.min_count)
 
         if self.relevant_indices_path is None:
             self.relevant_indices_path = indices_path
@@ -123,17 +130,14 @@ class SequenceAbundanceEncoder(DatasetEncoder):
 
     def _build_abundance_matrix(self, comparison_data, repertoire_ids, sequence_p_values_indices):
         abundance_matrix = np.zeros((len(repertoire_ids), 2))
+        relevant_indicator = np.asarray(sequence_p_values_indices, dtype=float)
 
-        for index in range(0, len(repertoire_ids)+self.repertoire_batch_size, self.repertoire_batch_size):
-            ind_start, ind_end = index, min(index+self.repertoire_batch_size, len(repertoire_ids))
-            repertoire_vectors = comparison_data.get_repertoire_vectors(repertoire_ids[ind_start:ind_end])
+        for ind_start in range(0, len(repertoire_ids), self.repertoire_batch_size):
+            ind_end = min(ind_start + self.repertoire_batch_size, len(repertoire_ids))
+            repertoire_matrix = comparison_data.get_matrix(repertoire_ids[ind_start:ind_end])
 
-            for rep_index in range(ind_start, ind_end):
-                repertoire_vector = repertoire_vectors[repertoire_ids[rep_index]]
-                relevant_sequence_abundance = np.sum(
-                    repertoire_vector[np.logical_and(sequence_p_values_indices, repertoire_vector)])
-                total_sequence_abundance = np.sum(repertoire_vector)
-                abundance_matrix[rep_index] = [relevant_sequence_abundance, total_sequence_abundance]
+            abundance_matrix[ind_start:ind_end, 0] = repertoire_matrix.T @ relevant_indicator
+            abundance_matrix[ind_start:ind_end, 1] = np.asarray(repertoire_matrix.sum(axis=0)).ravel()
 
         return abundance_matrix
 
@@ -31,30 +31,39 @@ class SequenceFilterHelper:
         return comparison_data
 
     @staticmethod
-    def filter_sequences(dataset: RepertoireDataset, comparison_data: ComparisonData, label: Label, p_value_threshold: float):
+    def filter_sequences(dataset: RepertoireDataset, comparison_data: ComparisonData, label: Label, p_value_threshold: float, min_count: int = 2):
 
-        sequence_p_values = SequenceFilterHelper.find_label_associated_sequence_p_values(comparison_data, dataset.repertoires, label)
+        sequence_p_values = SequenceFilterHelper.find_label_associated_sequence_p_values(comparison_data, dataset.repertoires, label, min_count)
 
         return np.array(sequence_p_values) < p_value_threshold
 
     @staticmethod
-    def find_label_associated_sequence_p_values(comparison_data: ComparisonData, repertoires: List[Repertoire], label: Label):
-
-        sequence_p_values = []
+    def find_label_associated_sequence_p_values(comparison_data: ComparisonData, repertoires: List[Repertoire], label: Label, min_count: int = 2):
+        """
+        Computes one-sided Fisher's exact test p-values for all sequences at once: the contingency tables are obtained from sparse
+        matrix-vector products of the sequence x repertoire matrix with the class indicator vector, and the p-value is computed only
+        once per distinct contingency table. Sequences present in fewer than min_count repertoires get INVALID_P_VALUE.
+        """
         is_first_class = np.array([repertoire.metadata[label.name] for repertoire in repertoires]) == label.positive_class
-
-        for sequence_vector in comparison_data.get_item_vectors([repertoire.identifier for repertoire in repertoires]):
-
-            if sequence_vector.sum() > 1:
-
-                first_class_present = np.sum(sequence_vector[np.logical_and(sequence_vector, is_first_class)])
-                second_class_present = np.sum(sequence_vector[np.logical_and(sequence_vector, np.logical_not(is_first_class))])
-                first_class_absent = np.sum(np.logical_and(is_first_class, sequence_vector == 0))
-                second_class_absent = np.sum(np.logical_and(np.logical_not(is_first_class), sequence_vector == 0))
-
-                sequence_p_values.append(fisher.pvalue(first_class_present, second_class_present, first_class_absent, second_class_absent).right_tail)
-            else:
-                sequence_p_values.append(SequenceFilterHelper.INVALID_P_VALUE)
+        matrix = comparison_data.get_matrix([repertoire.identifier for repertoire in repertoires]).tocsr()
+        presence = (matrix != 0).astype(np.int64)
+
+        first_class_present = matrix @ is_first_class.astype(np.float64)
+        second_class_present = matrix @ np.logical_not(is_first_class).astype(np.float64)
+        first_class_absent = np.sum(is_first_class) - presence @ is_first_class.astype(np.int64)
+        second_class_absent = np.sum(np.logical_not(is_first_class)) - presence @ np.logical_not(is_first_class).astype(np.int64)
+
+        sequence_p_values = np.full(matrix.shape[0], SequenceFilterHelper.INVALID_P_VALUE, dtype=float)
+        valid = np.asarray(presence.sum(axis=1)).ravel() >= min_count
+
+        if np.any(valid):
+            tables = np.column_stack([first_class_present[valid], second_class_present[valid], first_class_absent[valid],
+                                      second_class_absent[valid]]).astype(np.uint32)
+            table_keys = np.ravel_multi_index(tables.T.astype(np.int64), tuple(tables.max(axis=0).astype(np.int64) + 1))
+            _, unique_indices, inverse = np.unique(table_keys, return_index=True, return_inverse=True)
+            unique_tables = tables[unique_indices]
+            _, right_tail, _ = fisher.pvalue_npy(*[np.ascontiguousarray(unique_tables[:, column]) for column in range(4)])
+            sequence_p_values[valid] = right_tail[inverse]
 
         return sequence_p_values
 
@@ -69,7 +78,7 @@ class SequenceFilterHelper:
 
     @staticmethod
     def get_relevant_sequences(dataset: RepertoireDataset, params: EncoderParams, comparison_data: ComparisonData, label: str, p_value_threshold,
-                               comparison_attributes: list, sequence_indices_path: Path):
+                               comparison_attributes: list, sequence_indices_path: Path, min_count: int = 2):
 
         sequence_path = sequence_indices_path if sequence_indices_path is not None else params.result_path / 'relevant_sequence_indices.pickle'
         sequence_csv_path = None
@@ -77,7 +86,7 @@ class SequenceFilterHelper:
         if params.learn_model:
             SequenceFilterHelper._check_label_object(params, label)
             relevant_sequence_indices = SequenceFilterHelper.filter_sequences(dataset, comparison_data, params.label_config.get_label_object(label),
-                                                                              p_value_threshold)
+                                                                              p_value_threshold, min_count)
             with sequence_path.open("wb") as file:
                 pickle.dump(relevant_sequence_indices, file)
 
@@ -0,0 +1,214 @@
+import logging
+
+import numpy as np
+
+from immuneML.encodings.kmer_frequency.sequence_encoding.SequenceEncodingType import SequenceEncodingType
+from immuneML.environment.Constants import Constants
+from immuneML.util.KmerHelper import KmerHelper
+
+
+class BatchedKmerCounter:
+    """
+    Counts k-mers for a whole column of sequences at once instead of creating sequence objects and k-mer strings one by one.
+
+    Sequences are converted to a padded matrix of character codes, where the alphabet consists of the characters present in the sequences.
+    Each k-mer is then represented as an integer computed by a rolling base-`alphabet size` hash over the window, extended with the gap
+    length for gapped k-mers and with the IMGT position for IMGT k-mers. Occurrences are aggregated with numpy and only distinct k-mers
+    are decoded back to strings, which are the same as the features created by the corresponding SequenceEncodingStrategy classes.
+
+    Supports all SequenceEncodingType values: IDENTITY, CONTINUOUS_KMER, GAPPED_KMER, IMGT_CONTINUOUS_KMER and IMGT_GAPPED_KMER.
+    """
+
+    def __init__(self, sequence_encoding: SequenceEncodingType, k: int = 0, k_left: int = 0, k_right: int = 0, min_gap: int = 0,
+                 max_gap: int = 0, metadata_fields_to_include: list = None):
+        self.sequence_encoding = sequence_encoding
+        self.k = k
+        self.k_left = k_left
+        self.k_right = k_right
+        self.min_gap = min_gap
+        self.max_gap = max_gap
+        self.metadata_fields_to_include = metadata_fields_to_include if metadata_fields_to_include is not None else []
+
+    def count(self, sequences, weights=None, metadata: dict = None):
+        """
+        Counts features in the given sequences
+
+        Args:
+            sequences: array of sequences (amino acid or nucleotide)
+            weights: how much each occurrence of a k-mer in a sequence adds to its count (e.g., sequence counts); if None, each occurrence adds 1
+            metadata: dict of arrays for fields listed in metadata_fields_to_include; used only for IDENTITY encoding
+
+        Returns:
+            a tuple of feature names (sorted alphabetically) and the corresponding counts
+        """
+        sequences = np.asarray(sequences)
+        weights = np.ones(len(sequences)) if weights is None else np.asarray(weights, dtype=float)
+
+        present = np.array([sequence is not None for sequence in sequences], dtype=bool) if sequences.dtype == object \
+            else np.ones(len(sequences), dtype=bool)
+        sequences, weights = sequences[present].astype(str), weights[present]
+        metadata = {key: np.asarray(value)[present] for key, value in metadata.items()} if metadata is not None else {}
+
+        if self.sequence_encoding == SequenceEncodingType.IDENTITY:
+            features, counts = self._count_identity(sequences, weights, metadata)
+        elif len(sequences) == 0:
+            features, counts = np.array([], dtype=str), np.array([], dtype=float)
+        else:
+            features, counts = self._count_kmers(sequences, weights)
+
+        order = np.argsort(features, kind="stable")
+        return features[order], counts[order]
+
+    def _count_identity(self, sequences: np.ndarray, weights: np.ndarray, metadata: dict):
+        features = sequences
+        for field in self.metadata_fields_to_include:
+            values = metadata[field].astype(str) if field in metadata else np.full(len(sequences), "unknown")
+            features = np.char.add(np.char.add(features, Constants.FEATURE_DELIMITER), values)
+
+        unique_features, inverse = np.unique(features, return_inverse=True)
+        return unique_features, np.bincount(inverse, weights=weights, minlength=len(unique_features))
+
+    def _count_kmers(self, sequences: np.ndarray, weights: np.ndarray):
+        char_matrix = np.frombuffer(sequences.astype(np.bytes_).tobytes(), dtype=np.uint8).reshape(len(sequences), -1)
+        lengths = np.char.str_len(sequences)
+        alphabet = np.unique(char_matrix[char_matrix > 0])
+
+        lookup = np.zeros(256, dtype=np.int64)
+        lookup[alphabet] = np.arange(len(alphabet))
+        codes = lookup[char_matrix]
+
+        if self.sequence_encoding in [SequenceEncodingType.CONTINUOUS_KMER, SequenceEncodingType.IMGT_CONTINUOUS_KMER]:
+            keys, valid, position_labels = self._make_continuous_keys(codes, lengths, max(len(alphabet), 1))
+        else:
+            keys, valid, position_labels = self._make_gapped_keys(codes, lengths, max(len(alphabet), 1))
+
+        if keys is None or not valid.any():
+            return np.array([], dtype=str), np.array([], dtype=float)
+
+        unique_keys, inverse = np.unique(keys[valid], return_inverse=True)
+        row_weights = np.broadcast_to(weights.reshape((-1,) + (1,) * (valid.ndim - 1)), valid.shape)[valid]
+        counts = np.bincount(inverse, weights=row_weights, minlength=len(unique_keys))
+
+        return self._decode_keys(unique_keys, alphabet, max(len(alphabet), 1), position_labels), counts
+
+    def _make_continuous_keys(self, codes: np.ndarray, lengths: np.ndarray, base: int):
+        start_count = codes.shape[1] - self.k + 1
+        ignored_count = np.sum(lengths < self.k)
+        if ignored_count > 0:
+            logging.warning(f"{BatchedKmerCounter.__name__}: {ignored_count} sequences are shorter than k ({self.k}), ignoring them...")
+        if start_count <= 0:
+            return None, None, None
+
+        position_labels = None
+        dtype = self._get_key_dtype(base ** self.k)
+        keys = self._compute_window_codes(codes, self.k, start_count, base, dtype)
+        valid = np.arange(start_count)[np.newaxis, :] + self.k <= lengths[:, np.newaxis]
+
+        if self.sequence_encoding == SequenceEncodingType.IMGT_CONTINUOUS_KMER:
+            label_table, position_labels = self._make_position_label_table(
+                lengths, start_count, 1, lambda length: [KmerHelper.create_IMGT_kmers_from_string("A" * length, self.k)], self.k)
+            dtype = self._get_key_dtype(base ** self.k * len(position_labels))
+            keys = keys.astype(dtype) * len(position_labels) + label_table[0][lengths]
+
+        return keys, valid, position_labels
+
+    def _make_gapped_keys(self, codes: np.ndarray, lengths: np.ndarray, base: int):
+        gap_count = self.max_gap - self.min_gap + 1
+        max_length = codes.shape[1]
+        long_enough = lengths >= self.k_left + self.k_right + self.max_gap
+        if np.sum(~long_enough) > 0:
+            logging.warning(f"{BatchedKmerCounter.__name__}: {np.sum(~long_enough)} sequences are shorter than k_left + k_right + max_gap "
+                            f"({self.k_left + self.k_right + self.max_gap}), ignoring them...")
+
+        start_count = max_length - self.k_left - self.k_right - self.min_gap + 1
+        if start_count <= 0 or not long_enough.any():
+            return None, None, None
+
+        dtype = self._get_key_dtype(base ** (self.k_left + self.k_right) * gap_count)
+        left = self._compute_window_codes(codes, self.k_left, max_length - self.k_left + 1, base, dtype)
+        right = self._compute_window_codes(codes, self.k_right, max_length - self.k_right + 1, base, dtype)
+
+        keys = np.zeros((codes.shape[0], gap_count, start_count), dtype=dtype)
+        valid = np.zeros((codes.shape[0], gap_count, start_count), dtype=bool)
+
+        for gap_index, gap in enumerate(range(self.min_gap, self.max_gap + 1)):
+            window = self.k_left + gap + self.k_right
+            gap_start_count = max_length - window + 1
+            if gap_start_count > 0:
+                keys[:, gap_index, :gap_start_count] = (left[:, :gap_start_count] * gap_count + gap_index) * base ** self.k_right \
+                                                       + right[:, self.k_left + gap: self.k_left + gap + gap_start_count]
+                valid[:, gap_index, :gap_start_count] = np.logical_and(
+                    np.arange(gap_start_count)[np.newaxis, :] + window <= lengths[:, np.newaxis], long_enough[:, np.newaxis])
+
+        position_labels = None
+        if self.sequence_encoding == SequenceEncodingType.IMGT_GAPPED_KMER:
+            label_table, position_labels = self._make_position_label_table(
+                lengths[long_enough], start_count, gap_count, self._make_IMGT_gapped_kmers_per_gap, self.k_left + self.k_right + self.max_gap)
+            dtype = self._get_key_dtype(base ** (self.k_left + self.k_right) * gap_count * len(position_labels))
+            keys = keys.astype(dtype) * len(position_labels) + np.stack([label_table[gap_index][lengths] for gap_index in range(gap_count)], axis=1)
+
+        return keys, valid, position_labels
+
+    def _make_IMGT_gapped_kmers_per_gap(self, length: int) -> list:
+        kmers = KmerHelper.create_IMGT_gapped_kmers_from_string("A" * length, k_left=self.k_left, max_gap=self.max_gap, k_right=self.k_right,
+                                                                min_gap=self.min_gap)
+        kmers_per_gap, start = [], 0
+        for gap in range(self.min_gap, self.max_gap + 1):
+            gap_start_count = length - (self.k_left + gap + self.k_right) + 1
+            kmers_per_gap.append(kmers[start: start + gap_start_count])
+            start += gap_start_count
+        return kmers_per_gap
+
+    def _make_position_label_table(self, lengths: np.ndarray, start_count: int, gap_count: int, make_kmers_per_gap, min_length: int):
+        """
+        Creates a lookup table with IMGT position label index for each gap size, sequence length and k-mer start; IMGT positions depend
+        only on the sequence length, so they are computed once per distinct length using KmerHelper
+        """
+        max_length = int(lengths.max()) if len(lengths) > 0 else 0
+        label_table = np.zeros((gap_count, max(max_length, min_length) + 1, start_count), dtype=np.int64)
+        label_indices = {}
+
+        for length in np.unique(lengths):
+            if length >= min_length:
+                for gap_index, kmers in enumerate(make_kmers_per_gap(int(length))):
+                    positions = [label_indices.setdefault(str(position), len(label_indices)) for _, position in kmers]
+                    label_table[gap_index, length, :len(positions)] = positions
+
+        return label_table, np.array(list(label_indices.keys()), dtype=str) if len(label_indices) > 0 else np.array([""])
+
+    def _compute_window_codes(self, codes: np.ndarray, window: int, start_count: int, base: int, dtype) -> np.ndarray:
+        window_codes = np.zeros((codes.shape[0], max(start_count, 0)), dtype=dtype)
+        for offset in range(window):
+            window_codes = window_codes * base + codes[:, offset: offset + start_count].astype(dtype)
+        return window_codes
+
+    def _get_key_dtype(self, key_count: int):
+        return np.int64 if key_count < np.iinfo(np.int64).max else object
+
+    def _decode_keys(self, keys: np.ndarray, alphabet: np.ndarray, base: int, position_labels: np.ndarray) -> np.ndarray:
+        labels = None
+        if position_labels is not None:
+            labels = position_labels[(keys % len(position_labels)).astype(np.int64)]
+            keys = keys // len(position_labels)
+
+        if self.sequence_encoding in [SequenceEncodingType.CONTINUOUS_KMER, SequenceEncodingType.IMGT_CONTINUOUS_KMER]:
+            features = self._decode_window_codes(keys, self.k, alphabet, base)
+        else:
+            gap_count = self.max_gap - self.min_gap + 1
+            right = self._decode_window_codes(keys % base ** self.k_right, self.k_right, alphabet, base)
+            keys = keys // base ** self.k_right
+            gaps = (keys % gap_count).astype(np.int64) + self.min_gap
+            left = self._decode_window_codes(keys // gap_count, self.k_left, alphabet, base)
+            features = np.char.add(np.char.add(left, np.char.multiply(np.full(len(gaps), "."), gaps)), right)
+
+        if labels is not None:
+            features = np.char.add(np.char.add(features, Constants.FEATURE_DELIMITER), labels)
+
+        return features
+
+    def _decode_window_codes(self, keys: np.ndarray, window: int, alphabet: np.ndarray, base: int) -> np.ndarray:
+        characters = np.zeros((len(keys), window), dtype=np.uint8)
+        for position in range(window - 1, -1, -1):
+            characters[:, position] = alphabet[(keys % base).astype(np.int64)]
+            keys = keys // base
+        return characters.view(f"S{window}").ravel().astype(str)
@@ -1,12 +1,22 @@
-from collections import Counter
+import pickle
 from multiprocessing.pool import Pool
 
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction import DictVectorizer
+
 from immuneML.caching.CacheHandler import CacheHandler
 from immuneML.caching.CacheObjectType import CacheObjectType
 from immuneML.data_model.dataset.RepertoireDataset import RepertoireDataset
+from immuneML.data_model.repertoire.Repertoire import Repertoire
 from immuneML.encodings.EncoderParams import EncoderParams
+from immuneML.encodings.kmer_frequency.BatchedKmerCounter import BatchedKmerCounter
 from immuneML.encodings.kmer_frequency.KmerFrequencyEncoder import KmerFrequencyEncoder
+from immuneML.encodings.kmer_frequency.ReadsType import ReadsType
+from immuneML.environment.EnvironmentSettings import EnvironmentSettings
+from immuneML.util.FilenameHandler import FilenameHandler
 from immuneML.util.Logger import log
+from immuneML.util.PathBuilder import PathBuilder
 
 
 class KmerFreqRepertoireEncoder(KmerFrequencyEncoder):
@@ -42,17 +52,27 @@ class KmerFreqRepertoireEncoder(KmerFrequencyEncoder):
     def get_encoded_repertoire(self, repertoire, params: EncoderParams):
         params.model = vars(self)
 
-        return CacheHandler.memo_by_params((("encoding_model", params.model), ("type", "kmer_encoding"),
+        return CacheHandler.memo_by_params((("encoding_model", params.model), ("type", "batched_kmer_encoding"),
                                             ("labels", params.label_config.get_labels_by_name()),
                                             ("repertoire_id", repertoire.identifier)),
                                            lambda: self.encode_repertoire(repertoire, params), CacheObjectType.ENCODING_STEP)
 
-    def encode_repertoire(self, repertoire, params: EncoderParams):
-        counts = Counter()
+    def encode_repertoire(self, repertoire: Repertoire, params: EncoderParams):
+        """
+        Counts the features of one repertoire directly from its sequence (and count) columns using BatchedKmerCounter
+
+        Returns:
+            a tuple of (feature names, feature counts), repertoire identifier, labels and names of feature annotations
+        """
         sequence_encoder = self._prepare_sequence_encoder()
         feature_names = sequence_encoder.get_feature_names(params)
-        for sequence in repertoire.sequences:
-            counts = self._encode_sequence(sequence, params, sequence_encoder, counts)
+        sequence_type = self.sequence_type if self.sequence_type is not None else EnvironmentSettings.get_sequence_type()
+
+        counter = BatchedKmerCounter(sequence_encoding=self.sequence_encoding, k=self.k, k_left=self.k_left, k_right=self.k_right,
+                                     min_gap=self.min_gap, max_gap=self.max_gap, metadata_fields_to_include=self.metadata_fields_to_include)
+        counts = counter.count(sequences=repertoire.get_attribute(sequence_type.value),
+                               weights=repertoire.get_counts() if self.reads == ReadsType.ALL else None,
+                               metadata=self._get_metadata_columns(repertoire))
 
         label_config = params.label_config
         labels = dict() if params.encode_labels else None
@@ -64,3 +84,50 @@ class KmerFreqRepertoireEncoder(KmerFrequencyEncoder):
 
         # TODO: refactor this not to return 4 values but e.g. a dict or split into different functions?
         return counts, repertoire.identifier, labels, feature_names
+
+    def _get_metadata_columns(self, repertoire: Repertoire) -> dict:
+        columns = {}
+        for field in self.metadata_fields_to_include:
+            column = repertoire.get_attribute(field)
+            columns[field] = column if column is not None else repertoire.get_attribute(f"{field}s")
+        return {field: column for field, column in columns.items() if column is not None}
+
+    def _vectorize_encoded(self, examples: list, params: EncoderParams):
+        """
+        Builds a sparse design matrix from (feature names, counts) tuples; the features are stored as a DictVectorizer so that the
+        encoder can be applied to new data in the same way as the other k-mer frequency encoders
+        """
+        if self.vectorizer_path is None:
+            self.vectorizer_path = params.result_path / FilenameHandler.get_filename(DictVectorizer.__name__, "pickle")
+
+        example_features = [features for features, _ in examples]
+
+        if params.learn_model:
+            feature_names = np.unique(np.concatenate(example_features)) if len(example_features) > 0 else np.array([], dtype=str)
+            vectorizer = DictVectorizer(sparse=True, dtype=float)
+            vectorizer.feature_names_ = feature_names.tolist()
+            vectorizer.vocabulary_ = {feature: index for index, feature in enumerate(vectorizer.feature_names_)}
+            PathBuilder.build(params.result_path)
+            with self.vectorizer_path.open('wb') as file:
+                pickle.dump(vectorizer, file)
+        else:
+            with self.vectorizer_path.open('rb') as file:
+                vectorizer = pickle.load(file)
+            feature_names = np.array(vectorizer.feature_names_, dtype=str)
+
+        order = np.argsort(feature_names)
+        sorted_feature_names = feature_names[order]
+        rows, columns, values = [], [], []
+
+        for row, (features, counts) in enumerate(examples):
+            positions = np.searchsorted(sorted_feature_names, features).clip(max=max(len(sorted_feature_names) - 1, 0))
+            found = sorted_feature_names[positions] == features if len(sorted_feature_names) > 0 else np.zeros(len(features), dtype=bool)
+            rows.append(np.full(np.sum(found), row))
+            columns.append(order[positions[found]])
+            values.append(counts[found])
+
+        vectorized_examples = sparse.csr_matrix((np.concatenate(values) if len(values) > 0 else [],
+                                                 (np.concatenate(rows) if len(rows) > 0 else [], np.concatenate(columns) if len(columns) > 0 else [])),
+                                                shape=(len(examples), len(feature_names)), dtype=float)
+
+        return vectorized_examples, vectorizer.feature_names_
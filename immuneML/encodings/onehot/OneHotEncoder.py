@@ -2,6 +2,7 @@ import abc
 import math
 
 import numpy as np
+from scipy import sparse as sparse_matrix
 from sklearn.preprocessing import OneHotEncoder as SklearnOneHotEncoder
 
 from immuneML.IO.dataset_export.PickleExporter import PickleExporter
@@ -64,6 +65,13 @@ class OneHotEncoder(DatasetEncoder):
         This must be set to True when using onehot encoding in combination with scikit-learn ML methods (inheriting :py:obj:`~source.ml_methods.SklearnMethod.SklearnMethod`),
         such as :ref:`LogisticRegression`, :ref:`SVM`, :ref:`RandomForestClassifier` and :ref:`KNN`.
 
+        sparse (bool): whether to store the flattened one-hot matrix as a sparse (CSR) matrix instead of a dense numpy array; only the
+        non-zero values are stored, so the memory needed no longer depends on the padding to the largest repertoire and the longest sequence.
+        The sparse matrix has the same shape and values as the dense matrix when flatten is True, so this option can only be used with flatten
+        set to True. The lengths of the encoded sequences are stored in the encoded data as well (under info, key sequence_lengths). Sparse
+        one-hot encoded data can be used with the scikit-learn ML methods, but not with :ref:`ReceptorCNN`, which needs the (not flattened)
+        dense one-hot matrix. By default, sparse is False.
+
 
     YAML specification:
 
@@ -81,6 +89,12 @@ class OneHotEncoder(DatasetEncoder):
                 distance_to_seq_middle: 3
                 flatten: False
 
+        one_hot_sparse:
+            OneHot:
+                use_positional_info: False
+                flatten: True
+                sparse: True
+
     """
 
     dataset_mapping = {
@@ -91,10 +105,11 @@ class OneHotEncoder(DatasetEncoder):
 
     ALPHABET = EnvironmentSettings.get_sequence_alphabet()
 
-    def __init__(self, use_positional_info: bool, distance_to_seq_middle: int, flatten: bool, name: str = None):
+    def __init__(self, use_positional_info: bool, distance_to_seq_middle: int, flatten: bool, name: str = None, sparse: bool = False):
         self.use_positional_info = use_positional_info
         self.distance_to_seq_middle = distance_to_seq_middle
         self.flatten = flatten
+        self.sparse = sparse
 
         if distance_to_seq_middle:
             self.pos_increasing = [1 / self.distance_to_seq_middle * i for i in range(self.distance_to_seq_middle)]
@@ -110,7 +125,7 @@ class OneHotEncoder(DatasetEncoder):
         self.onehot_dimensions = self.ALPHABET + ["start", "mid", "end"] if self.use_positional_info else self.ALPHABET # todo test this
 
     @staticmethod
-    def _prepare_parameters(use_positional_info, distance_to_seq_middle, flatten, name: str = None):
+    def _prepare_parameters(use_positional_info, distance_to_seq_middle, flatten, name: str = None, sparse: bool = False):
 
         location = OneHotEncoder.__name__
 
@@ -121,10 +136,14 @@ class OneHotEncoder(DatasetEncoder):
             distance_to_seq_middle = None
 
         ParameterValidator.assert_type_and_value(flatten, bool, location, "flatten")
+        ParameterValidator.assert_type_and_value(sparse, bool, location, "sparse")
+        assert flatten or not sparse, f"{location}: sparse one-hot encoding is only defined for the flattened one-hot matrix, but flatten was " \
+                                      f"set to False. Set flatten to True to use sparse one-hot encoding."
 
         return {"use_positional_info": use_positional_info,
                 "distance_to_seq_middle": distance_to_seq_middle,
                 "flatten": flatten,
+                "sparse": sparse,
                 "name": name}
 
     @staticmethod
@@ -184,6 +203,41 @@ class OneHotEncoder(DatasetEncoder):
 
         return encoded_data
 
+    def _encode_sequence_list_sparse(self, sequences, pad_sequence_len) -> sparse_matrix.csr_matrix:
+        """
+        Encodes the sequences as a sparse matrix with one row per sequence: each row is the flattened [sequence_lengths, one_hot_characters]
+        matrix of the sequence padded to pad_sequence_len (the same values as when encoding the sequences with _encode_sequence_list and
+        reshaping the result), but without storing the padding
+        """
+        n_dims = len(self.onehot_dimensions)
+        sequence_lengths = np.array([len(sequence) for sequence in sequences], dtype=int)
+        sequence_starts = np.cumsum(sequence_lengths) - sequence_lengths
+
+        characters = np.frombuffer("".join(sequences).encode("utf-32-le"), dtype=np.uint32)
+        character_codes = np.full(max(characters.max() + 1 if characters.size > 0 else 0, 128), -1, dtype=int)
+        for index, character in enumerate(OneHotEncoder.ALPHABET):
+            character_codes[ord(character)] = index
+
+        rows = np.repeat(np.arange(len(sequences)), sequence_lengths)
+        positions = np.arange(characters.size) - np.repeat(sequence_starts, sequence_lengths)
+        channels = character_codes[characters]
+        is_known = channels >= 0
+
+        rows, columns, values = [rows[is_known]], [positions[is_known] * n_dims + channels[is_known]], [np.ones(np.sum(is_known))]
+
+        if self.use_positional_info:
+            weights = {length: np.array(self._get_imgt_position_weights(length), dtype=float) for length in np.unique(sequence_lengths)}
+            for channel in range(3):
+                rows.append(np.repeat(np.arange(len(sequences)), sequence_lengths))
+                columns.append(positions * n_dims + len(OneHotEncoder.ALPHABET) + channel)
+                values.append(np.concatenate([weights[length][channel] for length in sequence_lengths]) if len(sequences) > 0 else np.zeros(0))
+
+        encoded = sparse_matrix.csr_matrix((np.concatenate(values), (np.concatenate(rows), np.concatenate(columns))),
+                                           shape=(len(sequences), pad_sequence_len * n_dims))
+        encoded.eliminate_zeros()
+
+        return encoded
+
     def _get_imgt_position_weights(self, seq_length, pad_length=None):
         start_weights = self._get_imgt_start_weights(seq_length)
         mid_weights = self._get_imgt_mid_weights(seq_length)
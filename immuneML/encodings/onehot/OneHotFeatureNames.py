@@ -0,0 +1,57 @@
+from collections.abc import Sequence
+
+
+class OneHotFeatureNames(Sequence):
+    """
+    The feature names of flattened one-hot encoded repertoires in the order of the columns of the encoded matrix, where the name of the
+    feature for the one-hot dimension dim at position pos of sequence seq is f"{seq}_{pos}_{dim}".
+
+    There is one name per column of the encoded matrix (max_rep_len * max_seq_len * len(onehot_dimensions) names), so the names are not
+    stored but created when they are accessed.
+    """
+
+    def __init__(self, max_rep_len: int, max_seq_len: int, onehot_dimensions: list):
+        self.max_rep_len = max_rep_len
+        self.max_seq_len = max_seq_len
+        self.onehot_dimensions = list(onehot_dimensions)
+
+    def __len__(self): return self.max_rep_len * self.max_seq_len * len(self.onehot_dimensions)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._get_name(index) for index in range(len(self))[i]]
+        else:
+            return self._get_name(range(len(self))[i])
+
+    def _get_name(self, index: int) -> str:
+        seq, rest = divmod(index, self.max_seq_len * len(self.onehot_dimensions))
+        pos, dim = divmod(rest, len(self.onehot_dimensions))
+        return f"{seq}_{pos}_{self.onehot_dimensions[dim]}"
+
+    def index(self, value, start=0, stop=None):
+        seq, pos, dim = value.split("_", 2) if isinstance(value, str) and value.count("_") >= 2 else (None, None, None)
+
+        if seq is not None and seq.isdigit() and pos.isdigit() and dim in self.onehot_dimensions and int(seq) < self.max_rep_len \
+                and int(pos) < self.max_seq_len:
+            index = (int(seq) * self.max_seq_len + int(pos)) * len(self.onehot_dimensions) + self.onehot_dimensions.index(dim)
+            if index in range(len(self))[start:stop]:
+                return index
+
+        raise ValueError(f"{OneHotFeatureNames.__name__}: {value} is not in the feature names.")
+
+    def __contains__(self, value):
+        try:
+            self.index(value)
+            return True
+        except ValueError:
+            return False
+
+    def __eq__(self, other):
+        if isinstance(other, OneHotFeatureNames):
+            return vars(self) == vars(other)
+        else:
+            return isinstance(other, (list, tuple)) and len(other) == len(self) and all(a == b for a, b in zip(self, other))
+
+    def __str__(self):
+        return f"{OneHotFeatureNames.__name__}(max_rep_len={self.max_rep_len}, max_seq_len={self.max_seq_len}, " \
+               f"onehot_dimensions={self.onehot_dimensions})"
@@ -1,9 +1,13 @@
+import uuid
+
 import numpy as np
+from scipy import sparse
 
 from immuneML.data_model.dataset.ReceptorDataset import ReceptorDataset
 from immuneML.data_model.encoded_data.EncodedData import EncodedData
 from immuneML.encodings.EncoderParams import EncoderParams
 from immuneML.encodings.onehot.OneHotEncoder import OneHotEncoder
+from immuneML.util.PathBuilder import PathBuilder
 
 
 class OneHotReceptorEncoder(OneHotEncoder):
@@ -15,38 +19,35 @@ class OneHotReceptorEncoder(OneHotEncoder):
         - start position (high when close to start)
         - middle position (high in the middle of the sequence)
         - end position (high when close to end)
+
+    The receptors are encoded one batch file of the dataset at a time; the dense encoded array is written to a .npy file in the result path
+    and the encoded data refers to it memory-mapped (np.memmap), so the encoded receptors are read from the disk as they are needed (e.g.,
+    batch by batch by :ref:`ReceptorCNN`).
     """
 
     def _encode_new_dataset(self, dataset, params: EncoderParams):
         encoded_data = self._encode_data(dataset, params)
 
-        encoded_dataset = ReceptorDataset(filenames=dataset.get_filenames(),
-                                          encoded_data=encoded_data,
-                                          labels=dataset.labels)
+        encoded_dataset = dataset.clone()
+        encoded_dataset.encoded_data = encoded_data
 
         return encoded_dataset
 
     def _encode_data(self, dataset: ReceptorDataset, params: EncoderParams):
-        receptor_objs = [receptor for receptor in dataset.get_data()]
-        sequences = [[getattr(obj, chain).get_sequence() for chain in obj.get_chains()] for obj in receptor_objs]
-        first_chain_seqs, second_chain_seqs = zip(*sequences)
-
-        max_seq_len = max(max([len(seq) for seq in first_chain_seqs]), max([len(seq) for seq in second_chain_seqs]))
-
         example_ids = dataset.get_example_ids()
-        labels = self._get_labels(receptor_objs, params) if params.encode_labels else None
-
-        examples_first_chain = self._encode_sequence_list(first_chain_seqs, pad_n_sequences=len(receptor_objs),
-                                                          pad_sequence_len=max_seq_len)
-        examples_second_chain = self._encode_sequence_list(second_chain_seqs, pad_n_sequences=len(receptor_objs),
-                                                           pad_sequence_len=max_seq_len)
+        chains, sequence_lengths, labels = self._get_receptor_info(dataset, params)
+        max_seq_len = int(sequence_lengths.max())
 
-        examples = np.stack((examples_first_chain, examples_second_chain), axis=1)
+        feature_names = self._get_feature_names(max_seq_len, chains[0])
 
-        feature_names = self._get_feature_names(max_seq_len, receptor_objs[0].get_chains())
+        if self.sparse:
+            examples = sparse.vstack([self._encode_batch_sparse(batch, max_seq_len) for batch in filter(len, dataset.get_batch())],
+                                     format="csr")
+        else:
+            examples = self._encode_to_memmap(dataset, len(example_ids), max_seq_len, params)
 
         if self.flatten:
-            examples = examples.reshape((len(receptor_objs), 2*max_seq_len*len(self.onehot_dimensions)))
+            examples = examples if self.sparse else examples.reshape((len(example_ids), 2*max_seq_len*len(self.onehot_dimensions)))
             feature_names = [item for sublist in feature_names for subsublist in sublist for item in subsublist]
 
         encoded_data = EncodedData(examples=examples,
@@ -54,19 +55,58 @@ class OneHotReceptorEncoder(OneHotEncoder):
                                    example_ids=example_ids,
                                    feature_names=feature_names,
                                    encoding=OneHotEncoder.__name__,
-                                   info={"chain_names": receptor_objs[0].get_chains() if all(receptor_obj.get_chains() == receptor_objs[0].get_chains() for receptor_obj in receptor_objs) else None})
+                                   info={"chain_names": chains[0] if all(receptor_chains == chains[0] for receptor_chains in chains) else None,
+                                         **({"sequence_lengths": sequence_lengths} if self.sparse else {})})
 
         return encoded_data
 
-    def _get_feature_names(self, max_seq_len, chains):
-        return [[[f"{chain}_{pos}_{dim}" for dim in self.onehot_dimensions] for pos in range(max_seq_len)] for chain in chains]
-
-    def _get_labels(self, receptor_objs, params: EncoderParams):
-        label_names = params.label_config.get_labels_by_name()
-        labels = {name: [None] * len(receptor_objs) for name in label_names}
+    def _get_receptor_info(self, dataset: ReceptorDataset, params: EncoderParams):
+        chains, sequence_lengths = [], []
+        label_names = params.label_config.get_labels_by_name() if params.encode_labels else []
+        labels = {name: [] for name in label_names}
 
-        for idx, receptor in enumerate(receptor_objs):
+        for receptor in dataset.get_data():
+            chains.append(receptor.get_chains())
+            sequence_lengths.append([len(getattr(receptor, chain).get_sequence()) for chain in receptor.get_chains()])
             for name in label_names:
-                labels[name][idx] = receptor.metadata[name]
+                labels[name].append(receptor.metadata[name])
+
+        return chains, np.array(sequence_lengths), labels if params.encode_labels else None
+
+    def _encode_batch_sparse(self, receptors: list, max_seq_len: int):
+        first_chain_seqs, second_chain_seqs = self._get_chain_sequences(receptors)
+        return sparse.hstack([self._encode_sequence_list_sparse(first_chain_seqs, pad_sequence_len=max_seq_len),
+                              self._encode_sequence_list_sparse(second_chain_seqs, pad_sequence_len=max_seq_len)], format="csr")
+
+    def _encode_to_memmap(self, dataset: ReceptorDataset, example_count: int, max_seq_len: int, params: EncoderParams) -> np.memmap:
+        """
+        Encodes the receptors one batch file at a time into a .npy file under the result path and returns it memory-mapped, so the encoded
+        array is not kept in memory; the file name is unique, so that arrays of earlier encodings which may still be memory-mapped are never
+        overwritten
+        """
+        PathBuilder.build(params.result_path)
+        file_path = params.result_path / f"onehot_examples_{uuid.uuid4().hex}.npy"
+        examples = np.lib.format.open_memmap(str(file_path), mode="w+", dtype=float,
+                                             shape=(example_count, 2, max_seq_len, len(self.onehot_dimensions)))
+        start = 0
+
+        for batch in filter(len, dataset.get_batch()):
+            first_chain_seqs, second_chain_seqs = self._get_chain_sequences(batch)
+            examples[start:start + len(batch), 0] = self._encode_sequence_list(first_chain_seqs, pad_n_sequences=len(batch),
+                                                                               pad_sequence_len=max_seq_len)
+            examples[start:start + len(batch), 1] = self._encode_sequence_list(second_chain_seqs, pad_n_sequences=len(batch),
+                                                                               pad_sequence_len=max_seq_len)
+            start += len(batch)
+
+        examples.flush()
+        del examples
+
+        return np.load(str(file_path), mmap_mode="c")
+
+    def _get_chain_sequences(self, receptors: list):
+        sequences = [[getattr(receptor, chain).get_sequence() for chain in receptor.get_chains()] for receptor in receptors]
+        first_chain_seqs, second_chain_seqs = zip(*sequences)
+        return first_chain_seqs, second_chain_seqs
 
-        return labels
+    def _get_feature_names(self, max_seq_len, chains):
+        return [[[f"{chain}_{pos}_{dim}" for dim in self.onehot_dimensions] for pos in range(max_seq_len)] for chain in chains]
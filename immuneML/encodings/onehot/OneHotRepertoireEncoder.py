@@ -3,6 +3,7 @@ import math
 from multiprocessing.pool import Pool
 
 import numpy as np
+from scipy import sparse
 
 from immuneML.caching.CacheHandler import CacheHandler
 from immuneML.caching.CacheObjectType import CacheObjectType
@@ -10,6 +11,7 @@ from immuneML.data_model.dataset.RepertoireDataset import RepertoireDataset
 from immuneML.data_model.encoded_data.EncodedData import EncodedData
 from immuneML.encodings.EncoderParams import EncoderParams
 from immuneML.encodings.onehot.OneHotEncoder import OneHotEncoder
+from immuneML.encodings.onehot.OneHotFeatureNames import OneHotFeatureNames
 from immuneML.environment.EnvironmentSettings import EnvironmentSettings
 
 
@@ -22,6 +24,10 @@ class OneHotRepertoireEncoder(OneHotEncoder):
         - start position (high when close to start)
         - middle position (high in the middle of the sequence)
         - end position (high when close to end)
+
+    when sparse is true, each repertoire is one row of a sparse matrix with the flattened dimensions [sequences, sequence_lengths,
+    one_hot_characters], so the padding of repertoires to the largest repertoire and of sequences to the longest sequence is not stored;
+    the feature names are then given as OneHotFeatureNames, which creates the name of a column only when it is accessed
     """
 
     def _encode_new_dataset(self, dataset, params: EncoderParams):
@@ -51,27 +57,41 @@ class OneHotRepertoireEncoder(OneHotEncoder):
 
         arguments = [(repertoire, params) for repertoire in dataset.repertoires]
 
+        encoded_repertoires, repertoire_names, labels, sequence_lengths = [], [], [], []
+        examples = None if self.sparse else np.zeros((dataset.get_example_count(), self.max_rep_len, self.max_seq_len,
+                                                      len(self.onehot_dimensions)))
+
         with Pool(params.pool_size) as pool:
             chunksize = math.floor(dataset.get_example_count() / params.pool_size) + 1
-            repertoires = pool.starmap(self._get_encoded_repertoire, arguments, chunksize=chunksize)
-
-        encoded_repertoires, repertoire_names, labels = zip(*repertoires)
-
-        examples = np.stack(encoded_repertoires, axis=0)
-
-        labels = {k: [dic[k] for dic in labels] for k in labels[0]}
-
-        feature_names = self._get_feature_names(self.max_seq_len, self.max_rep_len)
-
-        if self.flatten:
+            # dense repertoires are copied to the preallocated matrix as they arrive instead of being stacked at the end
+            for index, (encoded_repertoire, repertoire_name, repertoire_labels, repertoire_sequence_lengths) in \
+                    enumerate(pool.imap(self._get_encoded_repertoire_from_arguments, arguments, chunksize=chunksize)):
+                if self.sparse:
+                    encoded_repertoires.append(encoded_repertoire)
+                    sequence_lengths.append(repertoire_sequence_lengths)
+                else:
+                    examples[index] = encoded_repertoire
+                repertoire_names.append(repertoire_name)
+                labels.append(repertoire_labels)
+
+        labels = {k: [dic[k] for dic in labels] for k in labels[0]} if labels[0] is not None else None
+
+        if self.sparse:
+            examples = sparse.vstack(encoded_repertoires, format="csr")
+            feature_names = OneHotFeatureNames(self.max_rep_len, self.max_seq_len, self.onehot_dimensions)
+        elif self.flatten:
             examples = examples.reshape(dataset.get_example_count(), self.max_rep_len*self.max_seq_len*len(self.onehot_dimensions))
-            feature_names = [item for sublist in feature_names for subsublist in sublist for item in subsublist]
+            feature_names = [item for sublist in self._get_feature_names(self.max_seq_len, self.max_rep_len) for subsublist in sublist
+                             for item in subsublist]
+        else:
+            feature_names = self._get_feature_names(self.max_seq_len, self.max_rep_len)
 
         encoded_data = EncodedData(examples=examples,
                                    example_ids=repertoire_names,
                                    labels=labels,
                                    feature_names=feature_names,
-                                   encoding=OneHotEncoder.__name__)
+                                   encoding=OneHotEncoder.__name__,
+                                   info={"sequence_lengths": sequence_lengths} if self.sparse else None)
 
         return encoded_data
 
@@ -79,6 +99,9 @@ class OneHotRepertoireEncoder(OneHotEncoder):
         return [[[f"{seq}_{pos}_{dim}" for dim in self.onehot_dimensions] for pos in range(max_seq_len)] for seq in range(max_rep_len)]
 
 
+    def _get_encoded_repertoire_from_arguments(self, arguments):
+        return self._get_encoded_repertoire(*arguments)
+
     def _get_encoded_repertoire(self, repertoire, params: EncoderParams):
         params.model = vars(self)
 
@@ -91,11 +114,20 @@ class OneHotRepertoireEncoder(OneHotEncoder):
     def _encode_repertoire(self, repertoire, params: EncoderParams):
         sequences = repertoire.get_attribute(EnvironmentSettings.get_sequence_type().value)
 
-        onehot_encoded = self._encode_sequence_list(sequences, pad_n_sequences=self.max_rep_len, pad_sequence_len=self.max_seq_len)
+        if self.sparse:
+            sequence_lengths = np.array([len(sequence) for sequence in sequences])
+            onehot_encoded = self._encode_sequence_list_sparse(sequences, pad_sequence_len=self.max_seq_len).tocoo()
+            sequence_width = self.max_seq_len * len(self.onehot_dimensions)
+            onehot_encoded = sparse.csr_matrix((onehot_encoded.data, (np.zeros_like(onehot_encoded.row),
+                                                                      onehot_encoded.row * sequence_width + onehot_encoded.col)),
+                                               shape=(1, self.max_rep_len * sequence_width))
+        else:
+            sequence_lengths = None
+            onehot_encoded = self._encode_sequence_list(sequences, pad_n_sequences=self.max_rep_len, pad_sequence_len=self.max_seq_len)
         example_id = repertoire.identifier
         labels = self._get_repertoire_labels(repertoire, params) if params.encode_labels else None
 
-        return onehot_encoded, example_id, labels
+        return onehot_encoded, example_id, labels, sequence_lengths
 
     def _get_repertoire_labels(self, repertoire, params: EncoderParams):
         label_config = params.label_config
@@ -1,3 +1,4 @@
+import numpy as np
 
 from immuneML.data_model.dataset.SequenceDataset import SequenceDataset
 from immuneML.data_model.encoded_data.EncodedData import EncodedData
@@ -18,10 +19,8 @@ class OneHotSequenceEncoder(OneHotEncoder):
     def _encode_new_dataset(self, dataset: SequenceDataset, params: EncoderParams):
         encoded_data = self._encode_data(dataset, params)
 
-        encoded_dataset = SequenceDataset(filenames=dataset.get_filenames(),
-                                          encoded_data=encoded_data,
-                                          labels=dataset.labels,
-                                          file_size=dataset.file_size)
+        encoded_dataset = dataset.clone()
+        encoded_dataset.encoded_data = encoded_data
 
         return encoded_dataset
 
@@ -33,19 +32,23 @@ class OneHotSequenceEncoder(OneHotEncoder):
         max_seq_len = max([len(seq) for seq in sequences])
         labels = self._get_labels(sequence_objs, params) if params.encode_labels else None
 
-        examples = self._encode_sequence_list(sequences, pad_n_sequences=len(sequence_objs), pad_sequence_len=max_seq_len)
-
         feature_names = self._get_feature_names(max_seq_len)
 
+        if self.sparse:
+            examples = self._encode_sequence_list_sparse(sequences, pad_sequence_len=max_seq_len)
+        else:
+            examples = self._encode_sequence_list(sequences, pad_n_sequences=len(sequence_objs), pad_sequence_len=max_seq_len)
+
         if self.flatten:
-            examples = examples.reshape((len(sequence_objs), max_seq_len*len(self.onehot_dimensions)))
+            examples = examples if self.sparse else examples.reshape((len(sequence_objs), max_seq_len*len(self.onehot_dimensions)))
             feature_names = [item for sublist in feature_names for item in sublist]
 
         encoded_data = EncodedData(examples=examples,
                                    labels=labels,
                                    example_ids=example_ids,
                                    feature_names=feature_names,
-                                   encoding=OneHotEncoder.__name__)
+                                   encoding=OneHotEncoder.__name__,
+                                   info={"sequence_lengths": np.array([len(seq) for seq in sequences])} if self.sparse else None)
 
         return encoded_data
 
@@ -1,10 +1,9 @@
-import numpy as np
 import pandas as pd
 
 from immuneML.analysis.SequenceMatcher import SequenceMatcher
+from immuneML.analysis.SequenceMatchingIndex import SequenceMatchingIndex
 from immuneML.data_model.dataset.RepertoireDataset import RepertoireDataset
 from immuneML.data_model.encoded_data.EncodedData import EncodedData
-from immuneML.data_model.repertoire.Repertoire import Repertoire
 from immuneML.encodings.EncoderParams import EncoderParams
 from immuneML.encodings.reference_encoding.MatchedReceptorsEncoder import MatchedReceptorsEncoder
 
@@ -79,37 +78,22 @@ class MatchedReceptorsRepertoireEncoder(MatchedReceptorsEncoder):
 
     def _encode_repertoires(self, dataset: RepertoireDataset, params: EncoderParams):
         # Rows = repertoires, Columns = reference chains (two per sequence receptor)
-        encoded_repertories = np.zeros((dataset.get_example_count(),
-                                        len(self.reference_receptors) * 2),
-                                       dtype=int)
+        encoded_repertories = SequenceMatcher().count_dataset_matches(dataset, self._build_reference_index(), params.pool_size)
         labels = {label: [] for label in params.label_config.get_labels_by_name()} if params.encode_labels else None
 
-        for i, repertoire in enumerate(dataset.get_data()):
-            encoded_repertories[i] = self._match_repertoire_to_receptors(repertoire)
-
+        for repertoire in dataset.get_data():
             if labels is not None:
                 for label in params.label_config.get_labels_by_name():
                     labels[label].append(repertoire.metadata[label])
 
         return encoded_repertories, labels, dataset.get_repertoire_ids()
 
-    def _match_repertoire_to_receptors(self, repertoire: Repertoire):
-        matcher = SequenceMatcher()
-        matches = np.zeros(len(self.reference_receptors) * 2, dtype=int)
-        rep_seqs = repertoire.sequences
-
-        for i, ref_receptor in enumerate(self.reference_receptors):
+    def _build_reference_index(self) -> SequenceMatchingIndex:
+        # first chain of receptor i is reference 2 * i (even columns in matches), second chain is reference 2 * i + 1 (odd columns)
+        chains, max_distances = [], []
+        for ref_receptor in self.reference_receptors:
             chain_names = ref_receptor.get_chains()
-            first_chain = ref_receptor.get_chain(chain_names[0])
-            second_chain = ref_receptor.get_chain(chain_names[1])
-
-            for rep_seq in rep_seqs:
-                # Match with first chain: add to even columns in matches.
-                # Match with second chain: add to odd columns
-                if matcher.matches_sequence(first_chain, rep_seq, max_distance=self.max_edit_distances[chain_names[0]]):
-                    matches[i * 2] += rep_seq.metadata.count
-                if matcher.matches_sequence(second_chain, rep_seq, max_distance=self.max_edit_distances[chain_names[1]]):
-                    matches[i * 2 + 1] += rep_seq.metadata.count
-
-        return matches
+            chains.extend(ref_receptor.get_chain(chain_name) for chain_name in chain_names[:2])
+            max_distances.extend(self.max_edit_distances[chain_name] for chain_name in chain_names[:2])
 
+        return SequenceMatchingIndex.from_receptor_sequences(chains, max_distances)
@@ -1,6 +1,6 @@
 import datetime
-import re
 import warnings
+from collections import defaultdict
 
 import numpy as np
 import pandas as pd
@@ -11,6 +11,7 @@ from immuneML.data_model.receptor.receptor_sequence.Chain import Chain
 from immuneML.data_model.repertoire.Repertoire import Repertoire
 from immuneML.encodings.EncoderParams import EncoderParams
 from immuneML.encodings.reference_encoding.MatchedRegexEncoder import MatchedRegexEncoder
+from immuneML.encodings.reference_encoding.RegexMotifScanner import RegexMotifScanner
 
 
 class MatchedRegexRepertoireEncoder(MatchedRegexEncoder):
@@ -72,10 +73,11 @@ class MatchedRegexRepertoireEncoder(MatchedRegexEncoder):
         labels = {label: [] for label in params.label_config.get_labels_by_name()} if params.encode_labels else None
 
         n_repertoires = dataset.get_example_count()
+        scanners = self._build_scanners()
 
         for i, repertoire in enumerate(dataset.get_data()):
             print(f"{datetime.datetime.now()}: Encoding repertoire {i+1}/{n_repertoires}")
-            encoded_repertoires[i] = self._match_repertoire_to_regexes(repertoire)
+            encoded_repertoires[i] = self._match_repertoire_to_regexes(repertoire, scanners)
 
             if labels is not None:
                 for label in params.label_config.get_labels_by_name():
@@ -83,10 +85,12 @@ class MatchedRegexRepertoireEncoder(MatchedRegexEncoder):
 
         return encoded_repertoires, labels
 
-    def _match_repertoire_to_regexes(self, repertoire: Repertoire):
-        matches = np.zeros(self.feature_count, dtype=int)
-        rep_seqs = repertoire.sequences
-
+    def _build_scanners(self) -> dict:
+        """
+        returns a dict with a RegexMotifScanner per chain, together with the feature (column) index and the required V gene for each of its
+        regular expressions; features are numbered in the same order as in _get_feature_info()
+        """
+        regexes, feature_indices, v_genes = defaultdict(list), defaultdict(list), defaultdict(list)
         match_idx = 0
 
         for index, row in self.regex_df.iterrows():
@@ -94,27 +98,46 @@ class MatchedRegexRepertoireEncoder(MatchedRegexEncoder):
                 regex = row[f"{chain_type}_regex"]
 
                 if regex is not None:
-                    v_gene = row[f"{chain_type}V"] if f"{chain_type}V" in row else None
-
-                    for rep_seq in rep_seqs:
-                        if rep_seq.metadata.chain is not None:
-                            if rep_seq.metadata.chain.value == chain_type:
-                                if self._matches(rep_seq, regex, v_gene):
-                                    n_matches = 1 if not self.sum_counts else rep_seq.metadata.count
-                                    if n_matches is None:
-                                        warnings.warn(f"MatchedRegexRepertoireEncoder: count not defined for sequence with id {rep_seq.identifier} in repertoire {repertoire.identifier}, ignoring sequence...")
-                                        n_matches = 0
-                                    matches[match_idx] += n_matches
-                        else:
-                            warnings.warn(f"{MatchedRegexRepertoireEncoder.__class__.__name__}: chain was not set for sequence {rep_seq.identifier}, skipping the sequence for matching...")
+                    regexes[chain_type].append(regex)
+                    feature_indices[chain_type].append(match_idx)
+                    v_genes[chain_type].append(row[f"{chain_type}V"] if f"{chain_type}V" in row else None)
                     match_idx += 1
 
-        return matches
+        return {chain_type: (RegexMotifScanner(regexes[chain_type]), np.array(feature_indices[chain_type], dtype=int), v_genes[chain_type])
+                for chain_type in regexes}
+
+    def _match_repertoire_to_regexes(self, repertoire: Repertoire, scanners: dict):
+        matches = np.zeros(self.feature_count, dtype=int)
 
-    def _matches(self, receptor_sequence, regex, v_gene=None):
-        if v_gene is not None and receptor_sequence.metadata.v_gene != v_gene:
-            matches = False
-        else:
-            matches = bool(re.search(regex, receptor_sequence.amino_acid_sequence))
+        sequences = repertoire.get_sequence_aas()
+        chains = repertoire.get_chains()
+        sequence_count = len(sequences)
+        rep_v_genes = repertoire.get_v_genes() if repertoire.get_v_genes() is not None else [None] * sequence_count
+        counts = repertoire.get_counts() if self.sum_counts and repertoire.get_counts() is not None else [None] * sequence_count
+
+        # identical sequences are scanned only once: sum their contributions per (sequence, chain, V gene)
+        n_matches_per_sequence = defaultdict(int)
+        missing_chain_count, missing_count_count = 0, 0
+
+        for sequence, chain, v_gene, count in zip(sequences, chains if chains is not None else [None] * sequence_count, rep_v_genes, counts):
+            if chain is None:
+                missing_chain_count += 1
+            elif self.sum_counts and count is None:
+                missing_count_count += 1
+            else:
+                n_matches_per_sequence[(sequence, chain.value, v_gene)] += count if self.sum_counts else 1
+
+        if missing_chain_count > 0:
+            warnings.warn(f"{MatchedRegexRepertoireEncoder.__name__}: chain was not set for {missing_chain_count} sequences in repertoire "
+                          f"{repertoire.identifier}, skipping these sequences for matching...")
+        if missing_count_count > 0:
+            warnings.warn(f"{MatchedRegexRepertoireEncoder.__name__}: count not defined for {missing_count_count} sequences in repertoire "
+                          f"{repertoire.identifier}, ignoring these sequences...")
+
+        for (sequence, chain_type, v_gene), n_matches in n_matches_per_sequence.items():
+            if chain_type in scanners:
+                scanner, feature_indices, required_v_genes = scanners[chain_type]
+                found = [index for index in scanner.scan(sequence) if required_v_genes[index] is None or required_v_genes[index] == v_gene]
+                np.add.at(matches, feature_indices[found], n_matches)
 
         return matches
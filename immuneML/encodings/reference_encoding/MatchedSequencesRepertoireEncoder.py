@@ -1,10 +1,9 @@
-import numpy as np
 import pandas as pd
 
 from immuneML.analysis.SequenceMatcher import SequenceMatcher
+from immuneML.analysis.SequenceMatchingIndex import SequenceMatchingIndex
 from immuneML.data_model.dataset.RepertoireDataset import RepertoireDataset
 from immuneML.data_model.encoded_data.EncodedData import EncodedData
-from immuneML.data_model.repertoire.Repertoire import Repertoire
 from immuneML.encodings.EncoderParams import EncoderParams
 from immuneML.encodings.reference_encoding.MatchedSequencesEncoder import MatchedSequencesEncoder
 
@@ -55,29 +54,14 @@ class MatchedSequencesRepertoireEncoder(MatchedSequencesEncoder):
 
     def _encode_repertoires(self, dataset: RepertoireDataset, params):
         # Rows = repertoires, Columns = reference sequences
-        encoded_repertories = np.zeros((dataset.get_example_count(),
-                                        len(self.reference_sequences)),
-                                       dtype=int)
+        reference_index = SequenceMatchingIndex.from_receptor_sequences(self.reference_sequences,
+                                                                        [self.max_edit_distance] * len(self.reference_sequences))
+        encoded_repertories = SequenceMatcher().count_dataset_matches(dataset, reference_index, params.pool_size)
 
         labels = {label: [] for label in params.label_config.get_labels_by_name()} if params.encode_labels else None
 
-        for i, repertoire in enumerate(dataset.get_data()):
-            encoded_repertories[i] = self._match_repertoire_to_reference(repertoire)
-
+        for repertoire in dataset.get_data():
             for label in params.label_config.get_labels_by_name():
                 labels[label].append(repertoire.metadata[label])
 
         return encoded_repertories, labels
-
-    def _match_repertoire_to_reference(self, repertoire: Repertoire):
-        matcher = SequenceMatcher()
-        matches = np.zeros(len(self.reference_sequences), dtype=int)
-        rep_seqs = repertoire.sequences
-
-        for i, reference_seq in enumerate(self.reference_sequences):
-
-            for repertoire_seq in rep_seqs:
-                if matcher.matches_sequence(reference_seq, repertoire_seq, max_distance=self.max_edit_distance):
-                    matches[i] += repertoire_seq.metadata.count
-
-        return matches
@@ -0,0 +1,46 @@
+import re
+from collections import defaultdict
+
+
+class RegexMotifScanner:
+    """
+    Finds which of the given regular expressions occur in a sequence, scanning the sequence once for all of them instead of calling
+    re.search per expression.
+
+    Expressions without special characters (e.g., k-mers, the most common case of motifs) are stored in a hash table by their literal
+    value: all substrings of the sequence with a length of one of the literals are looked up in the table, so the time needed per sequence
+    does not depend on the number of such motifs. The remaining expressions are compiled once when the scanner is created and searched
+    for one after another.
+
+    Arguments:
+
+        regexes (list): regular expressions to search for; the results of scan() refer to positions in this list
+
+    """
+
+    def __init__(self, regexes: list):
+        self.regexes = list(regexes)
+        self._literals = defaultdict(list)
+        self._compiled_regexes = []
+
+        for index, regex in enumerate(self.regexes):
+            if len(regex) > 0 and re.escape(regex) == regex:
+                self._literals[regex].append(index)
+            else:
+                self._compiled_regexes.append((index, re.compile(regex)))
+
+        self._literal_lengths = sorted(set(len(literal) for literal in self._literals))
+
+    def scan(self, sequence: str) -> list:
+        """Returns sorted indices of the regular expressions which occur in the sequence"""
+        found = set()
+
+        for length in self._literal_lengths:
+            for start in range(len(sequence) - length + 1):
+                indices = self._literals.get(sequence[start:start + length])
+                if indices is not None:
+                    found.update(indices)
+
+        found.update(index for index, compiled_regex in self._compiled_regexes if compiled_regex.search(sequence) is not None)
+
+        return sorted(found)
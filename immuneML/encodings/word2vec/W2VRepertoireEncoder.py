@@ -1,17 +1,36 @@
+from collections import Counter
+from multiprocessing.pool import Pool
+
 import numpy as np
 
 from immuneML.encodings.EncoderParams import EncoderParams
 from immuneML.encodings.word2vec.Word2VecEncoder import Word2VecEncoder
+from immuneML.environment.EnvironmentSettings import EnvironmentSettings
 from immuneML.util.KmerHelper import KmerHelper
 
 
 class W2VRepertoireEncoder(Word2VecEncoder):
 
+    _worker_kmer_indices = None
+    _worker_embedding_matrix = None
+
     def _encode_examples(self, encoded_dataset, vectors, params):
-        repertoires = np.zeros(shape=[encoded_dataset.get_example_count(), vectors.vector_size])
-        for (index, repertoire) in enumerate(encoded_dataset.get_data()):
-            repertoires[index] = self._encode_repertoire(repertoire, vectors)
-        return repertoires
+        """
+        Encodes the repertoires in a pool of params.pool_size processes; the k-mer indices and the embedding matrix are sent to each
+        worker once through the pool initializer instead of with every repertoire
+        """
+        with Pool(params.pool_size, initializer=W2VRepertoireEncoder._initialize_worker,
+                  initargs=(self._get_kmer_indices(vectors), np.asarray(vectors.vectors))) as pool:
+            repertoires = pool.map(self._encode_repertoire_in_worker, encoded_dataset.get_data())
+
+        return np.array(repertoires).reshape(encoded_dataset.get_example_count(), vectors.vector_size)
+
+    def _get_kmer_indices(self, vectors) -> dict:
+        # gensim >= 4 stores the vocabulary as key_to_index, older versions as vocab with Vocab objects
+        if hasattr(vectors, "key_to_index"):
+            return dict(vectors.key_to_index)
+        else:
+            return {kmer: item.index for kmer, item in vectors.vocab.items()}
 
     def _encode_labels(self, dataset, params: EncoderParams):
 
@@ -26,17 +45,27 @@ class W2VRepertoireEncoder(Word2VecEncoder):
 
         return np.array([labels[name] for name in labels.keys()])
 
-    def _encode_repertoire(self, repertoire, vectors):
-        repertoire_vector = np.zeros(vectors.vector_size)
-        for (index2, sequence) in enumerate(repertoire.sequences):
-            kmers = KmerHelper.create_kmers_from_sequence(sequence=sequence, k=self.k)
-            sequence_vector = np.zeros(vectors.vector_size)
-            for kmer in kmers:
-                try:
-                    word_vector = vectors.get_vector(kmer)
-                    sequence_vector = np.add(sequence_vector, word_vector)
-                except KeyError:
-                    pass
-
-            repertoire_vector = np.add(repertoire_vector, sequence_vector)
-        return repertoire_vector
+    @staticmethod
+    def _initialize_worker(kmer_indices: dict, embedding_matrix: np.ndarray):
+        W2VRepertoireEncoder._worker_kmer_indices = kmer_indices
+        W2VRepertoireEncoder._worker_embedding_matrix = embedding_matrix
+
+    def _encode_repertoire_in_worker(self, repertoire):
+        return self._encode_repertoire(repertoire, W2VRepertoireEncoder._worker_kmer_indices, W2VRepertoireEncoder._worker_embedding_matrix)
+
+    def _encode_repertoire(self, repertoire, kmer_indices: dict, embedding_matrix: np.ndarray):
+        """
+        sums the vectors of all k-mers in the repertoire (k-mers missing from the vocabulary are ignored) as a product of the k-mer count
+        vector and the embedding matrix
+        """
+        kmer_counts = Counter()
+        sequences = repertoire.get_attribute(EnvironmentSettings.get_sequence_type().value)
+        for sequence in sequences if sequences is not None else []:
+            kmer_counts.update(KmerHelper.create_kmers_from_string(sequence, self.k))
+
+        counts = np.zeros(embedding_matrix.shape[0])
+        for kmer, count in kmer_counts.items():
+            if kmer in kmer_indices:
+                counts[kmer_indices[kmer]] = count
+
+        return counts @ embedding_matrix
@@ -47,6 +47,9 @@ class Word2VecEncoder(DatasetEncoder):
 
         k (int): The length of the k-mers used for the encoding.
 
+        number_of_threads (int): How many worker threads gensim uses to train the model; this is independent of how many repertoires
+        are loaded in parallel (default is 3, as in gensim).
+
 
     YAML specification:
 
@@ -59,6 +62,7 @@ class Word2VecEncoder(DatasetEncoder):
                     vector_size: 16
                     k: 3
                     model_type: SEQUENCE
+                    number_of_threads: 3
 
     """
 
@@ -69,20 +73,23 @@ class Word2VecEncoder(DatasetEncoder):
         "RepertoireDataset": "W2VRepertoireEncoder"
     }
 
-    def __init__(self, vector_size: int, k: int, model_type: ModelType, name: str = None):
+    def __init__(self, vector_size: int, k: int, model_type: ModelType, number_of_threads: int = 3, name: str = None):
         self.vector_size = vector_size
         self.k = k
         self.model_type = model_type
+        self.number_of_threads = number_of_threads
         self.model_path = None
         self.name = name
 
     @staticmethod
-    def _prepare_parameters(vector_size: int, k: int, model_type: str, name: str = None):
+    def _prepare_parameters(vector_size: int, k: int, model_type: str, number_of_threads: int = 3, name: str = None):
         location = "Word2VecEncoder"
         ParameterValidator.assert_type_and_value(vector_size, int, location, "vector_size", min_inclusive=1)
         ParameterValidator.assert_type_and_value(k, int, location, "k", min_inclusive=1)
         ParameterValidator.assert_in_valid_list(model_type.upper(), [item.name for item in ModelType], location, "model_type")
-        return {"vector_size": vector_size, "k": k, "model_type": ModelType[model_type.upper()], "name": name}
+        ParameterValidator.assert_type_and_value(number_of_threads, int, location, "number_of_threads", min_inclusive=1)
+        return {"vector_size": vector_size, "k": k, "model_type": ModelType[model_type.upper()], "number_of_threads": number_of_threads,
+                "name": name}
 
     @staticmethod
     def build_object(dataset=None, **params):
@@ -189,7 +196,8 @@ class Word2VecEncoder(DatasetEncoder):
                                            k=self.k,
                                            vector_size=self.vector_size,
                                            batch_size=params.pool_size,
-                                           model_path=self.model_path)
+                                           model_path=self.model_path,
+                                           number_of_threads=self.number_of_threads)
 
         return model
 
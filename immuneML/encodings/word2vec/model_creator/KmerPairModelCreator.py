@@ -12,9 +12,9 @@ from immuneML.util.KmerHelper import KmerHelper
 
 class KmerPairModelCreator(ModelCreatorStrategy):
 
-    def create_model(self, dataset: RepertoireDataset, k: int, vector_size: int, batch_size: int, model_path: Path):
+    def create_model(self, dataset: RepertoireDataset, k: int, vector_size: int, batch_size: int, model_path: Path, number_of_threads: int = 3):
 
-        model = Word2Vec(size=vector_size, min_count=1, window=5)  # creates an empty model
+        model = Word2Vec(size=vector_size, min_count=1, window=5, workers=number_of_threads)  # creates an empty model
         all_kmers = KmerHelper.create_all_kmers(k=k, alphabet=EnvironmentSettings.get_sequence_alphabet())
         all_kmers = [[kmer] for kmer in all_kmers]
         model.build_vocab(all_kmers)
@@ -9,5 +9,5 @@ class ModelCreatorStrategy(metaclass=abc.ABCMeta):
     Defines how word2vec model can be created by defining different contexts for k-mers
     """
     @abc.abstractmethod
-    def create_model(self, dataset: RepertoireDataset, k: int, vector_size: int, batch_size: int, model_path: Path):
+    def create_model(self, dataset: RepertoireDataset, k: int, vector_size: int, batch_size: int, model_path: Path, number_of_threads: int = 3):
         pass
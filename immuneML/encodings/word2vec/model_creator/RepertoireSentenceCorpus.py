@@ -0,0 +1,45 @@
+from immuneML.data_model.dataset.RepertoireDataset import RepertoireDataset
+from immuneML.environment.EnvironmentSettings import EnvironmentSettings
+from immuneML.util.KmerHelper import KmerHelper
+
+
+class RepertoireSentenceCorpus:
+    """
+    Streams the sentences (lists of overlapping k-mers, one per sequence) of all repertoires in the dataset as one corpus for gensim's
+    Word2Vec: sequences are read from the repertoire columns one repertoire at a time, so the corpus does not have to be kept in memory.
+    The corpus can be iterated over multiple times, as gensim does once per training epoch. The number of sentences is counted during the
+    first complete pass over the corpus, so it is known for the following epochs without reading the repertoires again.
+
+    Arguments:
+
+        dataset (RepertoireDataset): the dataset whose sequences make up the corpus
+
+        k (int): the length of k-mers (words)
+
+        batch_size (int): how many repertoires are loaded in parallel
+
+    """
+
+    def __init__(self, dataset: RepertoireDataset, k: int, batch_size: int = 1):
+        self.dataset = dataset
+        self.k = k
+        self.batch_size = batch_size
+        self.sentence_count = None
+
+    def __iter__(self):
+        for sentences in self.get_repertoire_sentences():
+            yield from sentences
+
+    def get_repertoire_sentences(self):
+        """Yields the list of sentences of each repertoire in turn and records the total number of sentences once all are read"""
+        sentence_count = 0
+        for repertoire in self.dataset.get_data(batch_size=self.batch_size):
+            sequences = repertoire.get_attribute(EnvironmentSettings.get_sequence_type().value)
+            sentences = [KmerHelper.create_kmers_from_string(sequence, self.k) for sequence in sequences] if sequences is not None else []
+            sentence_count += len(sentences)
+            yield sentences
+        self.sentence_count = sentence_count
+
+    def get_sentence_count(self) -> int:
+        """Returns the number of sentences counted during the first complete pass over the corpus or None if there has been no such pass"""
+        return self.sentence_count
@@ -6,21 +6,34 @@ from gensim.models import Word2Vec
 
 from immuneML.data_model.dataset.RepertoireDataset import RepertoireDataset
 from immuneML.encodings.word2vec.model_creator.ModelCreatorStrategy import ModelCreatorStrategy
+from immuneML.encodings.word2vec.model_creator.RepertoireSentenceCorpus import RepertoireSentenceCorpus
 from immuneML.environment.EnvironmentSettings import EnvironmentSettings
 from immuneML.util.KmerHelper import KmerHelper
 
 
 class SequenceModelCreator(ModelCreatorStrategy):
 
-    def create_model(self, dataset: RepertoireDataset, k: int, vector_size: int, batch_size: int, model_path: Path):
-        model = Word2Vec(size=vector_size, min_count=1, window=5)  # creates an empty model
+    EPOCHS = 15
+
+    def create_model(self, dataset: RepertoireDataset, k: int, vector_size: int, batch_size: int, model_path: Path, number_of_threads: int = 3):
+        model = Word2Vec(size=vector_size, min_count=1, window=5, workers=number_of_threads)  # creates an empty model
         all_kmers = KmerHelper.create_all_kmers(k=k, alphabet=EnvironmentSettings.get_sequence_alphabet())
         all_kmers = [[kmer] for kmer in all_kmers]
         model.build_vocab(all_kmers)
 
-        for repertoire in dataset.get_data(batch_size=batch_size):
-            sentences = KmerHelper.create_sentences_from_repertoire(repertoire=repertoire, k=k)
-            model.train(sentences=sentences, total_words=len(all_kmers), epochs=15)
+        # sentences from all repertoires are streamed as one corpus, so that the learning rate decays once over the whole dataset; the
+        # first epoch is trained repertoire by repertoire with its initial learning rate while the sentences are counted, so that the
+        # corpus does not have to be read once more only to count them
+        corpus = RepertoireSentenceCorpus(dataset=dataset, k=k, batch_size=batch_size)
+        alpha_step = (model.alpha - model.min_alpha) / SequenceModelCreator.EPOCHS
+
+        for sentences in corpus.get_repertoire_sentences():
+            if len(sentences) > 0:
+                model.train(sentences, total_examples=len(sentences), epochs=1, start_alpha=model.alpha, end_alpha=model.alpha)
+
+        if SequenceModelCreator.EPOCHS > 1 and corpus.get_sentence_count() > 0:
+            model.train(corpus, total_examples=corpus.get_sentence_count(), epochs=SequenceModelCreator.EPOCHS - 1,
+                        start_alpha=model.alpha - alpha_step, end_alpha=model.min_alpha)
 
         model.save(str(model_path))
 
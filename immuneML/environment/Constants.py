@@ -11,6 +11,8 @@ class Constants:
     GENE_DELIMITER = "-"
     STOP_CODON = "*"
     CACHE_TYPE = "cache_type"
+    CACHE_MEMORY_MAX_BYTES = "cache_memory_max_bytes"
+    CACHE_MAX_BYTES_PER_TYPE = "cache_max_bytes_per_type"
     COMMENT_SIGN = "#"
     NOT_COMPUTED = "not computed"
 
@@ -1,3 +1,4 @@
+from immuneML.caching.CacheHandler import CacheHandler
 from immuneML.encodings.DatasetEncoder import DatasetEncoder
 from immuneML.ml_methods.MLMethod import MLMethod
 
@@ -24,5 +25,15 @@ class HPSetting:
             key += f"_{self.preproc_sequence_name}"
         return key
 
+    def get_encoding_key(self) -> str:
+        """
+        Returns a key which is the same for settings with the same preprocessing sequence and encoding (regardless of the ML method),
+        which therefore produce the same encoded datasets
+        """
+        preprocessing = [(type(preprocessing).__name__, vars(preprocessing)) for preprocessing in self.preproc_sequence] \
+            if self.preproc_sequence is not None else []
+        return CacheHandler.generate_cache_key((("encoder", type(self.encoder).__name__), ("encoder_params", self.encoder_params),
+                                                ("preprocessing", preprocessing)))
+
     def __str__(self):
         return self.get_key()
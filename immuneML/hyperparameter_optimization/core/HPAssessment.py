@@ -1,16 +1,16 @@
 import datetime
-from pathlib import Path
+from functools import partial
 
-from immuneML.data_model.dataset.Dataset import Dataset
 from immuneML.hyperparameter_optimization.HPSetting import HPSetting
 from immuneML.hyperparameter_optimization.core.HPSelection import HPSelection
 from immuneML.hyperparameter_optimization.core.HPUtil import HPUtil
+from immuneML.hyperparameter_optimization.core.MLProcessScheduler import MLProcessScheduler
 from immuneML.hyperparameter_optimization.states.HPAssessmentState import HPAssessmentState
 from immuneML.hyperparameter_optimization.states.TrainMLModelState import TrainMLModelState
-from immuneML.ml_methods.MLMethod import MLMethod
 from immuneML.reports.ReportUtil import ReportUtil
 from immuneML.util.PathBuilder import PathBuilder
 from immuneML.workflows.instructions.MLProcess import MLProcess
+from immuneML.workflows.instructions.MLProcessGroup import MLProcessGroup
 
 
 class HPAssessment:
@@ -22,8 +22,12 @@ class HPAssessment:
         train_val_datasets, test_datasets = HPUtil.split_data(state.dataset, state.assessment, state.path, state.label_configuration)
         n_splits = len(train_val_datasets)
 
+        scheduler = MLProcessScheduler(state.number_of_processes, state.number_of_processes_per_job)
+
         for index in range(n_splits):
-            state = HPAssessment.run_assessment_split(state, train_val_datasets[index], test_datasets[index], index, n_splits)
+            state = HPAssessment.add_assessment_split(state, scheduler, train_val_datasets[index], test_datasets[index], index, n_splits)
+
+        scheduler.run()
 
         return state
 
@@ -34,71 +38,88 @@ class HPAssessment:
         return state
 
     @staticmethod
-    def run_assessment_split(state, train_val_dataset, test_dataset, split_index: int, n_splits):
-        """run inner CV loop (selection) and retrain on the full train_val_dataset after optimal model is chosen"""
-
-        print(f'{datetime.datetime.now()}: Training ML model: running outer CV loop: started split {split_index + 1}/{n_splits}.\n', flush=True)
+    def add_assessment_split(state: TrainMLModelState, scheduler: MLProcessScheduler, train_val_dataset, test_dataset, split_index: int,
+                             n_splits: int) -> TrainMLModelState:
+        """add jobs for the inner CV loop (selection) and for retraining on the full train_val_dataset after optimal model is chosen"""
 
         current_path = HPAssessment.create_assessment_path(state, split_index)
 
         assessment_state = HPAssessmentState(split_index, train_val_dataset, test_dataset, current_path, state.label_configuration)
         state.assessment_states.append(assessment_state)
 
-        state = HPSelection.run_selection(state, train_val_dataset, current_path, split_index)
-        state = HPAssessment.run_assessment_split_per_label(state, split_index)
+        selection_keys = HPSelection.add_selection_jobs(state, scheduler, train_val_dataset, current_path, split_index)
+        job_keys = HPAssessment.add_assessment_jobs_per_label(state, scheduler, split_index, selection_keys)
 
-        assessment_state.train_val_data_reports = ReportUtil.run_data_reports(train_val_dataset, state.assessment.reports.data_split_reports.values(),
-                                                                              current_path / "data_report_train", state.context)
-        assessment_state.test_data_reports = ReportUtil.run_data_reports(test_dataset, state.assessment.reports.data_split_reports.values(),
-                                                                         current_path / "data_report_test", state.context)
-
-        print(f'{datetime.datetime.now()}: Training ML model: running outer CV loop: finished split {split_index + 1}/{n_splits}.\n', flush=True)
+        scheduler.add_step(("assessment", split_index), partial(HPAssessment.complete_assessment_split, state, split_index, n_splits), job_keys)
 
         return state
 
     @staticmethod
-    def run_assessment_split_per_label(state: TrainMLModelState, split_index: int):
-        """iterate through labels and hp_settings and retrain all models"""
-        n_labels = state.label_configuration.get_label_count()
-
-        for idx, label in enumerate(state.label_configuration.get_labels_by_name()):
+    def add_assessment_jobs_per_label(state: TrainMLModelState, scheduler: MLProcessScheduler, split_index: int, selection_keys: dict) -> list:
+        """add jobs to retrain models for all labels and hp_settings once the optimal setting for the label is known"""
 
-            print(f"{datetime.datetime.now()}: Training ML model: running the inner loop of nested CV: "
-                  f"retrain models for label {label} (label {idx + 1} / {n_labels}).\n", flush=True)
+        job_keys = []
 
-            path = state.assessment_states[split_index].path
+        for label in state.label_configuration.get_labels_by_name():
+            for group_index, group in enumerate(HPUtil.group_by_encoding(state.hp_settings)):
+                key = HPAssessment.get_job_key(split_index, label, group_index)
+                scheduler.add_job(key, partial(HPAssessment.create_process_group, state, group, label, split_index, selection_keys[label],
+                                               scheduler.number_of_processes_per_job), split_index, [selection_keys[label]])
+                job_keys.append(key)
 
-            for index, hp_setting in enumerate(state.hp_settings):
+        return job_keys
 
-                if hp_setting != state.assessment_states[split_index].label_states[label].optimal_hp_setting:
-                    setting_path = path / f"{label}_{hp_setting}/"
-                else:
-                    setting_path = path / f"{label}_{hp_setting}_optimal/"
+    @staticmethod
+    def get_job_key(split_index: int, label: str, group_index: int) -> tuple:
+        return "assessment", split_index, label, group_index
 
-                train_val_dataset = state.assessment_states[split_index].train_val_dataset
-                test_dataset = state.assessment_states[split_index].test_dataset
-                state = HPAssessment.reeval_on_assessment_split(state, train_val_dataset, test_dataset, hp_setting, setting_path, label, split_index)
+    @staticmethod
+    def create_process_group(state: TrainMLModelState, hp_setting_indices: list, label: str, split_index: int, selection_key,
+                             number_of_processes: int, results: dict) -> MLProcessGroup:
+        return MLProcessGroup([HPAssessment.create_process(state, state.hp_settings[index], label, split_index, selection_key, number_of_processes,
+                                                           results) for index in hp_setting_indices])
 
-            print(f"{datetime.datetime.now()}: Training ML model: running the inner loop of nested CV: completed retraining models "
-                  f"for label {label} (label {idx + 1} / {n_labels}).\n", flush=True)
+    @staticmethod
+    def create_process(state: TrainMLModelState, hp_setting: HPSetting, label: str, split_index: int, selection_key, number_of_processes: int,
+                       results: dict) -> MLProcess:
+        """create the process to retrain model for specific label, assessment split and hp_setting"""
 
-        return state
+        path = state.assessment_states[split_index].path
 
-    @staticmethod
-    def reeval_on_assessment_split(state, train_val_dataset: Dataset, test_dataset: Dataset, hp_setting: HPSetting, path: Path, label: str,
-                                   split_index: int) -> MLMethod:
-        """retrain model for specific label, assessment split and hp_setting"""
+        if hp_setting != results[selection_key]:
+            setting_path = path / f"{label}_{hp_setting}/"
+        else:
+            setting_path = path / f"{label}_{hp_setting}_optimal/"
 
-        assessment_item = MLProcess(train_dataset=train_val_dataset, test_dataset=test_dataset, label=label, metrics=state.metrics,
-                                    optimization_metric=state.optimization_metric, path=path, hp_setting=hp_setting, report_context=state.context,
-                                    ml_reports=state.assessment.reports.model_reports.values(), number_of_processes=state.number_of_processes,
-                                    encoding_reports=state.assessment.reports.encoding_reports.values(), label_config=state.label_configuration,
-                                    store_encoded_data=state.store_encoded_data) \
-            .run(split_index)
+        return MLProcess(train_dataset=state.assessment_states[split_index].train_val_dataset,
+                         test_dataset=state.assessment_states[split_index].test_dataset, label=label, metrics=state.metrics,
+                         optimization_metric=state.optimization_metric, path=setting_path, hp_setting=hp_setting, report_context=state.context,
+                         ml_reports=list(state.assessment.reports.model_reports.values()), number_of_processes=number_of_processes,
+                         encoding_reports=list(state.assessment.reports.encoding_reports.values()), label_config=state.label_configuration,
+                         store_encoded_data=state.store_encoded_data)
 
-        state.assessment_states[split_index].label_states[label].assessment_items[str(hp_setting)] = assessment_item
+    @staticmethod
+    def complete_assessment_split(state: TrainMLModelState, split_index: int, n_splits: int, results: dict):
+        """store retrained models in the order of labels and hp_settings and run data reports on the assessment split"""
+
+        assessment_state = state.assessment_states[split_index]
+
+        for label in state.label_configuration.get_labels_by_name():
+            hp_items = [None] * len(state.hp_settings)
+            for group_index, group in enumerate(HPUtil.group_by_encoding(state.hp_settings)):
+                for hp_setting_index, hp_item in zip(group, results[HPAssessment.get_job_key(split_index, label, group_index)]):
+                    hp_items[hp_setting_index] = hp_item
+            for hp_setting, hp_item in zip(state.hp_settings, hp_items):
+                assessment_state.label_states[label].assessment_items[str(hp_setting)] = hp_item
+
+        assessment_state.train_val_data_reports = ReportUtil.run_data_reports(assessment_state.train_val_dataset,
+                                                                              state.assessment.reports.data_split_reports.values(),
+                                                                              assessment_state.path / "data_report_train", state.context)
+        assessment_state.test_data_reports = ReportUtil.run_data_reports(assessment_state.test_dataset,
+                                                                         state.assessment.reports.data_split_reports.values(),
+                                                                         assessment_state.path / "data_report_test", state.context)
 
-        return state
+        print(f'{datetime.datetime.now()}: Training ML model: running outer CV loop: finished split {split_index + 1}/{n_splits}.\n', flush=True)
 
     @staticmethod
     def create_assessment_path(state, split_index):
@@ -1,14 +1,18 @@
 import datetime
+from functools import partial
 from pathlib import Path
 
 from immuneML.environment.LabelConfiguration import LabelConfiguration
 from immuneML.hyperparameter_optimization.HPSetting import HPSetting
 from immuneML.hyperparameter_optimization.config.SplitType import SplitType
 from immuneML.hyperparameter_optimization.core.HPUtil import HPUtil
+from immuneML.hyperparameter_optimization.core.MLProcessScheduler import MLProcessScheduler
+from immuneML.hyperparameter_optimization.states.HPItem import HPItem
 from immuneML.hyperparameter_optimization.states.HPSelectionState import HPSelectionState
 from immuneML.hyperparameter_optimization.states.TrainMLModelState import TrainMLModelState
 from immuneML.util.PathBuilder import PathBuilder
 from immuneML.workflows.instructions.MLProcess import MLProcess
+from immuneML.workflows.instructions.MLProcessGroup import MLProcessGroup
 
 
 class HPSelection:
@@ -21,41 +25,87 @@ class HPSelection:
         return state
 
     @staticmethod
-    def run_selection(state: TrainMLModelState, train_val_dataset, current_path: Path, split_index: int) -> TrainMLModelState:
+    def add_selection_jobs(state: TrainMLModelState, scheduler: MLProcessScheduler, train_val_dataset, current_path: Path,
+                           split_index: int) -> dict:
+        """
+        Adds jobs to evaluate all hyperparameter settings on all inner (selection) splits to the scheduler, followed by one step per label
+        which chooses the optimal setting once all jobs for the label have finished
+
+        Returns:
+            a dictionary with labels as keys and keys of the steps choosing the optimal setting as values
+        """
 
         path = HPSelection.create_selection_path(state, current_path)
         state = HPSelection.update_split_count(state, train_val_dataset)
         train_datasets, val_datasets = HPUtil.split_data(train_val_dataset, state.selection, path, state.label_configuration)
 
         n_labels = state.label_configuration.get_label_count()
+        selection_keys = {}
 
         for idx, label in enumerate(state.label_configuration.get_labels_by_name()):
 
-            print(f"{datetime.datetime.now()}: Hyperparameter optimization: running the inner loop of nested CV: selection for label {label} "
-                  f"(label {idx + 1} / {n_labels}).\n", flush=True)
-
             selection_state = HPSelectionState(train_datasets, val_datasets, path, state.hp_strategy)
             state.assessment_states[split_index].label_states[label].selection_state = selection_state
 
-            hp_setting = selection_state.hp_strategy.generate_next_setting()
-            while hp_setting is not None:
-                performance = HPSelection.evaluate_hp_setting(state, hp_setting, train_datasets, val_datasets,
-                                                              path, label, split_index)
-                hp_setting = selection_state.hp_strategy.generate_next_setting(hp_setting, performance)
+            hp_settings = list(selection_state.hp_strategy.hp_settings.values())
+            job_keys, item_positions = [], {}
+            for group_index, group in enumerate(HPUtil.group_by_encoding(hp_settings)):
+                for index in range(len(train_datasets)):
+                    key = HPSelection.get_job_key(split_index, label, group_index, index)
+                    scheduler.add_job(key, partial(HPSelection.create_process_group, state, [hp_settings[i] for i in group], train_datasets[index],
+                                                   val_datasets[index], path / f"split_{index + 1}", label,
+                                                   scheduler.number_of_processes_per_job), index + 1)
+                    job_keys.append(key)
+                item_positions.update({hp_settings[setting_index].get_key(): (group_index, position) for position, setting_index in enumerate(group)})
 
-            HPUtil.run_selection_reports(state, train_val_dataset, train_datasets, val_datasets, selection_state)
+            selection_keys[label] = ("selection", split_index, label)
+            scheduler.add_step(selection_keys[label], partial(HPSelection.complete_selection, state, train_val_dataset, train_datasets, val_datasets,
+                                                              path, label, split_index, item_positions, f"label {idx + 1} / {n_labels}"),
+                               job_keys)
 
-            print(f"{datetime.datetime.now()}: Hyperparameter optimization: running the inner loop of nested CV: completed selection for "
-                  f"label {label} (label {idx + 1} / {n_labels}).\n", flush=True)
+        return selection_keys
 
-        return state
+    @staticmethod
+    def get_job_key(assessment_index: int, label: str, group_index: int, selection_index: int) -> tuple:
+        return "selection", assessment_index, label, group_index, selection_index
+
+    @staticmethod
+    def complete_selection(state: TrainMLModelState, train_val_dataset, train_datasets: list, val_datasets: list, path: Path, label: str,
+                           split_index: int, item_positions: dict, label_repr: str, results: dict):
+        """
+        Passes the performances of the evaluated settings to the optimization strategy in the order in which the strategy generates them;
+        settings the strategy generates which were not evaluated in advance are evaluated here; item_positions maps the key of each evaluated
+        setting to the index of its group of settings with shared encoding and its position within the group
+        """
+
+        print(f"{datetime.datetime.now()}: Hyperparameter optimization: running the inner loop of nested CV: selection for label {label} "
+              f"({label_repr}).\n", flush=True)
+
+        selection_state = state.assessment_states[split_index].label_states[label].selection_state
+
+        hp_setting = selection_state.hp_strategy.generate_next_setting()
+        while hp_setting is not None:
+            if hp_setting.get_key() in item_positions:
+                group_index, position = item_positions[hp_setting.get_key()]
+                hp_items = [results[HPSelection.get_job_key(split_index, label, group_index, index)][position] for index in range(len(train_datasets))]
+                performance = HPUtil.get_average_performance([HPSelection.add_hp_item(state, hp_item, label, split_index) for hp_item in hp_items])
+            else:
+                performance = HPSelection.evaluate_hp_setting(state, hp_setting, train_datasets, val_datasets, path, label, split_index)
+            hp_setting = selection_state.hp_strategy.generate_next_setting(hp_setting, performance)
+
+        HPUtil.run_selection_reports(state, train_val_dataset, train_datasets, val_datasets, selection_state)
+
+        print(f"{datetime.datetime.now()}: Hyperparameter optimization: running the inner loop of nested CV: completed selection for "
+              f"label {label} ({label_repr}).\n", flush=True)
+
+        return selection_state.optimal_hp_setting
 
     @staticmethod
     def evaluate_hp_setting(state: TrainMLModelState, hp_setting: HPSetting, train_datasets: list, val_datasets: list,
                             current_path: Path, label: str, assessment_split_index: int):
 
         performances = []
-        for index in range(state.selection.split_count):
+        for index in range(len(train_datasets)):
             performance = HPSelection.run_setting(state, hp_setting, train_datasets[index], val_datasets[index], index + 1,
                                                   current_path / f"split_{index + 1}" / f"{label}_{hp_setting.get_key()}",
                                                   label, assessment_split_index)
@@ -67,14 +117,31 @@ class HPSelection:
     def run_setting(state: TrainMLModelState, hp_setting, train_dataset, val_dataset, split_index: int,
                     current_path: Path, label: str, assessment_index: int):
 
-        hp_item = MLProcess(train_dataset=train_dataset, test_dataset=val_dataset, encoding_reports=state.selection.reports.encoding_reports.values(),
-                            label_config=LabelConfiguration([state.label_configuration.get_label_object(label)]), report_context=state.context,
-                            number_of_processes=state.number_of_processes, metrics=state.metrics, optimization_metric=state.optimization_metric,
-                            ml_reports=state.selection.reports.model_reports.values(), label=label, path=current_path, hp_setting=hp_setting,
-                            store_encoded_data=state.store_encoded_data)\
-            .run(split_index)
+        hp_item = HPSelection.create_process(state, hp_setting, train_dataset, val_dataset, current_path, label).run(split_index)
+
+        return HPSelection.add_hp_item(state, hp_item, label, assessment_index)
+
+    @staticmethod
+    def create_process_group(state: TrainMLModelState, hp_settings: list, train_dataset, val_dataset, split_path: Path, label: str,
+                             number_of_processes: int, results: dict) -> MLProcessGroup:
+        return MLProcessGroup([HPSelection.create_process(state, hp_setting, train_dataset, val_dataset, split_path / f"{label}_{hp_setting.get_key()}",
+                                                          label, number_of_processes) for hp_setting in hp_settings])
+
+    @staticmethod
+    def create_process(state: TrainMLModelState, hp_setting, train_dataset, val_dataset, current_path: Path, label: str,
+                       number_of_processes: int = None, results: dict = None) -> MLProcess:
+
+        return MLProcess(train_dataset=train_dataset, test_dataset=val_dataset, encoding_reports=list(state.selection.reports.encoding_reports.values()),
+                         label_config=LabelConfiguration([state.label_configuration.get_label_object(label)]), report_context=state.context,
+                         number_of_processes=number_of_processes if number_of_processes is not None else state.number_of_processes,
+                         metrics=state.metrics, optimization_metric=state.optimization_metric,
+                         ml_reports=list(state.selection.reports.model_reports.values()), label=label, path=current_path, hp_setting=hp_setting,
+                         store_encoded_data=state.store_encoded_data)
+
+    @staticmethod
+    def add_hp_item(state: TrainMLModelState, hp_item: HPItem, label: str, assessment_index: int):
 
-        state.assessment_states[assessment_index].label_states[label].selection_state.hp_items[hp_setting.get_key()].append(hp_item)
+        state.assessment_states[assessment_index].label_states[label].selection_state.hp_items[hp_item.hp_setting.get_key()].append(hp_item)
 
         return hp_item.performance[state.optimization_metric.name.lower()] if hp_item.performance is not None else None
 
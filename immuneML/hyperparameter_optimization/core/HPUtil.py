@@ -3,6 +3,9 @@ from pathlib import Path
 from typing import List
 
 from immuneML.data_model.dataset.Dataset import Dataset
+from immuneML.data_model.dataset.ElementDataset import ElementDataset
+from immuneML.data_model.encoded_data.EncodedData import EncodedData
+from immuneML.encodings.DatasetEncoder import DatasetEncoder
 from immuneML.encodings.EncoderParams import EncoderParams
 from immuneML.environment.Constants import Constants
 from immuneML.environment.LabelConfiguration import LabelConfiguration
@@ -47,6 +50,17 @@ class HPUtil:
         else:
             return Constants.NOT_COMPUTED
 
+    @staticmethod
+    def group_by_encoding(hp_settings: List[HPSetting]) -> List[List[int]]:
+        """
+        Returns:
+            lists of indices of hp_settings which share the preprocessing and encoding, in the order of the first setting in each group
+        """
+        groups = {}
+        for index, hp_setting in enumerate(hp_settings):
+            groups.setdefault(hp_setting.get_encoding_key(), []).append(index)
+        return list(groups.values())
+
     @staticmethod
     def preprocess_dataset(dataset: Dataset, preproc_sequence: list, path: Path) -> Dataset:
         if dataset is not None:
@@ -58,7 +72,8 @@ class HPUtil:
             return tmp_dataset
 
     @staticmethod
-    def train_method(label: str, dataset, hp_setting: HPSetting, path: Path, train_predictions_path, ml_details_path, cores_for_training, optimization_metric) -> MLMethod:
+    def train_method(label: str, dataset, hp_setting: HPSetting, path: Path, train_predictions_path, ml_details_path, cores_for_training, optimization_metric,
+                     encoder: DatasetEncoder = None, encoder_params: EncoderParams = None) -> MLMethod:
         method = MLMethodTrainer.run(MLMethodTrainerParams(
             method=copy.deepcopy(hp_setting.ml_method),
             result_path=path / "ml_method",
@@ -69,7 +84,9 @@ class HPUtil:
             model_selection_cv=hp_setting.ml_params["model_selection_cv"],
             model_selection_n_folds=hp_setting.ml_params["model_selection_n_folds"],
             cores_for_training=cores_for_training,
-            optimization_metric=optimization_metric.name.lower()
+            optimization_metric=optimization_metric.name.lower(),
+            encoder=encoder,
+            encoder_params=encoder_params
         ))
         return method
 
@@ -81,19 +98,44 @@ class HPUtil:
         encoded_dataset = DataEncoder.run(DataEncoderParams(
             dataset=dataset,
             encoder=hp_setting.encoder,
-            encoder_params=EncoderParams(
-                model=hp_setting.encoder_params,
-                result_path=path,
-                pool_size=number_of_processes,
-                label_config=label_configuration,
-                learn_model=learn_model,
-                filename="train_dataset.pkl" if learn_model else "test_dataset.pkl",
-                encode_labels=encode_labels
-            ),
+            encoder_params=HPUtil.make_encoder_params(hp_setting, path, learn_model, number_of_processes, label_configuration, encode_labels),
             store_encoded_data=store_encoded_data
         ))
         return encoded_dataset
 
+    @staticmethod
+    def make_encoder_params(hp_setting: HPSetting, path: Path, learn_model: bool, number_of_processes: int, label_configuration: LabelConfiguration,
+                            encode_labels: bool = True) -> EncoderParams:
+        return EncoderParams(
+            model=hp_setting.encoder_params,
+            result_path=path,
+            pool_size=number_of_processes,
+            label_config=label_configuration,
+            learn_model=learn_model,
+            filename="train_dataset.pkl" if learn_model else "test_dataset.pkl",
+            encode_labels=encode_labels
+        )
+
+    @staticmethod
+    def encode_dataset_in_batches(dataset: ElementDataset, hp_setting: HPSetting, path: Path, number_of_processes: int,
+                                  label_configuration: LabelConfiguration) -> ElementDataset:
+        """
+        Prepares a receptor or sequence dataset to be encoded one batch file at a time while an ML method is trained on it incrementally (see
+        MLMethodTrainer): the encoder is fitted on the first batch file of the dataset only and the returned copy of the dataset has encoded data
+        with the example ids, labels and feature names, but without the encoded examples
+
+        Returns:
+            a copy of the dataset with encoded data without examples
+        """
+        first_batch = HPUtil.encode_dataset(dataset.get_batch_datasets()[0], hp_setting, path / "first_batch", learn_model=True, context=None,
+                                            number_of_processes=number_of_processes, label_configuration=label_configuration)
+
+        encoded_dataset = dataset.clone()
+        encoded_dataset.encoded_data = EncodedData(examples=None, labels=dataset.get_metadata(label_configuration.get_labels_by_name()),
+                                                   example_ids=dataset.get_example_ids(), feature_names=first_batch.encoded_data.feature_names,
+                                                   encoding=first_batch.encoded_data.encoding)
+        return encoded_dataset
+
     @staticmethod
     def assess_performance(method, metrics, optimization_metric, dataset, split_index, current_path: Path, test_predictions_path: Path, label: str,
                            ml_score_path: Path):
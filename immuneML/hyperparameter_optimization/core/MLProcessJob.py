@@ -0,0 +1,18 @@
+from dataclasses import dataclass, field
+from typing import Callable, Hashable, List
+
+
+@dataclass
+class MLProcessJob:
+    """
+    A node in the graph of jobs run by MLProcessScheduler.
+
+    If `runs_ml_process` is True, `function` is called with the results of all finished jobs and has to return an MLProcess object, which is
+    then run for `split_index` in a worker process. Otherwise, `function` is a step which is called with the results in the main process
+    (e.g., to choose the optimal hyperparameter setting from the results of its dependencies) and its return value is stored as the result.
+    """
+    key: Hashable
+    function: Callable
+    dependencies: List[Hashable] = field(default_factory=list)
+    runs_ml_process: bool = True
+    split_index: int = None
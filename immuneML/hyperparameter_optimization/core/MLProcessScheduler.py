@@ -0,0 +1,117 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Hashable, List
+
+from immuneML.hyperparameter_optimization.core.MLProcessJob import MLProcessJob
+
+
+class MLProcessScheduler:
+    """
+    Runs the jobs of nested cross-validation (training and assessing one hyperparameter setting on one split) as a directed acyclic graph.
+
+    Jobs are added together with the keys of the jobs they depend on, which have to be added before them, so the graph cannot contain cycles.
+    Each MLProcess is created in the main process once all its dependencies have finished and is then run in a pool of worker processes,
+    while the steps (e.g., choosing the optimal hyperparameter setting for one label once all selection jobs are finished) are always run in
+    the main process. Jobs are submitted in the order in which they were added and the results are stored by job key, so the results
+    and the state which the steps build from them do not depend on the order in which the jobs finish.
+
+    The total number of processes is divided between the jobs: each MLProcess gets `number_of_processes_per_job` processes for encoding
+    and training, and `number_of_processes // number_of_processes_per_job` jobs are run at the same time. If only one job can run at a
+    time, jobs are run one by one in the main process, in the same order as they would be run without the scheduler.
+
+    Worker processes are created with concurrent.futures.ProcessPoolExecutor, since (unlike the workers of multiprocessing.Pool) they
+    are not daemonic and can create their own pools when encoding the data.
+
+    Arguments:
+
+        number_of_processes (int): the total number of processes to use
+
+        number_of_processes_per_job (int): how many processes each MLProcess can use; if None, all processes are given to one job and
+        the jobs are run one by one
+
+    """
+
+    def __init__(self, number_of_processes: int, number_of_processes_per_job: int = None):
+        self.number_of_processes = max(number_of_processes, 1)
+        self.number_of_processes_per_job = self.number_of_processes if number_of_processes_per_job is None \
+            else min(max(number_of_processes_per_job, 1), self.number_of_processes)
+        self.parallel_job_count = self.number_of_processes // self.number_of_processes_per_job
+        self.jobs = {}
+        self.results = {}
+
+    def add_job(self, key: Hashable, create_process: Callable, split_index: int, dependencies: List[Hashable] = None):
+        self._add(MLProcessJob(key=key, function=create_process, dependencies=self._check_dependencies(key, dependencies),
+                               runs_ml_process=True, split_index=split_index))
+
+    def add_step(self, key: Hashable, step: Callable, dependencies: List[Hashable] = None):
+        self._add(MLProcessJob(key=key, function=step, dependencies=self._check_dependencies(key, dependencies), runs_ml_process=False))
+
+    def _add(self, job: MLProcessJob):
+        assert job.key not in self.jobs, f"{MLProcessScheduler.__name__}: job with key {job.key} was already added."
+        self.jobs[job.key] = job
+
+    def _check_dependencies(self, key: Hashable, dependencies: List[Hashable]) -> list:
+        dependencies = list(dependencies) if dependencies is not None else []
+        missing = [dependency for dependency in dependencies if dependency not in self.jobs]
+        assert len(missing) == 0, f"{MLProcessScheduler.__name__}: dependencies {missing} of job {key} have to be added before the job."
+        return dependencies
+
+    def run(self) -> dict:
+        """
+        Runs all jobs which have not been run yet
+
+        Returns:
+            a dictionary with job keys as keys and HPItem objects (for MLProcess jobs) or return values of steps as values
+        """
+        if self.parallel_job_count > 1:
+            logging.info(f"{MLProcessScheduler.__name__}: running up to {self.parallel_job_count} jobs in parallel with "
+                         f"{self.number_of_processes_per_job} processes each.")
+            self._run_in_pool()
+        else:
+            self._run_sequentially()
+
+        return self.results
+
+    def _run_sequentially(self):
+        job = self._get_next_ready_job(running=set())
+        while job is not None:
+            if job.runs_ml_process:
+                self.results[job.key] = job.function(self.results).run(job.split_index)
+            else:
+                self.results[job.key] = job.function(self.results)
+            job = self._get_next_ready_job(running=set())
+
+    def _run_in_pool(self):
+        with ProcessPoolExecutor(max_workers=self.parallel_job_count) as executor:
+            futures = {}
+            try:
+                self._submit_ready_jobs(executor, futures)
+                while len(futures) > 0:
+                    done, _ = wait(futures.keys(), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self.results[futures.pop(future)] = future.result()
+                    self._submit_ready_jobs(executor, futures)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    def _submit_ready_jobs(self, executor: ProcessPoolExecutor, futures: dict):
+        job = self._get_next_ready_job(running=set(futures.values()))
+        while job is not None:
+            if job.runs_ml_process:
+                process = job.function(self.results)
+                futures[executor.submit(MLProcessScheduler._run_process, process, job.split_index)] = job.key
+            else:
+                self.results[job.key] = job.function(self.results)
+            job = self._get_next_ready_job(running=set(futures.values()))
+
+    def _get_next_ready_job(self, running: set) -> MLProcessJob:
+        for key, job in self.jobs.items():
+            if key not in self.results and key not in running and all(dependency in self.results for dependency in job.dependencies):
+                return job
+        return None
+
+    @staticmethod
+    def _run_process(process, split_index: int):
+        return process.run(split_index)
@@ -1,4 +1,6 @@
 import hashlib
+import os
+import uuid
 import warnings
 from pathlib import Path
 
@@ -76,7 +78,7 @@ class DeepRC(MLMethod):
 
         training_batch_size (int): Number of repertoires per minibatch during training.
 
-        n_workers (int): Number of background processes to use for converting dataset to hdf5 container and training set data loader.
+        n_workers (int): Number of background processes to use for the training set data loader.
 
         pytorch_device_name (str): The name of the pytorch device to use. This name will be passed to  torch.device(self.pytorch_device_name). The default value is cuda:0
 
@@ -146,21 +148,32 @@ class DeepRC(MLMethod):
         self.feature_names = None
 
     def _metadata_to_hdf5(self, metadata_filepath: Path, label_name):
-        from deeprc.deeprc_binary.dataset_converters import DatasetToHDF5
-
-        hdf5_filepath = metadata_filepath.parent / f"{metadata_filepath.stem}.hdf5"
-        converter = DatasetToHDF5(metadata_file=str(metadata_filepath),
-                                  id_column=DeepRCEncoder.ID_COLUMN,
-                                  single_class_label_columns=tuple([label_name]),
-                                  sequence_column=DeepRCEncoder.SEQUENCE_COLUMN,
-                                  sequence_counts_column=DeepRCEncoder.COUNTS_COLUMN,
-                                  column_sep=DeepRCEncoder.SEP,
-                                  filename_extension=f".{DeepRCEncoder.EXTENSION}",
-                                  verbose=False)
-        converter.save_data_to_file(output_file=str(hdf5_filepath), n_workers=self.n_workers)
+        """
+        Converts the repertoires described by the metadata file to DeepRC's HDF5 format, unless this was already done for the same
+        metadata file and label: the encoder writes one metadata file per dataset, so the conversion is shared by all fit and predict calls
+        on subsets of the dataset (e.g., in different cross-validation splits). The file is written under a name unique to the process and
+        then renamed, so that parallel processes converting the same dataset never write to the same file.
+
+        The file is written by DeepRCEncoder.export_hdf5_file directly from the sequence and count columns of the repertoire files.
+        """
+        hdf5_filepath = metadata_filepath.parent / f"{metadata_filepath.stem}_{label_name}.hdf5"
+
+        if not hdf5_filepath.is_file():
+            tmp_filepath = hdf5_filepath.parent / f".{hdf5_filepath.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+            try:
+                DeepRCEncoder.export_hdf5_file(metadata_filepath, label_name, tmp_filepath)
+                os.replace(tmp_filepath, hdf5_filepath)
+            finally:
+                if tmp_filepath.is_file():
+                    os.remove(tmp_filepath)
 
         return hdf5_filepath
 
+    def _get_example_indices(self, encoded_data: EncodedData) -> np.ndarray:
+        """Returns the indices of the encoded examples in the HDF5 file or None if the file contains only these examples"""
+        example_indices = encoded_data.info.get("example_indices", None)
+        return np.array(example_indices, dtype=int) if example_indices is not None else None
+
     def _load_dataset_in_ram(self, hdf5_filepath: Path):
         with h5py.File(str(hdf5_filepath), 'r') as hf:
             pre_loaded_hdf5_file = dict()
@@ -193,7 +206,7 @@ class DeepRC(MLMethod):
                 If 'None', all repertoires will be used.
         :param label: the label to be predicted
         :param eval_only: whether the dataloader will only be used for evaluation (no training).
-                if false, sample_n_sequences can be set
+                if false, sample_n_sequences can be set and the repertoires are shuffled, otherwise they are kept in the order of indices
         :param is_train: whether this is a dataloader for training data. If true, self.training_batch_size is used.
         :param n_workers: the number of workers used in torch.utils.data.DataLoader
         :return: a Pytorch dataloader
@@ -211,7 +224,7 @@ class DeepRC(MLMethod):
             pre_loaded_hdf5_file=pre_loaded_hdf5_file,
             verbose=False)
         dataloader = torch.utils.data.DataLoader(dataset, batch_size=training_batch_size,
-                                                 shuffle=True,
+                                                 shuffle=not eval_only,
                                                  num_workers=n_workers,
                                                  collate_fn=no_stack_collate_fn)
         return dataloader
@@ -237,6 +250,7 @@ class DeepRC(MLMethod):
 
     def _prepare_caching_params(self, encoded_data: EncodedData, type: str, label_name: str):
         return (("metadata_filepath", str(encoded_data.info["metadata_filepath"])),
+                ("example_indices", self._get_example_indices(encoded_data)),
                 ("y", hashlib.sha256(str(encoded_data.labels[label_name]).encode("utf-8")).hexdigest()),
                 ("label_name", label_name),
                 ("type", type),
@@ -275,6 +289,9 @@ class DeepRC(MLMethod):
         pre_loaded_hdf5_file = self._load_dataset_in_ram(hdf5_filepath) if self.keep_dataset_in_ram else None
 
         train_indices, val_indices = self.get_train_val_indices(len(encoded_data.example_ids))
+        example_indices = self._get_example_indices(encoded_data)
+        if example_indices is not None:
+            train_indices, val_indices = example_indices[train_indices], example_indices[val_indices]
         self.max_seq_len = encoded_data.info["max_sequence_length"]
 
         self._fit_for_label(hdf5_filepath, pre_loaded_hdf5_file, train_indices, val_indices, label_name, cores_for_training)
@@ -344,7 +361,8 @@ class DeepRC(MLMethod):
         hdf5_filepath = self._metadata_to_hdf5(encoded_data.info["metadata_filepath"], label_name)
         pre_loaded_hdf5_file = self._load_dataset_in_ram(hdf5_filepath) if self.keep_dataset_in_ram else None
 
-        test_dataloader = self.make_data_loader(hdf5_filepath, pre_loaded_hdf5_file, indices=None, label=label_name, eval_only=True, is_train=False)
+        test_dataloader = self.make_data_loader(hdf5_filepath, pre_loaded_hdf5_file, indices=self._get_example_indices(encoded_data),
+                                                label=label_name, eval_only=True, is_train=False)
 
         probs_pos_class = self._model_predict(self.model, test_dataloader)
         probabilities[label_name] = np.vstack((probs_pos_class, 1 - probs_pos_class)).T
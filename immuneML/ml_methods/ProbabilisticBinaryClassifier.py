@@ -8,6 +8,7 @@ import numpy as np
 import yaml
 from scipy.special import beta as beta_func
 from scipy.special import betaln as beta_func_ln
+from scipy.optimize import minimize
 from scipy.special import digamma
 from scipy.stats import betabinom as beta_binomial
 
@@ -33,9 +34,18 @@ class ProbabilisticBinaryClassifier(MLMethod):
 
         max_iterations (int): maximum number of iterations while optimizing the parameters of the beta distribution (same for both classes)
 
-        update_rate (float): how much the computed gradient should influence the updated value of the parameters of the beta distribution
+        optimization_method (str): how to maximize the log-likelihood to find the parameters of the beta distribution: `L-BFGS` uses the
+        L-BFGS-B quasi-Newton method on log-transformed parameters and stops when the relative change of the log-likelihood falls below the
+        tolerance; `gradient_ascent` updates the parameters in the direction of the gradient with a fixed update rate (used before L-BFGS was
+        available, kept to reproduce earlier results). By default, L-BFGS is used, except if update_rate is set without optimization_method
+        (as in specifications written before L-BFGS was available), when gradient ascent is used.
 
-        likelihood_threshold (float): at which threshold to stop the optimization (default -1e-10)
+        tolerance (float): when to stop the optimization with L-BFGS (default 1e-10)
+
+        update_rate (float): how much the computed gradient should influence the updated value of the parameters of the beta distribution;
+        used only with gradient ascent
+
+        likelihood_threshold (float): at which threshold to stop the optimization with gradient ascent (default -1e-10)
 
     YAML specification:
 
@@ -45,27 +55,43 @@ class ProbabilisticBinaryClassifier(MLMethod):
         my_probabilistic_classifier: # user-defined name of the ML method
             ProbabilisticBinaryClassifier: # method name
                 max_iterations: 1000
-                update_rate: 0.01
+                optimization_method: L-BFGS
+                tolerance: 1.0e-10
 
     """
 
     SMALL_POSITIVE_NUMBER = 1e-15
+    LARGE_POSITIVE_NUMBER = 1e15
+    OPTIMIZATION_METHODS = ["L-BFGS", "gradient_ascent"]
 
-    def __init__(self, max_iterations: int, update_rate: float, likelihood_threshold: float = None):
+    def __init__(self, max_iterations: int, update_rate: float = None, likelihood_threshold: float = None, optimization_method: str = None,
+                 tolerance: float = None):
         super().__init__()
         self.max_iterations = max_iterations
-        self.update_rate = update_rate
+        # numbers in scientific notation without a decimal point (e.g., 1e-10) are parsed as strings from YAML
+        self.update_rate = float(update_rate) if update_rate is not None else None
+        if optimization_method is not None:
+            self.optimization_method = optimization_method
+        else:
+            self.optimization_method = "gradient_ascent" if update_rate is not None else "L-BFGS"
+        self.tolerance = float(tolerance) if tolerance is not None else 1e-10
         self.N_0 = None
         self.N_1 = None
         self.alpha_0 = None
         self.alpha_1 = None
         self.beta_0 = None
         self.beta_1 = None
-        self.likelihood_threshold = likelihood_threshold if likelihood_threshold is not None else -1e-10
+        self.likelihood_threshold = float(likelihood_threshold) if likelihood_threshold is not None else -1e-10
         self.class_mapping = None
         self.label_name = None
         self.feature_names = None
 
+        assert self.optimization_method in ProbabilisticBinaryClassifier.OPTIMIZATION_METHODS, \
+            f"ProbabilisticBinaryClassifier: optimization_method has to be one of {ProbabilisticBinaryClassifier.OPTIMIZATION_METHODS}, " \
+            f"got {self.optimization_method} instead."
+        assert self.optimization_method != "gradient_ascent" or self.update_rate is not None, \
+            "ProbabilisticBinaryClassifier: update_rate has to be set when gradient_ascent is used as optimization_method."
+
     def fit(self, encoded_data: EncodedData, label_name: str, cores_for_training: int = 2):
         self.feature_names = encoded_data.feature_names
         X = encoded_data.examples
@@ -111,12 +137,8 @@ class ProbabilisticBinaryClassifier(MLMethod):
         """
         X = encoded_data.examples
         self._check_labels(label_name)
-        predictions_list = []
-        for example in X:
-            k, n = example[0], example[1]
-            F = self._compute_log_posterior_odds_ratio(k, n)
-            predicted_class = int(F > 0)
-            predictions_list.append(self.class_mapping[predicted_class])
+        F = self._compute_log_posterior_odds_ratio(X[:, 0], X[:, 1])
+        predictions_list = [self.class_mapping[predicted_class] for predicted_class in (F > 0).astype(int)]
 
         return {self.label_name: predictions_list}
 
@@ -142,17 +164,13 @@ class ProbabilisticBinaryClassifier(MLMethod):
         """
         self._check_labels(label_name)
         X = encoded_data.examples
-        class_probabilities = np.zeros((X.shape[0], len(list(self.class_mapping.keys()))), dtype=float)
-        for index, example in enumerate(X):
-            k, n = example[0], example[1]
-            posterior_class_probabilities = self._compute_posterior_class_probability(k, n)
-            class_probabilities[index] = posterior_class_probabilities
+        class_probabilities = np.column_stack(self._compute_posterior_class_probability(X[:, 0], X[:, 1]))
 
         return {self.label_name: class_probabilities}
 
     def _find_beta_distribution_parameters(self, X, N_l: int) -> Tuple[float, float]:
         """
-        Function implementing gradient ascent to find parameters of the beta distribution for the given class.
+        Function finding the parameters of the beta distribution for the given class with the chosen optimization method.
         It maximizes the following log-likelihood:
 
         .. math::
@@ -175,6 +193,53 @@ class ProbabilisticBinaryClassifier(MLMethod):
         alpha, beta = self._initialize_beta_distribution_parameters(k_is, n_is)
         k_is, n_is = self._perform_laplace_smoothing(k_is, n_is)
 
+        if self.optimization_method == "gradient_ascent":
+            return self._perform_gradient_ascent(N_l, alpha, beta, k_is, n_is)
+        else:
+            return self._perform_lbfgs(N_l, alpha, beta, k_is, n_is)
+
+    def _perform_lbfgs(self, N_l: int, alpha: float, beta: float, k_is, n_is) -> Tuple[float, float]:
+        """
+        Maximizes the log-likelihood with L-BFGS-B over log(alpha) and log(beta), which keeps the parameters positive without clipping;
+        the gradient with respect to the log-parameters is the gradient with respect to the parameters multiplied by the parameters.
+        """
+
+        def negative_log_likelihood(log_parameters):
+            alpha, beta = np.exp(log_parameters)
+            log_likelihood = - N_l * beta_func_ln(alpha, beta) + np.sum(beta_func_ln(k_is + alpha, n_is - k_is + beta))
+            if np.isnan(log_likelihood):
+                raise RuntimeError(f"ProbabilisticBinaryClassifier: while estimating beta distribution parameters, "
+                                   f"log_likelihood became nan. \nalpha: {alpha}, beta: {beta}")
+
+            grad_alpha, grad_beta = self._compute_log_likelihood_gradients(N_l, alpha, beta, k_is, n_is)
+            return - log_likelihood, - np.array([grad_alpha * alpha, grad_beta * beta])
+
+        bounds = [(np.log(ProbabilisticBinaryClassifier.SMALL_POSITIVE_NUMBER), np.log(ProbabilisticBinaryClassifier.LARGE_POSITIVE_NUMBER))] * 2
+        initial_values = np.log(np.clip([alpha, beta], ProbabilisticBinaryClassifier.SMALL_POSITIVE_NUMBER,
+                                        ProbabilisticBinaryClassifier.LARGE_POSITIVE_NUMBER))
+
+        result = minimize(negative_log_likelihood, initial_values, jac=True, method="L-BFGS-B", bounds=bounds,
+                          options={"maxiter": self.max_iterations, "ftol": self.tolerance})
+
+        alpha, beta = np.exp(result.x)
+        return float(alpha), float(beta)
+
+    def _compute_log_likelihood_gradients(self, N_l, alpha, beta, k_is, n_is) -> Tuple[float, float]:
+        """
+        Computes the gradients of the log-likelihood with respect to alpha and beta parameters of the beta distribution:
+
+        .. math::
+
+            \\frac{\\partial  l_l}{\\partial \\alpha} = - N_l (\\Psi (\\alpha) - \\Psi (\\alpha + \\beta)) + \\sum_{i:c_i=l}^{} (\\Psi(k_i + \\alpha) - \\Psi(n_i + \\alpha + \\beta))
+            \\frac{\\partial  l_l}{\\partial \\beta} = - N_l (\\Psi(\\beta) - \\Psi(\\alpha + \\beta)) + \\sum_{i:c_i=l} (\\Psi(n_i - k_i + \\beta) - \\Psi(n_i + \\alpha + \\beta))
+
+        """
+        digamma_n_alpha_beta = np.sum(digamma(n_is + alpha + beta))
+        grad_alpha = - N_l * (digamma(alpha) - digamma(alpha + beta)) + np.sum(digamma(k_is + alpha)) - digamma_n_alpha_beta
+        grad_beta = - N_l * (digamma(beta) - digamma(alpha + beta)) + np.sum(digamma(n_is - k_is + beta)) - digamma_n_alpha_beta
+        return grad_alpha, grad_beta
+
+    def _perform_gradient_ascent(self, N_l: int, alpha: float, beta: float, k_is, n_is) -> Tuple[float, float]:
         for iteration in range(self.max_iterations):
 
             log_likelihood = - N_l * beta_func(alpha, beta) + np.sum(beta_func_ln(k_is + alpha, n_is - k_is + beta))
@@ -229,7 +294,7 @@ class ProbabilisticBinaryClassifier(MLMethod):
 
     def _compute_alpha_beta_gradients(self, N_l, alpha, beta, k_is, n_is) -> Tuple[float, float]:
         """
-        Function computing the gradients of alpha and beta parameters of the beta distribution to maximize log-likelihood:
+        Function computing the gradients of alpha and beta parameters of the beta distribution to maximize log-likelihood with gradient ascent:
 
         .. math::
 
@@ -253,13 +318,10 @@ class ProbabilisticBinaryClassifier(MLMethod):
             gradients for alpha and beta
 
         """
-        grad_alpha = - N_l * (digamma(alpha) - digamma(alpha + beta)) \
-                     + np.sum([digamma(k_is[i] + alpha) - digamma(n_is[i] + k_is[i] + alpha + beta)
-                               for i in range(k_is.shape[0])])
+        digamma_n_k_alpha_beta = digamma(n_is + k_is + alpha + beta)
 
-        grad_beta = - N_l * (digamma(beta) - digamma(alpha + beta)) \
-                    + np.sum([digamma(n_is[i] - k_is[i] + beta) - digamma(n_is[i] + k_is[i] + alpha + beta)
-                              for i in range(k_is.shape[0])])
+        grad_alpha = - N_l * (digamma(alpha) - digamma(alpha + beta)) + np.sum(digamma(k_is + alpha) - digamma_n_k_alpha_beta)
+        grad_beta = - N_l * (digamma(beta) - digamma(alpha + beta)) + np.sum(digamma(n_is - k_is + beta) - digamma_n_k_alpha_beta)
         return grad_alpha, grad_beta
 
     def _perform_laplace_smoothing(self, k_is, n_is) -> Tuple[np.array, np.array]:
@@ -309,12 +371,12 @@ class ProbabilisticBinaryClassifier(MLMethod):
 
         Arguments:
 
-            k: number of disease-associated sequences
-            n: total number of sequences
+            k: number of disease-associated sequences (a number or an array with one value per example)
+            n: total number of sequences (a number or an array with one value per example)
 
         Returns:
 
-            a tuple of probabilities for negative class and positive class for given example, normalized to sum to 1
+            a tuple of probabilities for negative class and positive class for given examples, normalized to sum to 1
 
         """
         predicted_probability_0 = beta_binomial.pmf(k, n, self.alpha_0, self.beta_0) * (self.N_0 + 1) / (self.N_0 + self.N_1 + 2)
@@ -322,17 +384,24 @@ class ProbabilisticBinaryClassifier(MLMethod):
 
         normalization_const = predicted_probability_0 + predicted_probability_1
 
-        if np.isnan(normalization_const):
+        if np.any(np.isnan(normalization_const)):
             raise ValueError(f"{ProbabilisticBinaryClassifier.__name__}: encountered nan in predicted posterior class probabilities."
                              f"\nprobability of class 0: {predicted_probability_0}\nprobability of class 1: {predicted_probability_1}\n"
                              f"alpha 0: {self.alpha_0}, beta 0: {self.beta_0}\nalpha 1: {self.alpha_1}, beta 1: {self.beta_1}\n"
                              f"positive example count: {self.N_1}, negative example count: {self.N_0}")
-        elif normalization_const == 0:
-            warnings.warn(f"{ProbabilisticBinaryClassifier.__name__}: posterior class probabilities for both classes are 0 (k={k}, n={n}). Returning "
-                          f"normalized values to indicate that the example could not be classified, by setting both probabilities to 0.5.", RuntimeWarning)
-            return 0.5, 0.5
 
-        return predicted_probability_0 / normalization_const, predicted_probability_1 / normalization_const
+        unclassified = normalization_const == 0
+        if np.any(unclassified):
+            warnings.warn(f"{ProbabilisticBinaryClassifier.__name__}: posterior class probabilities for both classes are 0 "
+                          f"(k={np.asarray(k)[unclassified] if np.ndim(k) > 0 else k}, n={np.asarray(n)[unclassified] if np.ndim(n) > 0 else n}). "
+                          f"Returning normalized values to indicate that the example could not be classified, by setting both probabilities to 0.5.",
+                          RuntimeWarning)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            probability_0 = np.where(unclassified, 0.5, predicted_probability_0 / normalization_const)
+            probability_1 = np.where(unclassified, 0.5, predicted_probability_1 / normalization_const)
+
+        return probability_0, probability_1
 
     def _compute_log_posterior_odds_ratio(self, k, n):
         """
@@ -344,8 +413,8 @@ class ProbabilisticBinaryClassifier(MLMethod):
 
         Arguments:
 
-            k: number of disease-associated sequences
-            n: total number of sequences
+            k: number of disease-associated sequences (a number or an array with one value per example)
+            n: total number of sequences (a number or an array with one value per example)
 
         Returns:
 
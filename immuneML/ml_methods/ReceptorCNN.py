@@ -1,18 +1,20 @@
 import copy
 import logging
-import math
 import random
 from pathlib import Path
 
 import numpy as np
 import torch
 import yaml
+from scipy import sparse
 from torch import nn
+from torch.utils.data import DataLoader, BatchSampler, SubsetRandomSampler
 
 from immuneML.data_model.encoded_data.EncodedData import EncodedData
 from immuneML.environment.EnvironmentSettings import EnvironmentSettings
 from immuneML.environment.SequenceType import SequenceType
 from immuneML.ml_methods.MLMethod import MLMethod
+from immuneML.ml_methods.pytorch_implementations.EncodedReceptorDataset import EncodedReceptorDataset
 from immuneML.ml_methods.pytorch_implementations.PyTorchReceptorCNN import PyTorchReceptorCNN as RCNN
 from immuneML.ml_methods.util.Util import Util
 from immuneML.util.PathBuilder import PathBuilder
@@ -28,7 +30,7 @@ class ReceptorCNN(MLMethod):
 
         The architecture of the CNN for paired-chain receptor data
 
-    Requires one-hot encoded data as input (as produced by :ref:`OneHot` encoder).
+    Requires one-hot encoded data as input (as produced by :ref:`OneHot` encoder with flatten and sparse set to False).
 
     Notes:
 
@@ -36,6 +38,10 @@ class ReceptorCNN(MLMethod):
 
     - ReceptorCNN can only be used for binary classification, not multi-class classification.
 
+    - The :ref:`OneHot` encoder writes the encoded receptors to a file one batch file of the dataset at a time and the encoded data refers to
+      it memory-mapped, so the receptors are read from the disk as they are needed: only the batches of batch_size receptors which are
+      converted to float tensors during training and prediction are kept in memory.
+
 
     Arguments:
 
@@ -63,7 +69,13 @@ class ReceptorCNN(MLMethod):
 
         l2_weight_decay (float): weight decay l2 value for the CNN; shrinks weight coefficients towards zero
 
-        batch_size (int): how many receptors to process at once
+        batch_size (int): how many receptors to process at once; receptors are read from the encoded data and converted to tensors one batch
+        at a time, so only the current batches have to be kept in memory
+
+        number_of_loader_workers (int): how many processes to use to prepare batches of receptors in parallel with training; if 0, batches are
+        prepared in the main process (default)
+
+        pin_memory (bool): whether to put batches into page-locked memory, which speeds up copying them to the GPU (default False)
 
         training_percentage (float): what percentage of data to use for training (the rest will be used for validation); values between 0 and 1
 
@@ -91,13 +103,16 @@ class ReceptorCNN(MLMethod):
                 l1_weight_decay: 0
                 l2_weight_decay: 0
                 batch_size: 5000
+                number_of_loader_workers: 0
+                pin_memory: False
 
     """
 
     def __init__(self, kernel_count: int = None, kernel_size=None, positional_channels: int = None, sequence_type: str = None, device=None,
                  number_of_threads: int = None, random_seed: int = None, learning_rate: float = None, iteration_count: int = None,
                  l1_weight_decay: float = None, l2_weight_decay: float = None, batch_size: int = None, training_percentage: float = None,
-                 evaluate_at: int = None, background_probabilities=None, result_path:Path=None):
+                 evaluate_at: int = None, background_probabilities=None, result_path:Path=None, number_of_loader_workers: int = None,
+                 pin_memory: bool = None):
 
         super().__init__()
         self.kernel_count = kernel_count
@@ -111,6 +126,8 @@ class ReceptorCNN(MLMethod):
         self.learning_rate = learning_rate
         self.iteration_count = iteration_count
         self.batch_size = batch_size
+        self.number_of_loader_workers = number_of_loader_workers if number_of_loader_workers is not None else 0
+        self.pin_memory = pin_memory if pin_memory is not None else False
         self.evaluate_at = evaluate_at
         self.training_percentage = training_percentage
         self.sequence_type = SequenceType[sequence_type.upper()]
@@ -132,16 +149,16 @@ class ReceptorCNN(MLMethod):
         # set the model to evaluation mode for inference
         self.CNN.eval()
 
-        # convert encoded data from numpy arrays to tensors
-        encoded_data_pt = self._make_encoded_data(encoded_data, np.arange(len(encoded_data.example_ids)))
+        # read batches of encoded data in the original order and convert them to tensors
+        data_loader = self._make_data_loader(encoded_data, np.arange(len(encoded_data.example_ids)), with_labels=False)
 
         # make predictions
         with torch.no_grad():
             predictions = []
-            for examples, labels, example_ids in self._get_data_batch(encoded_data_pt, label_name):
-                logit_outputs = self.CNN(examples)
+            for examples, labels in data_loader:
+                logit_outputs = self.CNN(examples.to(device=self.device))
                 prediction = torch.sigmoid(logit_outputs)
-                predictions.extend(prediction.numpy())
+                predictions.extend(prediction.cpu().numpy())
 
         return {self.label_name: np.vstack([1 - np.array(predictions), predictions]).T}
 
@@ -171,7 +188,8 @@ class ReceptorCNN(MLMethod):
 
         logging.info("ReceptorCNN: starting training.")
         while iteration < self.iteration_count:
-            for examples, labels, example_ids in self._get_data_batch(train_data, self.label_name):
+            for examples, labels in train_data:
+                examples, labels = examples.to(device=self.device, non_blocking=self.pin_memory), labels.to(device=self.device, non_blocking=self.pin_memory)
 
                 # Reset gradients
                 optimizer.zero_grad()
@@ -206,13 +224,6 @@ class ReceptorCNN(MLMethod):
         logging.warning(f"{ReceptorCNN.__name__}: cross_validation is not implemented for this method. Using standard fitting instead...")
         self.fit(encoded_data=encoded_data, label_name=label_name)
 
-    def _get_data_batch(self, encoded_data: EncodedData, label):
-        batch_count = int(math.ceil(len(encoded_data.example_ids) / self.batch_size))
-        for i in range(batch_count):
-            start_index, end_index = int(self.batch_size * i), int(self.batch_size * (i + 1))
-            yield encoded_data.examples[start_index: end_index], encoded_data.labels[label][start_index: end_index], \
-                  encoded_data.example_ids[start_index: end_index]
-
     def _prepare_and_split_data(self, encoded_data: EncodedData):
         indices = list(range(len(encoded_data.example_ids)))
         random.shuffle(indices)
@@ -221,19 +232,26 @@ class ReceptorCNN(MLMethod):
         train_indices = indices[:limit]
         val_indices = indices[limit:]
 
-        train_data = self._make_encoded_data(encoded_data, train_indices)
-        val_data = self._make_encoded_data(encoded_data, val_indices)
+        train_data = self._make_data_loader(encoded_data, train_indices, shuffle=True)
+        val_data = self._make_data_loader(encoded_data, sorted(val_indices))
 
         return train_data, val_data
 
-    def _make_encoded_data(self, encoded_data, indices):
-        examples = np.swapaxes(encoded_data.examples, 2, 3)
-        return EncodedData(examples=torch.from_numpy(examples[indices]).float(),
-                           labels={
-                               label: torch.from_numpy(np.array([encoded_data.labels[label][i] for i in indices]) == self.class_mapping[1]).float()
-                               for label in encoded_data.labels.keys()},
-                           example_ids=[encoded_data.example_ids[i] for i in indices], feature_names=encoded_data.feature_names,
-                           feature_annotations=encoded_data.feature_annotations, encoding=encoded_data.encoding)
+    def _make_data_loader(self, encoded_data: EncodedData, indices, shuffle: bool = False, with_labels: bool = True) -> DataLoader:
+        """
+        Creates a DataLoader which returns batches of (examples, labels) tensors for the receptors with given indices, reading only one
+        batch of encoded data at a time; if shuffle is True, the receptors are assigned to batches in a new random order in each epoch
+        """
+        if sparse.issparse(encoded_data.examples) or np.ndim(encoded_data.examples) != 4:
+            raise ValueError(f"{ReceptorCNN.__name__}: the encoded data has to be a 4-dimensional array [receptors, chains, sequence_lengths, "
+                             f"one_hot_characters], but {'a sparse matrix' if sparse.issparse(encoded_data.examples) else 'an array'} of "
+                             f"shape {encoded_data.examples.shape} was given. Use the OneHot encoder with flatten and sparse set to False.")
+
+        labels = np.array(encoded_data.labels[self.label_name]) == self.class_mapping[1] if with_labels else None
+        sampler = BatchSampler(SubsetRandomSampler(indices) if shuffle else list(indices), batch_size=self.batch_size, drop_last=False)
+
+        return DataLoader(EncodedReceptorDataset(encoded_data.examples, labels), sampler=sampler, batch_size=None,
+                          num_workers=self.number_of_loader_workers, pin_memory=self.pin_memory)
 
     def _compute_loss(self, loss_function, logit_outputs, labels):
         pred_loss = loss_function(logit_outputs, labels)
@@ -254,16 +272,16 @@ class ReceptorCNN(MLMethod):
 
         return state
 
-    def _evaluate(self, loss_function, data: EncodedData):
+    def _evaluate(self, loss_function, data: DataLoader):
         with torch.no_grad():
             self.CNN.to(device=self.device)
             loss_func = loss_function.to(device=self.device)
             loss = 0.
 
             with torch.no_grad():
-                for examples, labels, example_ids in self._get_data_batch(data, self.label_name):
-                    logit_outputs = self.CNN(examples)
-                    loss += loss_func(logit_outputs, labels) / len(data.example_ids)
+                for examples, labels in data:
+                    logit_outputs = self.CNN(examples.to(device=self.device))
+                    loss += loss_func(logit_outputs, labels.to(device=self.device)) / len(data.sampler.sampler)
 
         return loss
 
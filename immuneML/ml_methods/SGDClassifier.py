@@ -0,0 +1,71 @@
+from sklearn.linear_model import SGDClassifier as SklearnSGDClassifier
+
+from immuneML.ml_methods.SklearnMethod import SklearnMethod
+from scripts.specification_util import update_docs_per_mapping
+
+
+class SGDClassifier(SklearnMethod):
+    """
+    This is a wrapper of scikit-learn’s SGDClassifier class, which fits linear models (e.g., linear SVM with hinge loss or logistic regression
+    with log loss) with stochastic gradient descent. Please see the
+    `scikit-learn documentation <https://scikit-learn.org/stable/modules/generated/sklearn.linear_model.SGDClassifier.html>`_
+    of SGDClassifier for the parameters.
+
+    Since SGDClassifier supports partial_fit, it can be trained incrementally on mini-batches of the encoded data by setting the
+    `batch_size` parameter (the data is still encoded as a whole before training, see below for details).
+
+    For usage instructions, check :py:obj:`~immuneML.ml_methods.SklearnMethod.SklearnMethod`.
+
+
+    YAML specification:
+
+    .. indent with spaces
+    .. code-block:: yaml
+
+        my_sgd_classifier: # user-defined method name
+            SGDClassifier: # name of the ML method
+                # sklearn parameters (same names as in original sklearn class)
+                loss: hinge # fit a linear SVM
+                alpha: 0.0001
+                # parameters for incremental training
+                batch_size: 10000 # number of examples in one mini-batch
+                epochs: 10 # number of passes over the training data
+                patience: 2 # use the first batch for early stopping
+                # Additional parameter that determines whether to print convergence warnings
+                show_warnings: True
+        # alternative way to define ML method with default values:
+        my_default_sgd_classifier: SGDClassifier
+
+    """
+
+    def __init__(self, parameter_grid: dict = None, parameters: dict = None):
+        _parameters = parameters if parameters is not None else {}
+        _parameter_grid = parameter_grid if parameter_grid is not None else {}
+
+        super(SGDClassifier, self).__init__(parameter_grid=_parameter_grid, parameters=_parameters)
+
+    def _get_ml_model(self, cores_for_training: int = 2, X=None):
+        params = self._parameters.copy()
+        params["n_jobs"] = cores_for_training
+        return SklearnSGDClassifier(**params)
+
+    def can_predict_proba(self) -> bool:
+        return self._parameters.get("loss", "hinge") in ["log", "log_loss", "modified_huber"]
+
+    def get_params(self):
+        params = self.model.get_params()
+        params["coefficients"] = self.model.coef_[0].tolist()
+        params["intercept"] = self.model.intercept_.tolist()
+        return params
+
+    @staticmethod
+    def get_documentation():
+        doc = str(SGDClassifier.__doc__)
+
+        mapping = {
+            "For usage instructions, check :py:obj:`~immuneML.ml_methods.SklearnMethod.SklearnMethod`.": SklearnMethod.get_usage_documentation(
+                "SGDClassifier"),
+        }
+
+        doc = update_docs_per_mapping(doc, mapping)
+        return doc
@@ -1,18 +1,22 @@
 import abc
+import copy
 import hashlib
 import os
 import warnings
+import zlib
+from contextlib import contextmanager
 from pathlib import Path
 
 import dill
 import numpy as np
 import pkg_resources
 import yaml
-from sklearn.metrics import SCORERS
+from sklearn.metrics import SCORERS, balanced_accuracy_score
 from sklearn.model_selection import RandomizedSearchCV
 from sklearn.utils.validation import check_is_fitted
 
 from immuneML.caching.CacheHandler import CacheHandler
+from immuneML.data_model.encoded_data.EncodedBatchGenerator import EncodedBatchGenerator
 from immuneML.data_model.encoded_data.EncodedData import EncodedData
 from immuneML.ml_methods.MLMethod import MLMethod
 from immuneML.ml_methods.util.Util import Util
@@ -40,6 +44,28 @@ class SklearnMethod(MLMethod):
             "model_selection_cv" is True (in the specification) or just if fit_by_cross_validation() is called, a grid search will be performed over
             these parameters and the optimal model will be kept
 
+    Scikit-learn classes which implement `partial_fit` (such as SGDClassifier) can also be trained incrementally on mini-batches of the encoded
+    data by setting `batch_size` together with the sklearn parameters (it is not passed to scikit-learn). The model is then updated with one
+    mini-batch at a time, and the examples are assigned to mini-batches in a new random order in each epoch. When such a method is trained on
+    a receptor or sequence dataset in the TrainMLModel instruction, the training dataset is not encoded as a whole: the encoder is fitted on
+    the first batch file of the training dataset only and the examples are then encoded one batch file at a time during training (see
+    :py:obj:`~immuneML.data_model.encoded_data.EncodedBatchGenerator.EncodedBatchGenerator.from_element_dataset`), so the memory needed
+    depends on the size of the batch files of the dataset and batch_size instead of the size of the dataset. For other datasets, the
+    encoded data is split into mini-batches (for memory-mapped encoded data, only the current batch is read into memory). Incremental
+    training cannot be combined with model selection by cross-validation (model_selection_cv).
+    The incremental training parameters cannot be optimized (in parameter_grid, only a single value can be given) and are:
+
+        batch_size: the number of examples in one mini-batch; if not set, the model is fit on all examples at once
+
+        epochs: how many times to iterate over all batches (default: 5)
+
+        patience: if set, a part of the examples (see validation_fraction) is held out for validation and the training stops when the
+            balanced accuracy on these examples did not improve for `patience` epochs; the model from the best epoch is kept
+
+        validation_fraction: the fraction of examples held out for validation if patience is set (default: 0.1); the examples are chosen
+            by a hash of their identifiers (or of their positions if they have no identifiers), so the same examples are held out in each
+            epoch without keeping them in memory
+
     YAML specification:
 
         ml_methods:
@@ -63,16 +89,29 @@ class SklearnMethod(MLMethod):
                     show_warnings: True
                 # no grid search will be done
                 model_selection_cv: False
+            sgd_with_batches:
+                SGDClassifier: # incremental training, only supported by classes with partial_fit
+                    loss: hinge # linear SVM; use log_loss for logistic regression
+                    batch_size: 10000 # number of examples in one mini-batch
+                    epochs: 10 # number of passes over all batches
+                    patience: 2 # stop if the performance on the held-out examples did not improve for 2 epochs
+                    validation_fraction: 0.1 # hold out 10% of the examples for validation
 
     """
 
     FIT_CV = "fit_CV"
     FIT = "fit"
+    FIT_INCREMENTALLY = "fit_incrementally"
+    INCREMENTAL_TRAINING_PARAMETERS = {"batch_size": None, "epochs": 5, "patience": None, "validation_fraction": 0.1}
 
     def __init__(self, parameter_grid: dict = None, parameters: dict = None):
         super(SklearnMethod, self).__init__()
         self.model = None
 
+        # the parameters which are not passed to scikit-learn are removed from copies so that the specification is not changed
+        parameter_grid = dict(parameter_grid) if parameter_grid is not None else None
+        parameters = dict(parameters) if parameters is not None else None
+
         if parameter_grid is not None and "show_warnings" in parameter_grid:
             self.show_warnings = parameter_grid.pop("show_warnings")[0]
         elif parameters is not None and "show_warnings" in parameters:
@@ -80,6 +119,19 @@ class SklearnMethod(MLMethod):
         else:
             self.show_warnings = True
 
+        for name, default_value in SklearnMethod.INCREMENTAL_TRAINING_PARAMETERS.items():
+            if parameter_grid is not None and name in parameter_grid:
+                value = parameter_grid.pop(name)
+                if isinstance(value, list):
+                    assert len(value) == 1, f"{self.__class__.__name__}: parameter {name} cannot be optimized, only a single value can be " \
+                                            f"given, got {value} instead."
+                    value = value[0]
+                setattr(self, name, value)
+            elif parameters is not None and name in parameters:
+                setattr(self, name, parameters.pop(name))
+            else:
+                setattr(self, name, default_value)
+
         self._parameter_grid = parameter_grid
         self._parameters = parameters
         self.feature_names = None
@@ -93,7 +145,8 @@ class SklearnMethod(MLMethod):
                 ("type", type),
                 ("number_of_splits", str(number_of_splits)),
                 ("parameters", str(self._parameters)),
-                ("parameter_grid", str(self._parameter_grid)),)
+                ("parameter_grid", str(self._parameter_grid)),
+                ("incremental_training", str({name: getattr(self, name) for name in SklearnMethod.INCREMENTAL_TRAINING_PARAMETERS})),)
 
     def fit(self, encoded_data: EncodedData, label_name: str, cores_for_training: int = 2):
 
@@ -101,10 +154,36 @@ class SklearnMethod(MLMethod):
         self.feature_names = encoded_data.feature_names
         self.label_name = label_name
 
-        mapped_y = Util.map_to_new_class_values(encoded_data.labels[label_name], self.class_mapping)
+        if self.batch_size is not None:
+            self.model = CacheHandler.memo_by_params(
+                self._prepare_caching_params(encoded_data, encoded_data.labels[label_name], self.FIT_INCREMENTALLY, label_name),
+                lambda: self._fit_incrementally(EncodedBatchGenerator.from_encoded_data(encoded_data, self.batch_size), cores_for_training))
+        else:
+            mapped_y = Util.map_to_new_class_values(encoded_data.labels[label_name], self.class_mapping)
+
+            self.model = CacheHandler.memo_by_params(self._prepare_caching_params(encoded_data, encoded_data.labels[label_name], self.FIT, label_name),
+                                                     lambda: self._fit(encoded_data.examples, mapped_y, cores_for_training))
+
+    def fit_incrementally(self, get_batches, label_name: str, classes: list, cores_for_training: int = 2):
+        """
+        Fits the model on mini-batches of encoded data using partial_fit, keeping only one batch in memory at a time (see
+        :py:obj:`~immuneML.data_model.encoded_data.EncodedBatchGenerator.EncodedBatchGenerator`)
+
+        Arguments:
 
-        self.model = CacheHandler.memo_by_params(self._prepare_caching_params(encoded_data, encoded_data.labels[label_name], self.FIT, label_name),
-                                                 lambda: self._fit(encoded_data.examples, mapped_y, cores_for_training))
+            get_batches: a function which returns an iterable of EncodedData objects; it is called once per epoch with a random state
+                (np.random.RandomState) to shuffle the examples and without arguments to get the batches in a fixed order
+
+            label_name (str): the label to fit the model for
+
+            classes (list): all values of the label, which have to be known before all batches are seen
+
+            cores_for_training (int): number of processes to use for training if supported by the model
+
+        """
+        self.class_mapping = Util.make_class_mapping(classes)
+        self.label_name = label_name
+        self.model = self._fit_incrementally(get_batches, cores_for_training)
 
     def predict(self, encoded_data: EncodedData, label_name: str):
         self.check_is_fitted(label_name)
@@ -119,19 +198,84 @@ class SklearnMethod(MLMethod):
             return None
 
     def _fit(self, X, y, cores_for_training: int = 1):
-        if not self.show_warnings:
-            warnings.simplefilter("ignore")
-            os.environ["PYTHONWARNINGS"] = "ignore"
-
-        self.model = self._get_ml_model(cores_for_training, X)
-        self.model.fit(X, y)
-
-        if not self.show_warnings:
-            del os.environ["PYTHONWARNINGS"]
-            warnings.simplefilter("always")
+        with self._handle_warnings():
+            self.model = self._get_ml_model(cores_for_training, X)
+            self.model.fit(X, y)
 
         return self.model
 
+    @contextmanager
+    def _handle_warnings(self):
+        """ignores all warnings inside the context if show_warnings is False and restores the previous warning settings afterwards"""
+        if self.show_warnings:
+            yield
+        else:
+            python_warnings = os.environ.get("PYTHONWARNINGS", None)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                os.environ["PYTHONWARNINGS"] = "ignore"
+                try:
+                    yield
+                finally:
+                    if python_warnings is None:
+                        del os.environ["PYTHONWARNINGS"]
+                    else:
+                        os.environ["PYTHONWARNINGS"] = python_warnings
+
+    def _fit_incrementally(self, get_batches, cores_for_training: int = 1):
+        model = self._get_ml_model(cores_for_training)
+        assert hasattr(model, "partial_fit"), f"{self.__class__.__name__}: incremental training (parameter batch_size) is not supported for " \
+                                              f"{type(model).__name__}, since it does not implement partial_fit."
+
+        classes = np.array(list(self.class_mapping.keys()))
+        random_state = np.random.RandomState(0)
+        best_model, best_score, epochs_without_improvement = None, None, 0
+
+        with self._handle_warnings():
+            for epoch in range(self.epochs):
+                for batch in get_batches(random_state):
+                    examples, labels = batch.examples, np.asarray(batch.labels[self.label_name])
+                    if self.patience is not None:
+                        is_train = ~self._get_validation_mask(batch)
+                        examples, labels = examples[is_train], labels[is_train]
+                    if labels.shape[0] > 0:
+                        model.partial_fit(examples, Util.map_to_new_class_values(labels, self.class_mapping), classes=classes)
+                    self.feature_names = batch.feature_names
+
+                assert hasattr(model, "classes_"), f"{self.__class__.__name__}: no examples left for training, all examples were held out for " \
+                                                   f"validation (validation_fraction is {self.validation_fraction})."
+
+                if self.patience is not None:
+                    score = self._score_on_validation_examples(model, get_batches)
+                    if best_score is None or score > best_score:
+                        best_model, best_score, epochs_without_improvement = copy.deepcopy(model), score, 0
+                    else:
+                        epochs_without_improvement += 1
+                        if epochs_without_improvement >= self.patience:
+                            break
+
+        return best_model if best_model is not None else model
+
+    def _get_validation_mask(self, batch: EncodedData) -> np.ndarray:
+        """returns which examples of the batch are held out for validation, chosen by a hash of the example identifiers (or of the positions
+        of the examples in the encoded data if not all examples have identifiers) so that the same examples are held out in every epoch"""
+        keys = batch.example_ids if batch.example_ids is not None and all(example_id is not None for example_id in batch.example_ids) \
+            else batch.info["example_indices"]
+        return np.array([zlib.crc32(str(key).encode("utf-8")) / 2 ** 32 < self.validation_fraction for key in keys], dtype=bool)
+
+    def _score_on_validation_examples(self, model, get_batches) -> float:
+        true_classes, predicted_classes = [], []
+        for batch in get_batches():
+            is_validation = self._get_validation_mask(batch)
+            if np.any(is_validation):
+                true_classes.append(Util.map_to_new_class_values(np.asarray(batch.labels[self.label_name])[is_validation], self.class_mapping))
+                predicted_classes.append(model.predict(batch.examples[is_validation]))
+
+        assert len(true_classes) > 0, f"{self.__class__.__name__}: no examples were held out for validation, increase validation_fraction " \
+                                      f"(currently {self.validation_fraction}) or do not set patience."
+
+        return balanced_accuracy_score(np.concatenate(true_classes), np.concatenate(predicted_classes))
+
     def can_predict_proba(self) -> bool:
         return False
 
@@ -142,6 +286,10 @@ class SklearnMethod(MLMethod):
     def fit_by_cross_validation(self, encoded_data: EncodedData, number_of_splits: int = 5, label_name: str = None, cores_for_training: int = -1,
                                 optimization_metric='balanced_accuracy'):
 
+        if self.batch_size is not None:
+            raise ValueError(f"{self.__class__.__name__}: incremental training (parameter batch_size) cannot be combined with model selection "
+                             f"by cross-validation. Set model_selection_cv to False or remove batch_size from the parameters.")
+
         self.class_mapping = Util.make_class_mapping(encoded_data.labels[label_name])
         self.feature_names = encoded_data.feature_names
         self.label_name = label_name
@@ -163,17 +311,10 @@ class SklearnMethod(MLMethod):
             warnings.warn(
                 f"{self.__class__.__name__}: specified optimization metric ({optimization_metric}) is not defined as a sklearn scoring function, using {scoring} instead... ")
 
-        if not self.show_warnings:
-            warnings.simplefilter("ignore")
-            os.environ["PYTHONWARNINGS"] = "ignore"
-
-        self.model = RandomizedSearchCV(model, param_distributions=self._parameter_grid, cv=number_of_splits, n_jobs=cores_for_training,
-                                        scoring=scoring, refit=True)
-        self.model.fit(X, y)
-
-        if not self.show_warnings:
-            del os.environ["PYTHONWARNINGS"]
-            warnings.simplefilter("always")
+        with self._handle_warnings():
+            self.model = RandomizedSearchCV(model, param_distributions=self._parameter_grid, cv=number_of_splits, n_jobs=cores_for_training,
+                                            scoring=scoring, refit=True)
+            self.model.fit(X, y)
 
         self.model = self.model.best_estimator_  # do not leave RandomSearchCV object to be in models, use the best estimator instead
 
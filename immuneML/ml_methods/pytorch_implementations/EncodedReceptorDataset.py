@@ -0,0 +1,50 @@
+import mmap
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset
+
+
+class EncodedReceptorDataset(Dataset):
+    """
+    PyTorch dataset over one-hot encoded receptors (an array of shape [receptors x chains x positions x one-hot channels]) which reads
+    the examples lazily: each item is a whole batch given by a list of receptor indices (to be used with a BatchSampler), so only one batch
+    is converted to a float tensor at a time and the encoded array can stay memory-mapped on disk. The receptors of a batch are returned
+    in increasing order of their indices.
+
+    When the dataset is sent to DataLoader worker processes, a memory-mapped array is reopened from its file in each worker instead of
+    being copied.
+
+    Arguments:
+
+        examples (np.ndarray): one-hot encoded receptors, possibly a np.memmap
+
+        labels (np.ndarray): binary labels (0 or 1) for all receptors or None if there are no labels (e.g., for prediction)
+
+    """
+
+    def __init__(self, examples: np.ndarray, labels: np.ndarray = None):
+        self.examples = examples
+        self.labels = np.asarray(labels, dtype=np.float32) if labels is not None else None
+
+    def __len__(self):
+        return self.examples.shape[0]
+
+    def __getitem__(self, indices):
+        indices = np.sort(np.asarray(indices)) if not np.isscalar(indices) else np.array([indices])
+        examples = torch.from_numpy(np.ascontiguousarray(np.swapaxes(self.examples[indices], 2, 3), dtype=np.float32))
+        labels = torch.from_numpy(self.labels[indices]) if self.labels is not None else torch.zeros(len(indices))
+        return examples, labels
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # only arrays which own their mapping are reopened, views of memory-mapped arrays are copied
+        if isinstance(self.examples, np.memmap) and isinstance(self.examples.base, mmap.mmap) and self.examples.filename is not None:
+            state["examples"] = {"filename": self.examples.filename, "dtype": self.examples.dtype, "shape": self.examples.shape,
+                                 "offset": self.examples.offset}
+        return state
+
+    def __setstate__(self, state):
+        if isinstance(state["examples"], dict):
+            state["examples"] = np.memmap(mode="r", **state["examples"])
+        self.__dict__.update(state)
@@ -4,30 +4,87 @@ import pickle
 from pathlib import Path
 
 import numpy as np
+from scipy import sparse
 
 from immuneML.data_model.dataset.RepertoireDataset import RepertoireDataset
 from immuneML.pairwise_repertoire_comparison.ComparisonDataBatch import ComparisonDataBatch
+from immuneML.pairwise_repertoire_comparison.ComparisonDataBuilder import ComparisonDataBuilder
 from immuneML.util.Logger import log
 from immuneML.util.PathBuilder import PathBuilder
 
 
 class ComparisonData:
+    """
+    Stores which items (e.g., clonotypes defined by comparison_attributes) are present in which repertoires.
+
+    When built from a dataset with process_dataset(), the data is stored as a sparse incidence matrix of shape items x repertoires
+    (scipy.sparse.csc_matrix) in the comparison_matrix.npz file, while the items are stored in items.pickle; both are loaded lazily.
+    Comparison data consisting of dense batches (ComparisonDataBatch objects) is still supported for backward compatibility.
+    """
+
+    MATRIX_FILE_NAME = "comparison_matrix.npz"
+    ITEMS_FILE_NAME = "items.pickle"
 
     @log
-    def __init__(self, repertoire_ids: list, comparison_attributes, sequence_batch_size: int = 10000, path: Path = None):
+    def __init__(self, repertoire_ids: list, comparison_attributes, sequence_batch_size: int = 10000, path: Path = None,
+                 max_items_in_memory: int = 10_000_000):
 
         self.path = PathBuilder.build(path / "comparison_data")
         self.sequence_batch_size = sequence_batch_size
+        self.max_items_in_memory = max_items_in_memory
         self.item_count = 0
         self.comparison_attributes = comparison_attributes
         self.repertoire_ids = repertoire_ids
         self.batches = []
         self.tmp_batch_paths = []
+        self.is_sparse = False
+        self._matrix = None
+        self._items = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_matrix"], state["_items"] = None, None
+        return state
+
+    def __setstate__(self, state):
+        state.setdefault("is_sparse", False)
+        state.setdefault("max_items_in_memory", 10_000_000)
+        state["_matrix"], state["_items"] = None, None
+        self.__dict__.update(state)
 
     def build_matching_fn(self):
         return lambda repertoire: list(set(zip(*[value for value in repertoire.get_attributes(self.comparison_attributes).values() if value is not None])))
 
+    def get_matrix(self, repertoire_ids: list = None) -> sparse.csc_matrix:
+        """
+        Returns the sparse incidence matrix of shape items x repertoires with columns in the order of repertoire_ids (all repertoires if None)
+        """
+        if self.is_sparse:
+            matrix = self._load_matrix()
+            mapping = {identifier: index for index, identifier in enumerate(self.repertoire_ids)}
+        elif len(self.batches) > 0:
+            matrix = sparse.vstack([sparse.csc_matrix(batch.load().get_matrix()) for batch in self.batches], format="csc")
+            mapping = self.batches[0].repertoire_index_mapping
+        else:
+            matrix = sparse.csc_matrix((0, len(self.repertoire_ids)))
+            mapping = {identifier: index for index, identifier in enumerate(self.repertoire_ids)}
+
+        return matrix if repertoire_ids is None else matrix[:, [mapping[identifier] for identifier in repertoire_ids]]
+
+    def _load_matrix(self) -> sparse.csc_matrix:
+        if self._matrix is None:
+            self._matrix = sparse.load_npz(self.path / ComparisonData.MATRIX_FILE_NAME).tocsc()
+        return self._matrix
+
+    def _load_items(self) -> list:
+        if self._items is None:
+            with (self.path / ComparisonData.ITEMS_FILE_NAME).open("rb") as file:
+                self._items = pickle.load(file)
+        return self._items
+
     def get_item_names(self):
+        if self.is_sparse:
+            return np.array(self._load_items())
         return np.array([item for items in [batch.get_items() for batch in self.batches] for item in items])
 
     def get_item_vectors(self, repertoire_ids: list = None):
@@ -36,6 +93,10 @@ class ComparisonData:
                 yield batch[item_index]
 
     def get_repertoire_vectors(self, identifiers: list):
+        if self.is_sparse:
+            matrix = self.get_matrix(identifiers)
+            return {identifier: matrix[:, index].toarray().ravel() for index, identifier in enumerate(identifiers)}
+
         repertoire_vectors = {identifier: np.zeros(self.item_count) for identifier in identifiers}
         for batch_index, batch in enumerate(self.get_batches(columns=identifiers, return_dict=True)):
             start = batch_index * self.sequence_batch_size
@@ -45,6 +106,9 @@ class ComparisonData:
         return repertoire_vectors
 
     def get_repertoire_vector(self, identifier: str):
+        if self.is_sparse:
+            return self.get_matrix([identifier]).toarray().ravel()
+
         repertoire_vector = np.zeros(self.item_count)
         for batch_index, batch in enumerate(self.get_batches(columns=[identifier])):
             start = batch_index * self.sequence_batch_size
@@ -53,13 +117,28 @@ class ComparisonData:
         return repertoire_vector
 
     def get_item_vector(self, index: int):
+        if self.is_sparse:
+            return self._load_matrix()[index].toarray().ravel()
+
         batch_index = int(index / self.sequence_batch_size)
         index_in_batch = index - (batch_index * self.sequence_batch_size)
         return self.batches[batch_index].get_matrix()[index_in_batch]
 
     def get_batches(self, columns: list = None, return_dict: bool = False):
-        for index in range(len(self.batches)):
-            yield self.get_batch(index, columns, return_dict)
+        if self.is_sparse:
+            yield from self._get_sparse_batches(columns, return_dict)
+        else:
+            for index in range(len(self.batches)):
+                yield self.get_batch(index, columns, return_dict)
+
+    def _get_sparse_batches(self, columns: list = None, return_dict: bool = False):
+        matrix = self.get_matrix(columns).tocsr()
+        for start in range(0, matrix.shape[0], self.sequence_batch_size):
+            batch = matrix[start: start + self.sequence_batch_size].toarray()
+            if return_dict:
+                yield {col: batch[:, index] for index, col in enumerate(columns if columns is not None else self.repertoire_ids)}
+            else:
+                yield batch
 
     def get_batch(self, index: int, columns: list = None, return_dict: bool = False):
         batch = self.batches[index].load()
@@ -77,11 +156,25 @@ class ComparisonData:
     def process_dataset(self, dataset: RepertoireDataset):
         extract_fn = self.build_matching_fn()
         repertoire_count = dataset.get_example_count()
+        repertoire_index_mapping = {identifier: index for index, identifier in enumerate(self.repertoire_ids)}
+        builder = ComparisonDataBuilder(path=self.path / "index_partitions", max_items_in_memory=self.max_items_in_memory)
+
         for index, repertoire in enumerate(dataset.get_data()):
-            self.process_repertoire(repertoire, str(repertoire.identifier), extract_fn)
+            builder.add_repertoire(extract_fn(repertoire), repertoire_index_mapping[repertoire.identifier])
             logging.info("Repertoire {} ({}/{}) processed.".format(repertoire.identifier, index+1, repertoire_count))
-            logging.info(f"Currently, there are {self.item_count} items in the comparison data matrix.")
-        self.merge_tmp_batches_to_matrix()
+
+        items, matrix = builder.build(len(self.repertoire_ids))
+        self.store_matrix(items, matrix)
+        logging.info(f"There are {self.item_count} items in the comparison data matrix.")
+
+    def store_matrix(self, items: list, matrix: sparse.csc_matrix):
+        sparse.save_npz(self.path / ComparisonData.MATRIX_FILE_NAME, matrix, compressed=False)
+        with (self.path / ComparisonData.ITEMS_FILE_NAME).open("wb") as file:
+            pickle.dump(items, file)
+
+        self.item_count = len(items)
+        self.is_sparse = True
+        self._matrix, self._items = matrix, items
 
     def merge_tmp_batches_to_matrix(self):
 
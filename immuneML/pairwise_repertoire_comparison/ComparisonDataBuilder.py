@@ -0,0 +1,134 @@
+import logging
+import pickle
+import shutil
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+
+from immuneML.util.PathBuilder import PathBuilder
+
+
+class ComparisonDataBuilder:
+    """
+    Builds the item x repertoire incidence matrix for ComparisonData in one pass over the repertoires.
+
+    Each item (e.g., a clonotype defined by a combination of comparison attributes) gets an integer id from a hash index which is kept in
+    memory. If the number of (item, repertoire) pairs kept in memory exceeds max_items_in_memory, the builder switches to a partitioned mode:
+    pairs are distributed to partition files on disk by the hash of the item, and ids are assigned at the end one partition at a time, so
+    that only one partition of the index has to fit in memory.
+
+    Arguments:
+
+        path (Path): directory where partition files are stored if the index does not fit in memory
+
+        max_items_in_memory (int): the maximum number of (item, repertoire) pairs kept in memory before they are written to disk
+
+        partition_count (int): the number of partitions to use when the index is spilled to disk
+
+    """
+
+    def __init__(self, path: Path, max_items_in_memory: int = 10_000_000, partition_count: int = 64):
+        self.path = path
+        self.max_items_in_memory = max_items_in_memory
+        self.partition_count = partition_count
+        self.index = {}
+        self.items = []
+        self.rows = []
+        self.columns = []
+        self.pairs_in_memory = 0
+        self.partition_buffers = None
+        self.partition_paths = None
+
+    def add_repertoire(self, items: list, repertoire_index: int):
+        if self.partition_buffers is None:
+            ids = np.array([self._get_id(item) for item in items], dtype=np.int64)
+            self.rows.append(ids)
+            self.columns.append(np.full(len(ids), repertoire_index, dtype=np.int64))
+            self.pairs_in_memory += len(ids)
+
+            if self.pairs_in_memory > self.max_items_in_memory:
+                self._switch_to_partitions()
+        else:
+            for item in items:
+                self.partition_buffers[hash(item) % self.partition_count].append((item, repertoire_index))
+            self.pairs_in_memory += len(items)
+
+            if self.pairs_in_memory > self.max_items_in_memory:
+                self._flush_partitions()
+
+    def _get_id(self, item) -> int:
+        item_id = self.index.get(item)
+        if item_id is None:
+            item_id = len(self.items)
+            self.index[item] = item_id
+            self.items.append(item)
+        return item_id
+
+    def _switch_to_partitions(self):
+        logging.info(f"{ComparisonDataBuilder.__name__}: the number of items exceeded {self.max_items_in_memory}, storing the index "
+                     f"in {self.partition_count} partitions at {self.path}.")
+
+        PathBuilder.build(self.path)
+        self.partition_paths = [self.path / f"partition_{index}.pickle" for index in range(self.partition_count)]
+        self.partition_buffers = [[] for _ in range(self.partition_count)]
+
+        rows, columns = np.concatenate(self.rows), np.concatenate(self.columns)
+        for row, column in zip(rows, columns):
+            item = self.items[row]
+            self.partition_buffers[hash(item) % self.partition_count].append((item, int(column)))
+
+        self.index, self.items, self.rows, self.columns = {}, [], [], []
+        self._flush_partitions()
+
+    def _flush_partitions(self):
+        for partition_path, buffer in zip(self.partition_paths, self.partition_buffers):
+            if len(buffer) > 0:
+                with partition_path.open("ab") as file:
+                    pickle.dump(buffer, file)
+        self.partition_buffers = [[] for _ in range(self.partition_count)]
+        self.pairs_in_memory = 0
+
+    def build(self, repertoire_count: int):
+        """
+        Returns:
+            a tuple of the list of items and the incidence matrix (scipy.sparse.csc_matrix) of shape items x repertoires
+        """
+        if self.partition_buffers is not None:
+            self._flush_partitions()
+            self._build_from_partitions()
+
+        rows = np.concatenate(self.rows) if len(self.rows) > 0 else np.array([], dtype=np.int64)
+        columns = np.concatenate(self.columns) if len(self.columns) > 0 else np.array([], dtype=np.int64)
+
+        matrix = sparse.csc_matrix((np.ones(len(rows), dtype=np.float32), (rows, columns)), shape=(len(self.items), repertoire_count))
+        matrix.sum_duplicates()
+        matrix.data[:] = 1
+
+        return self.items, matrix
+
+    def _build_from_partitions(self):
+        for partition_path in self.partition_paths:
+            if partition_path.is_file():
+                partition_index = {}
+                rows, columns = [], []
+
+                with partition_path.open("rb") as file:
+                    while True:
+                        try:
+                            pairs = pickle.load(file)
+                        except EOFError:
+                            break
+                        for item, column in pairs:
+                            item_id = partition_index.get(item)
+                            if item_id is None:
+                                item_id = len(self.items)
+                                partition_index[item] = item_id
+                                self.items.append(item)
+                            rows.append(item_id)
+                            columns.append(column)
+
+                self.rows.append(np.array(rows, dtype=np.int64))
+                self.columns.append(np.array(columns, dtype=np.int64))
+
+        shutil.rmtree(self.path)
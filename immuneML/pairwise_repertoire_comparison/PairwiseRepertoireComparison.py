@@ -1,7 +1,9 @@
+from multiprocessing.pool import Pool
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
+from scipy import sparse
 
 from immuneML.caching.CacheHandler import CacheHandler
 from immuneML.data_model.dataset.RepertoireDataset import RepertoireDataset
@@ -11,13 +13,25 @@ from immuneML.util.PathBuilder import PathBuilder
 
 
 class PairwiseRepertoireComparison:
+    """
+    Compares all pairs of repertoires in the dataset based on which items (defined by matching_columns) they share.
+
+    If a set_size_fn is provided, i.e., a function computing the comparison from the number of shared items and the number of items in
+    each of the repertoires, the comparison is computed in batched mode: the number of shared items for all pairs of repertoires is
+    computed as a sparse matrix product X^T X of the item x repertoire incidence matrix X, tile by tile (with tile_size repertoires per
+    tile side), where tiles are processed in parallel by pool_size processes. Otherwise, comparison_fn is called for each pair of
+    repertoire vectors.
+    """
 
     @log
-    def __init__(self, matching_columns: list, item_columns: list, path: Path, sequence_batch_size: int):
+    def __init__(self, matching_columns: list, item_columns: list, path: Path, sequence_batch_size: int, tile_size: int = 1000,
+                 pool_size: int = 1):
         self.matching_columns = matching_columns
         self.item_columns = item_columns
         self.path = PathBuilder.build(path)
         self.sequence_batch_size = sequence_batch_size
+        self.tile_size = tile_size
+        self.pool_size = pool_size
         self.comparison_data = None
         self.comparison_fn = None
 
@@ -35,43 +49,82 @@ class PairwiseRepertoireComparison:
             ("item_attributes", self.item_columns)
         )
 
-    def compare(self, dataset: RepertoireDataset, comparison_fn, comparison_fn_name):
+    def compare(self, dataset: RepertoireDataset, comparison_fn, comparison_fn_name, set_size_fn=None):
         return CacheHandler.memo_by_params((("dataset_identifier", dataset.identifier),
                                             "pairwise_comparison",
                                             ("comparison_fn", comparison_fn_name)),
-                                           lambda: self.compare_repertoires(dataset, comparison_fn))
+                                           lambda: self.compare_repertoires(dataset, comparison_fn, set_size_fn))
 
     def memo_by_params(self, dataset: RepertoireDataset):
         comparison_data = CacheHandler.memo_by_params(self.prepare_caching_params(dataset), lambda: self.create_comparison_data(dataset))
         return comparison_data
 
     @log
-    def compare_repertoires(self, dataset: RepertoireDataset, comparison_fn):
+    def compare_repertoires(self, dataset: RepertoireDataset, comparison_fn, set_size_fn=None):
         self.comparison_data = self.memo_by_params(dataset)
-        repertoire_count = dataset.get_example_count()
-        comparison_result = np.zeros([repertoire_count, repertoire_count])
         repertoire_identifiers = dataset.get_repertoire_ids()
 
+        if set_size_fn is not None:
+            comparison_result = self.compare_repertoires_batched(repertoire_identifiers, set_size_fn)
+        else:
+            comparison_result = self.compare_repertoires_pairwise(repertoire_identifiers, comparison_fn)
+
+        comparison_df = pd.DataFrame(comparison_result, columns=repertoire_identifiers, index=repertoire_identifiers)
+
+        return comparison_df
+
+    def compare_repertoires_pairwise(self, repertoire_identifiers: list, comparison_fn) -> np.ndarray:
+        repertoire_count = len(repertoire_identifiers)
+        comparison_result = np.zeros([repertoire_count, repertoire_count])
+        matrix = self.comparison_data.get_matrix(repertoire_identifiers)
+
         for index1 in range(repertoire_count):
-            repertoire_vector_1 = self.comparison_data.get_repertoire_vector(repertoire_identifiers[index1])
+            repertoire_vector_1 = matrix[:, index1].toarray().ravel()
             for index2 in range(index1, repertoire_count):
-                repertoire_vector_2 = self.comparison_data.get_repertoire_vector(repertoire_identifiers[index2])
+                repertoire_vector_2 = matrix[:, index2].toarray().ravel()
                 comparison_result[index1, index2] = comparison_fn(repertoire_vector_1, repertoire_vector_2)
                 comparison_result[index2, index1] = comparison_result[index1, index2]
 
-        comparison_df = pd.DataFrame(comparison_result, columns=repertoire_identifiers, index=repertoire_identifiers)
+        return comparison_result
 
-        return comparison_df
+    def compare_repertoires_batched(self, repertoire_identifiers: list, set_size_fn) -> np.ndarray:
+        repertoire_count = len(repertoire_identifiers)
+        comparison_result = np.zeros([repertoire_count, repertoire_count])
+        matrix = (self.comparison_data.get_matrix(repertoire_identifiers) != 0).astype(np.float64).tocsc()
+        set_sizes = np.asarray(matrix.sum(axis=0)).ravel()
+
+        arguments = self.prepare_paralellization_arguments(matrix, set_sizes, set_size_fn)
 
-    def prepare_paralellization_arguments(self, repertoire_count: int, repertoire_identifiers: list, comparison_result):
+        if self.pool_size > 1 and len(arguments) > 1:
+            with Pool(min(self.pool_size, len(arguments))) as pool:
+                tiles = pool.starmap(PairwiseRepertoireComparison.compare_tile, arguments)
+        else:
+            tiles = [PairwiseRepertoireComparison.compare_tile(*argument) for argument in arguments]
 
+        for (start1, start2, *_), tile in zip(arguments, tiles):
+            comparison_result[start1: start1 + tile.shape[0], start2: start2 + tile.shape[1]] = tile
+            comparison_result[start2: start2 + tile.shape[1], start1: start1 + tile.shape[0]] = tile.T
+
+        return comparison_result
+
+    def prepare_paralellization_arguments(self, matrix: sparse.csc_matrix, set_sizes: np.ndarray, set_size_fn) -> list:
+        """
+        Creates one argument tuple per tile in the upper triangle of the repertoire x repertoire comparison matrix
+        """
         arguments = []
+        repertoire_count = matrix.shape[1]
 
-        for index1 in range(repertoire_count):
-            comparison_result[index1, index1] = 1
-            rep1 = repertoire_identifiers[index1]
-            for index2 in range(index1+1, repertoire_count):
-                rep2 = repertoire_identifiers[index2]
-                arguments.append((rep1, rep2))
+        for start1 in range(0, repertoire_count, self.tile_size):
+            end1 = min(start1 + self.tile_size, repertoire_count)
+            for start2 in range(start1, repertoire_count, self.tile_size):
+                end2 = min(start2 + self.tile_size, repertoire_count)
+                arguments.append((start1, start2, matrix[:, start1:end1], matrix[:, start2:end2], set_sizes[start1:end1],
+                                  set_sizes[start2:end2], set_size_fn))
 
         return arguments
+
+    @staticmethod
+    def compare_tile(start1: int, start2: int, matrix1: sparse.csc_matrix, matrix2: sparse.csc_matrix, set_sizes1: np.ndarray,
+                     set_sizes2: np.ndarray, set_size_fn) -> np.ndarray:
+        intersection = (matrix1.T @ matrix2).toarray()
+        return set_size_fn(intersection, set_sizes1[:, np.newaxis], set_sizes2[np.newaxis, :])
@@ -2,6 +2,7 @@ import copy
 from multiprocessing.pool import Pool
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 from immuneML.data_model.dataset.RepertoireDataset import RepertoireDataset
@@ -113,49 +114,134 @@ class DuplicateSequenceFilter(Filter):
         return groupby_fields
 
     @staticmethod
-    def _prepare_agg_dict(params, columns, custom_lists):
+    def _get_column_names(repertoire: Repertoire) -> list:
+        return list(repertoire.fields) if repertoire.is_columnar() else list(repertoire.load_data().dtype.names)
 
-        agg_dict = {"sequence_identifiers": "first"}
+    @staticmethod
+    def _chains_to_strings(chains: np.ndarray) -> np.ndarray:
+        # Chain objects are compared by their values, so that chains stored as objects and as strings are grouped together
+        codes, uniques = pd.factorize(chains)
+        values = np.empty(len(uniques) + 1, dtype=object)
+        values[:-1] = [chain.value if isinstance(chain, Chain) else chain for chain in uniques]
+        return values[codes]
 
-        if params["sequence_to_ignore"] in columns:
-            agg_dict[params["sequence_to_ignore"]] = "first"
+    @staticmethod
+    def _strings_to_chains(chains: np.ndarray) -> np.ndarray:
+        codes, uniques = pd.factorize(chains)
+        values = np.empty(len(uniques), dtype=object)
+        values[:] = [Chain(key) for key in uniques]
+        return values[codes]
 
-        if "counts" in columns:
-            agg_dict["counts"] = params["count_agg"].value
+    @staticmethod
+    def _make_group_keys(columns: dict, groupby_fields: list):
+        """
+        Combines the codes of all groupby fields into a single int64 key per sequence, such that sorting the keys sorts the sequences in the
+        lexicographic order of the groupby fields; sequences where any of the groupby fields is missing are not kept (as in pandas groupby)
+        """
+        sequence_count = len(next(iter(columns.values())))
+        keys, key_count = np.zeros(sequence_count, dtype=np.int64), 1
+        keep = np.ones(sequence_count, dtype=bool)
+
+        for field in groupby_fields:
+            codes, uniques = pd.factorize(columns[field], sort=True)
+            keep &= codes >= 0
+            if key_count * max(len(uniques), 1) >= np.iinfo(np.int64).max // 2:
+                # replace the keys by their ranks so that the combined keys do not overflow
+                keys[~keep] = 0
+                _, keys = np.unique(keys, return_inverse=True)
+                key_count = int(keys.max()) + 1 if sequence_count > 0 else 1
+            keys = keys * max(len(uniques), 1) + codes
+            key_count *= max(len(uniques), 1)
+
+        return keys, np.flatnonzero(keep)
+
+    @staticmethod
+    def _aggregate_first(values: np.ndarray, group_ids: np.ndarray, starts: np.ndarray, last: bool = False) -> np.ndarray:
+        """first (or last) value per group, skipping missing values; None if all values in the group are missing"""
+        missing = pd.isnull(values)
+        if not missing.any():
+            return values[starts] if not last else values[np.r_[starts[1:], len(values)] - 1]
+
+        present = np.flatnonzero(~missing)
+        result = np.full(len(starts), None, dtype=object)
+        if last:
+            present = present[::-1]
+        groups_with_values, first_indices = np.unique(group_ids[present], return_index=True)
+        result[groups_with_values] = values[present[first_indices]]
+        return result
+
+    @staticmethod
+    def _aggregate_counts(counts: np.ndarray, group_ids: np.ndarray, starts: np.ndarray, count_agg: CountAggregationFunction) -> np.ndarray:
+        if count_agg in [CountAggregationFunction.FIRST, CountAggregationFunction.LAST]:
+            return DuplicateSequenceFilter._aggregate_first(counts, group_ids, starts, last=count_agg == CountAggregationFunction.LAST)
+
+        missing = pd.isnull(counts)
+        if missing.any():
+            present_counts = counts[~missing]
+            dtype = np.float64 if any(isinstance(count, (float, np.floating)) for count in present_counts) else np.int64
+            filled = np.zeros(len(counts), dtype=dtype)
+            filled[~missing] = present_counts.astype(dtype)
+        else:
+            filled = np.asarray(counts.tolist() if counts.dtype == object else counts)
+
+        if count_agg == CountAggregationFunction.SUM:
+            return np.add.reduceat(filled, starts) if len(starts) > 0 else filled[:0]
 
-        if "cell_ids" in columns:
-            agg_dict["cell_ids"] = "first"
+        group_sizes = np.add.reduceat((~missing).astype(np.int64), starts) if len(starts) > 0 else np.zeros(0, dtype=np.int64)
 
-        for key in custom_lists:
-            agg_dict[key] = "first"
+        if count_agg == CountAggregationFunction.MEAN:
+            sums = np.add.reduceat(filled.astype(np.float64), starts) if len(starts) > 0 else np.zeros(0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                return sums / group_sizes
 
-        return agg_dict
+        dtype = filled.dtype
+        if missing.any():
+            filled = filled.astype(np.float64)
+            filled[missing] = np.nan
+        function = np.fmax if count_agg == CountAggregationFunction.MAX else np.fmin
+        aggregated = function.reduceat(filled, starts) if len(starts) > 0 else filled[:0]
+
+        # as in pandas, integer counts stay integers unless there is a group without counts
+        return aggregated.astype(dtype) if not np.isnan(aggregated).any() else aggregated
 
     @staticmethod
     def process_repertoire(repertoire: Repertoire, params: dict) -> Repertoire:
-        data = pd.DataFrame(repertoire.load_data())
+        column_names = DuplicateSequenceFilter._get_column_names(repertoire)
+        columns = {name: np.asarray(repertoire.get_attribute(name)) for name in column_names}
 
-        groupby_fields = DuplicateSequenceFilter._prepare_group_by_field(params, data.columns)
-        custom_lists = list(set(data.columns) - set(Repertoire.FIELDS))
-        agg_dict = DuplicateSequenceFilter._prepare_agg_dict(params, data.columns, custom_lists)
+        groupby_fields = DuplicateSequenceFilter._prepare_group_by_field(params, column_names)
+        custom_lists = [name for name in column_names if name not in Repertoire.FIELDS]
 
-        # Chain objects can not be aggregated, convert to strings
-        if "chains" in data.columns:
-            data["chains"] = [chain.value if isinstance(chain, Chain) else chain for chain in data["chains"]]
-        else:
-            data["chains"] = None
-
-        no_duplicates = data.groupby(groupby_fields).agg(agg_dict).reset_index()
-
-        processed_repertoire = Repertoire.build(sequence_aas=list(no_duplicates["sequence_aas"]) if "sequence_aas" in no_duplicates.columns else None,
-                                                sequences=list(no_duplicates["sequences"]) if "sequences" in no_duplicates.columns else None,
-                                                v_genes=list(no_duplicates["v_genes"]) if "v_genes" in no_duplicates.columns else None,
-                                                j_genes=list(no_duplicates["j_genes"]) if 'j_genes' in no_duplicates.columns else None,
-                                                chains=[Chain(key) for key in list(no_duplicates["chains"])] if "chains" in no_duplicates.columns else None,
-                                                counts=list(no_duplicates["counts"]) if "counts" in no_duplicates else None,
-                                                region_types=list(no_duplicates["region_types"]) if "region_types" in no_duplicates else None,
-                                                custom_lists={key: list(no_duplicates[key]) for key in custom_lists},
-                                                sequence_identifiers=list(no_duplicates["sequence_identifiers"]),
+        if "chains" in columns:
+            columns["chains"] = DuplicateSequenceFilter._chains_to_strings(columns["chains"])
+
+        keys, rows = DuplicateSequenceFilter._make_group_keys(columns, groupby_fields)
+
+        order = rows[np.argsort(keys[rows], kind="stable")]
+        sorted_keys = keys[order]
+        is_start = np.ones(len(order), dtype=bool)
+        is_start[1:] = sorted_keys[1:] != sorted_keys[:-1]
+        starts = np.flatnonzero(is_start)
+        group_ids = np.cumsum(is_start) - 1
+
+        no_duplicates = {field: columns[field][order[starts]] for field in groupby_fields}
+        for field in [params["sequence_to_ignore"], "sequence_identifiers"] + custom_lists:
+            if field in columns:
+                no_duplicates[field] = DuplicateSequenceFilter._aggregate_first(columns[field][order], group_ids, starts)
+        if "counts" in columns:
+            no_duplicates["counts"] = DuplicateSequenceFilter._aggregate_counts(columns["counts"][order], group_ids, starts,
+                                                                                params["count_agg"])
+
+        processed_repertoire = Repertoire.build(sequence_aas=no_duplicates.get("sequence_aas"),
+                                                sequences=no_duplicates.get("sequences"),
+                                                v_genes=no_duplicates.get("v_genes"),
+                                                j_genes=no_duplicates.get("j_genes"),
+                                                chains=DuplicateSequenceFilter._strings_to_chains(no_duplicates["chains"])
+                                                if "chains" in no_duplicates else None,
+                                                counts=no_duplicates.get("counts"),
+                                                region_types=no_duplicates.get("region_types"),
+                                                custom_lists={key: no_duplicates[key] for key in custom_lists},
+                                                sequence_identifiers=no_duplicates.get("sequence_identifiers"),
                                                 metadata=copy.deepcopy(repertoire.metadata),
                                                 path=params["result_path"],
                                                 filename_base=f"{repertoire.data_filename.stem}_filtered")
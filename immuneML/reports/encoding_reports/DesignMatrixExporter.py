@@ -1,3 +1,4 @@
+import gzip
 import logging
 import os
 import warnings
@@ -9,6 +10,7 @@ import h5py
 import numpy as np
 import pandas as pd
 import yaml
+from scipy import sparse
 
 from immuneML.analysis.data_manipulation.DataReshaper import DataReshaper
 from immuneML.data_model.dataset.Dataset import Dataset
@@ -27,10 +29,20 @@ class DesignMatrixExporter(EncodingReport):
     the data are then exported to different formats to facilitate
     their import with external software.
 
+    Sparse design matrices (e.g., from k-mer frequency encoding) are never converted to dense arrays: they are stored natively in npz and
+    hdf5 formats, written in chunks of rows to csv, and exported to npz instead of npy. For dense matrices, npz format stores the matrix
+    under the key 'design_matrix'.
+
     Arguments:
 
         file_format (str): the format and extension of the file to store the design matrix. The supported formats are:
-        npy, csv, hdf5, npy.zip, csv.zip or hdf5.zip.
+        npy, npz, csv, hdf5, npy.zip, npz.zip, csv.zip or hdf5.zip. In hdf5 format, a sparse matrix is stored as a group 'design_matrix'
+        with datasets data, indices and indptr of the CSR format and the shape of the matrix as an attribute, while a dense matrix is stored
+        as a dataset 'design_matrix'.
+
+        compress (bool): whether to compress the design matrix: csv files are written with gzip (design_matrix.csv.gz), npz archives are
+        compressed and hdf5 datasets use gzip compression; npy files are not compressed (npy.zip can be used instead). By default, the
+        design matrix is not compressed.
 
 
     YAML specification:
@@ -41,17 +53,24 @@ class DesignMatrixExporter(EncodingReport):
         my_dme_report: DesignMatrixExporter
             DesignMatrixExporter:
                 file_format: csv
+                compress: False
 
     """
     dataset: Dataset = None
     result_path: Path = None
     name: str = None
     file_format: str = None
+    compress: bool = False
+
+    CSV_CHUNK_SIZE = 1000
 
     @classmethod
     def build_object(cls, **kwargs):
         ParameterValidator.assert_keys_present(list(kwargs.keys()), ['file_format', 'name'], DesignMatrixExporter.__name__, DesignMatrixExporter.__name__)
-        ParameterValidator.assert_in_valid_list(kwargs['file_format'], ['npy', 'csv', 'npy.zip', 'csv.zip', 'hdf5.zip'], DesignMatrixExporter.__name__, 'file_format')
+        ParameterValidator.assert_in_valid_list(kwargs['file_format'], ['npy', 'npz', 'csv', 'hdf5', 'npy.zip', 'npz.zip', 'csv.zip', 'hdf5.zip'],
+                                                DesignMatrixExporter.__name__, 'file_format')
+        if 'compress' in kwargs:
+            ParameterValidator.assert_type_and_value(kwargs['compress'], bool, DesignMatrixExporter.__name__, 'compress')
 
         return DesignMatrixExporter(**kwargs)
 
@@ -67,24 +86,27 @@ class DesignMatrixExporter(EncodingReport):
 
     def _export_matrix(self) -> ReportOutput:
         """Create a file for the design matrix in the desired format."""
-        
-        data = self._get_data()
+
+        data = self.dataset.encoded_data.examples
         file_path = self.result_path / "design_matrix"
         ext = os.path.splitext(self.file_format)[0]
         file_path = file_path.with_suffix('.' + ext)
 
-        # Use h5py to create a hdf5 file.
-        if ext == "hdf5": 
-            with h5py.File(str(file_path), 'w') as hf_object:
-                hf_object.create_dataset(str(file_path), data=data)
-        # Use numpy to create a csv or npy file.
-        elif len(data.shape) <= 2 and ext == "csv": 
-            np.savetxt(fname=str(file_path), X=data, delimiter=",", comments='',
-                       header=",".join(self.dataset.encoded_data.feature_names))
+        if ext == "hdf5":
+            self._export_hdf5(data, file_path)
+        elif len(data.shape) <= 2 and ext == "csv":
+            file_path = self._export_csv(data, file_path)
         elif ext == "long_csv":
             long = DataReshaper.reshape(self.dataset)
             file_path = self.result_path / "long_design_matrix.csv"
             long.to_csv(file_path, index=False)
+        elif ext == "npz" or sparse.issparse(data):
+            if ext != "npz":
+                logging.info(f'{DesignMatrixExporter.__name__}: the design matrix is sparse and cannot be stored in {ext} format '
+                             f'without converting it to a dense matrix, .npz is used instead')
+                file_path = file_path.with_suffix(".npz")
+                ext = "npz"
+            self._export_npz(data, file_path)
         else:
             if ext != "npy":
                 logging.info('The selected Report format is not compatible, '
@@ -92,22 +114,55 @@ class DesignMatrixExporter(EncodingReport):
                 file_path = file_path.with_suffix(".npy")
                 ext = "npy"
             np.save(str(file_path), data)
-        
+
         # If requested, compress the file into a .zip.
         if self.file_format.endswith(".zip"):
-            file_path_zip = file_path.with_suffix('.' + ext + '.zip')
+            file_path_zip = file_path.with_name(file_path.name + '.zip')
             with zipfile.ZipFile(str(file_path_zip), 'w') as zipped_file:
                 zipped_file.write(str(file_path), compress_type=zipfile.ZIP_DEFLATED)
-            os.remove(str(file_path)) 
+            os.remove(str(file_path))
             file_path = file_path_zip
         return ReportOutput(file_path, "design matrix")
 
-    def _get_data(self) -> np.ndarray:
-        if not isinstance(self.dataset.encoded_data.examples, np.ndarray):
-            data = self.dataset.encoded_data.examples.toarray()
+    def _export_hdf5(self, data, file_path: Path):
+        compression = "gzip" if self.compress else None
+        with h5py.File(str(file_path), 'w') as hf_object:
+            if sparse.issparse(data):
+                data = sparse.csr_matrix(data)
+                group = hf_object.create_group("design_matrix")
+                group.attrs["format"] = "csr"
+                group.attrs["shape"] = data.shape
+                for key in ["data", "indices", "indptr"]:
+                    group.create_dataset(key, data=getattr(data, key), compression=compression)
+            else:
+                hf_object.create_dataset("design_matrix", data=data, compression=compression)
+
+    def _export_csv(self, data, file_path: Path) -> Path:
+        """Writes the design matrix in chunks of rows so that only one chunk of a sparse matrix is converted to a dense array at a time"""
+        if sparse.issparse(data):
+            data = sparse.csr_matrix(data)
+
+        if self.compress:
+            file_path = file_path.with_suffix(".csv.gz")
+            file = gzip.open(file_path, "wt")
+        else:
+            file = file_path.open("w")
+
+        with file:
+            file.write(",".join(self.dataset.encoded_data.feature_names) + "\n")
+            for start in range(0, data.shape[0], DesignMatrixExporter.CSV_CHUNK_SIZE):
+                chunk = data[start:start + DesignMatrixExporter.CSV_CHUNK_SIZE]
+                np.savetxt(file, chunk.toarray() if sparse.issparse(chunk) else chunk, delimiter=",")
+
+        return file_path
+
+    def _export_npz(self, data, file_path: Path):
+        if sparse.issparse(data):
+            sparse.save_npz(str(file_path), data, compressed=self.compress)
+        elif self.compress:
+            np.savez_compressed(str(file_path), design_matrix=data)
         else:
-            data = self.dataset.encoded_data.examples
-        return data
+            np.savez(str(file_path), design_matrix=data)
 
     def _export_details(self) -> ReportOutput:
         file_path = self.result_path / "encoding_details.yaml"
@@ -74,8 +74,9 @@ class DeepRCMotifDiscovery(MLReport):
         test_metadata_filepath = self.test_dataset.encoded_data.info['metadata_filepath']
         hdf5_filepath = self.method._metadata_to_hdf5(test_metadata_filepath, self.label)
 
-        n_examples_test = len(self.test_dataset.encoded_data.example_ids)
-        indices = np.array(range(n_examples_test))
+        indices = self.method._get_example_indices(self.test_dataset.encoded_data)
+        if indices is None:
+            indices = np.array(range(len(self.test_dataset.encoded_data.example_ids)))
 
         dataloader = self.method.make_data_loader(hdf5_filepath, pre_loaded_hdf5_file=None,
                                                   indices=indices, label=self.label, eval_only=True,
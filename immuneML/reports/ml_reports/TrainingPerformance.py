@@ -201,10 +201,10 @@ class TrainingPerformance(MLReport):
                           f" report will not be created.")
             return False
 
-        if self.train_dataset is None or self.train_dataset.encoded_data is None:
+        if self.train_dataset is None or self.train_dataset.encoded_data is None or self.train_dataset.encoded_data.examples is None:
             warnings.warn(
                 f"{self.__class__.__name__}: train dataset is"
-                f" not encoded and can not be run."
+                f" not encoded (or was encoded in batches during training) and can not be run."
                 f"{self.__class__.__name__} report will not be created.")
             return False
 
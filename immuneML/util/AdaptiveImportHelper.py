@@ -53,16 +53,35 @@ class AdaptiveImportHelper:
         for gene in ["v", "j"]:
 
             if f"{gene}_genes" in dataframe.columns:
-                dataframe.loc[:, f"{gene}_genes"] = dataframe[f"{gene}_genes"].replace(gene_name_replacement, regex=True)
-                dataframe.loc[:, f"{gene}_genes"] = dataframe[f"{gene}_genes"].replace(germline_value_replacement, regex=True)
+                dataframe.loc[:, f"{gene}_genes"] = AdaptiveImportHelper.replace_gene_names(dataframe[f"{gene}_genes"], [gene_name_replacement,
+                                                                                                                     germline_value_replacement])
 
             if f"{gene}_alleles" in dataframe.columns:
-                dataframe.loc[:, f"{gene}_alleles"] = dataframe[f"{gene}_alleles"].replace(gene_name_replacement, regex=True)
-                dataframe.loc[:, f"{gene}_alleles"] = dataframe[f"{gene}_alleles"].replace(germline_value_replacement, regex=True)
+                dataframe.loc[:, f"{gene}_alleles"] = AdaptiveImportHelper.replace_gene_names(dataframe[f"{gene}_alleles"],
+                                                                                              [gene_name_replacement, germline_value_replacement])
 
             if f"{gene}_subgroups" in dataframe.columns:
-                    dataframe.loc[:, f"{gene}_subgroups"] = dataframe[f"{gene}_subgroups"].replace(germline_value_replacement, regex=True)
+                dataframe.loc[:, f"{gene}_subgroups"] = AdaptiveImportHelper.replace_gene_names(dataframe[f"{gene}_subgroups"],
+                                                                                                [germline_value_replacement])
 
         return dataframe
 
-
+    @staticmethod
+    def replace_gene_names(column: pd.Series, replacements: list) -> pd.Series:
+        """
+        Applies the regex replacements (one after another) to the column as Series.replace would, but only once for each distinct value in
+        the column, since there are usually few distinct gene names compared to the number of sequences
+        """
+        codes, unique_values = pd.factorize(column)
+        # missing values are replaced as well if the replacements include a missing key, so None is replaced together with the distinct values
+        replaced_values = pd.Series(list(unique_values) + [None], dtype=object)
+        for replacement in replacements:
+            replaced_values = replaced_values.replace(replacement, regex=True)
+
+        is_missing = codes < 0
+        result = column.values.astype(object)
+        result[~is_missing] = replaced_values.values[codes[~is_missing]]
+        if not pd.isnull(replaced_values.values[-1]):
+            result[is_missing] = replaced_values.values[-1]
+
+        return pd.Series(result, index=column.index, dtype=object)
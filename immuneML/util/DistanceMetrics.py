@@ -3,3 +3,8 @@ import numpy as np
 
 def jaccard(vector1, vector2, tmp_vector=None):
     return np.sum(np.logical_and(vector1, vector2, out=tmp_vector)) / np.sum(np.logical_or(vector1, vector2, out=tmp_vector))
+
+
+def jaccard_from_set_sizes(intersection, size1, size2):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.divide(intersection, size1 + size2 - intersection)
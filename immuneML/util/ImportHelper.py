@@ -1,5 +1,9 @@
-import pickle
+import logging
+import re
+import time
 import warnings
+from collections import deque
+from functools import partial
 from multiprocessing.pool import Pool
 from pathlib import Path
 from typing import List
@@ -17,6 +21,7 @@ from immuneML.data_model.dataset.SequenceDataset import SequenceDataset
 from immuneML.data_model.receptor.BCKReceptor import BCKReceptor
 from immuneML.data_model.receptor.BCReceptor import BCReceptor
 from immuneML.data_model.receptor.ChainPair import ChainPair
+from immuneML.data_model.receptor.ElementBatchFile import ElementBatchFile
 from immuneML.data_model.receptor.Receptor import Receptor
 from immuneML.data_model.receptor.RegionType import RegionType
 from immuneML.data_model.receptor.TCABReceptor import TCABReceptor
@@ -154,10 +159,12 @@ class ImportHelper:
 
             filename = params.path / f"{metadata_row['filename']}"
 
+            start_time = time.perf_counter()
+
             dataframe = ImportHelper.load_sequence_dataframe(filename, params, alternative_load_func)
             dataframe = import_class.preprocess_dataframe(dataframe, params)
-            sequence_lists = {field: dataframe[field].values.tolist() for field in Repertoire.FIELDS if field in dataframe.columns}
-            sequence_lists["custom_lists"] = {field: dataframe[field].values.tolist()
+            sequence_lists = {field: dataframe[field].to_numpy() for field in Repertoire.FIELDS if field in dataframe.columns}
+            sequence_lists["custom_lists"] = {field: dataframe[field].to_numpy()
                                               for field in list(set(dataframe.columns) - set(Repertoire.FIELDS))}
 
             repertoire_inputs = {**{"metadata": metadata_row.to_dict(),
@@ -165,6 +172,10 @@ class ImportHelper:
                                     "filename_base": filename.stem}, **sequence_lists}
             repertoire = Repertoire.build(**repertoire_inputs)
 
+            elapsed_time = time.perf_counter() - start_time
+            logging.info(f"{ImportHelper.__name__}: imported {dataframe.shape[0]} sequences from {filename.name} in {elapsed_time:.2f}s "
+                         f"({dataframe.shape[0] / max(elapsed_time, 1e-9):.0f} sequences/s).")
+
             return repertoire
         except Exception as exception:
             raise RuntimeError(f"{ImportHelper.__name__}: error when importing file {metadata_row['filename']}.") from exception
@@ -262,8 +273,13 @@ class ImportHelper:
             if sequence_type == SequenceType.AMINO_ACID:
                 legal_alphabet.append(Constants.STOP_CODON)
 
-            is_illegal_seq = [ImportHelper.is_illegal_sequence(sequence, legal_alphabet) for
-                              sequence in dataframe[sequence_type.value]]
+            sequences = dataframe[sequence_type.value]
+            if sequences.dtype == object and pd.api.types.infer_dtype(sequences, skipna=True) in ["string", "empty"] \
+                    and np.array_equal(np.equal(sequences.values, None), sequences.isnull().values):
+                illegal_characters = f"[^{re.escape(''.join(legal_alphabet))}]"
+                is_illegal_seq = sequences.str.contains(illegal_characters, regex=True).fillna(False).values.astype(bool)
+            else:
+                is_illegal_seq = [ImportHelper.is_illegal_sequence(sequence, legal_alphabet) for sequence in sequences]
             n_illegal = sum(is_illegal_seq)
 
             if n_illegal > 0:
@@ -299,11 +315,26 @@ class ImportHelper:
 
     @staticmethod
     def load_chains_from_chains(df: pd.DataFrame) -> list:
-        return [Chain.get_chain(chain_str).value if chain_str is not None else None for chain_str in df["chains"]]
+        chains = {chain_str: Chain.get_chain(chain_str).value for chain_str in df["chains"].unique() if chain_str is not None}
+        return [chains[chain_str] if chain_str is not None else None for chain_str in df["chains"]]
 
     @staticmethod
     def load_chains_from_genes(df: pd.DataFrame) -> list:
-        return df.apply(ImportHelper.get_chain_for_row, axis=1)
+        """
+        Determines the chain of each row from the first three characters of the first gene column which is set (as get_chain_for_row), but
+        looks up the chain only once per distinct gene prefix
+        """
+        gene_columns = [col for col in ["v_subgroup", "j_subgroup", "v_genes", "j_genes", "v_alleles", "j_alleles"] if col in df.columns]
+        genes = pd.Series([None] * df.shape[0], index=df.index, dtype=object)
+
+        for col in gene_columns:
+            missing = np.equal(genes.values, None)
+            genes[missing] = df[col].values[missing]
+
+        prefixes = [None if gene is None else str(gene)[0:3] for gene in genes.values]
+        chains = {prefix: Chain.get_chain(prefix).value for prefix in set(prefixes) if prefix is not None}
+
+        return pd.Series([chains[prefix] if prefix is not None else None for prefix in prefixes], index=df.index, dtype=object)
 
     @staticmethod
     def get_chain_for_row(row):
@@ -340,7 +371,15 @@ class ImportHelper:
         Safely removes everything after a delimiter from a column in the DataFrame
         """
         if column_name in df.columns:
-            return df[column_name].apply(lambda gene_col: None if gene_col is None else gene_col.rsplit(delimiter)[0])
+            column = df[column_name]
+            is_none = np.equal(column.values, None)
+            if column.dtype == object and pd.api.types.infer_dtype(column, skipna=True) in ["string", "empty"] \
+                    and np.array_equal(is_none, column.isnull().values):
+                stripped = column.str.split(delimiter, n=1).str[0].values.astype(object)
+                stripped[is_none] = None
+                return pd.Series(stripped, index=column.index, dtype=object)
+            else:
+                return column.apply(lambda gene_col: None if gene_col is None else gene_col.rsplit(delimiter)[0])
 
     @staticmethod
     def get_sequence_filenames(path: Path, dataset_name: str):
@@ -363,25 +402,33 @@ class ImportHelper:
 
     @staticmethod
     def import_sequence_dataset(import_class, params, dataset_name: str):
+        """
+        Creates a SequenceDataset or a ReceptorDataset from the input files and exports the dataset pickle file: the files are imported in
+        parallel (using params.number_of_processes, with a bounded number of files imported ahead) and, in the order of the files, the
+        imported items are written to batch files of params.sequence_file_size items as soon as enough items are available, while the
+        label values are collected from each file
+        """
         PathBuilder.build(params.result_path)
 
         filenames = ImportHelper.get_sequence_filenames(params.path, dataset_name)
 
-        file_index = 0
         dataset_filenames = []
-        dataset_params = {}
-        items = None
+        dataset_params = ImportHelper.extract_sequence_dataset_params(params=params)
+        items = []
+
+        with Pool(params.number_of_processes) as pool:
+            for new_items in ImportHelper._import_items_in_order(pool, import_class, filenames, params):
+                ImportHelper.update_sequence_dataset_params(dataset_params, new_items, params)
+                items.extend(new_items)
 
-        for index, filename in enumerate(filenames):
-            new_items = ImportHelper.import_items(import_class, filename, params)
-            items = np.append(items, new_items) if items is not None else new_items
-            dataset_params = ImportHelper.extract_sequence_dataset_params(items, params)
+                start = 0
+                while len(items) - start >= params.sequence_file_size:
+                    ImportHelper._store_next_sequence_batch(dataset_filenames, items[start:start + params.sequence_file_size], params)
+                    start += params.sequence_file_size
+                del items[:start]
 
-            while len(items) > params.sequence_file_size or (index == len(filenames) - 1 and len(items) > 0):
-                dataset_filenames.append(params.result_path / "batch_{}.pickle".format(file_index))
-                ImportHelper.store_sequence_items(dataset_filenames, items, params.sequence_file_size)
-                items = items[params.sequence_file_size:]
-                file_index += 1
+        if len(items) > 0:
+            ImportHelper._store_next_sequence_batch(dataset_filenames, items, params)
 
         init_kwargs = {"filenames": dataset_filenames, "file_size": params.sequence_file_size, "name": dataset_name, "labels": dataset_params}
 
@@ -391,21 +438,50 @@ class ImportHelper:
 
         return dataset
 
+    @staticmethod
+    def _import_items_in_order(pool: Pool, import_class, filenames: list, params):
+        """
+        Yields the items imported from each file in the order of the files, while keeping at most 2 * params.number_of_processes files
+        imported in the pool but not yet consumed, so that the imported items are not accumulated faster than they are written
+        """
+        import_func = partial(ImportHelper.import_items, import_class, params=params)
+        max_pending_files = 2 * params.number_of_processes
+        pending = deque()
+
+        for filename in filenames:
+            if len(pending) == max_pending_files:
+                yield pending.popleft().get()
+            pending.append(pool.apply_async(import_func, (filename,)))
+
+        while len(pending) > 0:
+            yield pending.popleft().get()
+
+    @staticmethod
+    def _store_next_sequence_batch(dataset_filenames: list, items: list, params):
+        dataset_filenames.append(params.result_path / "batch_{}.pickle".format(len(dataset_filenames)))
+        ImportHelper.store_sequence_items(dataset_filenames, items, params.sequence_file_size)
+
     @staticmethod
     def extract_sequence_dataset_params(items=None, params=None) -> dict:
         result = {}
         if params is not None:
             result = {'region_type': params.region_type, 'receptor_chains': params.receptor_chains, 'organism': params.organism}
         if items is not None:
-            for index, item in enumerate(items):
-                metadata = item.metadata if params.paired else item.metadata.custom_params if item.metadata is not None else {}
-                for key in metadata:
-                    if key in result and isinstance(result[key], set):
-                        result[key].add(metadata[key])
-                    elif key not in result:
-                        result[key] = {metadata[key]}
+            ImportHelper.update_sequence_dataset_params(result, items, params)
         return result
 
+    @staticmethod
+    def update_sequence_dataset_params(dataset_params: dict, items, params) -> dict:
+        """Adds the metadata values of the items (receptors or sequences) to the sets of values per metadata key in dataset_params"""
+        for item in items:
+            metadata = item.metadata if params.paired else item.metadata.custom_params if item.metadata is not None else {}
+            for key in metadata:
+                if key in dataset_params and isinstance(dataset_params[key], set):
+                    dataset_params[key].add(metadata[key])
+                elif key not in dataset_params:
+                    dataset_params[key] = {metadata[key]}
+        return dataset_params
+
     @staticmethod
     def import_items(import_class, path, params: DatasetImportParams):
         alternative_load_func = getattr(import_class, "alternative_load_func", None)
@@ -420,14 +496,22 @@ class ImportHelper:
                 raise NotImplementedError(f"{import_class.__name__}: import of paired receptor data has not been implemented.")
         else:
             metadata_columns = params.metadata_column_mapping.values() if params.metadata_column_mapping else None
-            sequences = df.apply(ImportHelper.import_sequence, metadata_columns=metadata_columns, axis=1).values
+            sequences = ImportHelper.import_sequences(df, metadata_columns=metadata_columns)
 
         return sequences
 
+    @staticmethod
+    def import_sequences(df: pd.DataFrame, metadata_columns=None) -> List[ReceptorSequence]:
+        """Creates a ReceptorSequence from each row of the data frame, reading the values directly from the column arrays"""
+        columns = df.columns.tolist()
+        column_values = [df[column].astype(object).values for column in columns]
+
+        return [ImportHelper.import_sequence(dict(zip(columns, row_values)), metadata_columns=metadata_columns)
+                for row_values in zip(*column_values)]
+
     @staticmethod
     def store_sequence_items(dataset_filenames: list, items: list, sequence_file_size: int):
-        with dataset_filenames[-1].open("wb") as file:
-            pickle.dump(items[:sequence_file_size], file)
+        ElementBatchFile.write(dataset_filenames[-1], items[:sequence_file_size])
 
     @staticmethod
     def import_sequence(row, metadata_columns=None) -> ReceptorSequence:
@@ -453,33 +537,55 @@ class ImportHelper:
 
     @staticmethod
     def import_receptors(df, params) -> List[Receptor]:
-        identifiers = df["receptor_identifiers"].unique()
-        all_receptors = []
-
-        for identifier in identifiers:
-            receptors = ImportHelper.import_receptors_by_id(df, identifier, params)
-            all_receptors.extend(receptors)
-
-        return all_receptors
-
-    @staticmethod
-    def import_receptors_by_id(df, identifier, params) -> List[Receptor]:
-        first_row = df.loc[(df["receptor_identifiers"] == identifier) & (df["chains"] == params.receptor_chains.value[0])]
-        second_row = df.loc[(df["receptor_identifiers"] == identifier) & (df["chains"] == params.receptor_chains.value[1])]
-
-        for i, row in enumerate([first_row, second_row]):
-            if row.shape[0] > 1:
-                warnings.warn(
-                    f"Multiple {params.receptor_chains.value[i]} chains found for receptor with identifier {identifier}, only the first entry will be loaded")
-            elif row.shape[0] == 0:
-                warnings.warn(
-                    f"Missing {params.receptor_chains.value[i]} chain for receptor with identifier {identifier}, this receptor will be omitted.")
-                return []
+        """
+        Pairs the chains in the data frame into receptors: the rows are grouped by receptor identifier once and for each receptor, the first
+        row of each of the two chain types given by params.receptor_chains is used. Receptors with a missing chain are omitted and only the
+        first chain is kept for receptors with multiple chains of the same type; both cases are reported with one warning per chain type.
+        The receptors are returned in the order in which their identifiers first occur in the data frame.
+        """
+        codes, identifiers = pd.factorize(df["receptor_identifiers"])
+        n_receptors = len(identifiers)
+        is_complete = np.ones(n_receptors, dtype=bool)
+        first_rows = []
+
+        if np.any(codes < 0):
+            warnings.warn(f"{ImportHelper.__name__}: {np.sum(codes < 0)} chains without a receptor identifier were found, these chains will be "
+                          f"omitted.")
+
+        for chain in params.receptor_chains.value:
+            row_indices = np.flatnonzero(np.asarray(df["chains"] == chain) & (codes >= 0))
+            receptor_codes, first_positions, chain_counts = np.unique(codes[row_indices], return_index=True, return_counts=True)
+
+            chain_rows = np.full(n_receptors, -1)
+            chain_rows[receptor_codes] = row_indices[first_positions]
+            chain_count_per_receptor = np.zeros(n_receptors, dtype=int)
+            chain_count_per_receptor[receptor_codes] = chain_counts
+
+            # as when receptors were paired one by one, chains of the second type are only checked (and warned about) for receptors which
+            # have a chain of the first type: a receptor with a missing first chain is reported only once, as missing that chain
+            ImportHelper._warn_about_chains(identifiers, is_complete & (chain_count_per_receptor > 1),
+                                            f"Multiple {chain} chains found for", "only the first entry will be loaded")
+            ImportHelper._warn_about_chains(identifiers, is_complete & (chain_count_per_receptor == 0),
+                                            f"Missing {chain} chain for", "these receptors will be omitted")
+
+            is_complete &= chain_count_per_receptor > 0
+            first_rows.append(chain_rows)
 
         # todo add options like IRIS import: option to import all dual chains or just the first pair / all V genes when uncertain annotation, etc
         # todo add possibility to import multiple chain combo's? (BCR heavy-light & heavy-kappa, as seen in 10xGenomics?)
 
-        return [ImportHelper.build_receptor_from_rows(first_row.iloc[0], second_row.iloc[0], identifier, params)]
+        columns = {column: df[column].values for column in df.columns}
+
+        return [ImportHelper.build_receptor_from_rows({column: values[first_rows[0][code]] for column, values in columns.items()},
+                                                      {column: values[first_rows[1][code]] for column, values in columns.items()},
+                                                      identifiers[code], params)
+                for code in np.flatnonzero(is_complete)]
+
+    @staticmethod
+    def _warn_about_chains(identifiers, mask, description: str, consequence: str, n_examples: int = 5):
+        if np.any(mask):
+            examples = ", ".join(str(identifier) for identifier in identifiers[np.flatnonzero(mask)[:n_examples]])
+            warnings.warn(f"{description} {np.sum(mask)} receptor(s) (e.g., with identifiers {examples}), {consequence}.")
 
     @staticmethod
     def build_receptor_from_rows(first_row, second_row, identifier, params):
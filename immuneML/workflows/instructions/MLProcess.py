@@ -1,14 +1,17 @@
 import copy
 import datetime
+import logging
 from pathlib import Path
 from typing import List
 
 from immuneML.data_model.dataset.Dataset import Dataset
+from immuneML.data_model.dataset.ElementDataset import ElementDataset
 from immuneML.environment.LabelConfiguration import LabelConfiguration
 from immuneML.environment.Metric import Metric
 from immuneML.hyperparameter_optimization.HPSetting import HPSetting
 from immuneML.hyperparameter_optimization.core.HPUtil import HPUtil
 from immuneML.hyperparameter_optimization.states.HPItem import HPItem
+from immuneML.ml_methods.SklearnMethod import SklearnMethod
 from immuneML.reports.ReportUtil import ReportUtil
 from immuneML.reports.ml_reports.MLReport import MLReport
 from immuneML.util.PathBuilder import PathBuilder
@@ -23,6 +26,9 @@ class MLProcess:
         4. assesses the method's performance on encoded test dataset
 
     It performs the task for a given label configuration, and given list of metrics (used only in the assessment step).
+
+    If the ML method is trained incrementally (see trains_in_batches()), the training dataset is not encoded as a whole in step 1: the encoder
+    is fitted on its first batch file and the examples are encoded one batch file at a time while the ML method is trained in step 3.
     """
 
     def __init__(self, train_dataset: Dataset, test_dataset: Dataset, label: str, metrics: set, optimization_metric: Metric,
@@ -65,26 +71,43 @@ class MLProcess:
 
         print(f"{datetime.datetime.now()}: Evaluating hyperparameter setting: {self.hp_setting}...", flush=True)
 
-        PathBuilder.build(self.path)
-        self._set_paths()
+        encoded_train_dataset, encoded_test_dataset = self.encode_datasets()
+        hp_item = self.train_and_assess(encoded_train_dataset, encoded_test_dataset, split_index)
 
-        processed_dataset = HPUtil.preprocess_dataset(self.train_dataset, self.hp_setting.preproc_sequence, self.path / "preprocessed_train_dataset")
+        print(f"{datetime.datetime.now()}: Completed hyperparameter setting {self.hp_setting}.\n", flush=True)
+
+        return hp_item
 
-        encoded_train_dataset = HPUtil.encode_dataset(processed_dataset, self.hp_setting, self.path / "encoded_datasets", learn_model=True,
-                                                      context=self.report_context, number_of_processes=self.number_of_processes,
-                                                      label_configuration=self.label_config, store_encoded_data=self.store_encoded_data)
+    def trains_in_batches(self) -> bool:
+        """
+        Checks if the training dataset is encoded one batch file at a time while the ML method is trained: this is the case if the ML method
+        is trained incrementally (an SklearnMethod with batch_size set, without model selection by cross-validation) on a receptor or
+        sequence dataset
+        """
+        return isinstance(self.method, SklearnMethod) and self.method.batch_size is not None and isinstance(self.train_dataset, ElementDataset) \
+            and not self.hp_setting.ml_params["model_selection_cv"]
 
-        method = HPUtil.train_method(self.label, encoded_train_dataset, self.hp_setting, self.path, self.train_predictions_path, self.ml_details_path, self.number_of_processes, self.optimization_metric)
+    def encode_datasets(self) -> tuple:
+        """
+        Preprocesses and encodes the training dataset and then the test dataset (using parameters learnt on the training dataset if any)
 
-        encoding_train_results = ReportUtil.run_encoding_reports(encoded_train_dataset, self.encoding_reports, self.report_path / "encoding_train")
+        Returns:
+            a tuple of encoded training and test datasets, where the test dataset is None if there is no test dataset
+        """
 
-        hp_item = self._assess_on_test_dataset(encoded_train_dataset, encoding_train_results, method, split_index)
+        PathBuilder.build(self.path)
+        self._set_paths()
 
-        print(f"{datetime.datetime.now()}: Completed hyperparameter setting {self.hp_setting}.\n", flush=True)
+        processed_dataset = HPUtil.preprocess_dataset(self.train_dataset, self.hp_setting.preproc_sequence, self.path / "preprocessed_train_dataset")
 
-        return hp_item
+        if self.trains_in_batches():
+            encoded_train_dataset = HPUtil.encode_dataset_in_batches(processed_dataset, self.hp_setting, self.path / "encoded_datasets",
+                                                                     number_of_processes=self.number_of_processes, label_configuration=self.label_config)
+        else:
+            encoded_train_dataset = HPUtil.encode_dataset(processed_dataset, self.hp_setting, self.path / "encoded_datasets", learn_model=True,
+                                                          context=self.report_context, number_of_processes=self.number_of_processes,
+                                                          label_configuration=self.label_config, store_encoded_data=self.store_encoded_data)
 
-    def _assess_on_test_dataset(self, encoded_train_dataset, encoding_train_results, method, split_index) -> HPItem:
         if self.test_dataset is not None and self.test_dataset.get_example_count() > 0:
             processed_test_dataset = HPUtil.preprocess_dataset(self.test_dataset, self.hp_setting.preproc_sequence,
                                                                self.path / "preprocessed_test_dataset")
@@ -92,7 +115,37 @@ class MLProcess:
             encoded_test_dataset = HPUtil.encode_dataset(processed_test_dataset, self.hp_setting, self.path / "encoded_datasets",
                                                          learn_model=False, context=self.report_context, number_of_processes=self.number_of_processes,
                                                          label_configuration=self.label_config, store_encoded_data=self.store_encoded_data)
+        else:
+            encoded_test_dataset = None
+
+        return encoded_train_dataset, encoded_test_dataset
+
+    def train_and_assess(self, encoded_train_dataset, encoded_test_dataset, split_index: int) -> HPItem:
+        """trains the ML method on the encoded training dataset and assesses it on the encoded test dataset if there is one"""
+
+        PathBuilder.build(self.path)
+        self._set_paths()
+
+        if self.trains_in_batches():
+            encoder_params = HPUtil.make_encoder_params(self.hp_setting, self.path / "encoded_datasets" / "train_batches", learn_model=False,
+                                                        number_of_processes=self.number_of_processes, label_configuration=self.label_config)
+            method = HPUtil.train_method(self.label, encoded_train_dataset, self.hp_setting, self.path, self.train_predictions_path,
+                                         self.ml_details_path, self.number_of_processes, self.optimization_metric, encoder=self.hp_setting.encoder,
+                                         encoder_params=encoder_params)
+        else:
+            method = HPUtil.train_method(self.label, encoded_train_dataset, self.hp_setting, self.path, self.train_predictions_path, self.ml_details_path, self.number_of_processes, self.optimization_metric)
+
+        if self.trains_in_batches() and len(self.encoding_reports) > 0:
+            logging.warning(f"{MLProcess.__name__}: the training dataset for {self.hp_setting} was encoded in batches during training, so the "
+                            f"encoding reports are run only on the test dataset.")
+            encoding_train_results = []
+        else:
+            encoding_train_results = ReportUtil.run_encoding_reports(encoded_train_dataset, self.encoding_reports, self.report_path / "encoding_train")
+
+        return self._assess_on_test_dataset(encoded_train_dataset, encoded_test_dataset, encoding_train_results, method, split_index)
 
+    def _assess_on_test_dataset(self, encoded_train_dataset, encoded_test_dataset, encoding_train_results, method, split_index) -> HPItem:
+        if encoded_test_dataset is not None:
             performance = HPUtil.assess_performance(method, self.metrics, self.optimization_metric, encoded_test_dataset, split_index, self.path,
                                                     self.test_predictions_path, self.label, self.ml_score_path)
 
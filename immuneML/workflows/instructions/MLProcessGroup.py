@@ -0,0 +1,43 @@
+import datetime
+from typing import List
+
+from immuneML.hyperparameter_optimization.states.HPItem import HPItem
+from immuneML.workflows.instructions.MLProcess import MLProcess
+
+
+class MLProcessGroup:
+    """
+    Runs a list of MLProcess objects which have the same datasets, label and preprocessing and encoding and differ only in the ML method:
+    the datasets are preprocessed and encoded once (by the first process) and the encoded datasets are kept in memory and used to train
+    and assess the ML methods of all processes. The encoder fitted on the training dataset is shared by all resulting HPItem objects.
+    If any of the processes trains its ML method on a training dataset encoded in batches (see MLProcess.trains_in_batches()), the encoded
+    datasets cannot be shared and the processes are run one by one.
+    """
+
+    def __init__(self, processes: List[MLProcess]):
+        assert len(processes) > 0, f"{MLProcessGroup.__name__}: at least one process has to be given."
+        assert len({process.hp_setting.get_encoding_key() for process in processes}) == 1 and len({process.label for process in processes}) == 1, \
+            f"{MLProcessGroup.__name__}: all processes must have the same label, preprocessing and encoding."
+        self.processes = processes
+
+    def run(self, split_index: int) -> List[HPItem]:
+
+        if len(self.processes) == 1 or any(process.trains_in_batches() for process in self.processes):
+            return [process.run(split_index) for process in self.processes]
+
+        print(f"{datetime.datetime.now()}: Encoding data for hyperparameter settings: "
+              f"{', '.join(str(process.hp_setting) for process in self.processes)}...", flush=True)
+
+        encoded_train_dataset, encoded_test_dataset = self.processes[0].encode_datasets()
+        encoder = self.processes[0].hp_setting.encoder
+
+        hp_items = []
+        for process in self.processes:
+            print(f"{datetime.datetime.now()}: Evaluating hyperparameter setting: {process.hp_setting}...", flush=True)
+
+            process.hp_setting.encoder = encoder
+            hp_items.append(process.train_and_assess(encoded_train_dataset, encoded_test_dataset, split_index))
+
+            print(f"{datetime.datetime.now()}: Completed hyperparameter setting {process.hp_setting}.\n", flush=True)
+
+        return hp_items
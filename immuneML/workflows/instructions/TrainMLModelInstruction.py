@@ -32,6 +32,9 @@ class TrainMLModelInstruction(Instruction):
 
     Optimal model chosen by the inner loop is then retrained on the whole training dataset in the outer loop.
 
+    Settings which have the same preprocessing and encoding (and differ only in the ML method) are encoded only once per data split and label,
+    and the encoded data is then used to train all of their ML methods.
+
     Note: If you are interested in plotting the performance of all combinations of encodings and ML methods on the test set,
     consider running the :ref:`MLSettingsPerformance` report as hyperparameter report in the assessment loop.
 
@@ -60,6 +63,11 @@ class TrainMLModelInstruction(Instruction):
 
         number_of_processes (int): how many processes should be created at once to speed up the analysis. For personal machines, 4 or 8 is usually a good choice.
 
+        number_of_processes_per_job (int): how many of the `number_of_processes` processes to use for encoding and training in one combination of
+        label, setting and data split; `number_of_processes // number_of_processes_per_job` such combinations are then trained in parallel. If not
+        set, all processes are used for one combination at a time. Setting this parameter lower than `number_of_processes` increases the memory usage,
+        as multiple datasets are encoded at the same time.
+
         reports (list): a list of report names to be executed after the nested CV has finished to show the overall performance or some statistic;
         the reports to be specified here have to be :py:obj:`~immuneML.reports.train_ml_model_reports.TrainMLModelReport.TrainMLModelReport` reports.
 
@@ -116,6 +124,7 @@ class TrainMLModelInstruction(Instruction):
             reports: # list of reports to execute when nested CV is finished to show overall performance
                 - rep4
             number_of_processes: 4 # number of parallel processes to create (could speed up the computation)
+            number_of_processes_per_job: 2 # train two settings in parallel with 2 processes each
             optimization_metric: balanced_accuracy # the metric to use for choosing the optimal model and during training
             refit_optimal_model: False # use trained model, do not refit on the full dataset
             store_encoded_data: True # store encoded datasets in pickle format
@@ -124,10 +133,12 @@ class TrainMLModelInstruction(Instruction):
 
     def __init__(self, dataset, hp_strategy: HPOptimizationStrategy, hp_settings: list, assessment: SplitConfig, selection: SplitConfig,
                  metrics: set, optimization_metric: Metric, label_configuration: LabelConfiguration, path: Path = None, context: dict = None,
-                 number_of_processes: int = 1, reports: dict = None, name: str = None, refit_optimal_model: bool = False, store_encoded_data: bool = None):
+                 number_of_processes: int = 1, reports: dict = None, name: str = None, refit_optimal_model: bool = False, store_encoded_data: bool = None,
+                 number_of_processes_per_job: int = None):
         self.state = TrainMLModelState(dataset, hp_strategy, hp_settings, assessment, selection, metrics,
                                        optimization_metric, label_configuration, path, context, number_of_processes,
-                                       reports if reports is not None else {}, name, refit_optimal_model, store_encoded_data)
+                                       reports if reports is not None else {}, name, refit_optimal_model, store_encoded_data,
+                                       number_of_processes_per_job)
 
     def run(self, result_path: Path):
         self.state.path = result_path
@@ -3,12 +3,21 @@ import datetime
 
 import pandas as pd
 
+from immuneML.data_model.encoded_data.EncodedBatchGenerator import EncodedBatchGenerator
+from immuneML.data_model.encoded_data.EncodedData import EncodedData
 from immuneML.ml_methods.MLMethod import MLMethod
 from immuneML.workflows.steps.MLMethodTrainerParams import MLMethodTrainerParams
 from immuneML.workflows.steps.Step import Step
 
 
 class MLMethodTrainer(Step):
+    """
+    Fits the ML method on the encoded dataset, stores it and writes its predictions for the training examples.
+
+    If an encoder and encoder params are given, the dataset (a receptor or sequence dataset) is not encoded as a whole: its encoded data
+    only has the labels, example ids and feature names, and the ML method (which has to support incremental training, see SklearnMethod) is
+    fitted on batches of examples which are encoded with the given (already fitted) encoder one batch file at a time.
+    """
 
     @staticmethod
     def run(input_params: MLMethodTrainerParams = None):
@@ -33,24 +42,43 @@ class MLMethodTrainer(Step):
                                            label_name=input_params.label,
                                            cores_for_training=input_params.cores_for_training,
                                            optimization_metric=input_params.optimization_metric)
+        elif input_params.encoder is not None:
+            method.fit_incrementally(MLMethodTrainer._get_batches(input_params, method.batch_size), label_name=input_params.label,
+                                     classes=input_params.dataset.encoded_data.labels[input_params.label],
+                                     cores_for_training=input_params.cores_for_training)
         else:
             method.fit(encoded_data=input_params.dataset.encoded_data, label_name=input_params.label, cores_for_training=input_params.cores_for_training)
 
         return method
 
+    @staticmethod
+    def _get_batches(input_params: MLMethodTrainerParams, batch_size: int = None):
+        return EncodedBatchGenerator.from_element_dataset(input_params.dataset, input_params.encoder, input_params.encoder_params, batch_size)
+
     @staticmethod
     def store(method: MLMethod, input_params: MLMethodTrainerParams):
         method.store(input_params.result_path, input_params.dataset.encoded_data.feature_names, input_params.ml_details_path)
-        train_predictions = method.predict(input_params.dataset.encoded_data, input_params.label)
-        train_proba_predictions = method.predict_proba(input_params.dataset.encoded_data, input_params.label)
 
-        df = pd.DataFrame({"example_ids": input_params.dataset.encoded_data.example_ids,
-                           f"{input_params.label}_predicted_class": train_predictions[input_params.label],
-                           f"{input_params.label}_true_class": input_params.dataset.encoded_data.labels[input_params.label]})
+        if input_params.encoder is not None:
+            df = pd.concat([MLMethodTrainer._make_predictions_df(method, batch, input_params.label)
+                            for batch in MLMethodTrainer._get_batches(input_params)()], ignore_index=True)
+        else:
+            df = MLMethodTrainer._make_predictions_df(method, input_params.dataset.encoded_data, input_params.label)
+
+        df.to_csv(input_params.train_predictions_path, index=False)
+
+    @staticmethod
+    def _make_predictions_df(method: MLMethod, encoded_data: EncodedData, label: str) -> pd.DataFrame:
+        train_predictions = method.predict(encoded_data, label)
+        train_proba_predictions = method.predict_proba(encoded_data, label)
+
+        df = pd.DataFrame({"example_ids": encoded_data.example_ids,
+                           f"{label}_predicted_class": train_predictions[label],
+                           f"{label}_true_class": encoded_data.labels[label]})
 
         classes = method.get_classes()
         for cls_index, cls in enumerate(classes):
-            tmp = train_proba_predictions[input_params.label][:, cls_index] if train_proba_predictions is not None and train_proba_predictions[input_params.label] is not None else None
-            df["{}_{}_proba".format(input_params.label, cls)] = tmp
+            tmp = train_proba_predictions[label][:, cls_index] if train_proba_predictions is not None and train_proba_predictions[label] is not None else None
+            df["{}_{}_proba".format(label, cls)] = tmp
 
-        df.to_csv(input_params.train_predictions_path, index=False)
+        return df
@@ -1,6 +1,8 @@
 from pathlib import Path
 
 from immuneML.data_model.dataset.Dataset import Dataset
+from immuneML.encodings.DatasetEncoder import DatasetEncoder
+from immuneML.encodings.EncoderParams import EncoderParams
 from immuneML.ml_methods.MLMethod import MLMethod
 from immuneML.workflows.steps.StepParams import StepParams
 
@@ -9,7 +11,7 @@ class MLMethodTrainerParams(StepParams):
 
     def __init__(self, method: MLMethod, dataset: Dataset, result_path: Path, label: str, model_selection_cv: bool,
                  model_selection_n_folds: int, cores_for_training: int, train_predictions_path: Path, ml_details_path: Path,
-                 optimization_metric: str):
+                 optimization_metric: str, encoder: DatasetEncoder = None, encoder_params: EncoderParams = None):
         self.method = method
         self.result_path = result_path
         self.dataset = dataset
@@ -20,3 +22,5 @@ class MLMethodTrainerParams(StepParams):
         self.train_predictions_path = train_predictions_path
         self.ml_details_path = ml_details_path
         self.optimization_metric = optimization_metric
+        self.encoder = encoder
+        self.encoder_params = encoder_params
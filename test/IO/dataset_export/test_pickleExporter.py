@@ -51,3 +51,22 @@ class TestPickleExporter(TestCase):
         self.assertEqual(10, dataset2.get_example_count())
 
         shutil.rmtree(path)
+
+    def test_export_receptor_dataset_view(self):
+        path = EnvironmentSettings.tmp_test_path / "pickleexporter_receptor_view/"
+        PathBuilder.build(path)
+
+        dataset = RandomDatasetGenerator.generate_receptor_dataset(10, {2: 1}, {3: 1}, {}, path / "dataset")
+        subset = dataset.make_subset([1, 4, 8], path / "subset", ReceptorDataset.TRAIN)
+        subset.name = "d1"
+        PickleExporter.export(subset, path / "exported")
+
+        with open(path / "exported" / f"{subset.name}.iml_dataset", "rb") as file:
+            dataset2 = pickle.load(file)
+
+        self.assertTrue(subset.is_view())
+        self.assertFalse(dataset2.is_view())
+        self.assertTrue(all(filename.parent == path / "exported" for filename in dataset2.get_filenames()))
+        self.assertEqual([receptor.identifier for receptor in subset.get_data()], dataset2.get_example_ids())
+
+        shutil.rmtree(path)
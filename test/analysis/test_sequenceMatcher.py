@@ -2,7 +2,10 @@ import os
 import shutil
 from unittest import TestCase
 
+import numpy as np
+
 from immuneML.analysis.SequenceMatcher import SequenceMatcher
+from immuneML.analysis.SequenceMatchingIndex import SequenceMatchingIndex
 from immuneML.caching.CacheType import CacheType
 from immuneML.data_model.dataset.RepertoireDataset import RepertoireDataset
 from immuneML.data_model.receptor.receptor_sequence.ReceptorSequence import ReceptorSequence
@@ -83,3 +86,36 @@ class TestSequenceMatcher(TestCase):
         self.assertEqual(0.8, result["clonal_percentage"])
 
         shutil.rmtree(path)
+
+    def test_match_in_parallel(self):
+        path = EnvironmentSettings.tmp_test_path / "seqmatch_parallel/"
+        PathBuilder.build(path)
+
+        repertoires = [Repertoire.build_from_sequence_objects(sequence_objects=[
+            ReceptorSequence(amino_acid_sequence="AAAAAA", metadata=SequenceMetadata(chain="A", v_gene="V1", j_gene="J2", count=index + 1), identifier="1"),
+            ReceptorSequence(amino_acid_sequence="CCCCCC", metadata=SequenceMetadata(chain="A", v_gene="V1", j_gene="J2", count=3), identifier="2"),
+            ReceptorSequence(amino_acid_sequence="TADQVF", metadata=SequenceMetadata(chain="A", v_gene="V1-1", j_gene="J3", count=1), identifier="3")],
+            metadata={"CD": index % 2 == 0}, path=path) for index in range(3)]
+        dataset = RepertoireDataset(repertoires=repertoires)
+        sequences = [ReceptorSequence("AAAACA", metadata=SequenceMetadata(chain="A", v_gene="V1", j_gene="J2"), identifier="1"),
+                     ReceptorSequence("TADQV", metadata=SequenceMetadata(chain="A", v_gene="V1", j_gene="J3"), identifier="2")]
+
+        matcher = SequenceMatcher()
+        result = matcher.match(dataset, sequences, 2, SequenceMatchingSummaryType.COUNT, number_of_processes=2)
+
+        self.assertEqual([0, 1, 2], [repertoire["repertoire_index"] for repertoire in result["repertoires"]])
+        self.assertTrue(all(repertoire["count"] == 2 for repertoire in result["repertoires"]))
+        self.assertEqual(["AAAACA"], result["repertoires"][0]["sequences"][0]["matching_sequences"])
+        self.assertEqual(["TADQV"], result["repertoires"][0]["sequences"][2]["matching_sequences"])
+
+        result = matcher.match(dataset, sequences, 2, SequenceMatchingSummaryType.CLONAL_PERCENTAGE, number_of_processes=2)
+        self.assertEqual([2 / 5, 3 / 6, 4 / 7], [repertoire["clonal_percentage"] for repertoire in result["repertoires"]])
+
+        counts = matcher.count_dataset_matches(dataset, SequenceMatchingIndex.from_receptor_sequences(sequences, [2, 2]), number_of_processes=2)
+        self.assertTrue(np.array_equal([[1, 1], [2, 1], [3, 1]], counts))
+
+        counts = matcher.count_dataset_matches(dataset, SequenceMatchingIndex.from_receptor_sequences(sequences, [2, 2]), number_of_processes=1)
+        self.assertTrue(np.array_equal([[1, 1], [2, 1], [3, 1]], counts))
+        self.assertIsNone(SequenceMatcher._worker_reference_index)
+
+        shutil.rmtree(path)
@@ -0,0 +1,67 @@
+import os
+import random
+import shutil
+from unittest import TestCase
+
+import numpy as np
+
+from immuneML.analysis.SequenceMatcher import SequenceMatcher
+from immuneML.analysis.SequenceMatchingIndex import SequenceMatchingIndex
+from immuneML.caching.CacheType import CacheType
+from immuneML.data_model.receptor.receptor_sequence.ReceptorSequence import ReceptorSequence
+from immuneML.data_model.receptor.receptor_sequence.SequenceMetadata import SequenceMetadata
+from immuneML.data_model.repertoire.Repertoire import Repertoire
+from immuneML.environment.Constants import Constants
+from immuneML.environment.EnvironmentSettings import EnvironmentSettings
+from immuneML.util.PathBuilder import PathBuilder
+
+
+class TestSequenceMatchingIndex(TestCase):
+
+    def setUp(self) -> None:
+        os.environ[Constants.CACHE_TYPE] = CacheType.TEST.name
+
+    def make_sequences(self, count: int, seed: int):
+        random.seed(seed)
+        return [ReceptorSequence(amino_acid_sequence="".join(random.choices("ACD", k=random.randint(3, 6))),
+                                 metadata=SequenceMetadata(chain=random.choice(["A", "B"]), v_gene=random.choice(["V1", "V1-1", "V1-2", "V2"]),
+                                                           j_gene=random.choice(["J1", "J1-1"]), count=random.randint(1, 5)),
+                                 identifier=str(index))
+                for index in range(count)]
+
+    def test_find_matches(self):
+        references = self.make_sequences(60, 1)
+        sequences = self.make_sequences(100, 2)
+        matcher = SequenceMatcher()
+
+        for max_distance in [0, 1, 2]:
+            index = SequenceMatchingIndex.from_receptor_sequences(references, [max_distance] * len(references))
+            for sequence in sequences:
+                expected = [i for i, reference in enumerate(references) if matcher.matches_sequence(reference, sequence, max_distance)]
+                self.assertEqual(expected, index.find_matches(sequence.get_sequence(), sequence.metadata.v_gene, sequence.metadata.j_gene,
+                                                              sequence.metadata.chain))
+
+        max_distances = [i % 3 for i in range(len(references))]
+        index = SequenceMatchingIndex.from_receptor_sequences(references, max_distances)
+        for sequence in sequences:
+            expected = [i for i, reference in enumerate(references) if matcher.matches_sequence(reference, sequence, max_distances[i])]
+            self.assertEqual(expected, index.find_matches(sequence.get_sequence(), sequence.metadata.v_gene, sequence.metadata.j_gene,
+                                                          sequence.metadata.chain))
+
+    def test_count_repertoire_matches(self):
+        path = EnvironmentSettings.tmp_test_path / "sequence_matching_index/"
+        PathBuilder.build(path)
+
+        references = self.make_sequences(30, 3)
+        sequences = self.make_sequences(80, 4)
+        sequences += sequences[:10]
+        repertoire = Repertoire.build_from_sequence_objects(sequences, path, {})
+
+        matcher = SequenceMatcher()
+        expected = np.array([sum(sequence.metadata.count for sequence in sequences if matcher.matches_sequence(reference, sequence, 1))
+                             for reference in references])
+
+        index = SequenceMatchingIndex.from_receptor_sequences(references, [1] * len(references))
+        self.assertTrue(np.array_equal(expected, index.count_repertoire_matches(repertoire)))
+
+        shutil.rmtree(path)
@@ -3,9 +3,12 @@ import os
 import pickle
 from unittest import TestCase
 
+import numpy as np
+
 from immuneML.caching.CacheHandler import CacheHandler
 from immuneML.caching.CacheObjectType import CacheObjectType
 from immuneML.caching.CacheType import CacheType
+from immuneML.caching.TieredCacheBackend import TieredCacheBackend
 from immuneML.environment.Constants import Constants
 from immuneML.environment.EnvironmentSettings import EnvironmentSettings
 
@@ -85,3 +88,30 @@ class TestCacheHandler(TestCase):
         self.assertTrue(os.path.isfile(EnvironmentSettings.get_cache_path() / f"encoding/{cache_key}.pickle"))
 
         os.remove(CacheHandler._build_filename(cache_key, CacheObjectType.ENCODING))
+
+    def test_generate_cache_key(self):
+        params = (("k1", 1), ("k2", ("k3", 2)))
+        self.assertEqual(hashlib.sha256(str(params).encode('utf-8')).hexdigest(), CacheHandler.generate_cache_key(params))
+
+        self.assertEqual(CacheHandler.generate_cache_key((("d", {"a": 1, "b": {2, 1}}),)),
+                         CacheHandler.generate_cache_key((("d", {"b": {1, 2}, "a": 1}),)))
+
+        array = np.arange(5000)
+        changed_array = array.copy()
+        changed_array[2500] = -1
+        self.assertNotEqual(CacheHandler.generate_cache_key((("array", array),)), CacheHandler.generate_cache_key((("array", changed_array),)))
+
+    def test_get_backend(self):
+        backend = CacheHandler.backend
+        os.environ[Constants.CACHE_MEMORY_MAX_BYTES] = "not_a_number"
+        try:
+            CacheHandler.set_backend(None)
+            with self.assertRaisesRegex(ValueError, Constants.CACHE_MEMORY_MAX_BYTES):
+                CacheHandler.get_backend()
+
+            del os.environ[Constants.CACHE_MEMORY_MAX_BYTES]
+            self.assertIsInstance(CacheHandler.get_backend(), TieredCacheBackend)
+            self.assertIs(CacheHandler.get_backend(), CacheHandler.get_backend())
+        finally:
+            os.environ.pop(Constants.CACHE_MEMORY_MAX_BYTES, None)
+            CacheHandler.set_backend(backend)
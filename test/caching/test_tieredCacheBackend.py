@@ -0,0 +1,185 @@
+import os
+import shutil
+import time
+from unittest import TestCase
+
+import numpy as np
+
+from immuneML.caching.CacheIndex import CacheIndex
+from immuneML.caching.CacheObjectType import CacheObjectType
+from immuneML.caching.EvictionPolicy import EvictionPolicy
+from immuneML.caching.TieredCacheBackend import TieredCacheBackend
+from immuneML.data_model.dataset.RepertoireDataset import RepertoireDataset
+from immuneML.data_model.encoded_data.EncodedData import EncodedData
+from immuneML.environment.Constants import Constants
+from immuneML.environment.EnvironmentSettings import EnvironmentSettings
+from immuneML.util.PathBuilder import PathBuilder
+
+
+class TestTieredCacheBackend(TestCase):
+
+    def test_load_and_store(self):
+        path = PathBuilder.build(EnvironmentSettings.tmp_test_path / "tiered_cache_backend/")
+        filename = PathBuilder.build(path / "other") / "key1.pickle"
+
+        backend = TieredCacheBackend()
+        self.assertIsNone(backend.load(path, filename, CacheObjectType.OTHER))
+
+        backend.store(path, filename, {"a": [1, 2]}, CacheObjectType.OTHER)
+        self.assertListEqual(["key1.pickle"], [file.name for file in (path / "other").iterdir()])
+
+        first = backend.load(path, filename, CacheObjectType.OTHER)
+        first["a"].append(3)
+        self.assertDictEqual({"a": [1, 2]}, backend.load(path, filename, CacheObjectType.OTHER))
+
+        statistics = backend.get_statistics()["OTHER"]
+        self.assertEqual(1, statistics["misses"])
+        self.assertEqual(1, statistics["disk_hits"])
+        self.assertEqual(1, statistics["memory_hits"])
+        self.assertEqual(filename.stat().st_size, statistics["bytes_written"])
+
+        self.assertEqual(0, CacheIndex(path).get_entries()[0]["access_count"])
+        backend.flush_access_records()
+
+        entries = CacheIndex(path).get_entries()
+        self.assertEqual(1, len(entries))
+        self.assertEqual("other/key1.pickle", entries[0]["key"])
+        self.assertEqual(2, entries[0]["access_count"])
+
+        filename.unlink()
+        self.assertIsNone(backend.load(path, filename, CacheObjectType.OTHER))
+
+        shutil.rmtree(path)
+
+    def test_store_encoded_data(self):
+        path = PathBuilder.build(EnvironmentSettings.tmp_test_path / "tiered_cache_backend_encoded_data/")
+        filename = PathBuilder.build(path / "encoding") / "key.pickle"
+
+        dataset = RepertoireDataset(encoded_data=EncodedData(np.arange(12).reshape(4, 3), labels={"l1": [1, 0, 1, 0]}), repertoires=[])
+        array = np.ones(300_000)
+
+        backend = TieredCacheBackend()
+        backend.store(path, filename, (dataset, array), CacheObjectType.ENCODING)
+
+        data_paths = list((path / "encoding").glob("key_data.*"))
+        self.assertEqual(1, len(data_paths))
+        self.assertTrue((data_paths[0] / "encoded_data_0/examples.npy").is_file())
+        self.assertTrue((data_paths[0] / "array_1.npy").is_file())
+
+        loaded_dataset, loaded_array = backend.load(path, filename, CacheObjectType.ENCODING)
+
+        self.assertTrue(isinstance(loaded_dataset.encoded_data.examples, np.memmap))
+        self.assertTrue(np.array_equal(dataset.encoded_data.examples, loaded_dataset.encoded_data.examples))
+        self.assertDictEqual(dataset.encoded_data.labels, loaded_dataset.encoded_data.labels)
+        self.assertTrue(isinstance(loaded_array, np.memmap))
+        self.assertTrue(np.array_equal(array, loaded_array))
+
+        shutil.rmtree(path)
+
+    def test_eviction(self):
+        for policy, expected_files in [(EvictionPolicy.LRU, ["key0.pickle", "key3.pickle"]), (EvictionPolicy.LFU, ["key1.pickle", "key3.pickle"])]:
+            path = PathBuilder.build(EnvironmentSettings.tmp_test_path / "tiered_cache_backend_eviction/")
+            PathBuilder.build(path / "encoding")
+
+            backend = TieredCacheBackend(memory_max_bytes=0, eviction_policy=policy)
+            for index in range(3):
+                backend.store(path, path / f"encoding/key{index}.pickle", "x" * 1000, CacheObjectType.ENCODING)
+
+            backend.load(path, path / "encoding/key1.pickle", CacheObjectType.ENCODING)
+            backend.load(path, path / "encoding/key1.pickle", CacheObjectType.ENCODING)
+            backend.load(path, path / "encoding/key0.pickle", CacheObjectType.ENCODING)
+
+            backend.max_bytes_per_type = {CacheObjectType.ENCODING: 2500}
+            backend.store(path, path / "encoding/key3.pickle", "x" * 1000, CacheObjectType.ENCODING)
+
+            self.assertListEqual(expected_files, sorted(file.name for file in (path / "encoding").iterdir()))
+            self.assertEqual(2, backend.get_statistics()["ENCODING"]["evictions"])
+
+            shutil.rmtree(path)
+
+    def test_eviction_removes_data(self):
+        path = PathBuilder.build(EnvironmentSettings.tmp_test_path / "tiered_cache_backend_eviction_data/")
+        PathBuilder.build(path / "encoding")
+
+        backend = TieredCacheBackend(memory_max_bytes=0, max_bytes_per_type={CacheObjectType.ENCODING: 3_000_000})
+        backend.store(path, path / "encoding/key0.pickle", np.zeros(300_000), CacheObjectType.ENCODING)
+        self.assertEqual(1, len(list((path / "encoding").glob("key0_data.*"))))
+
+        backend.store(path, path / "encoding/key1.pickle", np.ones(300_000), CacheObjectType.ENCODING)
+
+        self.assertFalse((path / "encoding/key0.pickle").is_file())
+        self.assertEqual(0, len(list((path / "encoding").glob("key0_data.*"))))
+        self.assertEqual(1, len(list((path / "encoding").glob("key1_data.*"))))
+        self.assertTrue(np.array_equal(np.ones(300_000), backend.load(path, path / "encoding/key1.pickle", CacheObjectType.ENCODING)))
+
+        shutil.rmtree(path)
+
+    def test_replace(self):
+        path = PathBuilder.build(EnvironmentSettings.tmp_test_path / "tiered_cache_backend_replace/")
+        filename = PathBuilder.build(path / "encoding") / "key.pickle"
+
+        backend = TieredCacheBackend(memory_max_bytes=0)
+        backend.store(path, filename, np.zeros(300_000), CacheObjectType.ENCODING)
+        first_array = backend.load(path, filename, CacheObjectType.ENCODING)
+        first_data_path = backend._get_referenced_data_path(filename)
+
+        backend.store(path, filename, np.ones(300_000), CacheObjectType.ENCODING)
+        second_data_path = backend._get_referenced_data_path(filename)
+
+        self.assertNotEqual(first_data_path, second_data_path)
+        self.assertEqual(2, len(list((path / "encoding").glob("key_data.*"))))
+        self.assertTrue(np.array_equal(np.zeros(300_000), first_array))
+        self.assertTrue(np.array_equal(np.ones(300_000), backend.load(path, filename, CacheObjectType.ENCODING)))
+
+        stale_time = time.time() - TieredCacheBackend.STALE_DATA_SECONDS - 1
+        os.utime(path / "encoding" / first_data_path, (stale_time, stale_time))
+        backend.store(path, filename, np.full(300_000, 2.), CacheObjectType.ENCODING)
+        third_data_path = backend._get_referenced_data_path(filename)
+
+        self.assertListEqual(sorted([second_data_path, third_data_path]),
+                             sorted(data_path.name for data_path in (path / "encoding").glob("key_data.*")))
+        self.assertTrue(np.array_equal(np.full(300_000, 2.), backend.load(path, filename, CacheObjectType.ENCODING)))
+
+        shutil.rmtree(path)
+
+    def test_configuration_from_environment(self):
+        os.environ[Constants.CACHE_MEMORY_MAX_BYTES] = "1000"
+        os.environ[Constants.CACHE_MAX_BYTES_PER_TYPE] = "encoding:5000, OTHER:100"
+        try:
+            backend = TieredCacheBackend()
+            self.assertEqual(1000, backend.memory_tier.max_bytes)
+            self.assertDictEqual({CacheObjectType.ENCODING: 5000, CacheObjectType.OTHER: 100}, backend.max_bytes_per_type)
+
+            self.assertEqual(0, TieredCacheBackend(memory_max_bytes=0).memory_tier.max_bytes)
+
+            os.environ[Constants.CACHE_MAX_BYTES_PER_TYPE] = "ENCODING"
+            with self.assertRaisesRegex(ValueError, Constants.CACHE_MAX_BYTES_PER_TYPE):
+                TieredCacheBackend()
+
+            os.environ[Constants.CACHE_MEMORY_MAX_BYTES] = "1GB"
+            with self.assertRaisesRegex(ValueError, Constants.CACHE_MEMORY_MAX_BYTES):
+                TieredCacheBackend()
+        finally:
+            del os.environ[Constants.CACHE_MEMORY_MAX_BYTES]
+            del os.environ[Constants.CACHE_MAX_BYTES_PER_TYPE]
+
+        backend = TieredCacheBackend()
+        self.assertEqual(TieredCacheBackend.DEFAULT_MEMORY_MAX_BYTES, backend.memory_tier.max_bytes)
+        self.assertDictEqual({}, backend.max_bytes_per_type)
+        self.assertTrue(TieredCacheBackend._exit_handler_registered)
+        self.assertIn(backend, TieredCacheBackend._instances)
+
+    def test_index_errors(self):
+        path = PathBuilder.build(EnvironmentSettings.tmp_test_path / "tiered_cache_backend_index_errors/")
+        filename = PathBuilder.build(path / "other") / "key.pickle"
+        PathBuilder.build(path / CacheIndex.FILE_NAME)
+
+        backend = TieredCacheBackend(max_bytes_per_type={CacheObjectType.OTHER: 10})
+        with self.assertLogs(level="WARNING"):
+            backend.store(path, filename, "x" * 100, CacheObjectType.OTHER)
+        self.assertEqual("x" * 100, backend.load(path, filename, CacheObjectType.OTHER))
+
+        with self.assertLogs(level="WARNING"):
+            backend.flush_access_records()
+
+        shutil.rmtree(path)
@@ -0,0 +1,74 @@
+import os
+import shutil
+from unittest import TestCase
+
+import numpy as np
+
+from immuneML.caching.CacheType import CacheType
+from immuneML.data_model.encoded_data.EncodedBatchGenerator import EncodedBatchGenerator
+from immuneML.data_model.encoded_data.EncodedData import EncodedData
+from immuneML.encodings.EncoderParams import EncoderParams
+from immuneML.encodings.kmer_frequency.KmerFrequencyEncoder import KmerFrequencyEncoder
+from immuneML.environment.Constants import Constants
+from immuneML.environment.EnvironmentSettings import EnvironmentSettings
+from immuneML.environment.LabelConfiguration import LabelConfiguration
+from immuneML.simulation.dataset_generation.RandomDatasetGenerator import RandomDatasetGenerator
+
+
+class TestEncodedBatchGenerator(TestCase):
+
+    def setUp(self) -> None:
+        os.environ[Constants.CACHE_TYPE] = CacheType.TEST.name
+
+    def test_from_encoded_data(self):
+        encoded_data = EncodedData(np.arange(10).reshape(5, 2), {"l1": [1, 2, 1, 2, 1]}, example_ids=list("abcde"), feature_names=["f1", "f2"])
+
+        get_batches = EncodedBatchGenerator.from_encoded_data(encoded_data, 2)
+
+        for _ in range(2):
+            batches = list(get_batches())
+            self.assertEqual([2, 2, 1], [batch.examples.shape[0] for batch in batches])
+            self.assertTrue(np.array_equal(encoded_data.examples, np.concatenate([batch.examples for batch in batches])))
+            self.assertEqual([1, 2, 1, 2, 1], [label for batch in batches for label in batch.labels["l1"]])
+            self.assertEqual(list("abcde"), [example_id for batch in batches for example_id in batch.example_ids])
+
+        random_state = np.random.RandomState(0)
+        epochs = [[example_id for batch in get_batches(random_state) for example_id in batch.example_ids] for _ in range(5)]
+
+        self.assertTrue(all(sorted(epoch) == list("abcde") for epoch in epochs))
+        self.assertTrue(any(epoch != epochs[0] for epoch in epochs))
+
+    def test_from_element_dataset(self):
+        path = EnvironmentSettings.tmp_test_path / "encoded_batch_generator/"
+
+        dataset = RandomDatasetGenerator.generate_sequence_dataset(50, {4: 1.}, {"l1": {1: 0.5, 2: 0.5}}, path / "data")
+        dataset.file_size = 20
+
+        label_config = LabelConfiguration()
+        label_config.add_label("l1", [1, 2])
+        encoder = KmerFrequencyEncoder.build_object(dataset, **{"normalization_type": "relative_frequency", "reads": "unique",
+                                                                "sequence_encoding": "continuous_kmer", "k": 2, "scale_to_unit_variance": False,
+                                                                "scale_to_zero_mean": False, "sequence_type": "amino_acid"})
+
+        encoded_dataset = encoder.encode(dataset, EncoderParams(result_path=path / "encoded", label_config=label_config, learn_model=True,
+                                                                filename="dataset.pkl"))
+
+        get_batches = EncodedBatchGenerator.from_element_dataset(dataset, encoder, EncoderParams(result_path=path / "batches",
+                                                                                                 label_config=label_config, learn_model=False,
+                                                                                                 filename="dataset.pkl"))
+        batches = list(get_batches())
+
+        self.assertEqual(len(dataset.get_filenames()), len(batches))
+        self.assertEqual(dataset.get_example_count(), sum(batch.examples.shape[0] for batch in batches))
+        self.assertTrue(all(batch.feature_names == encoded_dataset.encoded_data.feature_names for batch in batches))
+        self.assertEqual(list(encoded_dataset.encoded_data.labels["l1"]), [label for batch in batches for label in batch.labels["l1"]])
+
+        get_batches = EncodedBatchGenerator.from_element_dataset(dataset, encoder, EncoderParams(result_path=path / "batches",
+                                                                                                 label_config=label_config, learn_model=False,
+                                                                                                 filename="dataset.pkl"), batch_size=8)
+        batches = list(get_batches(np.random.RandomState(1)))
+
+        self.assertTrue(all(batch.examples.shape[0] <= 8 for batch in batches))
+        self.assertEqual(list(range(50)), sorted(index for batch in batches for index in batch.info["example_indices"]))
+
+        shutil.rmtree(path)
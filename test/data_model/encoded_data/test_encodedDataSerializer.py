@@ -0,0 +1,42 @@
+import shutil
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from immuneML.data_model.encoded_data.EncodedData import EncodedData
+from immuneML.data_model.encoded_data.EncodedDataSerializer import EncodedDataSerializer
+from immuneML.environment.EnvironmentSettings import EnvironmentSettings
+from immuneML.util.PathBuilder import PathBuilder
+
+
+class TestEncodedDataSerializer(TestCase):
+
+    def test_write_and_read(self):
+        path = EnvironmentSettings.tmp_test_path / "encoded_data_serializer/"
+        PathBuilder.build(path)
+
+        for examples in [np.random.rand(4, 3), sparse.random(4, 3, density=0.5, format="csr"), sparse.random(4, 3, density=0.5, format="csc")]:
+            encoded_data = EncodedData(examples=examples, labels={"l1": [1, 0, 1, 0], "l2": ["a", "b", "a", "b"]},
+                                       example_ids=["e1", "e2", "e3", "e4"], feature_names=["f1", "f2", "f3"],
+                                       feature_annotations=pd.DataFrame({"feature": ["f1", "f2", "f3"], "position": [1, 2, 3]}),
+                                       encoding="test_encoding", info={"path": path, "k": 3})
+
+            EncodedDataSerializer.write(encoded_data, path / "encoded_data")
+            loaded = EncodedDataSerializer.read(path / "encoded_data")
+
+            self.assertTrue(isinstance(loaded, EncodedData))
+            self.assertTrue(isinstance(loaded.examples, type(examples)))
+            self.assertTrue(np.array_equal(examples.toarray() if sparse.issparse(examples) else examples,
+                                           loaded.examples.toarray() if sparse.issparse(loaded.examples) else loaded.examples))
+            self.assertDictEqual(encoded_data.labels, loaded.labels)
+            self.assertListEqual(encoded_data.example_ids, loaded.example_ids)
+            self.assertListEqual(encoded_data.feature_names, loaded.feature_names)
+            self.assertTrue(encoded_data.feature_annotations.equals(loaded.feature_annotations))
+            self.assertEqual("test_encoding", loaded.encoding)
+            self.assertDictEqual(encoded_data.info, loaded.info)
+
+            shutil.rmtree(path / "encoded_data")
+
+        shutil.rmtree(path)
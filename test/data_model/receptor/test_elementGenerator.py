@@ -4,6 +4,7 @@ from unittest import TestCase
 
 from immuneML.data_model.dataset.SequenceDataset import SequenceDataset
 from immuneML.data_model.receptor.BCReceptor import BCReceptor
+from immuneML.data_model.receptor.ElementBatchFile import ElementBatchFile
 from immuneML.data_model.receptor.ElementGenerator import ElementGenerator
 from immuneML.data_model.receptor.receptor_sequence.ReceptorSequence import ReceptorSequence
 from immuneML.environment.EnvironmentSettings import EnvironmentSettings
@@ -77,3 +78,61 @@ class TestElementGenerator(TestCase):
         shutil.rmtree(path)
 
 
+
+    def test_get_elements(self):
+        path = EnvironmentSettings.tmp_test_path / "element_generator_get_elements/"
+        PathBuilder.build(path)
+
+        receptors = [BCReceptor(identifier=str(i)) for i in range(25)]
+        file_list = [path / f"batch{i}.pkl" for i in range(3)]
+
+        # the first file is in the previous format (pickled list), the others are indexed
+        with file_list[0].open("wb") as file:
+            pickle.dump(receptors[:10], file)
+        ElementBatchFile.write(file_list[1], receptors[10:20], block_size=3)
+        ElementBatchFile.write(file_list[2], receptors[20:], block_size=3)
+
+        generator = ElementGenerator(file_list, file_size=10)
+
+        self.assertEqual(25, generator.get_element_count())
+        self.assertEqual([10, 10, 5], generator.file_lengths)
+        self.assertEqual(["24", "3", "15", "16", "9", "10"], [receptor.identifier for receptor in generator.get_elements([24, 3, 15, 16, 9, 10])])
+        self.assertEqual([str(i) for i in range(25)], [receptor.identifier for receptor in generator.build_element_generator()])
+
+        batch_filenames = generator.make_subset([22, 4, 11, 12, 13], path, SequenceDataset.TEST, "subset")
+        self.assertTrue(all(ElementBatchFile.is_indexed(filename) for filename in batch_filenames))
+        self.assertEqual([["4", "11", "12", "13", "22"]], [[receptor.identifier for receptor in ElementBatchFile.read(filename)]
+                                                          for filename in batch_filenames])
+
+        shutil.rmtree(path)
+
+    def test_make_subset_view(self):
+        path = EnvironmentSettings.tmp_test_path / "element_generator_subset_view/"
+        PathBuilder.build(path)
+
+        sequences = [ReceptorSequence(amino_acid_sequence="AAA", identifier=str(i)) for i in range(30)]
+        dataset = SequenceDataset.build(sequences, file_size=10, path=path)
+
+        subset = dataset.make_subset([25, 3, 12, 14, 28, 7], path / "subset", SequenceDataset.TRAIN)
+        self.assertTrue(subset.is_view())
+        self.assertEqual(6, subset.get_example_count())
+        self.assertEqual(["3", "7", "12", "14", "25", "28"], subset.get_example_ids())
+        self.assertEqual(["14", "3"], [sequence.identifier for sequence in subset.get_examples([3, 0])])
+        self.assertEqual([["3", "7"], ["12", "14"], ["25", "28"]],
+                         [[sequence.identifier for sequence in batch_dataset.get_data()] for batch_dataset in subset.get_batch_datasets()])
+
+        subset_of_subset = subset.make_subset([1, 4, 5], path / "subset_of_subset", SequenceDataset.TEST)
+        self.assertEqual(["7", "25", "28"], [sequence.identifier for sequence in subset_of_subset.get_data()])
+        self.assertFalse((path / "subset_of_subset").exists())
+
+        self.assertEqual(dataset.get_filenames(), subset_of_subset.get_filenames())
+        self.assertTrue(subset_of_subset.is_view())
+        self.assertFalse((path / "subset_of_subset").exists())
+
+        subset_of_subset.materialize()
+        filenames = subset_of_subset.get_filenames()
+        self.assertFalse(subset_of_subset.is_view())
+        self.assertTrue(all(filename.parent == path / "subset_of_subset" for filename in filenames))
+        self.assertEqual(["7", "25", "28"], [sequence.identifier for sequence in subset_of_subset.get_data()])
+
+        shutil.rmtree(path)
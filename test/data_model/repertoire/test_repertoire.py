@@ -1,4 +1,5 @@
 import os
+import pickle
 import shutil
 from unittest import TestCase
 
@@ -92,3 +93,53 @@ class TestRepertoire(TestCase):
         self.assertEqual(2, len(cells))
 
         shutil.rmtree(path)
+
+    def test_columnar_storage(self):
+        path = EnvironmentSettings.tmp_test_path / "columnar_repertoire/"
+        PathBuilder.build(path)
+
+        obj = Repertoire.build(sequence_aas=["AAA", "CCCC", "DD"], v_genes=["V1", None, "V1"], chains=["TRB", "TRB", "TRA"],
+                               counts=[3, None, 1], custom_lists={"score": [0.5, 1.5, 2.5]}, path=path, metadata={"cmv": "yes"})
+
+        self.assertTrue(obj.is_columnar())
+        self.assertTrue(isinstance(obj.get_sequence_aas(), np.memmap))
+        self.assertListEqual(["AAA", "CCCC", "DD"], obj.get_sequence_aas().tolist())
+        self.assertListEqual(["V1", None, "V1"], obj.get_v_genes().tolist())
+        self.assertListEqual([3, None, 1], obj.get_attribute("counts").tolist())
+        self.assertListEqual([0.5, 1.5, 2.5], obj.get_attribute("score").tolist())
+        self.assertListEqual([Chain.BETA, Chain.BETA, Chain.ALPHA], obj.get_chains().tolist())
+        self.assertEqual(3, obj.get_element_count())
+        self.assertIsNone(obj.get_attribute("j_genes"))
+
+        subset = Repertoire.build_like(obj, [0, 2], path / "subset")
+        self.assertListEqual(["AAA", "DD"], subset.get_sequence_aas().tolist())
+        self.assertListEqual(["TRB", "TRA"], subset.get_attribute("chains").tolist())
+        self.assertListEqual([3, 1], subset.get_counts().tolist())
+
+        data = obj.load_data()
+        self.assertEqual(("AAA", "V1", "TRB", 3), (data[0]["sequence_aas"], data[0]["v_genes"], data[0]["chains"], data[0]["counts"]))
+
+        shutil.rmtree(path)
+
+    def test_convert_to_columnar(self):
+        path = EnvironmentSettings.tmp_test_path / "legacy_repertoire/"
+        PathBuilder.build(path)
+
+        data = np.array([("AAA", "V1", 5), ("CCC", None, 2)], dtype=[("sequence_aas", object), ("v_genes", object), ("counts", object)])
+        np.save(str(path / "legacy.npy"), data)
+        with (path / "legacy_metadata.pickle").open("wb") as file:
+            pickle.dump({"field_list": ["sequence_aas", "v_genes", "counts"], "cmv": "no"}, file)
+
+        legacy = Repertoire(path / "legacy.npy", path / "legacy_metadata.pickle", "1")
+        self.assertFalse(legacy.is_columnar())
+        self.assertListEqual(["AAA", "CCC"], legacy.get_sequence_aas().tolist())
+
+        converted = Repertoire.convert_to_columnar(legacy, path / "converted")
+        self.assertTrue(converted.is_columnar())
+        self.assertEqual("1", converted.identifier)
+        self.assertEqual("no", converted.metadata["cmv"])
+        self.assertListEqual(["AAA", "CCC"], converted.get_sequence_aas().tolist())
+        self.assertListEqual(["V1", None], converted.get_v_genes().tolist())
+        self.assertListEqual([5, 2], converted.get_counts().tolist())
+
+        shutil.rmtree(path)
@@ -3,6 +3,8 @@ import shutil
 from pathlib import Path
 from unittest import TestCase
 
+import h5py
+import numpy as np
 import pandas as pd
 
 from immuneML.caching.CacheType import CacheType
@@ -49,12 +51,65 @@ class TestDeepRCEncoder(TestCase):
         self.assertTrue(os.path.isfile(encoded.encoded_data.info["metadata_filepath"]))
 
         metadata_content = pd.read_csv(encoded.encoded_data.info["metadata_filepath"], sep="\t")
-        self.assertListEqual(list(metadata_content["ID"]), sub_dataset.get_repertoire_ids())
+        self.assertListEqual(list(metadata_content["ID"]), main_dataset.get_repertoire_ids())
+        self.assertListEqual(list(metadata_content["ID"].values[encoded.encoded_data.info["example_indices"]]), sub_dataset.get_repertoire_ids())
+        self.assertEqual(1, encoded.encoded_data.info["max_sequence_length"])
 
         for repertoire in main_dataset.repertoires:
-            rep_path = path / f"encoded_data/encoding/{repertoire.identifier}.tsv"
+            rep_path = encoded.encoded_data.info["metadata_filepath"].parent / f"{repertoire.identifier}.tsv"
             self.assertTrue(os.path.isfile(rep_path))
             repertoire_tsv = pd.read_csv(rep_path, sep="\t")
             self.assertListEqual(list(repertoire_tsv["amino_acid"]), list(repertoire.get_sequence_aas()))
 
+        test_dataset = main_dataset.make_subset([3, 2], path=path, dataset_type="subset")
+        encoded_test = enc.encode(test_dataset, EncoderParams(result_path=path / "encoded_test_data/",
+                                                              label_config=LabelConfiguration([Label("l1", [0, 1]), Label("l2", [2, 3])]),
+                                                              pool_size=4, learn_model=False))
+
+        self.assertEqual(encoded.encoded_data.info["metadata_filepath"], encoded_test.encoded_data.info["metadata_filepath"])
+        self.assertListEqual([3, 2], list(encoded_test.encoded_data.info["example_indices"]))
+
+        shutil.rmtree(path)
+
+    def test_export_hdf5_file(self):
+        path = EnvironmentSettings.tmp_test_path / "deeprc_encoder_hdf5/"
+        PathBuilder.build(path)
+
+        repertoires, metadata = RepertoireBuilder.build([["CAS", "CASSW"], ["W"], ["G"], ["ACDEFGHIKLMNPQRSTVWY", "YY", "CAS"]], path,
+                                                      {"l1": [1, 0, 1, 0]}, seq_metadata=[[{"count": 3}, {"count": 5}], [{"count": 1}], [{"count": 9}],
+                                                                                          [{"count": 2}, {"count": 4}, {"count": 7}]])
+        dataset = RepertoireDataset(repertoires=repertoires, metadata_file=metadata)
+
+        encoded = DeepRCEncoder.build_object(dataset).encode(dataset, EncoderParams(result_path=path / "encoded_data/",
+                                                                                    label_config=LabelConfiguration([Label("l1", [0, 1])]),
+                                                                                    pool_size=4))
+        hdf5_filepath = path / "dataset.hdf5"
+        DeepRCEncoder.export_hdf5_file(encoded.encoded_data.info["metadata_filepath"], "l1", hdf5_filepath)
+
+        alphabet = "ACDEFGHIKLMNPQRSTVWY"
+
+        with h5py.File(str(hdf5_filepath), "r") as hf:
+            self.assertEqual(4, hf["metadata"]["n_samples"][()])
+            self.assertListEqual([f"{identifier}.tsv" for identifier in dataset.get_repertoire_ids()],
+                                 [key.decode() if isinstance(key, bytes) else key for key in hf["metadata"]["sample_keys"][:]])
+            self.assertListEqual(["1", "0", "1", "0"],
+                                 [value.decode() if isinstance(value, bytes) else value for value in hf["metadata"]["target_features"][:, 0]])
+            self.assertEqual(alphabet, hf["metadata"]["aas"][()].decode())
+
+            start_end = hf["sampledata"]["sample_sequences_start_end"][:]
+            seq_lens = hf["sampledata"]["seq_lens"][:]
+            counts = hf["sampledata"]["counts_per_sequence"][:]
+            amino_acid_sequences = hf["sampledata"]["amino_acid_sequences"][:]
+
+        self.assertListEqual([[0, 2], [2, 3], [3, 4], [4, 7]], start_end.tolist())
+        self.assertEqual((7, 20), amino_acid_sequences.shape)
+        self.assertListEqual([3, 5, 1, 9, 2, 4, 7], counts.tolist())
+
+        for index, repertoire in enumerate(dataset.repertoires):
+            start, end = start_end[index]
+            sequences = ["".join(alphabet[aa_index] for aa_index in amino_acid_sequences[i, :seq_lens[i]]) for i in range(start, end)]
+            self.assertListEqual(list(repertoire.get_sequence_aas()), sequences)
+
+        self.assertTrue(np.all((amino_acid_sequences == -1) == (np.arange(20) >= seq_lens[:, np.newaxis])))
+
         shutil.rmtree(path)
@@ -2,7 +2,9 @@ import os
 import shutil
 from unittest import TestCase
 
+import fisher
 import numpy as np
+from scipy import sparse
 
 from immuneML.caching.CacheType import CacheType
 from immuneML.data_model.dataset.RepertoireDataset import RepertoireDataset
@@ -139,3 +141,32 @@ class TestEmersonSequenceAbundanceEncoder(TestCase):
                          0.8333333333333331, 1., 1., 2], p_values, equal_nan=True))
 
         shutil.rmtree(path)
+
+    def test_find_label_associated_sequence_p_values_sparse(self):
+        path = EnvironmentSettings.tmp_test_path / "comparison_data_find_label_assocseqpvalues_sparse/"
+        PathBuilder.build(path)
+
+        labels = [True, False, True, True, False, False, True, False]
+        repertoires = [Repertoire.build_from_sequence_objects([ReceptorSequence()], path, {"l1": val, "subject_id": f"rep_{index}"})
+                       for index, val in enumerate(labels)]
+
+        matrix = (np.random.RandomState(1).rand(200, len(labels)) < 0.3).astype(float)
+        comparison_data = ComparisonData(repertoire_ids=[repertoire.identifier for repertoire in repertoires],
+                                         comparison_attributes=["sequence_aas"], sequence_batch_size=50, path=path)
+        comparison_data.store_matrix([(f"S{index}",) for index in range(matrix.shape[0])], sparse.csc_matrix(matrix))
+
+        label = Label('l1', [True, False], positive_class=True)
+        p_values = SequenceFilterHelper.find_label_associated_sequence_p_values(comparison_data, repertoires, label)
+
+        is_first_class = np.array(labels)
+        expected = [fisher.pvalue(np.sum(vector[is_first_class]), np.sum(vector[~is_first_class]), np.sum(vector[is_first_class] == 0),
+                                  np.sum(vector[~is_first_class] == 0)).right_tail if vector.sum() > 1 else SequenceFilterHelper.INVALID_P_VALUE
+                    for vector in matrix]
+
+        self.assertTrue(np.allclose(expected, p_values))
+
+        p_values = SequenceFilterHelper.find_label_associated_sequence_p_values(comparison_data, repertoires, label, min_count=3)
+        self.assertTrue(np.all(p_values[matrix.sum(axis=1) < 3] == SequenceFilterHelper.INVALID_P_VALUE))
+        self.assertTrue(np.allclose(np.array(expected)[matrix.sum(axis=1) >= 3], p_values[matrix.sum(axis=1) >= 3]))
+
+        shutil.rmtree(path)
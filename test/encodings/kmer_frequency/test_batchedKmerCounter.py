@@ -0,0 +1,44 @@
+from collections import Counter
+from unittest import TestCase
+
+import numpy as np
+
+from immuneML.data_model.receptor.receptor_sequence.ReceptorSequence import ReceptorSequence
+from immuneML.encodings.EncoderParams import EncoderParams
+from immuneML.encodings.kmer_frequency.BatchedKmerCounter import BatchedKmerCounter
+from immuneML.encodings.kmer_frequency.sequence_encoding.SequenceEncodingType import SequenceEncodingType
+from immuneML.environment.LabelConfiguration import LabelConfiguration
+from immuneML.util.ReflectionHandler import ReflectionHandler
+
+
+class TestBatchedKmerCounter(TestCase):
+
+    def test_count(self):
+        sequences = np.array(["CASSPRERATYEQCAY", "AHCDE", "CASSLGQAYEQYF", "AC", "CASSPRERATYEQCAY"])
+        weights = np.array([2, 1, 3, 5, 1])
+
+        for sequence_encoding, params in [(SequenceEncodingType.IDENTITY, {}),
+                                          (SequenceEncodingType.CONTINUOUS_KMER, {"k": 3}),
+                                          (SequenceEncodingType.IMGT_CONTINUOUS_KMER, {"k": 3}),
+                                          (SequenceEncodingType.GAPPED_KMER, {"k_left": 2, "k_right": 1, "min_gap": 0, "max_gap": 2}),
+                                          (SequenceEncodingType.IMGT_GAPPED_KMER, {"k_left": 1, "k_right": 1, "min_gap": 1, "max_gap": 2})]:
+
+            sequence_encoder = ReflectionHandler.get_class_by_name(sequence_encoding.value, "encodings/")
+            expected = Counter()
+            for sequence, weight in zip(sequences, weights):
+                features = sequence_encoder.encode_sequence(ReceptorSequence(amino_acid_sequence=sequence),
+                                                            EncoderParams(result_path="", label_config=LabelConfiguration(), model=params))
+                for feature in features if features is not None else []:
+                    expected[feature] += weight
+
+            features, counts = BatchedKmerCounter(sequence_encoding, **params).count(sequences, weights)
+
+            self.assertListEqual(sorted(expected.keys()), features.tolist())
+            self.assertListEqual([expected[feature] for feature in features], counts.tolist())
+
+    def test_count_identity_with_metadata(self):
+        counter = BatchedKmerCounter(SequenceEncodingType.IDENTITY, metadata_fields_to_include=["v_gene"])
+        features, counts = counter.count(np.array(["AAA", "AAA", "CCC", None], dtype=object), metadata={"v_gene": np.array(["V1", "V2", "V1", "V1"])})
+
+        self.assertListEqual(["AAA///V1", "AAA///V2", "CCC///V1"], features.tolist())
+        self.assertListEqual([1, 1, 1], counts.tolist())
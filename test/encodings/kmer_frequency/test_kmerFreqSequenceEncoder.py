@@ -81,3 +81,37 @@ class TestKmerFreqSequenceEncoder(TestCase):
         self.assertTrue(numpy.array_equal(encoded_dataset.encoded_data.examples[0].A, encoded_dataset.encoded_data.examples[3].A))
 
         shutil.rmtree(path)
+
+    def test_encode_view(self):
+        path = EnvironmentSettings.tmp_test_path / "kmerfreqseqencoder_view/"
+        PathBuilder.build(path)
+
+        sequences = [ReceptorSequence(amino_acid_sequence=sequence, identifier=str(index), metadata=SequenceMetadata(custom_params={"l1": index % 2}))
+                     for index, sequence in enumerate(["AAACCC", "ACACAC", "CCCAAA", "AAACCC", "ACACAC", "CCCAAA", "AAACCC"])]
+        dataset = SequenceDataset.build(sequences, file_size=3, path=path)
+        dataset.labels = {"l1": [0, 1]}
+        subset = dataset.make_subset([1, 2, 5, 6], path / "subset", SequenceDataset.TRAIN)
+
+        lc = LabelConfiguration()
+        lc.add_label("l1", [0, 1])
+
+        encoder = KmerFreqSequenceEncoder.build_object(subset, **{
+                "normalization_type": NormalizationType.RELATIVE_FREQUENCY.name,
+                "reads": ReadsType.UNIQUE.name,
+                "sequence_encoding": SequenceEncodingType.CONTINUOUS_KMER.name,
+                "sequence_type": SequenceType.AMINO_ACID.name,
+                "k": 3
+            })
+
+        encoded_dataset = encoder.encode(subset, EncoderParams(result_path=path / "encoded/", label_config=lc, pool_size=2, learn_model=True,
+                                                               model={}, filename="dataset.csv"))
+
+        self.assertEqual(["1", "2", "5", "6"], list(encoded_dataset.encoded_data.example_ids))
+        self.assertEqual([1, 0, 1, 0], encoded_dataset.encoded_data.labels["l1"])
+        self.assertTrue(subset.is_view())
+        self.assertTrue(encoded_dataset.is_view())
+        self.assertEqual(dataset.get_filenames(), encoded_dataset.get_filenames())
+        self.assertFalse((path / "subset").exists())
+        self.assertEqual(0, len(list(path.glob("**/*_batch*.pkl"))))
+
+        shutil.rmtree(path)
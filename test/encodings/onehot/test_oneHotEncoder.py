@@ -2,6 +2,9 @@ import os
 import shutil
 import unittest
 
+import numpy as np
+from scipy.sparse import issparse
+
 from immuneML.caching.CacheType import CacheType
 from immuneML.data_model.dataset.RepertoireDataset import RepertoireDataset
 from immuneML.data_model.receptor.receptor_sequence.ReceptorSequence import ReceptorSequence
@@ -9,6 +12,7 @@ from immuneML.data_model.receptor.receptor_sequence.ReceptorSequenceList import
 from immuneML.data_model.repertoire.Repertoire import Repertoire
 from immuneML.encodings.EncoderParams import EncoderParams
 from immuneML.encodings.onehot.OneHotEncoder import OneHotEncoder
+from immuneML.encodings.onehot.OneHotFeatureNames import OneHotFeatureNames
 from immuneML.environment.Constants import Constants
 from immuneML.environment.EnvironmentSettings import EnvironmentSettings
 from immuneML.environment.LabelConfiguration import LabelConfiguration
@@ -213,4 +217,40 @@ class TestOneHotEncoder(unittest.TestCase):
 
         self.assertListEqual(list(encoded_data.encoded_data.feature_names), [f"{seq}_{pos}_{char}" for seq in range(3) for pos in range(4) for char in EnvironmentSettings.get_sequence_alphabet()])
 
-        shutil.rmtree(path)
\ No newline at end of file
+        shutil.rmtree(path)
+
+    def test_repertoire_sparse(self):
+        path = EnvironmentSettings.root_path / "test/tmp/onehot_rep_sparse/"
+
+        PathBuilder.build(path)
+
+        for positional in [False, True]:
+            dataset, lc = self._construct_test_repertoiredataset(path, positional=positional)
+
+            encoded = {}
+            for sparse in [False, True]:
+                encoder = OneHotEncoder.build_object(dataset, **{"use_positional_info": positional, "distance_to_seq_middle": 6,
+                                                                 "flatten": True, "sparse": sparse})
+
+                encoded[sparse] = encoder.encode(dataset, EncoderParams(result_path=path / f"{positional}_{sparse}", label_config=lc,
+                                                                        pool_size=1, learn_model=True, model={},
+                                                                        filename="dataset.pkl")).encoded_data
+
+            self.assertTrue(issparse(encoded[True].examples))
+            self.assertTrue(np.allclose(encoded[False].examples, encoded[True].examples.toarray()))
+            self.assertIsInstance(encoded[True].feature_names, OneHotFeatureNames)
+            self.assertEqual(encoded[True].examples.shape[1], len(encoded[True].feature_names))
+            self.assertListEqual(encoded[False].feature_names, list(encoded[True].feature_names))
+            self.assertListEqual(encoded[False].feature_names[-3:], encoded[True].feature_names[-3:])
+            self.assertEqual(encoded[True].feature_names, encoded[False].feature_names)
+            self.assertEqual(len(encoded[False].feature_names) - 1, encoded[True].feature_names.index(encoded[False].feature_names[-1]))
+            self.assertRaises(ValueError, encoded[True].feature_names.index, "3_0_A")
+            self.assertDictEqual(encoded[False].labels, encoded[True].labels)
+            self.assertListEqual([[len(sequence) for sequence in repertoire.get_sequence_aas()] for repertoire in dataset.get_data()],
+                                 [list(lengths) for lengths in encoded[True].info["sequence_lengths"]])
+
+        self.assertRaises(AssertionError, OneHotEncoder.build_object, dataset, **{"use_positional_info": False,
+                                                                                  "distance_to_seq_middle": None,
+                                                                                  "flatten": False, "sparse": True})
+
+        shutil.rmtree(path)
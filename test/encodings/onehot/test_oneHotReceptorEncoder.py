@@ -1,6 +1,9 @@
 import shutil
+from pathlib import Path
 from unittest import TestCase
 
+import numpy as np
+
 from immuneML.data_model.dataset.ReceptorDataset import ReceptorDataset
 from immuneML.data_model.receptor.TCABReceptor import TCABReceptor
 from immuneML.data_model.receptor.receptor_sequence.ReceptorSequence import ReceptorSequence
@@ -111,4 +114,50 @@ class TestOneHotSequenceEncoder(TestCase):
 
         self.assertListEqual(list(encoded_data.encoded_data.feature_names), [f"{chain}_{pos}_{char}" for chain in ("alpha","beta") for pos in range(6) for char in EnvironmentSettings.get_sequence_alphabet()])
 
-        shutil.rmtree(path)
\ No newline at end of file
+        shutil.rmtree(path)
+
+    def test_receptor_sparse(self):
+        path = EnvironmentSettings.tmp_test_path / "onehot_recep_sparse/"
+        PathBuilder.build(path)
+
+        dataset, lc = self._construct_test_dataset(path)
+
+        encoded = {}
+        for sparse in [False, True]:
+            encoder = OneHotEncoder.build_object(dataset, **{"use_positional_info": False, "distance_to_seq_middle": None, "flatten": True,
+                                                             "sparse": sparse})
+            encoded[sparse] = encoder.encode(dataset, EncoderParams(result_path=path / f"encoded_{sparse}", label_config=lc, pool_size=1,
+                                                                    learn_model=True, model={}, filename="dataset.pkl")).encoded_data
+
+        self.assertListEqual(encoded[False].examples.tolist(), encoded[True].examples.toarray().tolist())
+        self.assertListEqual(encoded[False].feature_names, encoded[True].feature_names)
+
+        shutil.rmtree(path)
+
+    def test_receptor_memmap(self):
+        path = EnvironmentSettings.tmp_test_path / "onehot_recep_memmap/"
+        PathBuilder.build(path)
+
+        sequences = [("AAAA", "ATA"), ("ATA", "ATT"), ("CASS", "CA"), ("CW", "WWWWW"), ("GGG", "AC")]
+        receptors = [TCABReceptor(alpha=ReceptorSequence(amino_acid_sequence=alpha), beta=ReceptorSequence(amino_acid_sequence=beta),
+                                  metadata={"l1": index % 2}, identifier=str(index)) for index, (alpha, beta) in enumerate(sequences)]
+        dataset = ReceptorDataset.build(receptors, 2, PathBuilder.build(path / "dataset"))
+        lc = LabelConfiguration([Label("l1", [0, 1])])
+
+        for use_positional_info in [False, True]:
+            encoder = OneHotEncoder.build_object(dataset, **{"use_positional_info": use_positional_info, "distance_to_seq_middle": 2,
+                                                             "flatten": False})
+            encoded = encoder._encode_data(dataset, EncoderParams(result_path=path / f"encoded_{use_positional_info}", label_config=lc,
+                                                                  pool_size=1, learn_model=True, model={}, filename="dataset.pkl"))
+
+            self.assertIsInstance(encoded.examples, np.memmap)
+            self.assertEqual(path / f"encoded_{use_positional_info}", Path(encoded.examples.filename).parent)
+
+            expected = np.stack([encoder._encode_sequence_list([alpha for alpha, beta in sequences], pad_n_sequences=5, pad_sequence_len=5),
+                                 encoder._encode_sequence_list([beta for alpha, beta in sequences], pad_n_sequences=5, pad_sequence_len=5)],
+                                axis=1)
+            self.assertTrue(np.array_equal(expected, encoded.examples))
+            self.assertListEqual([0, 1, 0, 1, 0], encoded.labels["l1"])
+            self.assertListEqual(["alpha", "beta"], encoded.info["chain_names"])
+
+        shutil.rmtree(path)
@@ -1,6 +1,8 @@
 import shutil
 from unittest import TestCase
 
+import numpy as np
+
 from immuneML.data_model.dataset.SequenceDataset import SequenceDataset
 from immuneML.data_model.receptor.receptor_sequence.ReceptorSequence import ReceptorSequence
 from immuneML.data_model.receptor.receptor_sequence.SequenceMetadata import SequenceMetadata
@@ -101,5 +103,22 @@ class TestOneHotSequenceEncoder(TestCase):
         self.assertListEqual(list(encoded_data.encoded_data.feature_names), [f"{pos}_{char}" for pos in range(6) for char in EnvironmentSettings.get_sequence_alphabet()])
         shutil.rmtree(path)
 
+    def test_sequence_sparse(self):
+        path = EnvironmentSettings.tmp_test_path / "onehot_seq_sparse/"
+        PathBuilder.build(path)
+
+        dataset, lc = self._construct_test_dataset(path)
+
+        encoded = {}
+        for sparse in [False, True]:
+            encoder = OneHotEncoder.build_object(dataset, **{"use_positional_info": True, "distance_to_seq_middle": 2, "flatten": True,
+                                                             "sparse": sparse})
+            encoded[sparse] = encoder.encode(dataset, EncoderParams(result_path=path / f"encoded_{sparse}", label_config=lc, pool_size=1,
+                                                                    learn_model=True, model={}, filename="dataset.pkl")).encoded_data
 
+        self.assertTrue(np.allclose(encoded[False].examples, encoded[True].examples.toarray()))
+        self.assertEqual(np.count_nonzero(encoded[False].examples), encoded[True].examples.nnz)
+        self.assertListEqual([4, 3, 3], list(encoded[True].info["sequence_lengths"]))
+        self.assertDictEqual(encoded[False].labels, encoded[True].labels)
 
+        shutil.rmtree(path)
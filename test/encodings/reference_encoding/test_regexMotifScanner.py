@@ -0,0 +1,21 @@
+import random
+import re
+from unittest import TestCase
+
+from immuneML.encodings.reference_encoding.RegexMotifScanner import RegexMotifScanner
+
+
+class TestRegexMotifScanner(TestCase):
+
+    def test_scan(self):
+        regexes = ["AC", "ACG", "AC", "G.A", "^CA", "[DE]{2}", "Q", "ACGT$", "GG.*A"]
+        scanner = RegexMotifScanner(regexes)
+
+        self.assertEqual([0, 1, 2, 3], scanner.scan("TACGAA"))
+        self.assertEqual([], scanner.scan(""))
+
+        random.seed(1)
+        for _ in range(200):
+            sequence = "".join(random.choices("ACGTDEQ", k=random.randint(0, 12)))
+            expected = [index for index, regex in enumerate(regexes) if re.search(regex, sequence) is not None]
+            self.assertEqual(expected, scanner.scan(sequence))
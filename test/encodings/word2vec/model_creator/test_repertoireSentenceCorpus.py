@@ -0,0 +1,31 @@
+import shutil
+from unittest import TestCase
+
+from immuneML.data_model.dataset.RepertoireDataset import RepertoireDataset
+from immuneML.data_model.receptor.receptor_sequence.ReceptorSequence import ReceptorSequence
+from immuneML.data_model.repertoire.Repertoire import Repertoire
+from immuneML.encodings.word2vec.model_creator.RepertoireSentenceCorpus import RepertoireSentenceCorpus
+from immuneML.environment.EnvironmentSettings import EnvironmentSettings
+from immuneML.util.PathBuilder import PathBuilder
+
+
+class TestRepertoireSentenceCorpus(TestCase):
+    def test_iter(self):
+        path = EnvironmentSettings.tmp_test_path / "w2v_sentence_corpus/"
+        PathBuilder.build(path)
+
+        rep1 = Repertoire.build_from_sequence_objects([ReceptorSequence("CASS", identifier="1"), ReceptorSequence("CAT", identifier="2")],
+                                                      metadata={"subject_id": "1"}, path=path)
+        rep2 = Repertoire.build_from_sequence_objects([ReceptorSequence("CASSV", identifier="3")], metadata={"subject_id": "2"}, path=path)
+
+        corpus = RepertoireSentenceCorpus(RepertoireDataset(repertoires=[rep1, rep2]), k=3, batch_size=2)
+
+        expected = [["CAS", "ASS"], ["CAT"], ["CAS", "ASS", "SSV"]]
+        self.assertIsNone(corpus.get_sentence_count())
+        self.assertEqual([expected[:2], expected[2:]], list(corpus.get_repertoire_sentences()))
+        self.assertEqual(3, corpus.get_sentence_count())
+        self.assertEqual(expected, list(corpus))
+        self.assertEqual(expected, list(corpus))
+        self.assertEqual(3, corpus.get_sentence_count())
+
+        shutil.rmtree(path)
@@ -0,0 +1,81 @@
+import os
+import shutil
+from unittest import TestCase
+
+from immuneML.caching.CacheType import CacheType
+from immuneML.data_model.dataset.RepertoireDataset import RepertoireDataset
+from immuneML.encodings.kmer_frequency.KmerFrequencyEncoder import KmerFrequencyEncoder
+from immuneML.environment.Constants import Constants
+from immuneML.environment.EnvironmentSettings import EnvironmentSettings
+from immuneML.environment.Label import Label
+from immuneML.environment.LabelConfiguration import LabelConfiguration
+from immuneML.environment.Metric import Metric
+from immuneML.hyperparameter_optimization.HPSetting import HPSetting
+from immuneML.hyperparameter_optimization.config.ReportConfig import ReportConfig
+from immuneML.hyperparameter_optimization.config.SplitConfig import SplitConfig
+from immuneML.hyperparameter_optimization.config.SplitType import SplitType
+from immuneML.hyperparameter_optimization.core.MLProcessScheduler import MLProcessScheduler
+from immuneML.hyperparameter_optimization.strategy.GridSearch import GridSearch
+from immuneML.ml_methods.LogisticRegression import LogisticRegression
+from immuneML.ml_methods.SVM import SVM
+from immuneML.util.PathBuilder import PathBuilder
+from immuneML.util.RepertoireBuilder import RepertoireBuilder
+from immuneML.workflows.instructions.TrainMLModelInstruction import TrainMLModelInstruction
+
+
+class TestMLProcessScheduler(TestCase):
+
+    def setUp(self) -> None:
+        os.environ[Constants.CACHE_TYPE] = CacheType.TEST.name
+
+    def test_add_step(self):
+        scheduler = MLProcessScheduler(number_of_processes=4, number_of_processes_per_job=3)
+        self.assertEqual(1, scheduler.parallel_job_count)
+
+        scheduler.add_step("a", lambda results: 1)
+        scheduler.add_step("b", lambda results: results["a"] + 1, ["a"])
+        self.assertRaises(AssertionError, scheduler.add_step, "c", lambda results: 0, ["d"])
+        self.assertRaises(AssertionError, scheduler.add_step, "a", lambda results: 0)
+
+        self.assertEqual({"a": 1, "b": 2}, scheduler.run())
+
+    def run_instruction(self, path, number_of_processes_per_job: int):
+        repertoires, metadata = RepertoireBuilder.build(sequences=[["AAA", "CCC"], ["DDD", "EEE"], ["AAA", "EEE"], ["DDD", "CCC"]] * 10,
+                                                        path=path / "data", labels={"l1": [1, 2, 1, 2] * 10, "l2": [0, 1, 1, 0] * 10})
+        dataset = RepertoireDataset(repertoires=repertoires, metadata_file=metadata, labels={"l1": [1, 2], "l2": [0, 1]})
+
+        encoder_params = {"normalization_type": "relative_frequency", "reads": "unique", "sequence_encoding": "continuous_kmer",
+                          "sequence_type": "amino_acid", "k": 2, "scale_to_unit_variance": False, "scale_to_zero_mean": False}
+        hp_settings = [HPSetting(KmerFrequencyEncoder.build_object(dataset, **encoder_params), encoder_params, ml_method, ml_params=
+                                 {"model_selection_cv": False, "model_selection_n_folds": -1}, preproc_sequence=[], encoder_name="e1",
+                                 ml_method_name=name)
+                       for name, ml_method in [("lr", LogisticRegression()), ("svm", SVM())]]
+
+        instruction = TrainMLModelInstruction(dataset, GridSearch(hp_settings), hp_settings,
+                                              SplitConfig(SplitType.K_FOLD, 2, reports=ReportConfig()),
+                                              SplitConfig(SplitType.K_FOLD, 2, reports=ReportConfig()),
+                                              {Metric.BALANCED_ACCURACY}, Metric.BALANCED_ACCURACY,
+                                              LabelConfiguration([Label("l1", [1, 2]), Label("l2", [0, 1])]), path,
+                                              number_of_processes=2, number_of_processes_per_job=number_of_processes_per_job)
+
+        return instruction.run(result_path=path / "result")
+
+    def test_run_assessment(self):
+        path = EnvironmentSettings.tmp_test_path / "ml_process_scheduler/"
+        PathBuilder.build(path)
+
+        for number_of_processes_per_job in [1, None]:
+            state = self.run_instruction(path / f"run_{number_of_processes_per_job}", number_of_processes_per_job)
+
+            self.assertEqual(2, len(state.assessment_states))
+            for assessment_state in state.assessment_states:
+                for label in ["l1", "l2"]:
+                    label_state = assessment_state.label_states[label]
+                    self.assertEqual(["e1_lr", "e1_svm"], list(label_state.assessment_items.keys()))
+                    self.assertTrue(isinstance(label_state.optimal_assessment_item.performance["balanced_accuracy"], float))
+                    self.assertTrue(label_state.optimal_assessment_item.train_predictions_path.parent.name.endswith("_optimal"))
+                    for hp_items in label_state.selection_state.hp_items.values():
+                        self.assertEqual([1, 2], [hp_item.split_index for hp_item in hp_items])
+                        self.assertTrue(all(hp_item.performance is not None for hp_item in hp_items))
+
+        shutil.rmtree(path)
@@ -3,6 +3,7 @@ import shutil
 from unittest import TestCase
 
 import numpy as np
+import yaml
 
 from immuneML.caching.CacheType import CacheType
 from immuneML.data_model.encoded_data.EncodedData import EncodedData
@@ -42,6 +43,42 @@ class TestProbabilisticBinaryClassifier(TestCase):
         self.assertTrue((proba_predictions["cmv"] <= 1.0).all() and (proba_predictions["cmv"] >= 0.0).all())
         self.assertTrue(isinstance(labels, np.ndarray))
 
+    def test_fit_optimization_methods(self):
+        random_state = np.random.RandomState(1)
+        n = random_state.randint(500, 1000, 100)
+        k = random_state.binomial(n, np.where(np.arange(100) < 50, random_state.beta(2, 100, 100), random_state.beta(6, 100, 100)))
+        encoded_data = EncodedData(np.column_stack([k, n]), {"cmv": [False] * 50 + [True] * 50})
+
+        classifier = ProbabilisticBinaryClassifier(1000)
+        classifier.fit(encoded_data, "cmv")
+
+        k_is, n_is = classifier._perform_laplace_smoothing(k[:50], n[:50])
+        gradients = classifier._compute_log_likelihood_gradients(50, classifier.alpha_0, classifier.beta_0, k_is, n_is)
+        self.assertTrue(np.allclose([gradients[0] * classifier.alpha_0, gradients[1] * classifier.beta_0], 0, atol=1e-3))
+
+        predictions = classifier.predict(encoded_data, "cmv")["cmv"]
+        self.assertTrue(np.mean(np.array(predictions) == np.array(encoded_data.labels["cmv"])) > 0.7)
+        self.assertEqual((100, 2), classifier.predict_proba(encoded_data, "cmv")["cmv"].shape)
+
+        classifier = ProbabilisticBinaryClassifier(100, 0.01, optimization_method="gradient_ascent")
+        classifier.fit(encoded_data, "cmv")
+        self.assertEqual(100, len(classifier.predict(encoded_data, "cmv")["cmv"]))
+
+        self.assertRaises(AssertionError, ProbabilisticBinaryClassifier, 100, optimization_method="gradient_ascent")
+
+    def test_parameters_from_yaml(self):
+        params = yaml.safe_load("max_iterations: 1000\ntolerance: 1e-10\nlikelihood_threshold: -1e-10")
+        classifier = ProbabilisticBinaryClassifier(**params)
+        self.assertEqual("L-BFGS", classifier.optimization_method)
+        self.assertEqual(1e-10, classifier.tolerance)
+        self.assertEqual(-1e-10, classifier.likelihood_threshold)
+
+        classifier.fit(EncodedData(np.array([[3, 4], [1, 7], [5, 7], [3, 8]]), {"cmv": [True, False, True, False]}), "cmv")
+        self.assertEqual([True, False], classifier.predict(EncodedData(np.array([[6, 7], [1, 6]])), "cmv")["cmv"])
+
+        self.assertEqual("gradient_ascent", ProbabilisticBinaryClassifier(100, update_rate=0.01).optimization_method)
+        self.assertEqual("L-BFGS", ProbabilisticBinaryClassifier(100, update_rate=0.01, optimization_method="L-BFGS").optimization_method)
+
     def test_store(self):
 
         classifier = self.train_classifier()
@@ -5,6 +5,7 @@ from unittest import TestCase
 import numpy as np
 
 from immuneML.caching.CacheType import CacheType
+from immuneML.data_model.encoded_data.EncodedData import EncodedData
 from immuneML.encodings.EncoderParams import EncoderParams
 from immuneML.encodings.onehot.OneHotReceptorEncoder import OneHotReceptorEncoder
 from immuneML.environment.Constants import Constants
@@ -29,6 +30,8 @@ class TestReceptorCNN(TestCase):
                                                                    labels={"CMV": {True: 0.5, False: 0.5}}, path=path / "dataset")
         enc_dataset = OneHotReceptorEncoder(True, 1, False, "enc1").encode(dataset, EncoderParams(path / "result",
                                                                                            LabelConfiguration([Label("CMV", [True, False])])))
+        self.assertIsInstance(enc_dataset.encoded_data.examples, np.memmap)
+
         cnn = ReceptorCNN(kernel_count=2, kernel_size=[3], positional_channels=3, sequence_type="amino_acid", device="cpu",
                           number_of_threads=4, random_seed=1, learning_rate=0.01, iteration_count=10, l1_weight_decay=0.1, evaluate_at=5,
                           batch_size=100, training_percentage=0.8, l2_weight_decay=0.0)
@@ -60,3 +63,45 @@ class TestReceptorCNN(TestCase):
         self.assertEqual(vars(cnn), model)
 
         shutil.rmtree(path)
+
+    def test_fit_with_loader_workers(self):
+        path = PathBuilder.build(EnvironmentSettings.tmp_test_path / "cnn_loader_workers")
+
+        examples = np.zeros((100, 2, 4, 23), dtype=np.float32)
+        examples[:, :, np.arange(4), np.random.RandomState(1).randint(0, 20, size=(100, 2, 4))] = 1
+        np.save(path / "examples.npy", examples)
+
+        encoded_data = EncodedData(np.load(path / "examples.npy", mmap_mode="r"), labels={"CMV": [True, False] * 50},
+                                   example_ids=[str(i) for i in range(100)], info={"chain_names": ["alpha", "beta"]})
+
+        cnn = ReceptorCNN(kernel_count=2, kernel_size=[3], positional_channels=3, sequence_type="amino_acid", device="cpu",
+                          number_of_threads=1, random_seed=1, learning_rate=0.01, iteration_count=6, l1_weight_decay=0.1, evaluate_at=3,
+                          batch_size=30, training_percentage=0.7, l2_weight_decay=0.0, number_of_loader_workers=2)
+        cnn.fit(encoded_data=encoded_data, label_name="CMV")
+
+        predictions_proba = cnn.predict_proba(encoded_data, "CMV")["CMV"]
+        self.assertEqual((100, 2), predictions_proba.shape)
+
+        cnn.number_of_loader_workers = 0
+        self.assertTrue(np.allclose(predictions_proba, cnn.predict_proba(encoded_data, "CMV")["CMV"]))
+
+        shutil.rmtree(path)
+
+    def test_fit_with_flattened_encoding(self):
+        path = PathBuilder.build(EnvironmentSettings.tmp_test_path / "cnn_flattened")
+
+        dataset = RandomDatasetGenerator.generate_receptor_dataset(receptor_count=20, chain_1_length_probabilities={4: 1},
+                                                                   chain_2_length_probabilities={4: 1},
+                                                                   labels={"CMV": {True: 0.5, False: 0.5}}, path=path / "dataset")
+        cnn = ReceptorCNN(kernel_count=2, kernel_size=[3], positional_channels=3, sequence_type="amino_acid", device="cpu",
+                          number_of_threads=1, random_seed=1, learning_rate=0.01, iteration_count=2, l1_weight_decay=0.1, evaluate_at=1,
+                          batch_size=10, training_percentage=0.8, l2_weight_decay=0.0)
+
+        for sparse in [False, True]:
+            enc_dataset = OneHotReceptorEncoder(True, 1, True, f"enc_{sparse}", sparse=sparse)\
+                .encode(dataset, EncoderParams(path / f"result_{sparse}", LabelConfiguration([Label("CMV", [True, False])])))
+
+            with self.assertRaisesRegex(ValueError, "OneHot encoder with flatten and sparse set to False"):
+                cnn.fit(encoded_data=enc_dataset.encoded_data, label_name="CMV")
+
+        shutil.rmtree(path)
@@ -0,0 +1,118 @@
+import os
+import pickle
+import shutil
+import warnings
+from unittest import TestCase
+
+import numpy as np
+from scipy import sparse
+
+from immuneML.caching.CacheType import CacheType
+from immuneML.data_model.encoded_data.EncodedBatchGenerator import EncodedBatchGenerator
+from immuneML.data_model.encoded_data.EncodedData import EncodedData
+from immuneML.environment.Constants import Constants
+from immuneML.environment.EnvironmentSettings import EnvironmentSettings
+from immuneML.ml_methods.SGDClassifier import SGDClassifier
+from immuneML.ml_methods.SVM import SVM
+
+
+class TestSGDClassifier(TestCase):
+
+    def setUp(self) -> None:
+        os.environ[Constants.CACHE_TYPE] = CacheType.TEST.name
+
+    def make_encoded_data(self, example_count: int = 200):
+        random = np.random.RandomState(1)
+        x = random.normal(size=(example_count, 4))
+        y = np.where(x[:, 0] + x[:, 1] > 0, "a", "b")
+        return EncodedData(x, {"l1": y}, feature_names=["f1", "f2", "f3", "f4"])
+
+    def test_fit(self):
+        encoded_data = self.make_encoded_data()
+
+        sgd = SGDClassifier(parameters={"loss": "log_loss", "random_state": 1})
+        sgd.fit(encoded_data, "l1")
+
+        self.assertTrue(sgd.can_predict_proba())
+        self.assertEqual(200, len(sgd.predict(encoded_data, "l1")["l1"]))
+        self.assertEqual((200, 2), sgd.predict_proba(encoded_data, "l1")["l1"].shape)
+
+    def test_fit_incrementally(self):
+        encoded_data = self.make_encoded_data()
+
+        sgd = SGDClassifier(parameters={"random_state": 1, "batch_size": 30, "epochs": 20, "patience": 3})
+        self.assertEqual({"random_state": 1}, sgd._parameters)
+        sgd.fit(encoded_data, "l1")
+
+        predictions = sgd.predict(encoded_data, "l1")["l1"]
+        self.assertTrue(np.mean(predictions == encoded_data.labels["l1"]) > 0.9)
+        self.assertEqual(["f1", "f2", "f3", "f4"], sgd.feature_names)
+
+        sparse_data = EncodedData(sparse.coo_matrix(encoded_data.examples), encoded_data.labels, feature_names=encoded_data.feature_names)
+        sgd = SGDClassifier(parameters={"random_state": 1})
+        sgd.fit_incrementally(EncodedBatchGenerator.from_encoded_data(sparse_data, 50), "l1", ["a", "b"])
+
+        self.assertTrue(np.mean(sgd.predict(sparse_data, "l1")["l1"] == encoded_data.labels["l1"]) > 0.9)
+
+    def test_validation_examples(self):
+        encoded_data = self.make_encoded_data()
+        encoded_data.example_ids = [f"example_{index}" for index in range(200)]
+
+        sgd = SGDClassifier(parameters={"random_state": 1, "batch_size": 30, "validation_fraction": 0.2})
+        batches = list(EncodedBatchGenerator.from_encoded_data(encoded_data, 30)(np.random.RandomState(3)))
+        validation_ids = {example_id for batch in batches for example_id, is_validation
+                          in zip(batch.example_ids, sgd._get_validation_mask(batch)) if is_validation}
+
+        self.assertTrue(20 < len(validation_ids) < 60)
+        self.assertEqual(validation_ids, {example_id for batch in EncodedBatchGenerator.from_encoded_data(encoded_data, 50)()
+                                          for example_id, is_validation in zip(batch.example_ids, sgd._get_validation_mask(batch))
+                                          if is_validation})
+
+        sgd = SGDClassifier(parameters={"random_state": 1, "batch_size": 30, "patience": 2, "validation_fraction": 0.})
+        self.assertRaises(AssertionError, sgd.fit, encoded_data, "l1")
+
+    def test_warnings_are_restored(self):
+        python_warnings = os.environ.get("PYTHONWARNINGS", None)
+        filters = list(warnings.filters)
+
+        sgd = SGDClassifier(parameters={"random_state": 1, "max_iter": 1, "show_warnings": False})
+        sgd.fit(self.make_encoded_data(), "l1")
+
+        self.assertEqual(python_warnings, os.environ.get("PYTHONWARNINGS", None))
+        self.assertEqual(filters, warnings.filters)
+
+    def test_fit_by_cross_validation_with_batches(self):
+        sgd = SGDClassifier(parameter_grid={"alpha": [0.001, 0.01], "batch_size": [30]})
+        self.assertRaises(ValueError, sgd.fit_by_cross_validation, self.make_encoded_data(), 2, "l1", 1)
+
+    def test_incremental_training_parameters(self):
+        parameters = {"loss": "hinge", "batch_size": 30, "show_warnings": False}
+        parameter_grid = {"alpha": [0.001, 0.01], "epochs": [3]}
+        sgd = SGDClassifier(parameter_grid=parameter_grid, parameters=parameters)
+
+        self.assertEqual({"loss": "hinge", "batch_size": 30, "show_warnings": False}, parameters)
+        self.assertEqual({"alpha": [0.001, 0.01], "epochs": [3]}, parameter_grid)
+        self.assertEqual({"loss": "hinge"}, sgd._parameters)
+        self.assertEqual({"alpha": [0.001, 0.01]}, sgd._parameter_grid)
+        self.assertEqual((30, 3), (sgd.batch_size, sgd.epochs))
+
+        self.assertRaises(AssertionError, SGDClassifier, {"epochs": [3, 5]})
+
+    def test_fit_incrementally_unsupported(self):
+        svm = SVM(parameters={"batch_size": 10})
+        self.assertRaises(AssertionError, svm.fit, self.make_encoded_data(), "l1")
+
+    def test_store(self):
+        sgd = SGDClassifier()
+        sgd.fit(self.make_encoded_data(), "l1")
+
+        path = EnvironmentSettings.tmp_test_path / "sgd_classifier/"
+        sgd.store(path, ["f1", "f2", "f3", "f4"])
+
+        self.assertTrue(os.path.isfile(path / "sgd_classifier.pickle"))
+        with open(path / "sgd_classifier.pickle", "rb") as file:
+            model = pickle.load(file)
+
+        self.assertTrue(np.array_equal(sgd.model.coef_, model.coef_))
+
+        shutil.rmtree(path)
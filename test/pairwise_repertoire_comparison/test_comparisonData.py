@@ -6,11 +6,13 @@ import numpy as np
 import pandas as pd
 
 from immuneML.caching.CacheType import CacheType
+from immuneML.data_model.dataset.RepertoireDataset import RepertoireDataset
 from immuneML.environment.Constants import Constants
 from immuneML.environment.EnvironmentSettings import EnvironmentSettings
 from immuneML.pairwise_repertoire_comparison.ComparisonData import ComparisonData
 from immuneML.pairwise_repertoire_comparison.ComparisonDataBatch import ComparisonDataBatch
 from immuneML.util.PathBuilder import PathBuilder
+from immuneML.util.RepertoireBuilder import RepertoireBuilder
 
 
 class TestComparisonData(TestCase):
@@ -110,3 +112,39 @@ class TestComparisonData(TestCase):
         self.assertTrue("g" in [unique_items[0][0], unique_items[1][0]])
 
         shutil.rmtree(path)
+
+    def test_process_dataset(self):
+
+        path = EnvironmentSettings.tmp_test_path / "comparison_data_process_dataset/"
+        PathBuilder.build(path)
+
+        repertoires, metadata = RepertoireBuilder.build([["AAA", "CCC"], ["AAA", "DDD"], ["EEE"]], path=path)
+        dataset = RepertoireDataset(repertoires=repertoires, metadata_file=metadata)
+        repertoire_ids = dataset.get_repertoire_ids()
+
+        comparison_data = ComparisonData(repertoire_ids=repertoire_ids, comparison_attributes=["sequence_aas"], sequence_batch_size=2,
+                                         path=path, max_items_in_memory=3)
+        comparison_data.process_dataset(dataset)
+
+        self.assertTrue(comparison_data.is_sparse)
+        self.assertTrue((comparison_data.path / ComparisonData.MATRIX_FILE_NAME).is_file())
+        self.assertEqual(4, comparison_data.item_count)
+
+        items = [item[0] for item in comparison_data.get_item_names()]
+        self.assertCountEqual(["AAA", "CCC", "DDD", "EEE"], items)
+
+        expected = {"AAA": [1, 1, 0], "CCC": [1, 0, 0], "DDD": [0, 1, 0], "EEE": [0, 0, 1]}
+        item_vectors = list(comparison_data.get_item_vectors())
+        self.assertEqual(4, len(item_vectors))
+        for item, vector in zip(items, item_vectors):
+            self.assertListEqual(expected[item], vector.tolist())
+
+        repertoire_vectors = comparison_data.get_repertoire_vectors([repertoire_ids[1], repertoire_ids[0]])
+        self.assertListEqual([expected[item][1] for item in items], repertoire_vectors[repertoire_ids[1]].tolist())
+        self.assertListEqual([expected[item][0] for item in items], comparison_data.get_repertoire_vector(repertoire_ids[0]).tolist())
+        self.assertListEqual(expected[items[2]], comparison_data.get_item_vector(2).tolist())
+        self.assertEqual((4, 2), comparison_data.get_matrix([repertoire_ids[2], repertoire_ids[0]]).shape)
+
+        self.assertListEqual([2, 2], [batch.shape[0] for batch in comparison_data.get_batches(columns=[repertoire_ids[0]])])
+
+        shutil.rmtree(path)
@@ -0,0 +1,40 @@
+import shutil
+from unittest import TestCase
+
+import numpy as np
+
+from immuneML.environment.EnvironmentSettings import EnvironmentSettings
+from immuneML.pairwise_repertoire_comparison.ComparisonDataBuilder import ComparisonDataBuilder
+from immuneML.util.PathBuilder import PathBuilder
+
+
+class TestComparisonDataBuilder(TestCase):
+
+    def build_matrix(self, builder: ComparisonDataBuilder, repertoires: list) -> dict:
+        for index, items in enumerate(repertoires):
+            builder.add_repertoire(items, index)
+
+        items, matrix = builder.build(len(repertoires))
+        self.assertEqual(len(items), matrix.shape[0])
+        return {item: matrix[index].toarray().ravel().tolist() for index, item in enumerate(items)}
+
+    def test_build(self):
+        path = EnvironmentSettings.tmp_test_path / "comparison_data_builder/"
+        PathBuilder.build(path)
+
+        repertoires = [[("AAA", "V1"), ("CCC", "V1")], [("AAA", "V1"), ("AAA", "V2")], [], [("CCC", "V1"), ("DDD", "V3"), ("AAA", "V2")]]
+        expected = {("AAA", "V1"): [1, 1, 0, 0], ("CCC", "V1"): [1, 0, 0, 1], ("AAA", "V2"): [0, 1, 0, 1], ("DDD", "V3"): [0, 0, 0, 1]}
+
+        in_memory = self.build_matrix(ComparisonDataBuilder(path / "in_memory"), repertoires)
+        self.assertDictEqual(expected, in_memory)
+        self.assertFalse((path / "in_memory").is_dir())
+
+        spilled = self.build_matrix(ComparisonDataBuilder(path / "spilled", max_items_in_memory=2, partition_count=3), repertoires)
+        self.assertDictEqual(expected, spilled)
+        self.assertFalse((path / "spilled").is_dir())
+
+        items, matrix = ComparisonDataBuilder(path / "empty").build(2)
+        self.assertEqual(0, len(items))
+        self.assertTrue(np.array_equal((0, 2), matrix.shape))
+
+        shutil.rmtree(path)
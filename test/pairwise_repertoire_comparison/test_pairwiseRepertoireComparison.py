@@ -47,6 +47,23 @@ class TestPairwiseRepertoireComparison(TestCase):
 
         shutil.rmtree(path)
 
+    def test_compare_repertoires_batched(self):
+
+        path = EnvironmentSettings.tmp_test_path / "pairwise_comparison_reps_batched/"
+        PathBuilder.build(path)
+
+        dataset = self.create_dataset(path)
+
+        comparison = PairwiseRepertoireComparison(["sequence_aas"], ["sequence_aas"], path, 4, tile_size=2, pool_size=2)
+
+        expected = comparison.compare_repertoires(dataset, DistanceMetrics.jaccard)
+        result = comparison.compare_repertoires(dataset, None, DistanceMetrics.jaccard_from_set_sizes)
+
+        self.assertTrue(np.allclose(expected.values, result.values))
+        self.assertListEqual(dataset.get_repertoire_ids(), list(result.index))
+
+        shutil.rmtree(path)
+
     def test_comparison_data_io(self):
         path = EnvironmentSettings.tmp_test_path / "comparison_data_io/"
         PathBuilder.build(path)
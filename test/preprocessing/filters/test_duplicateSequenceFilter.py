@@ -2,6 +2,8 @@ import os
 import shutil
 from unittest import TestCase
 
+import numpy as np
+
 from immuneML.caching.CacheType import CacheType
 from immuneML.data_model.dataset.RepertoireDataset import RepertoireDataset
 from immuneML.data_model.receptor.receptor_sequence.Chain import Chain
@@ -66,3 +68,29 @@ class TestDuplicateSequenceFilter(TestCase):
         self.assertListEqual([5, 20, 20, 40], list(attr["counts"]))
 
         shutil.rmtree(path)
+
+    def test_count_aggregation(self):
+        path = EnvironmentSettings.tmp_test_path / "duplicatesequencefilter_count_agg/"
+        PathBuilder.build(path)
+
+        repertoire = Repertoire.build(sequence_aas=["AAA", "CCC", "AAA", "DDD", "CCC", "AAA", "EEE", None],
+                                      v_genes=["v1", "v1", "v1", "v1", "v1", "v1", "v1", "v1"],
+                                      counts=[4, None, 2, 7, None, 6, 1, 3],
+                                      sequence_identifiers=[1, 2, 3, 4, 5, 6, 7, 8], path=path)
+        dataset = RepertoireDataset(repertoires=[repertoire])
+
+        expected_counts = {CountAggregationFunction.SUM: [12, 0, 7, 1], CountAggregationFunction.MAX: [6, None, 7, 1],
+                           CountAggregationFunction.MIN: [2, None, 7, 1], CountAggregationFunction.MEAN: [4, None, 7, 1],
+                           CountAggregationFunction.FIRST: [4, None, 7, 1], CountAggregationFunction.LAST: [6, None, 7, 1]}
+
+        for count_agg, expected in expected_counts.items():
+            dupfilter = DuplicateSequenceFilter(filter_sequence_type=SequenceType.AMINO_ACID, count_agg=count_agg, batch_size=1)
+            reduced_repertoire = dupfilter.process_dataset(dataset=dataset,
+                                                           result_path=PathBuilder.build(path / count_agg.name)).repertoires[0]
+
+            self.assertListEqual(["AAA", "CCC", "DDD", "EEE"], list(reduced_repertoire.get_sequence_aas()))
+            self.assertListEqual([1, 2, 4, 7], list(reduced_repertoire.get_sequence_identifiers()))
+            self.assertListEqual(expected, [None if count is None or np.isnan(count) else count
+                                            for count in reduced_repertoire.get_attribute("counts")])
+
+        shutil.rmtree(path)
@@ -5,12 +5,14 @@ from unittest import TestCase
 import numpy as np
 import pandas as pd
 import yaml
-from scipy.sparse import csr_matrix
+from scipy.sparse import csr_matrix, issparse
 
 from immuneML.data_model.dataset.RepertoireDataset import RepertoireDataset
 from immuneML.data_model.encoded_data.EncodedData import EncodedData
+from immuneML.dev_util.util import load_design_matrix
 from immuneML.environment.EnvironmentSettings import EnvironmentSettings
 from immuneML.reports.encoding_reports.DesignMatrixExporter import DesignMatrixExporter
+from immuneML.util.PathBuilder import PathBuilder
 
 
 class TestDesignMatrixExporter(TestCase):
@@ -71,10 +73,10 @@ class TestDesignMatrixExporter(TestCase):
 
         report.file_format = 'npy'
         report._export_matrix()
-        self.assertTrue(os.path.isfile(path / "design_matrix.npy"))
+        self.assertTrue(os.path.isfile(path / "design_matrix.npz"))
         report.file_format = 'npy.zip'
         report._export_matrix()
-        self.assertTrue(os.path.isfile(path / "design_matrix.npy.zip"))
+        self.assertTrue(os.path.isfile(path / "design_matrix.npz.zip"))
 
         report.file_format = 'hdf5'
         report._export_matrix()
@@ -86,3 +88,39 @@ class TestDesignMatrixExporter(TestCase):
 
         with self.assertRaises(AssertionError):
             DesignMatrixExporter.build_object(**{'file_format': "random"})
+
+    def test_sparse_formats(self):
+        examples = csr_matrix(np.array([[0, 1, 0, 0], [0, 0, 0, 0], [2, 0, 0, 3]]))
+        dataset = RepertoireDataset(encoded_data=EncodedData(examples=examples, labels={"l1": [1, 0, 1]}, example_ids=[0, 1, 2],
+                                                             feature_names=["f1", "f2", "f3", "f4"], encoding="test_encoding"))
+
+        path = EnvironmentSettings.tmp_test_path / "designmatrixexporter_sparse/"
+        PathBuilder.build(path)
+
+        for file_format, compress, file_name in [('npz', False, 'design_matrix.npz'), ('npz', True, 'design_matrix.npz'),
+                                                 ('hdf5', False, 'design_matrix.hdf5'), ('hdf5', True, 'design_matrix.hdf5'),
+                                                 ('csv', True, 'design_matrix.csv.gz')]:
+            report = DesignMatrixExporter(dataset=dataset, result_path=path, name="design_matrix", file_format=file_format, compress=compress)
+            output = report._export_matrix()
+            self.assertEqual(path / file_name, output.path)
+
+            matrix = load_design_matrix(output.path)
+            if file_format != 'csv':
+                self.assertTrue(issparse(matrix))
+                matrix = matrix.toarray()
+            self.assertTrue(np.array_equal(examples.toarray(), matrix))
+
+        DesignMatrixExporter.CSV_CHUNK_SIZE = 2
+        report = DesignMatrixExporter(dataset=dataset, result_path=path, name="design_matrix", file_format='csv')
+        self.assertTrue(np.array_equal(examples.toarray(), load_design_matrix(report._export_matrix().path)))
+        DesignMatrixExporter.CSV_CHUNK_SIZE = 1000
+
+        dense_dataset = RepertoireDataset(encoded_data=EncodedData(examples=examples.toarray(), example_ids=[0, 1, 2],
+                                                                   feature_names=["f1", "f2", "f3", "f4"], encoding="test_encoding"))
+        for file_format in ['npz', 'hdf5']:
+            report = DesignMatrixExporter(dataset=dense_dataset, result_path=path, name="design_matrix", file_format=file_format)
+            self.assertTrue(np.array_equal(examples.toarray(), load_design_matrix(report._export_matrix().path)))
+
+        self.assertTrue(DesignMatrixExporter.build_object(**{'file_format': 'npz', 'name': 'report', 'compress': True}).compress)
+
+        shutil.rmtree(path)
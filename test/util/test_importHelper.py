@@ -0,0 +1,86 @@
+import shutil
+import warnings
+from unittest import TestCase
+
+import pandas as pd
+
+from immuneML.IO.dataset_import.DatasetImportParams import DatasetImportParams
+from immuneML.IO.dataset_import.GenericImport import GenericImport
+from immuneML.data_model.receptor.ChainPair import ChainPair
+from immuneML.data_model.receptor.ElementBatchFile import ElementBatchFile
+from immuneML.data_model.receptor.RegionType import RegionType
+from immuneML.data_model.receptor.TCABReceptor import TCABReceptor
+from immuneML.environment.EnvironmentSettings import EnvironmentSettings
+from immuneML.util.ImportHelper import ImportHelper
+from immuneML.util.PathBuilder import PathBuilder
+
+
+class TestImportHelper(TestCase):
+
+    def test_import_receptors(self):
+        df = pd.DataFrame({"receptor_identifiers": ["r1", "r2", "r1", "r3", "r2", "r1", "r4", "r4"],
+                           "chains": ["TRB", "TRA", "TRA", "TRA", "TRB", "TRA", "TRB", "TRB"],
+                           "sequence_aas": ["AAA", "CCC", "DDD", "EEE", "FFF", "GGG", "HHH", "III"],
+                           "sequence_identifiers": [str(i) for i in range(8)],
+                           "counts": [1, 2, 3, 4, 5, 6, 7, 8],
+                           "epitope": ["e1", "e2", "e1", "e3", "e2", "e1", "e4", "e4"]})
+        params = DatasetImportParams(receptor_chains=ChainPair.TRA_TRB, metadata_column_mapping={"epitope": "epitope"})
+
+        with warnings.catch_warnings(record=True) as caught_warnings:
+            warnings.simplefilter("always")
+            receptors = ImportHelper.import_receptors(df, params)
+
+        self.assertEqual(["r1", "r2"], [receptor.identifier for receptor in receptors])
+        self.assertTrue(all(isinstance(receptor, TCABReceptor) for receptor in receptors))
+        self.assertEqual(["DDD", "CCC"], [receptor.alpha.amino_acid_sequence for receptor in receptors])
+        self.assertEqual(["AAA", "FFF"], [receptor.beta.amino_acid_sequence for receptor in receptors])
+        self.assertEqual(3, receptors[0].alpha.metadata.count)
+        self.assertEqual({"epitope": "e2"}, receptors[1].metadata)
+
+        messages = [str(warning.message) for warning in caught_warnings]
+        self.assertEqual(3, len(messages))
+        self.assertTrue(messages[0].startswith("Multiple TRA chains found for 1 receptor(s) (e.g., with identifiers r1)"))
+        self.assertTrue(messages[1].startswith("Missing TRA chain for 1 receptor(s) (e.g., with identifiers r4)"))
+        self.assertTrue(messages[2].startswith("Missing TRB chain for 1 receptor(s) (e.g., with identifiers r3)"))
+        self.assertFalse(any(message.startswith("Multiple TRB chains") for message in messages))
+
+    def test_update_gene_info_and_load_chains(self):
+        df = pd.DataFrame({"v_alleles": ["TRBV1-2*01", None, "TRAV3*02"], "j_genes": ["TRBJ1-1", "TRBJ2-2", None]})
+
+        ImportHelper.update_gene_info(df)
+        ImportHelper.load_chains(df)
+
+        self.assertListEqual(["TRBV1-2", None, "TRAV3"], list(df["v_genes"]))
+        self.assertListEqual(["TRBV1", None, "TRAV3"], list(df["v_subgroups"]))
+        self.assertListEqual(["TRBJ1", "TRBJ2", None], list(df["j_subgroups"]))
+        self.assertListEqual(["TRB", "TRB", "TRA"], list(df["chains"]))
+
+    def test_import_sequence_dataset(self):
+        path = EnvironmentSettings.tmp_test_path / "import_helper_sequence_dataset/"
+        PathBuilder.build(path / "data")
+
+        for file_index, count in enumerate([3, 1, 4, 2, 5]):
+            pd.DataFrame({"cdr3_aa": [f"C{'A' * (file_index + 1)}{'G' * (i + 1)}F" for i in range(count)],
+                          "v_call": ["TRBV1-1"] * count, "j_call": ["TRBJ1-1"] * count,
+                          "epitope": [f"e{file_index}"] * count}).to_csv(path / f"data/file_{file_index}.tsv", sep="\t", index=False)
+
+        params = DatasetImportParams(path=path / "data", result_path=path / "result", is_repertoire=False, paired=False, separator="\t",
+                                     column_mapping={"cdr3_aa": "sequence_aas", "v_call": "v_alleles", "j_call": "j_alleles"},
+                                     metadata_column_mapping={"epitope": "epitope"}, region_type=RegionType.IMGT_JUNCTION,
+                                     import_empty_nt_sequences=True, import_empty_aa_sequences=False, import_illegal_characters=False,
+                                     number_of_processes=2, sequence_file_size=4)
+
+        dataset = ImportHelper.import_sequence_dataset(GenericImport, params, "dataset")
+
+        filenames = ImportHelper.get_sequence_filenames(path / "data", "dataset")
+        expected = [sequence.amino_acid_sequence for filename in filenames
+                    for sequence in ImportHelper.import_items(GenericImport, filename, params)]
+
+        self.assertEqual(15, dataset.get_example_count())
+        self.assertListEqual([path / f"result/batch_{i}.pickle" for i in range(4)], dataset.get_filenames())
+        self.assertListEqual([4, 4, 4, 3], [len(ElementBatchFile.read(filename)) for filename in dataset.get_filenames()])
+        self.assertListEqual(expected, [sequence.amino_acid_sequence for sequence in dataset.get_data()])
+        self.assertEqual({f"e{i}" for i in range(5)}, dataset.labels["epitope"])
+        self.assertEqual(RegionType.IMGT_JUNCTION, dataset.labels["region_type"])
+
+        shutil.rmtree(path)
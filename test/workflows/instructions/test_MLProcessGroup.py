@@ -0,0 +1,106 @@
+import os
+import shutil
+from unittest import TestCase
+
+import pandas as pd
+
+from immuneML.caching.CacheType import CacheType
+from immuneML.data_model.dataset.RepertoireDataset import RepertoireDataset
+from immuneML.encodings.kmer_frequency.KmerFrequencyEncoder import KmerFrequencyEncoder
+from immuneML.environment.Constants import Constants
+from immuneML.environment.EnvironmentSettings import EnvironmentSettings
+from immuneML.environment.Label import Label
+from immuneML.environment.LabelConfiguration import LabelConfiguration
+from immuneML.environment.Metric import Metric
+from immuneML.hyperparameter_optimization.HPSetting import HPSetting
+from immuneML.hyperparameter_optimization.core.HPUtil import HPUtil
+from immuneML.ml_methods.LogisticRegression import LogisticRegression
+from immuneML.ml_methods.SGDClassifier import SGDClassifier
+from immuneML.ml_methods.SVM import SVM
+from immuneML.simulation.dataset_generation.RandomDatasetGenerator import RandomDatasetGenerator
+from immuneML.util.PathBuilder import PathBuilder
+from immuneML.util.RepertoireBuilder import RepertoireBuilder
+from immuneML.workflows.instructions.MLProcess import MLProcess
+from immuneML.workflows.instructions.MLProcessGroup import MLProcessGroup
+
+
+class TestMLProcessGroup(TestCase):
+
+    def setUp(self) -> None:
+        os.environ[Constants.CACHE_TYPE] = CacheType.TEST.name
+
+    def test_run(self):
+        path = EnvironmentSettings.tmp_test_path / "ml_process_group/"
+        PathBuilder.build(path)
+
+        repertoires, metadata = RepertoireBuilder.build(sequences=[["AAA", "CCC"], ["DDD", "EEE"]] * 10, path=path / "data",
+                                                        labels={"l1": [1, 2] * 10})
+        dataset = RepertoireDataset(repertoires=repertoires, metadata_file=metadata, labels={"l1": [1, 2]})
+        train_dataset = dataset.make_subset(list(range(12)), PathBuilder.build(path / "train"), "train")
+        test_dataset = dataset.make_subset(list(range(12, 20)), PathBuilder.build(path / "test"), "test")
+
+        encoder_params = {"normalization_type": "relative_frequency", "reads": "unique", "sequence_encoding": "continuous_kmer",
+                          "sequence_type": "amino_acid", "k": 2, "scale_to_unit_variance": False, "scale_to_zero_mean": False}
+        hp_settings = [HPSetting(KmerFrequencyEncoder.build_object(dataset, **{**encoder_params, "k": k}), {**encoder_params, "k": k}, ml_method,
+                                 {"model_selection_cv": False, "model_selection_n_folds": -1}, [], "e1", name)
+                       for k, name, ml_method in [(2, "lr", LogisticRegression()), (3, "lr", LogisticRegression()), (2, "svm", SVM())]]
+
+        self.assertEqual([[0, 2], [1]], HPUtil.group_by_encoding(hp_settings))
+
+        label_config = LabelConfiguration([Label("l1", [1, 2])])
+        processes = [MLProcess(train_dataset, test_dataset, "l1", {Metric.BALANCED_ACCURACY}, Metric.BALANCED_ACCURACY, path / str(index),
+                               label_config=label_config, hp_setting=hp_settings[index], number_of_processes=1) for index in [0, 2]]
+
+        hp_items = MLProcessGroup(processes).run(1)
+
+        self.assertEqual(2, len(hp_items))
+        self.assertEqual(["e1_lr", "e1_svm"], [hp_item.hp_setting.get_key() for hp_item in hp_items])
+        self.assertTrue(all(hp_item.performance["balanced_accuracy"] == 1. for hp_item in hp_items))
+        self.assertTrue(hp_items[0].encoder is hp_items[1].encoder)
+        self.assertTrue((path / "0" / "encoded_datasets").is_dir())
+        self.assertFalse((path / "2" / "encoded_datasets").is_dir())
+
+        self.assertRaises(AssertionError, MLProcessGroup, [processes[0], MLProcess(train_dataset, test_dataset, "l1", {Metric.BALANCED_ACCURACY},
+                                                                                   Metric.BALANCED_ACCURACY, path / "1", label_config=label_config,
+                                                                                   hp_setting=hp_settings[1])])
+
+        shutil.rmtree(path)
+
+    def test_run_in_batches(self):
+        path = EnvironmentSettings.tmp_test_path / "ml_process_group_in_batches/"
+        PathBuilder.build(path)
+
+        dataset = RandomDatasetGenerator.generate_sequence_dataset(60, {4: 1.}, {"l1": {1: 0.5, 2: 0.5}}, path / "data")
+        dataset.file_size = 15
+        train_dataset = dataset.make_subset(list(range(45)), PathBuilder.build(path / "train"), "train")
+        test_dataset = dataset.make_subset(list(range(45, 60)), PathBuilder.build(path / "test"), "test")
+
+        encoder_params = {"normalization_type": "relative_frequency", "reads": "unique", "sequence_encoding": "continuous_kmer",
+                          "sequence_type": "amino_acid", "k": 2, "scale_to_unit_variance": False, "scale_to_zero_mean": False}
+        hp_settings = [HPSetting(KmerFrequencyEncoder.build_object(dataset, **encoder_params), encoder_params, ml_method,
+                                 {"model_selection_cv": False, "model_selection_n_folds": -1}, [], "e1", name)
+                       for name, ml_method in [("sgd", SGDClassifier(parameters={"batch_size": 10, "epochs": 2})), ("lr", LogisticRegression())]]
+
+        label_config = LabelConfiguration([Label("l1", [1, 2])])
+        processes = [MLProcess(train_dataset, test_dataset, "l1", {Metric.BALANCED_ACCURACY}, Metric.BALANCED_ACCURACY, path / str(index),
+                               label_config=label_config, hp_setting=hp_setting, number_of_processes=1)
+                     for index, hp_setting in enumerate(hp_settings)]
+
+        self.assertEqual([True, False], [process.trains_in_batches() for process in processes])
+
+        encoded_train_dataset, encoded_test_dataset = processes[0].encode_datasets()
+        self.assertIsNone(encoded_train_dataset.encoded_data.examples)
+        self.assertEqual(train_dataset.get_example_ids(), encoded_train_dataset.encoded_data.example_ids)
+        self.assertEqual(encoded_test_dataset.encoded_data.feature_names, encoded_train_dataset.encoded_data.feature_names)
+
+        hp_items = MLProcessGroup(processes).run(1)
+
+        self.assertEqual(["e1_sgd", "e1_lr"], [hp_item.hp_setting.get_key() for hp_item in hp_items])
+        self.assertTrue(all(0 <= hp_item.performance["balanced_accuracy"] <= 1 for hp_item in hp_items))
+        self.assertTrue((path / "1" / "encoded_datasets").is_dir())
+
+        train_predictions = pd.read_csv(hp_items[0].train_predictions_path)
+        self.assertEqual(45, train_predictions.shape[0])
+        self.assertTrue(set(train_predictions["l1_predicted_class"]).issubset({1, 2}))
+
+        shutil.rmtree(path)